@@ -0,0 +1,5 @@
+import sys
+
+from auto_trader.cli import main
+
+sys.exit(main())
@@ -0,0 +1,249 @@
+import math
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+FILL_COLUMNS = ("ticker", "direction", "quantity", "fill_price", "commission")
+
+
+def fills_frame(fill_events) -> pd.DataFrame:
+    """
+    把 FillEvent 列表转换为成交表（每个 FillEvent 一行）。
+    """
+    return pd.DataFrame({
+        column: [getattr(fill, column) for fill in fill_events] for column in FILL_COLUMNS
+    }, columns=list(FILL_COLUMNS))
+
+
+def _signed_quantity(fills: pd.DataFrame) -> np.ndarray:
+    quantity = fills["quantity"].to_numpy(dtype=np.float64)
+    return np.where(fills["direction"].to_numpy() == "BUY", quantity, -quantity)
+
+
+def years_spanned(index, n_bars: int, periods_per_year: int = TRADING_DAYS) -> float:
+    """
+    权益曲线覆盖的年数：有 DatetimeIndex 时按日历计算，否则按 K 线数量估算。
+    """
+    if isinstance(index, pd.DatetimeIndex) and len(index) > 1:
+        return (index[-1] - index[0]).total_seconds() / (365.25 * 86400)
+    return (n_bars - 1) / periods_per_year
+
+
+def batch_metrics(equity, periods_per_year: int = TRADING_DAYS, risk_free: float = 0.0,
+                  years=None) -> pd.DataFrame:
+    """
+    一次性计算多条权益曲线的收益与风险指标。
+
+    Args:
+        equity: 形状为 (回测数, K 线数) 的数组，每行一条权益曲线；长度不同的曲线
+            在末尾用 NaN 补齐。权益需为正数，收益率按相邻 K 线的权益计算。
+        periods_per_year (int): 每年的 K 线数量，用于年化。
+        risk_free (float): 年化无风险利率。
+        years: 每条曲线覆盖的年数（标量或数组），默认按 K 线数量 / periods_per_year 估算。
+
+    Returns:
+        每条曲线一行的 DataFrame，列为 final_equity、total_return、cagr、volatility、
+        sharpe、sortino、max_drawdown（相对峰值的比例）和 max_drawdown_duration（K 线数）。
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    n_runs, n_bars = equity.shape
+    lengths = (~np.isnan(equity)).sum(axis=1)
+    runs = np.arange(n_runs)
+    start = equity[:, 0] if n_bars else np.full(n_runs, np.nan)
+    final = equity[runs, np.maximum(lengths - 1, 0)] if n_bars else np.full(n_runs, np.nan)
+    if years is None:
+        years = (lengths - 1) / periods_per_year
+    years = np.broadcast_to(np.asarray(years, dtype=np.float64), (n_runs,))
+
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        # 全为 NaN 的行（只有一根 K 线）在 nanmean 等处会告警，结果本来就是 NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        total_return = final / start - 1.0
+        growth = final / start
+        cagr = np.where((years > 0) & (growth > 0), np.power(growth, 1.0 / years) - 1.0, np.nan)
+
+        returns = equity[:, 1:] / equity[:, :-1] - 1.0
+        excess = returns - risk_free / periods_per_year
+        mean = np.nanmean(excess, axis=1)
+        std = np.nanstd(returns, axis=1, ddof=1)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0.0) ** 2, axis=1))
+        scale = math.sqrt(periods_per_year)
+        sharpe = np.where(std > 0, mean / std * scale, np.nan)
+        sortino = np.where(downside > 0, mean / downside * scale, np.nan)
+
+        peak = np.fmax.accumulate(equity, axis=1)
+        max_drawdown = np.nanmax(1.0 - equity / peak, axis=1) if n_bars else np.full(n_runs, np.nan)
+        # 水下时长：距上一次创新高的 K 线数
+        underwater = equity < peak
+        bars = np.arange(n_bars)
+        last_high = np.maximum.accumulate(np.where(underwater, 0, bars), axis=1)
+        duration = np.where(underwater, bars - last_high, 0).max(axis=1) if n_bars else np.zeros(n_runs)
+
+    return pd.DataFrame({
+        "final_equity": final,
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": std * math.sqrt(periods_per_year),
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": max_drawdown,
+        "max_drawdown_duration": duration.astype(np.int64),
+    })
+
+
+def round_trip_pnl(fills: pd.DataFrame) -> np.ndarray:
+    """
+    每笔已平仓交易（round trip）的盈亏（含佣金），按开仓顺序排列。
+
+    一个 ticker 的持仓从 0 开始、回到 0 为一次完整交易，期末仍未平仓的交易不计入。
+    """
+    if len(fills) == 0:
+        return np.empty(0)
+    signed = _signed_quantity(fills)
+    price = fills["fill_price"].to_numpy(dtype=np.float64)
+    commission = fills["commission"].to_numpy(dtype=np.float64)
+    tickers = fills["ticker"].to_numpy()
+
+    position_after = pd.Series(signed).groupby(tickers).cumsum().to_numpy()
+    opens = (position_after - signed) == 0
+    trip = pd.Series(opens.astype(np.int64)).groupby(tickers).cumsum().to_numpy()
+    trips = pd.DataFrame({
+        "ticker": tickers, "trip": trip, "cash": -signed * price - commission, "position": position_after,
+    }).groupby(["ticker", "trip"], sort=False).agg(pnl=("cash", "sum"), position=("position", "last"))
+    return trips.loc[trips["position"] == 0, "pnl"].to_numpy()
+
+
+def trade_metrics(fills: pd.DataFrame, average_equity: float = None, years: float = None) -> dict:
+    """
+    根据成交表计算交易类指标。
+
+    一个 ticker 的持仓从 0 开始、回到 0 为一次完整交易（round trip），
+    hit_rate 是已平仓交易中盈利（含佣金）的比例。turnover 为成交金额除以
+    平均权益，给出 years 时按年折算。
+    """
+    if len(fills) == 0:
+        return {"num_fills": 0, "traded_notional": 0.0, "commission": 0.0,
+                "round_trips": 0, "hit_rate": np.nan, "turnover": 0.0}
+    signed = _signed_quantity(fills)
+    price = fills["fill_price"].to_numpy(dtype=np.float64)
+    commission = fills["commission"].to_numpy(dtype=np.float64)
+    closed = round_trip_pnl(fills)
+
+    traded_notional = float(np.abs(signed * price).sum())
+    turnover = np.nan
+    if average_equity:
+        turnover = traded_notional / average_equity
+        if years:
+            turnover /= years
+    return {
+        "num_fills": int(len(fills)),
+        "traded_notional": traded_notional,
+        "commission": float(commission.sum()),
+        "round_trips": int(len(closed)),
+        "hit_rate": float((closed > 0).mean()) if len(closed) else np.nan,
+        "turnover": turnover,
+    }
+
+
+def exposure(positions) -> float:
+    """
+    持有非零仓位的 K 线占比。
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    return float((positions != 0).mean()) if positions.size else 0.0
+
+
+def attribution(fills: pd.DataFrame, last_prices) -> pd.DataFrame:
+    """
+    按 ticker 拆分盈亏。
+
+    Args:
+        fills (pd.DataFrame): 成交表。
+        last_prices: ticker -> 最新价格（dict 或 Series），用于给期末持仓估值。
+
+    Returns:
+        以 ticker 为索引的 DataFrame：num_fills、position（期末持仓）、traded_notional、
+        commission 和 pnl（现金流加期末持仓市值，已扣佣金）。
+    """
+    signed = _signed_quantity(fills)
+    price = fills["fill_price"].to_numpy(dtype=np.float64)
+    frame = pd.DataFrame({
+        "ticker": fills["ticker"].to_numpy(),
+        "position": signed,
+        "traded_notional": np.abs(signed * price),
+        "commission": fills["commission"].to_numpy(dtype=np.float64),
+        "cash": -signed * price,
+    })
+    grouped = frame.groupby("ticker")
+    result = grouped[["position", "traded_notional", "commission", "cash"]].sum()
+    result.insert(0, "num_fills", grouped.size())
+    marks = pd.Series(last_prices, dtype=np.float64).reindex(result.index)
+    result["pnl"] = result["cash"] - result["commission"] + result["position"] * marks.fillna(0.0)
+    return result.drop(columns="cash")
+
+
+def performance_metrics(equity, fills: pd.DataFrame = None, positions=None,
+                        periods_per_year: int = TRADING_DAYS, risk_free: float = 0.0) -> dict:
+    """
+    计算一次回测的全部指标。
+
+    Args:
+        equity: 权益曲线（Series 或数组）；带 DatetimeIndex 时按实际日历年数计算 CAGR。
+        fills (pd.DataFrame): 成交表，提供后计算交易类指标。
+        positions: 与权益曲线对齐的持仓序列，提供后计算 exposure。
+        periods_per_year (int): 每年的 K 线数量。
+        risk_free (float): 年化无风险利率。
+    """
+    values = np.asarray(equity, dtype=np.float64)
+    years = years_spanned(getattr(equity, "index", None), len(values), periods_per_year)
+    metrics = batch_metrics(values[np.newaxis, :], periods_per_year, risk_free, years).iloc[0].to_dict()
+    metrics["max_drawdown_duration"] = int(metrics["max_drawdown_duration"])
+    if fills is not None:
+        metrics.update(trade_metrics(fills, float(np.nanmean(values)) if len(values) else None, years))
+    if positions is not None:
+        metrics["exposure"] = exposure(positions)
+    return metrics
+
+
+def result_metrics(result, periods_per_year: int = TRADING_DAYS, risk_free: float = 0.0) -> dict:
+    """
+    计算 BacktestResult 的全部指标。
+    """
+    return performance_metrics(result.equity_curve, result.fills, result.positions, periods_per_year, risk_free)
+
+
+def export_metrics(metrics: pd.DataFrame, path: str) -> str:
+    """
+    把指标表写成列式文件，返回实际写入的路径。
+
+    安装了 pyarrow 或 fastparquet 时写 Parquet；否则写压缩的 .npz，
+    每列一个数组（字符串列存为定长 Unicode，不依赖 pickle）。
+    """
+    root, ext = os.path.splitext(path)
+    if ext != ".npz":
+        try:
+            metrics.to_parquet(path if ext else root + ".parquet", index=False)
+            return path if ext else root + ".parquet"
+        except ImportError:
+            path = root + ".npz"
+    columns = [str(column) for column in metrics.columns]
+    arrays = [metrics[column].to_numpy() for column in metrics.columns]
+    arrays = [values.astype(str) if values.dtype == object else values for values in arrays]
+    np.savez_compressed(path, np.array(columns), *arrays)
+    return path
+
+
+def load_metrics(path: str) -> pd.DataFrame:
+    """
+    读取 export_metrics() 写出的文件。
+    """
+    if not path.endswith(".npz"):
+        return pd.read_parquet(path)
+    with np.load(path, allow_pickle=False) as data:
+        columns = data["arr_0"].tolist()
+        return pd.DataFrame({column: data[f"arr_{k}"] for k, column in enumerate(columns, start=1)},
+                            columns=columns)
@@ -0,0 +1,409 @@
+import math
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .metrics import TRADING_DAYS, round_trip_pnl
+
+METHOD_BOOTSTRAP = "bootstrap"
+METHOD_SHUFFLE = "shuffle"
+METHOD_PERTURB = "perturb"
+
+METRICS = ("sharpe", "max_drawdown", "terminal_equity")
+
+# 每个分块最多生成的元素数（路径数 × K 线数），决定单个进程的峰值内存（约 32 MB 的 float64）
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def block_bootstrap(returns, n_paths: int, block_size: int = 20, initial_equity: float = 1.0,
+                    rng: np.random.Generator = None) -> np.ndarray:
+    """
+    收益率的循环块自助法（circular block bootstrap）：每条路径由随机起点的连续
+    block_size 根 K 线收益拼接而成，块内保留收益的自相关和波动聚集。
+
+    Args:
+        returns: 原始的逐 K 线收益率序列。
+        n_paths: 生成的路径数。
+        block_size: 块长度（K 线数）。
+        initial_equity: 路径的初始权益。
+        rng: 随机数生成器。
+
+    Returns:
+        形状为 (n_paths, len(returns) + 1) 的权益路径，第一列为 initial_equity。
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    rng = rng or np.random.default_rng()
+    n = len(returns)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks, 1))
+    index = ((starts + np.arange(block_size)) % n).reshape(n_paths, -1)[:, :n]
+    paths = np.empty((n_paths, n + 1))
+    paths[:, 0] = initial_equity
+    np.cumprod(1.0 + returns[index], axis=1, out=paths[:, 1:])
+    paths[:, 1:] *= initial_equity
+    return paths
+
+
+def shuffle_trades(trade_pnls, n_paths: int, initial_equity: float, replace: bool = False,
+                   rng: np.random.Generator = None) -> np.ndarray:
+    """
+    打乱交易顺序：每条路径把逐笔交易盈亏随机重排后累加成权益曲线。
+
+    不放回时期末权益与原始结果相同，分布反映的是回撤和夏普对交易顺序的敏感度；
+    replace=True 时有放回地抽取同样数量的交易，期末权益也随之变化。
+
+    Returns:
+        形状为 (n_paths, len(trade_pnls) + 1) 的权益路径。
+    """
+    trade_pnls = np.asarray(trade_pnls, dtype=np.float64)
+    rng = rng or np.random.default_rng()
+    n = len(trade_pnls)
+    if replace:
+        sampled = trade_pnls[rng.integers(0, n, size=(n_paths, n))] if n else np.empty((n_paths, 0))
+    else:
+        sampled = rng.permuted(np.broadcast_to(trade_pnls, (n_paths, n)), axis=1)
+    paths = np.empty((n_paths, n + 1))
+    paths[:, 0] = initial_equity
+    np.cumsum(sampled, axis=1, out=paths[:, 1:])
+    paths[:, 1:] += initial_equity
+    return paths
+
+
+def perturb_prices(equity, close, positions, n_paths: int, noise: float = 0.5,
+                   rng: np.random.Generator = None) -> np.ndarray:
+    """
+    价格路径扰动：给收盘价的对数收益叠加 noise 倍收益标准差的高斯噪声，
+    按原始持仓重新计算权益。
+
+    原始权益变化中不能由 持仓 × 价格变化 解释的部分（佣金、成交价与收盘价之差）
+    原样保留，因此扰动路径与原始结果的成本一致，只改变行情。
+
+    Args:
+        equity: 原始权益曲线，与 close、positions 逐 K 线对齐（例如 BacktestResult.equity）。
+        close: 收盘价。
+        positions: 每根 K 线收盘后的持仓（例如 BacktestResult.positions）。
+        n_paths: 生成的路径数。
+        noise: 噪声标准差相对于原始对数收益标准差的倍数。
+        rng: 随机数生成器。
+
+    Returns:
+        形状为 (n_paths, len(close)) 的权益路径。
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    held = np.asarray(positions, dtype=np.float64)[:-1]
+    rng = rng or np.random.default_rng()
+    residual = np.diff(equity) - held * np.diff(close)
+    log_returns = np.diff(np.log(close))
+    scale = noise * (log_returns.std(ddof=1) if len(log_returns) > 1 else 0.0)
+    shocked = log_returns + rng.normal(0.0, scale, size=(n_paths, len(log_returns)))
+    prices = np.empty((n_paths, len(close)))
+    prices[:, 0] = close[0]
+    prices[:, 1:] = close[0] * np.exp(np.cumsum(shocked, axis=1))
+    paths = np.empty_like(prices)
+    paths[:, 0] = equity[0]
+    np.cumsum(held * np.diff(prices, axis=1) + residual, axis=1, out=paths[:, 1:])
+    paths[:, 1:] += equity[0]
+    return paths
+
+
+_GENERATORS = {
+    METHOD_BOOTSTRAP: block_bootstrap,
+    METHOD_SHUFFLE: shuffle_trades,
+    METHOD_PERTURB: perturb_prices,
+}
+
+
+def path_metrics(paths, periods_per_year: int = TRADING_DAYS) -> dict:
+    """
+    逐行计算权益路径的夏普比率、最大回撤（相对峰值的比例）和期末权益，
+    定义与 batch_metrics 相同。
+
+    Returns:
+        dict: 指标名 -> 长度为路径数的数组。
+    """
+    paths = np.atleast_2d(np.asarray(paths, dtype=np.float64))
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        returns = paths[:, 1:] / paths[:, :-1] - 1.0
+        std = returns.std(axis=1, ddof=1)
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std * math.sqrt(periods_per_year), np.nan)
+        peak = np.maximum.accumulate(paths, axis=1)
+        max_drawdown = (1.0 - paths / peak).max(axis=1)
+    return {"sharpe": sharpe, "max_drawdown": max_drawdown, "terminal_equity": paths[:, -1].copy()}
+
+
+class StreamingMoments:
+    """
+    流式的计数、均值、方差和最值（Welford 算法，按批次用 Chan 的公式合并），
+    内存为 O(1)；多个进程各自累计后可以用 merge() 合并。NaN 不计入。
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            other = StreamingMoments()
+            other.count = values.size
+            other.mean = float(values.mean())
+            other._m2 = float(((values - other.mean) ** 2).sum())
+            other.min = float(values.min())
+            other.max = float(values.max())
+            self.merge(other)
+
+    def merge(self, other: "StreamingMoments"):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class ReservoirSample:
+    """
+    固定容量的均匀随机样本，用于估计分位数。
+
+    每个值附带一个均匀分布的随机键，只保留键最小的 capacity 个（bottom-k 抽样），
+    因此样本是全部值的无放回均匀抽样；两个样本合并时同样保留键最小的 capacity 个，
+    结果与合并顺序无关。值的总数不超过 capacity 时分位数是精确的。
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        if capacity < 1:
+            raise ValueError("capacity 必须至少为 1")
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self._keys = np.empty(0)
+
+    def update(self, values, rng: np.random.Generator):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._keep(np.concatenate((self.values, values)), np.concatenate((self._keys, rng.random(values.size))))
+
+    def merge(self, other: "ReservoirSample"):
+        self._keep(np.concatenate((self.values, other.values)), np.concatenate((self._keys, other._keys)))
+
+    def _keep(self, values: np.ndarray, keys: np.ndarray):
+        if values.size > self.capacity:
+            kept = np.argpartition(keys, self.capacity - 1)[:self.capacity]
+            values, keys = values[kept], keys[kept]
+        self.values, self._keys = values, keys
+
+    def quantile(self, q):
+        return np.quantile(self.values, q) if self.values.size else np.full(np.shape(q), np.nan)
+
+    def fraction_below(self, threshold: float) -> float:
+        """
+        估计取值小于 threshold 的比例。
+        """
+        return float((self.values < threshold).mean()) if self.values.size else math.nan
+
+
+class MetricDistribution:
+    """
+    单个指标在全部路径上的分布：精确的流式矩（StreamingMoments）加上
+    用于分位数的蓄水池样本（ReservoirSample）。
+    """
+
+    def __init__(self, reservoir_size: int = 10_000):
+        self.moments = StreamingMoments()
+        self.sample = ReservoirSample(reservoir_size)
+
+    def update(self, values, rng: np.random.Generator):
+        self.moments.update(values)
+        self.sample.update(values, rng)
+
+    def merge(self, other: "MetricDistribution"):
+        self.moments.merge(other.moments)
+        self.sample.merge(other.sample)
+
+
+def _run_chunks(method: str, inputs: dict, seeds: list, sizes: list, periods_per_year: int,
+                reservoir_size: int) -> dict:
+    """
+    依次生成并汇总若干分块的路径，返回 指标名 -> MetricDistribution。每个分块的路径
+    用完即弃，内存与路径总数无关。也是工作进程中执行的任务。
+    """
+    generate = _GENERATORS[method]
+    distributions = {name: MetricDistribution(reservoir_size) for name in METRICS}
+    for seed, size in zip(seeds, sizes):
+        rng = np.random.default_rng(seed)
+        metrics = path_metrics(generate(n_paths=size, rng=rng, **inputs), periods_per_year)
+        for name in METRICS:
+            distributions[name].update(metrics[name], rng)
+    return distributions
+
+
+class RobustnessReport:
+    """
+    一次稳健性分析的结果：每个指标的路径分布，以及原始结果的指标值。
+    """
+
+    QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+    def __init__(self, method: str, n_paths: int, distributions: dict, observed: dict):
+        self.method = method
+        self.n_paths = n_paths
+        self.distributions = distributions
+        self.observed = observed
+
+    def quantile(self, metric: str, q):
+        return self.distributions[metric].sample.quantile(q)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        每个指标一行：均值、标准差、最值、分位数、原始结果的取值，以及路径中
+        低于原始取值的比例（observed_rank，接近 1 说明原始结果处在分布的上尾，
+        例如夏普比率的 rank 很高意味着结果可能依赖运气）。
+        """
+        rows = {}
+        for name, distribution in self.distributions.items():
+            moments = distribution.moments
+            row = {"mean": moments.mean, "std": moments.std, "min": moments.min}
+            row.update({f"p{round(q * 100):02d}": value
+                        for q, value in zip(self.QUANTILES, distribution.sample.quantile(self.QUANTILES))})
+            row["max"] = moments.max
+            observed = self.observed.get(name, math.nan)
+            row["observed"] = observed
+            row["observed_rank"] = distribution.sample.fraction_below(observed)
+            rows[name] = row
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+class RobustnessAnalysis:
+    """
+    蒙特卡洛 / 自助法稳健性分析，判断一次回测结果有多少来自运气。
+
+    三种重采样方式（method）：
+      * "bootstrap" — 收益率的循环块自助法，输入 returns（可选 block_size、initial_equity）；
+      * "shuffle"   — 打乱逐笔交易的顺序，输入 trade_pnls 和 initial_equity（可选 replace）；
+      * "perturb"   — 扰动价格路径、按原持仓重算权益，输入 equity、close、positions（可选 noise）。
+
+    路径按分块以二维 NumPy 数组生成（每块 路径数 × K 线数 不超过约 400 万个元素），
+    算出指标后即丢弃；每个指标只保留流式的矩和固定容量的蓄水池样本，内存与路径数无关。
+    路径数较多时分块分发到 ProcessPoolExecutor，各进程返回汇总结果再合并。
+    每个分块的随机种子由 seed 派生，同样的 seed 得到的分布与进程数无关。
+    """
+
+    def __init__(self, method: str, inputs: dict, periods_per_year: int = TRADING_DAYS, chunk_size: int = None,
+                 reservoir_size: int = 10_000, max_workers: int = None, seed: int = 0):
+        """
+        Args:
+            method (str): "bootstrap"、"shuffle" 或 "perturb"。
+            inputs (dict): 传给对应路径生成函数的参数，见类说明；from_result() 会自动准备。
+            periods_per_year (int): 每年的 K 线数量，用于年化夏普比率。
+            chunk_size (int): 每块的路径数，默认按路径长度取约 400 万个元素。
+            reservoir_size (int): 每个指标用于估计分位数的样本容量。
+            max_workers (int): 工作进程数，默认等于 CPU 数；为 1 时在当前进程中运行。
+            seed (int): 随机种子。
+        """
+        if method not in _GENERATORS:
+            raise ValueError(f"不支持的重采样方式: {method}，可选 {sorted(_GENERATORS)}")
+        self.method = method
+        self.inputs = inputs
+        self.periods_per_year = periods_per_year
+        self.chunk_size = chunk_size
+        self.reservoir_size = reservoir_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.seed = seed
+
+    @classmethod
+    def from_result(cls, result, method: str, close=None, initial_cash: float = 0.0,
+                    **kwargs) -> "RobustnessAnalysis":
+        """
+        按 BacktestResult 准备输入：bootstrap 使用权益曲线的逐 K 线收益，shuffle 使用
+        已平仓交易的盈亏，perturb 使用权益曲线、持仓和 close（收盘价，需另行传入）。
+        初始权益取权益曲线的第一个值。其余参数传给构造函数。
+
+        收益率和回撤都是相对权益计算的，权益曲线必须始终为正。VectorizedBacktest
+        默认 initial_cash=0，此时权益在 0 附近，需要通过 initial_cash 补上初始资金：
+        权益曲线整体加上这笔现金，等价于以该初始现金运行同一回测。
+
+        Raises:
+            ValueError: 权益曲线（加上 initial_cash 后）存在非正值。
+        """
+        equity = np.asarray(result.equity, dtype=np.float64) + initial_cash
+        if len(equity) == 0 or not (equity > 0).all():
+            raise ValueError("权益曲线必须始终为正，收益率和回撤才有意义；"
+                             "请以 VectorizedBacktest(initial_cash=...) 回测，或向 from_result 传入 initial_cash")
+        if method == METHOD_BOOTSTRAP:
+            inputs = {"returns": equity[1:] / equity[:-1] - 1.0, "initial_equity": equity[0]}
+        elif method == METHOD_SHUFFLE:
+            inputs = {"trade_pnls": round_trip_pnl(result.fills), "initial_equity": equity[0]}
+        elif method == METHOD_PERTURB:
+            if close is None:
+                raise ValueError("perturb 需要传入与权益曲线对齐的收盘价 close")
+            inputs = {"equity": equity, "close": close, "positions": result.positions}
+        else:
+            raise ValueError(f"不支持的重采样方式: {method}，可选 {sorted(_GENERATORS)}")
+        return cls(method, inputs, **kwargs)
+
+    def observed_path(self) -> np.ndarray:
+        """
+        原始结果对应的权益路径，用于和重采样的分布比较。
+        """
+        inputs = self.inputs
+        if self.method == METHOD_BOOTSTRAP:
+            returns = np.asarray(inputs["returns"], dtype=np.float64)
+            return inputs.get("initial_equity", 1.0) * np.concatenate(([1.0], np.cumprod(1.0 + returns)))
+        if self.method == METHOD_SHUFFLE:
+            return inputs["initial_equity"] + np.concatenate(([0.0], np.cumsum(inputs["trade_pnls"])))
+        return np.asarray(inputs["equity"], dtype=np.float64)
+
+    def _chunks(self, n_paths: int) -> list:
+        length = len(self.observed_path())
+        chunk_size = self.chunk_size or max(1, _CHUNK_ELEMENTS // max(length, 1))
+        sizes = [chunk_size] * (n_paths // chunk_size)
+        if n_paths % chunk_size:
+            sizes.append(n_paths % chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        return list(zip(seeds, sizes))
+
+    def run(self, n_paths: int = 10_000) -> RobustnessReport:
+        """
+        生成 n_paths 条路径并汇总指标分布。
+        """
+        chunks = self._chunks(n_paths)
+        args = (self.method, self.inputs)
+        tail = (self.periods_per_year, self.reservoir_size)
+        workers = min(self.max_workers, len(chunks))
+        if workers <= 1:
+            parts = [_run_chunks(*args, [seed for seed, _ in chunks], [size for _, size in chunks], *tail)]
+        else:
+            # 每个进程分到多个分块，任务间按提交顺序合并
+            tasks = [chunks[k::workers] for k in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_run_chunks, *args, [seed for seed, _ in task],
+                                           [size for _, size in task], *tail) for task in tasks]
+                parts = [future.result() for future in futures]
+
+        distributions = parts[0]
+        for part in parts[1:]:
+            for name in METRICS:
+                distributions[name].merge(part[name])
+        observed = {name: float(values[0])
+                    for name, values in path_metrics(self.observed_path(), self.periods_per_year).items()}
+        return RobustnessReport(self.method, n_paths, distributions, observed)
@@ -0,0 +1,70 @@
+from ..common.event import EventBus, EventType
+from ..data_handler.data_handler import DataHandler
+
+
+class Backtest:
+    """
+    同步、无墙钟的回测驱动器。
+
+    在调用线程上逐条从数据处理器拉取 K 线，每发布一条 MarketEvent 就把事件总线
+    排空至静止状态（策略 -> 信号 -> 订单 -> 成交 -> 头寸 -> 风控全部处理完毕），
+    然后再推进下一条。整个过程没有 sleep 和轮询，吞吐量只受各处理器自身开销限制，
+    结果也与线程调度无关。
+
+    StrategyEngine、ExecutionHandler、PositionManager、RiskManager 等组件无需改动，
+    只要像实时模式一样订阅到同一个事件总线即可。
+    """
+    def __init__(self, event_bus: EventBus, data_handler: DataHandler, checkpointer=None):
+        """
+        初始化回测驱动器。
+
+        Args:
+            event_bus (EventBus): 各组件已订阅的事件总线，不能处于线程运行状态。
+                推荐使用 EventBus(threaded=False)，分发走无锁的 deque。
+            data_handler (DataHandler): 提供历史 K 线的数据处理器。
+            checkpointer (Checkpointer): 可选，每个时间步处理完、总线静止后调用其
+                maybe_save()，见 resume()。
+        """
+        self.event_bus = event_bus
+        self.data_handler = data_handler
+        self.checkpointer = checkpointer
+        self.bars_processed = 0
+        self.events_dispatched = 0
+
+    def resume(self) -> bool:
+        """
+        从 checkpointer 中最新的检查点恢复各组件的状态，之后的 run() 只处理
+        检查点之后的 K 线。
+
+        Returns:
+            bool: 是否找到并恢复了检查点。
+        """
+        bars = self.checkpointer.restore()
+        if bars is None:
+            return False
+        self.bars_processed = bars
+        return True
+
+    def run(self) -> int:
+        """
+        运行回测直到数据耗尽。
+
+        Returns:
+            int: 本次运行处理的 K 线数量。
+        """
+        if self.event_bus.is_running():
+            raise RuntimeError("回测模式需要在调用线程上分发事件，请勿先调用 event_bus.start()")
+
+        # 先处理回测开始前已经在队列中的事件
+        self.events_dispatched += self.event_bus.run_until_idle()
+
+        bars = 0
+        while self.data_handler.continue_backtest:
+            for event in self.data_handler.update_bars():
+                self.event_bus.publish(event)
+                self.events_dispatched += self.event_bus.run_until_idle()
+                bars += len(event) if event.event_type is EventType.MARKET_BATCH else 1
+            if self.checkpointer is not None:
+                self.checkpointer.maybe_save(self.bars_processed + bars)
+        self.bars_processed += bars
+        return bars
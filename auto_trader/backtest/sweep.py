@@ -0,0 +1,398 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ..analytics.metrics import batch_metrics, exposure, fills_frame, trade_metrics, years_spanned
+from ..common.event import EventBus, EventType
+from ..data_handler.bar_buffer import BAR_FIELDS
+from ..data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from ..data_storage.bar_cache import BarCache
+from ..data_storage.feature_cache import FeatureCache
+from ..execution_handler.execution_handler import ExecutionHandler
+from ..strategy_engine.strategy_engine import StrategyEngine
+from .backtest import Backtest
+from .vectorized import BacktestResult, VectorizedBacktest, FILL_AT_CLOSE
+
+ENGINE_VECTORIZED = "vectorized"
+ENGINE_EVENT = "event"
+
+
+class SharedBarData:
+    """
+    把所有 ticker 的 K 线放进一块共享内存，供参数扫描的工作进程只读访问。
+
+    每个 ticker 占两段连续区域：int64 时间戳 (n,) 和 float64 OHLCV 矩阵 (n, 5)。
+    工作进程通过 `attach()` 映射同一块内存，构造 DataFrame 时不拷贝数据，
+    任务参数里也只传 ticker 名称，不再逐任务 pickle 整段行情。
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, layout: dict, owner: bool):
+        self._shm = shm
+        self.layout = layout
+        self._owner = owner
+        self._frames = {}
+
+    @classmethod
+    def from_csv(cls, csv_files: list, tickers: list, cache_dir: str = None) -> "SharedBarData":
+        """
+        读取 CSV（每个文件只读一次）并复制到新建的共享内存中。
+        指定 cache_dir 时通过 BarCache 读取，已转换过的文件不再解析。
+        """
+        bar_cache = BarCache(cache_dir) if cache_dir else None
+        arrays = {}
+        for path, ticker in zip(csv_files, tickers):
+            if bar_cache is not None:
+                columns = bar_cache.load(path)
+                timestamps = columns["timestamp"]
+                bars = np.column_stack([columns[field] for field in BAR_FIELDS])
+            else:
+                df = pd.read_csv(path, header=0, index_col=0, parse_dates=True).sort_index(kind="stable")
+                timestamps = df.index.values.astype("datetime64[ns]").view(np.int64)
+                bars = df[list(BAR_FIELDS)].to_numpy(dtype=np.float64)
+            arrays[ticker] = (timestamps, bars)
+
+        size = sum(ts.nbytes + bars.nbytes for ts, bars in arrays.values())
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        layout = {}
+        offset = 0
+        for ticker, (timestamps, bars) in arrays.items():
+            n = len(timestamps)
+            np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=offset)[:] = timestamps
+            layout[ticker] = (offset, n)
+            offset += timestamps.nbytes
+            np.ndarray(bars.shape, dtype=np.float64, buffer=shm.buf, offset=offset)[:] = bars
+            offset += bars.nbytes
+        return cls(shm, layout, owner=True)
+
+    @property
+    def descriptor(self) -> tuple:
+        """
+        可以 pickle 的描述信息，用于在其他进程中 attach。
+        """
+        return self._shm.name, self.layout
+
+    @classmethod
+    def attach(cls, descriptor: tuple) -> "SharedBarData":
+        name, layout = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        # 只读挂载的一方不负责回收，避免进程退出时资源跟踪器提前 unlink
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, layout, owner=False)
+
+    @property
+    def tickers(self) -> list:
+        return list(self.layout)
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """
+        返回 ticker 的 OHLCV DataFrame，底层直接引用共享内存。
+        """
+        df = self._frames.get(ticker)
+        if df is None:
+            offset, n = self.layout[ticker]
+            timestamps = np.ndarray((n,), dtype=np.int64, buffer=self._shm.buf, offset=offset)
+            bars = np.ndarray((n, len(BAR_FIELDS)), dtype=np.float64, buffer=self._shm.buf,
+                              offset=offset + timestamps.nbytes)
+            bars.flags.writeable = False
+            index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), name="datetime")
+            df = pd.DataFrame(bars, index=index, columns=list(BAR_FIELDS), copy=False)
+            self._frames[ticker] = df
+        return df
+
+    def close(self):
+        """
+        释放映射；创建方同时删除共享内存。
+        """
+        self._frames.clear()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# 每个工作进程在初始化时挂载一次共享行情，并打开共享磁盘目录的特征缓存
+_worker_data = None
+_worker_features = None
+
+_CACHE_COUNTERS = ("memory_hits", "disk_hits", "misses", "evictions")
+
+
+def _init_worker(descriptor: tuple, feature_cache_dir: str = None):
+    global _worker_data, _worker_features
+    _worker_data = SharedBarData.attach(descriptor)
+    _worker_features = FeatureCache(feature_cache_dir) if feature_cache_dir else None
+
+
+class _EquityRecorder:
+    """
+    事件驱动回测中按 K 线记录持仓、现金和权益。
+    """
+    def __init__(self, event_bus: EventBus, initial_cash: float):
+        self.cash = initial_cash
+        self.position = 0
+        self.price = 0.0
+        self.positions, self.cash_curve, self.equity = [], [], []
+        self.fills = []
+        event_bus.subscribe(EventType.MARKET, self.on_market)
+        event_bus.subscribe(EventType.FILL, self.on_fill)
+
+    def on_market(self, event):
+        self.price = event.price
+        self.positions.append(self.position)
+        self.cash_curve.append(self.cash)
+        self.equity.append(self.cash + self.position * self.price)
+
+    def on_fill(self, event):
+        sign = 1 if event.direction == "BUY" else -1
+        self.position += sign * event.quantity
+        self.cash -= sign * event.quantity * event.fill_price + event.commission
+        self.fills.append(event)
+        # 成交发生在当前 K 线上，修正这根 K 线的记录
+        self.positions[-1] = self.position
+        self.cash_curve[-1] = self.cash
+        self.equity[-1] = self.cash + self.position * self.price
+
+
+def _run_event_driven(strategy_cls: type, params: dict, df: pd.DataFrame, ticker: str,
+                      engine_kwargs: dict, feature_cache: FeatureCache = None) -> BacktestResult:
+    """
+    在独立的事件总线上运行一次完整的事件驱动回测。
+    """
+    if engine_kwargs["fill_at"] != FILL_AT_CLOSE:
+        raise ValueError("事件驱动回测只支持按信号 K 线收盘价成交")
+    event_bus = EventBus(threaded=False)
+    data_handler = HistoricCSVDataHandler.from_dataframes(event_bus, {ticker: df}, feature_cache=feature_cache)
+    strategy = strategy_cls(bars=data_handler, **params)
+    StrategyEngine([strategy], event_bus)
+    execution_handler = ExecutionHandler(event_bus, engine_kwargs["quantity"], engine_kwargs["commission"])
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    recorder = _EquityRecorder(event_bus, engine_kwargs["initial_cash"])
+    Backtest(event_bus, data_handler).run()
+
+    fills = fills_frame(recorder.fills)
+    return BacktestResult(ticker, df.index, fills, np.array(recorder.positions),
+                          np.array(recorder.cash_curve), np.array(recorder.equity))
+
+
+def _run_batch(strategy_cls: type, params: dict, tickers: list, engine: str, engine_kwargs: dict) -> tuple:
+    """
+    在工作进程中对一组 ticker 运行同一组参数，返回 (指标行, 本批次的特征缓存计数)。
+    """
+    features = _worker_features
+    before = features.stats() if features is not None else None
+    results = []
+    if engine == ENGINE_VECTORIZED:
+        backtest = VectorizedBacktest(strategy_cls(bars=None, **params), feature_cache=features, **engine_kwargs)
+        for ticker in tickers:
+            results.append(backtest.run(_worker_data.frame(ticker), ticker))
+    else:
+        for ticker in tickers:
+            results.append(_run_event_driven(strategy_cls, params, _worker_data.frame(ticker), ticker, engine_kwargs,
+                                             features))
+    counters = {}
+    if features is not None:
+        after = features.stats()
+        counters = {name: after[name] - before[name] for name in _CACHE_COUNTERS}
+    return _summarize(results, params, engine_kwargs["initial_cash"]), counters
+
+
+def _summarize(results: list, params: dict, initial_cash: float) -> list:
+    """
+    一次性计算一批回测结果的指标。
+
+    权益曲线前补上初始现金后按 NaN 对齐成二维数组，交给 batch_metrics 做向量化计算；
+    初始现金为 0 时收益类指标为 NaN。
+    """
+    width = max((len(result.equity) for result in results), default=0) + 1
+    equity = np.full((len(results), width), np.nan)
+    equity[:, 0] = initial_cash
+    years = np.empty(len(results))
+    for k, result in enumerate(results):
+        equity[k, 1:len(result.equity) + 1] = result.equity
+        years[k] = years_spanned(result.index, len(result.equity) + 1)
+    summary = batch_metrics(equity, years=years)
+
+    rows = []
+    for result, metrics, run_years in zip(results, summary.to_dict("records"), years):
+        row = dict(params)
+        row["ticker"] = result.ticker
+        row.update(metrics)
+        average_equity = float(np.mean(result.equity)) if len(result.equity) else None
+        row.update(trade_metrics(result.fills, average_equity, run_years))
+        row["exposure"] = exposure(result.positions)
+        rows.append(row)
+    return rows
+
+
+def _json_default(value):
+    """
+    json.dumps 的 default：NumPy 标量（参数网格中常见的 np.int64 等）转换为 Python 标量。
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _task_key(params: dict, ticker: str) -> str:
+    return json.dumps([sorted(params.items()), ticker], default=_json_default)
+
+
+class ParameterSweep:
+    """
+    多进程参数扫描（网格搜索）。
+
+    把 参数组合 × ticker 分批派发到 ProcessPoolExecutor，每个任务运行相互独立的回测：
+    默认使用向量化引擎；engine="event" 时每个回测使用自己的 EventBus 实例运行
+    完整的事件驱动流程。行情数据只加载一次并通过共享内存传给工作进程。
+    结果汇总成一张指标表；如果指定了 results_path，每完成一批就追加写入
+    （JSON Lines），中断后重新运行会跳过已完成的任务。
+    指定 feature_cache_dir 时所有工作进程共享一个磁盘特征缓存（见 FeatureCache），
+    不同参数组合、重复的扫描之间相同的指标序列只计算一次，命中情况汇总在
+    `feature_cache_stats` 中。
+
+    策略类以 `strategy_cls(bars=..., **params)` 的方式构造；向量化引擎下 bars 为 None，
+    策略必须实现 vectorized_signals()。
+    """
+    def __init__(self, strategy_cls: type, param_grid: dict, csv_files: list, tickers: list,
+                 engine: str = ENGINE_VECTORIZED, max_workers: int = None, batch_size: int = 16,
+                 results_path: str = None, cache_dir: str = None, feature_cache_dir: str = None,
+                 constraint=None, progress=None,
+                 quantity: int = 100, commission: float = 5.0,
+                 fill_at: str = FILL_AT_CLOSE, initial_cash: float = 100_000.0):
+        """
+        Args:
+            strategy_cls (type): 策略类，需可在工作进程中导入。
+            param_grid (dict): 参数名 -> 候选值列表。
+            csv_files (list): CSV 文件路径，与 tickers 一一对应。
+            tickers (list): ticker 列表。
+            engine (str): "vectorized" 或 "event"。
+            max_workers (int): 工作进程数，默认等于 CPU 数。
+            batch_size (int): 每个任务包含的 ticker 数量，用于摊薄进程间通信开销。
+            results_path (str): 可选，结果追加写入的 JSON Lines 文件，用于断点续跑。
+            cache_dir (str): 可选，BarCache 目录，重复扫描时跳过 CSV 解析。
+            feature_cache_dir (str): 可选，FeatureCache 磁盘目录，重复扫描时跳过指标计算。
+            constraint (callable): 可选，params -> bool，过滤无效参数组合（如 short >= long）。
+            progress (callable): 可选，progress(已完成任务数, 总任务数)。
+            其余参数传给 VectorizedBacktest。
+        """
+        self.strategy_cls = strategy_cls
+        self.param_grid = param_grid
+        self.csv_files = csv_files
+        self.tickers = tickers
+        if engine not in (ENGINE_VECTORIZED, ENGINE_EVENT):
+            raise ValueError(f"不支持的回测引擎: {engine}")
+        self.engine = engine
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.results_path = results_path
+        self.cache_dir = cache_dir
+        self.feature_cache_dir = feature_cache_dir
+        # 最近一次 run() 中各工作进程特征缓存计数之和
+        self.feature_cache_stats = dict.fromkeys(_CACHE_COUNTERS, 0)
+        self.constraint = constraint
+        self.progress = progress
+        self.engine_kwargs = {
+            "quantity": quantity, "commission": commission,
+            "fill_at": fill_at, "initial_cash": initial_cash,
+        }
+
+    def parameter_combinations(self) -> list:
+        """
+        展开参数网格，并应用 constraint 过滤。
+        """
+        names = list(self.param_grid)
+        combos = [dict(zip(names, values)) for values in itertools.product(*self.param_grid.values())]
+        if self.constraint is not None:
+            combos = [params for params in combos if self.constraint(params)]
+        return combos
+
+    def _load_completed(self) -> list:
+        """
+        读取 results_path 中已完成的结果。
+
+        中断的运行可能在文件末尾留下写了一半的行：这一行被截掉，之后追加的结果
+        从完整的行之后开始写。
+        """
+        if not self.results_path or not os.path.exists(self.results_path):
+            return []
+        with open(self.results_path, "rb+") as f:
+            lines = f.read().split(b"\n")
+            # 最后一个换行符之后的内容（正常情况下为空）
+            tail = lines.pop()
+            rows = [json.loads(line) for line in lines if line.strip()]
+            if tail.strip():
+                try:
+                    rows.append(json.loads(tail))
+                    f.write(b"\n")
+                except json.JSONDecodeError:
+                    f.truncate(f.tell() - len(tail))
+        return rows
+
+    def run(self) -> pd.DataFrame:
+        """
+        运行扫描并返回指标表（每行一个 参数组合 × ticker）。
+        """
+        combos = self.parameter_combinations()
+        self.feature_cache_stats = dict.fromkeys(_CACHE_COUNTERS, 0)
+        # 只保留属于当前网格 × tickers 的已完成结果：网格或 tickers 变化后，
+        # 旧结果中多出的组合不再出现在结果表中，缺少新参数的行视为未完成
+        wanted = {_task_key(params, ticker) for params in combos for ticker in self.tickers}
+        rows, done = [], set()
+        for row in self._load_completed():
+            if "ticker" not in row or any(name not in row for name in self.param_grid):
+                continue
+            key = _task_key({name: row[name] for name in self.param_grid}, row["ticker"])
+            if key in wanted and key not in done:
+                done.add(key)
+                rows.append(row)
+
+        batches = []
+        for params in combos:
+            pending = [t for t in self.tickers if _task_key(params, t) not in done]
+            for i in range(0, len(pending), self.batch_size):
+                batches.append((params, pending[i:i + self.batch_size]))
+
+        total = len(combos) * len(self.tickers)
+        completed = total - sum(len(tickers) for _, tickers in batches)
+        if self.progress:
+            self.progress(completed, total)
+
+        if batches:
+            results_file = open(self.results_path, "a") if self.results_path else None
+            try:
+                with SharedBarData.from_csv(self.csv_files, self.tickers, self.cache_dir) as data, \
+                        ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                            initargs=(data.descriptor, self.feature_cache_dir)) as executor:
+                    futures = [
+                        executor.submit(_run_batch, self.strategy_cls, params, tickers, self.engine, self.engine_kwargs)
+                        for params, tickers in batches
+                    ]
+                    for future in as_completed(futures):
+                        batch_rows, counters = future.result()
+                        for name, value in counters.items():
+                            self.feature_cache_stats[name] += value
+                        rows.extend(batch_rows)
+                        if results_file:
+                            for row in batch_rows:
+                                results_file.write(json.dumps(row, default=_json_default) + "\n")
+                            results_file.flush()
+                        completed += len(batch_rows)
+                        if self.progress:
+                            self.progress(completed, total)
+            finally:
+                if results_file:
+                    results_file.close()
+
+        table = pd.DataFrame(rows)
+        if not table.empty:
+            table = table.sort_values(list(self.param_grid) + ["ticker"]).reset_index(drop=True)
+        return table
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from ..strategy_engine.strategy import Strategy
+
+FILL_AT_CLOSE = "close"
+FILL_AT_NEXT_OPEN = "next_open"
+
+
+class BacktestResult:
+    """
+    单个 ticker 的回测结果，所有序列都与原始数据的 K 线一一对应。
+    """
+    def __init__(self, ticker: str, index: pd.Index, fills: pd.DataFrame,
+                 positions: np.ndarray, cash: np.ndarray, equity: np.ndarray):
+        self.ticker = ticker
+        self.index = index
+        self.fills = fills
+        self.positions = positions
+        self.cash = cash
+        self.equity = equity
+
+    @property
+    def equity_curve(self) -> pd.Series:
+        return pd.Series(self.equity, index=self.index, name=self.ticker)
+
+
+class VectorizedBacktest:
+    """
+    向量化的全历史回测引擎，用于参数研究。
+
+    不做逐事件分发：调用策略的 vectorized_signals() 得到完整信号序列后，
+    用 NumPy 数组运算一次性算出成交、持仓、佣金、现金和权益曲线。
+    默认的成交规则与 ExecutionHandler 一致（每个信号固定数量、固定佣金、
+    按信号所在 K 线的收盘价立即成交），因此与事件驱动回测的成交结果相同。
+    """
+    def __init__(self, strategy: Strategy, quantity: int = 100, commission: float = 5.0,
+                 fill_at: str = FILL_AT_CLOSE, initial_cash: float = 0.0, feature_cache=None):
+        """
+        Args:
+            strategy (Strategy): 实现了 vectorized_signals() 的策略。
+            quantity (int): 每个信号的成交数量。
+            commission (float): 每笔成交的佣金。
+            fill_at (str): "close" 按信号 K 线收盘价成交，"next_open" 按下一根 K 线开盘价成交。
+            initial_cash (float): 初始现金。
+            feature_cache (FeatureCache): 可选，特征缓存；策略通过 Strategy.feature()
+                读取的指标序列在回测之间共享，不再重复计算。
+        """
+        if fill_at not in (FILL_AT_CLOSE, FILL_AT_NEXT_OPEN):
+            raise ValueError(f"不支持的成交方式: {fill_at}")
+        self.strategy = strategy
+        self.quantity = quantity
+        self.commission = commission
+        self.fill_at = fill_at
+        self.initial_cash = initial_cash
+        self.feature_cache = feature_cache
+
+    def run(self, df: pd.DataFrame, ticker: str) -> BacktestResult:
+        """
+        对单个 ticker 的完整数据运行回测。
+        """
+        if self.feature_cache is not None:
+            self.strategy.features = self.feature_cache.frame(ticker, df)
+        try:
+            signals = np.sign(np.asarray(self.strategy.vectorized_signals(df), dtype=np.int64))
+        finally:
+            self.strategy.features = None
+        close = df["close"].to_numpy(dtype=np.float64)
+
+        if self.fill_at == FILL_AT_CLOSE:
+            trades = signals * self.quantity
+            prices = close
+        else:
+            # 信号在下一根 K 线开盘成交，最后一根 K 线上的信号无法成交
+            trades = np.zeros_like(signals)
+            trades[1:] = signals[:-1] * self.quantity
+            prices = df["open"].to_numpy(dtype=np.float64)
+
+        filled = trades != 0
+        commissions = np.where(filled, self.commission, 0.0)
+        positions = np.cumsum(trades)
+        cash = self.initial_cash - np.cumsum(trades * prices) - np.cumsum(commissions)
+        equity = cash + positions * close
+
+        fill_idx = np.flatnonzero(filled)
+        fill_trades = trades[fill_idx]
+        fills = pd.DataFrame({
+            "ticker": ticker,
+            "direction": np.where(fill_trades > 0, "BUY", "SELL"),
+            "quantity": np.abs(fill_trades),
+            "fill_price": prices[fill_idx],
+            "commission": commissions[fill_idx],
+        }, index=df.index[fill_idx])
+        return BacktestResult(ticker, df.index, fills, positions, cash, equity)
+
+    def run_handler(self, data_handler) -> dict:
+        """
+        对 HistoricCSVDataHandler 已加载的所有 ticker 运行回测。
+
+        Returns:
+            dict: ticker -> BacktestResult。
+        """
+        return {
+            ticker: self.run(data_handler.ticker_data[ticker], ticker)
+            for ticker in data_handler.tickers
+        }
@@ -0,0 +1,83 @@
+"""
+行情到下单端到端延迟基准（asyncio，单线程）。
+
+在本机启动 FakeExchange，按 CSV 回放 K 线（NDJSON over TCP）；
+AsyncFeedDataHandler 读取行情并发布到 AsyncEventBus，每根 K 线都发出
+买入信号的策略经 StrategyEngine → ExecutionHandler 产生 OrderEvent。
+延迟 = OrderEvent 被分发的时刻 - 交易所写出该条行情的时刻
+（均为 time.perf_counter_ns），报告平均值与分位数（微秒）。
+
+用法:
+    python -m auto_trader.benchmarks.bench_async_feed [--csv data/AAPL.csv] [--interval 0.001]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from auto_trader.common.async_event_bus import AsyncEventBus
+from auto_trader.common.event import EventType, SignalEvent
+from auto_trader.data_handler.async_data_handler import AsyncFeedDataHandler, pump
+from auto_trader.data_handler.fake_exchange import FakeExchange
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class _AlwaysBuy(Strategy):
+    def calculate_signals(self, event):
+        return SignalEvent(event.ticker, "BUY", event.price)
+
+
+async def measure(csv_file: str, ticker: str = "AAPL", interval: float = 0.001) -> np.ndarray:
+    """
+    返回每笔订单的行情到下单延迟（纳秒）。
+    """
+    async with FakeExchange([csv_file], [ticker], interval=interval) as exchange:
+        event_bus = AsyncEventBus()
+        feed = AsyncFeedDataHandler(event_bus, exchange.host, exchange.port, [ticker])
+        StrategyEngine([_AlwaysBuy()], event_bus)
+        execution_handler = ExecutionHandler(event_bus)
+        event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        latencies = []
+
+        def on_order(event):
+            latencies.append(time.perf_counter_ns() - feed.sent_ns[event.ticker])
+
+        event_bus.subscribe(EventType.ORDER, on_order)
+        event_bus.start()
+        try:
+            await pump(feed.stream(), event_bus, lockstep=True)
+        finally:
+            await event_bus.stop()
+    return np.asarray(latencies, dtype=np.float64)
+
+
+def run(csv_file: str = DEFAULT_CSV, interval: float = 0.001) -> dict:
+    latencies = asyncio.run(measure(csv_file, interval=interval)) / 1e3
+    return {
+        "orders": len(latencies),
+        "mean_us": float(latencies.mean()),
+        "p50_us": float(np.percentile(latencies, 50)),
+        "p99_us": float(np.percentile(latencies, 99)),
+        "max_us": float(latencies.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--interval", type=float, default=0.001, help="交易所两次推送之间的间隔（秒）")
+    args = parser.parse_args()
+    result = run(args.csv, args.interval)
+    print(f"orders: {result['orders']}")
+    for key in ("mean_us", "p50_us", "p99_us", "max_us"):
+        print(f"{key:>8}: {result[key]:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+多周期 K 线聚合基准。
+
+  * stream   — BarAggregator.update() 把 1 分钟 K 线增量聚合为 5m/15m/1h/1d 的速率；
+  * offline  — resample_columns() 一次级联聚合全部周期，对比 pandas 对每个周期
+               各 resample 一次的耗时。
+
+用法:
+    python -m auto_trader.benchmarks.bench_bar_aggregator [--bars 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from auto_trader.benchmarks.synthetic import generate_ohlcv
+from auto_trader.common.event import EventBus
+from auto_trader.data_handler.bar_aggregator import BarAggregator, resample_columns
+from auto_trader.data_handler.bar_buffer import BAR_FIELDS
+
+TIMEFRAMES = ("5m", "15m", "1h", "1d")
+_PANDAS_RULES = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}
+_AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def measure_stream(df, timeframes=TIMEFRAMES) -> float:
+    bus = EventBus(threaded=False)
+    aggregator = BarAggregator(bus, timeframes, bar_interval="1m")
+    timestamps = df.index.values.astype("datetime64[ns]").view(np.int64).tolist()
+    columns = [df[field].to_numpy(dtype=np.float64).tolist() for field in BAR_FIELDS]
+    update, run_until_idle = aggregator.update, bus.run_until_idle
+    started = time.perf_counter()
+    for timestamp, open_, high, low, close, volume in zip(timestamps, *columns):
+        update("X", timestamp, open_, high, low, close, volume)
+        run_until_idle()
+    return len(timestamps) / (time.perf_counter() - started)
+
+
+def measure_offline(df, timeframes=TIMEFRAMES) -> dict:
+    columns = {field: df[field].to_numpy(dtype=np.float64) for field in BAR_FIELDS}
+    columns["timestamp"] = df.index.values.astype("datetime64[ns]").view(np.int64)
+    started = time.perf_counter()
+    resample_columns(columns, timeframes)
+    cascaded = time.perf_counter() - started
+    started = time.perf_counter()
+    for timeframe in timeframes:
+        df.resample(_PANDAS_RULES[timeframe]).agg(_AGGREGATIONS).dropna()
+    return {"resample_columns": cascaded, "pandas": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = generate_ohlcv(args.bars)
+    print(f"stream: {measure_stream(df):12,.0f} bars/s into {len(TIMEFRAMES)} timeframes")
+    for name, seconds in measure_offline(df).items():
+        print(f"{name:>16}: {seconds * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
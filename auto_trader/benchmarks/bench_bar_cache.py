@@ -0,0 +1,104 @@
+"""
+启动时间与常驻内存基准：直接解析 CSV vs BarCache 内存映射。
+
+生成 N 个 ticker 的日线 CSV，然后在独立子进程中分别测量：
+  * csv   — HistoricCSVDataHandler 每次启动都 pd.read_csv 全部文件；
+  * cache — 通过 BarCache 打开已转换好的列式缓存（首次转换时间单独报告）。
+子进程报告构造数据处理器所需时间和峰值 RSS；另测一个不加载任何数据的子进程，
+用来扣除导入 pandas/numpy 的固定内存。
+
+用法:
+    python -m auto_trader.benchmarks.bench_bar_cache [--tickers 5000] [--days 2520] [--start 2025-01-01]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def write_csvs(directory: str, n_tickers: int, n_days: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2015-01-01", periods=n_days, name="datetime")
+    paths, tickers = [], []
+    for i in range(n_tickers):
+        ticker = f"T{i:05d}"
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+        df = pd.DataFrame({
+            "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": rng.integers(1_000, 1_000_000, n_days),
+        }, index=index)
+        path = os.path.join(directory, f"{ticker}.csv")
+        df.to_csv(path, float_format="%.4f")
+        paths.append(path)
+        tickers.append(ticker)
+    return paths, tickers
+
+
+def _child(spec: dict):
+    import resource
+    from auto_trader.common.event import EventBus
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+
+    started = time.perf_counter()
+    HistoricCSVDataHandler(
+        EventBus(threaded=False), spec["paths"], spec["tickers"],
+        cache_dir=spec["cache_dir"], start=spec["start"],
+    )
+    elapsed = time.perf_counter() - started
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "max_rss_mb": rss_kb / 1024}))
+
+
+def _measure(spec_path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "auto_trader.benchmarks.bench_bar_cache", "--child", spec_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(n_tickers: int, n_days: int, start=None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, tickers = write_csvs(tmp, n_tickers, n_days)
+        cache_dir = os.path.join(tmp, "cache")
+        results = {}
+        runs = (("baseline", [], [], None), ("csv", paths, tickers, None),
+                ("cache_build", paths, tickers, cache_dir), ("cache", paths, tickers, cache_dir))
+        for name, run_paths, run_tickers, cache in runs:
+            spec_path = os.path.join(tmp, f"{name}.json")
+            with open(spec_path, "w") as f:
+                json.dump({"paths": run_paths, "tickers": run_tickers, "cache_dir": cache, "start": start}, f)
+            results[name] = _measure(spec_path)
+        # 扣除解释器和 pandas/numpy 导入本身的内存
+        for stats in results.values():
+            stats["data_rss_mb"] = stats["max_rss_mb"] - results["baseline"]["max_rss_mb"]
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--start", default=None, help="只回放该日期之后的数据")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.child) as f:
+            _child(json.load(f))
+        return
+
+    results = run(args.tickers, args.days, args.start)
+    for name, stats in results.items():
+        print(f"{name:>12}: {stats['seconds']:8.3f} s  {stats['max_rss_mb']:8.1f} MB  (+{stats['data_rss_mb']:.1f} MB data)")
+    print(f"startup speedup: {results['csv']['seconds'] / results['cache']['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+检查点热重启基准。
+
+对不同历史长度的合成数据，先完整跑一遍带 MovingAverageCrossoverStrategy 的回测并在
+结尾保存检查点，然后比较两种重启方式恢复到同一状态的耗时：
+
+  * cold — 重新解析 CSV 并回放全部历史；
+  * warm — 数据处理器通过 BarCache 内存映射打开数据，再恢复最新检查点
+           （restore()），无需回放任何 K 线。
+
+warm 的耗时应基本不随历史长度变化。
+
+用法:
+    python -m auto_trader.benchmarks.bench_checkpoint [--tickers 20] [--bars 1000 10000 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from auto_trader.benchmarks.synthetic import generate_universe, write_csvs
+from auto_trader.common.event import EventBus, EventType
+from auto_trader.data_storage.checkpoint import Checkpointer
+
+
+def _pipeline(paths: list, tickers: list, directory: str, cache_dir: str = None):
+    from auto_trader.backtest.backtest import Backtest
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+    from auto_trader.execution_handler.execution_handler import ExecutionHandler
+    from auto_trader.position_manager.position_manager import PositionManager
+    from auto_trader.risk_manager.risk_manager import RiskManager
+    from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+    from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+    event_bus = EventBus(threaded=False)
+    handler = HistoricCSVDataHandler(event_bus, paths, tickers, cache_dir=cache_dir)
+    engine = StrategyEngine([MovingAverageCrossoverStrategy(handler, 10, 30)], event_bus)
+    execution_handler = ExecutionHandler(event_bus)
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    position_manager = PositionManager(event_bus, initial_cash=1e6)
+    risk_manager = RiskManager(event_bus, equity_limit=1e9)
+    checkpointer = Checkpointer(directory, {
+        "data": handler, "strategies": engine, "positions": position_manager, "risk": risk_manager,
+    })
+    return Backtest(event_bus, handler, checkpointer), position_manager
+
+
+def measure(directory: str, n_tickers: int, n_bars: int) -> dict:
+    data_dir = os.path.join(directory, f"data-{n_bars}")
+    cache_dir = os.path.join(directory, "cache")
+    checkpoint_dir = os.path.join(directory, f"checkpoints-{n_bars}")
+    os.makedirs(data_dir)
+    paths, tickers = write_csvs(data_dir, generate_universe(n_tickers, n_bars))
+
+    backtest, original = _pipeline(paths, tickers, checkpoint_dir, cache_dir)
+    backtest.run()
+    path = backtest.checkpointer.save(backtest.bars_processed)
+    results = {"checkpoint_kb": os.path.getsize(path) / 1024}
+
+    started = time.perf_counter()
+    backtest, cold = _pipeline(paths, tickers, os.path.join(directory, "unused"))
+    backtest.run()
+    results["cold_seconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    backtest, warm = _pipeline(paths, tickers, checkpoint_dir, cache_dir)
+    backtest.resume()
+    backtest.run()
+    results["warm_seconds"] = time.perf_counter() - started
+
+    for restarted in (cold, warm):
+        assert dict(restarted.positions) == dict(original.positions)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'bars':>10} {'checkpoint KB':>14} {'cold s':>10} {'warm s':>10} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_bars in args.bars:
+            r = measure(tmp, args.tickers, n_bars)
+            print(f"{n_bars:>10,} {r['checkpoint_kb']:>14.1f} {r['cold_seconds']:>10.3f} "
+                  f"{r['warm_seconds']:>10.4f} {r['cold_seconds'] / r['warm_seconds']:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+CLI 冷启动基准。
+
+每次在新的 Python 子进程中运行一条命令，取多次运行墙钟时间的中位数：
+
+  * interpreter — `python -c pass`，解释器本身的启动开销；
+  * check       — `python -m auto_trader check`，只加载和校验配置；
+  * run_csv     — `python -m auto_trader run`，数据处理器直接解析 CSV；
+  * run_cached  — 同上，但通过 BarCache 内存映射读取已转换的数据（不导入 pandas）。
+
+同时列出每条命令导入了哪些重量级模块（numpy / pandas）。
+
+用法:
+    python -m auto_trader.benchmarks.bench_cold_start [--repeat 10] [--bars 1000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_PROBE = ("import json, runpy, sys\n"
+          "sys.argv = ['auto_trader'] + sys.argv[1:]\n"
+          "try:\n"
+          "    runpy.run_module('auto_trader', run_name='__main__')\n"
+          "except SystemExit:\n"
+          "    pass\n"
+          "print('HEAVY', json.dumps([name for name in ('numpy', 'pandas') if name in sys.modules]), file=sys.stderr)\n")
+
+
+def write_config(directory: str, cached: bool) -> str:
+    lines = [
+        "[universe]", 'tickers = ["T00000"]',
+        "[data]", 'path = "data/{ticker}.csv"',
+    ]
+    if cached:
+        lines.append('cache_dir = "bar_cache"')
+    lines += ["[[strategies]]", 'type = "moving_average_crossover"', "params = { short_window = 5, long_window = 20 }",
+              "[portfolio]", "initial_cash = 100000.0"]
+    path = os.path.join(directory, "cached.toml" if cached else "csv.toml")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def measure(command: list, repeat: int) -> tuple:
+    """
+    返回 (墙钟时间中位数（秒）, 导入的重量级模块)。
+    """
+    times, heavy = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - started)
+        for line in result.stderr.splitlines():
+            if line.startswith("HEAVY "):
+                heavy = json.loads(line[len("HEAVY "):])
+    return statistics.median(times), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--bars", type=int, default=1_000)
+    args = parser.parse_args()
+
+    from auto_trader.benchmarks.synthetic import generate_universe, write_csvs
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_dir = os.path.join(directory, "data")
+        os.makedirs(data_dir)
+        write_csvs(data_dir, generate_universe(1, args.bars))
+        csv_config = write_config(directory, cached=False)
+        cached_config = write_config(directory, cached=True)
+        probe = [sys.executable, "-c", _PROBE]
+        # 先运行一次，生成 BarCache
+        subprocess.run(probe + ["run", cached_config], capture_output=True, check=True)
+
+        commands = {
+            "interpreter": [sys.executable, "-c", "pass"],
+            "check": probe + ["check", csv_config],
+            "run_csv": probe + ["run", csv_config],
+            "run_cached": probe + ["run", cached_config],
+        }
+        for name, command in commands.items():
+            seconds, heavy = measure(command, args.repeat)
+            print(f"{name:>12}: {seconds * 1e3:8.1f} ms  imports {heavy}")
+
+
+if __name__ == "__main__":
+    main()
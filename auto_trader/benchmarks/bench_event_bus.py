@@ -0,0 +1,93 @@
+"""
+EventBus 发布 + 分发吞吐量微基准。
+
+对比原先的单例实现（Queue + 每个事件做一次成员检查再遍历 handler 列表）
+与当前实现的两种模式（线程安全 Queue / 单线程 deque），全部在调用线程上
+同步排空，只衡量纯 Python 的分发路径。deque_instrumented 为开启延迟直方图
+（Instrumentation）后的 deque 模式，用于衡量插桩开销。
+
+用法:
+    python -m auto_trader.benchmarks.bench_event_bus [--events N] [--handlers H]
+"""
+import argparse
+import time
+from queue import Queue, Empty
+
+from auto_trader.common.event import EventBus, EventType, MarketEvent
+from auto_trader.common.instrumentation import Instrumentation
+
+
+class _LegacyEventBus:
+    """
+    原 EventBus 的分发路径（去掉单例和线程），作为对比基准。
+    """
+    def __init__(self):
+        self._event_queue = Queue()
+        self._handlers = {event_type: [] for event_type in EventType}
+
+    def subscribe(self, event_type, handler):
+        if event_type in self._handlers:
+            self._handlers[event_type].append(handler)
+
+    def publish(self, event):
+        self._event_queue.put(event)
+
+    def run_until_idle(self):
+        while True:
+            try:
+                event = self._event_queue.get(block=False)
+            except Empty:
+                return
+            if event and event.event_type in self._handlers:
+                for handler in self._handlers[event.event_type]:
+                    handler(event)
+
+
+def _noop(event):
+    pass
+
+
+def measure(bus, events: list, handlers: int, batch: int = 1) -> float:
+    """
+    返回每秒发布并分发的事件数。每发布 batch 个事件排空一次总线。
+    """
+    for _ in range(handlers):
+        bus.subscribe(EventType.MARKET, _noop)
+    publish = bus.publish
+    run_until_idle = bus.run_until_idle
+    started = time.perf_counter()
+    for i in range(0, len(events), batch):
+        for event in events[i:i + batch]:
+            publish(event)
+        run_until_idle()
+    elapsed = time.perf_counter() - started
+    return len(events) / elapsed
+
+
+def run(n_events: int = 200_000, handlers: int = 3, batch: int = 1) -> dict:
+    events = [MarketEvent("AAPL", 100.0 + i % 10) for i in range(n_events)]
+    results = {
+        "legacy": measure(_LegacyEventBus(), events, handlers, batch),
+        "threaded_queue": measure(EventBus(), events, handlers, batch),
+        "deque": measure(EventBus(threaded=False), events, handlers, batch),
+        "deque_instrumented": measure(EventBus(threaded=False, instrumentation=Instrumentation()),
+                                      events, handlers, batch),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--handlers", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=1, help="每次排空前发布的事件数")
+    args = parser.parse_args()
+
+    results = run(args.events, args.handlers, args.batch)
+    baseline = results["legacy"]
+    for name, rate in results.items():
+        print(f"{name:>18}: {rate:>12,.0f} events/s  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
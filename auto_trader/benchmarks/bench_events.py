@@ -0,0 +1,97 @@
+"""
+事件对象内存与分配次数基准（tracemalloc）。
+
+对比：
+  * 原先基于 __dict__、经 super().__init__ 设置 event_type 的事件类；
+  * 当前的 __slots__ 事件类；
+  * 每个时间步一个 MarketBatchEvent，而不是每个 ticker 一个 MarketEvent。
+
+用法:
+    python -m auto_trader.benchmarks.bench_events [--events N] [--tickers T] [--steps S]
+"""
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from auto_trader.common.event import EventType, FillEvent, MarketBatchEvent, MarketEvent
+
+
+class _LegacyEvent:
+    def __init__(self, event_type):
+        self.event_type = event_type
+
+
+class _LegacyMarketEvent(_LegacyEvent):
+    def __init__(self, ticker, price):
+        super().__init__(EventType.MARKET)
+        self.ticker = ticker
+        self.price = price
+
+
+class _LegacyFillEvent(_LegacyEvent):
+    def __init__(self, ticker, quantity, direction, fill_price, commission=0.0):
+        super().__init__(EventType.FILL)
+        self.ticker = ticker
+        self.quantity = quantity
+        self.direction = direction
+        self.fill_price = fill_price
+        self.commission = commission
+
+
+def traced(build) -> dict:
+    """
+    运行 build()，返回其存活对象占用的字节数和内存块（分配）数量。
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del kept
+    return {"bytes": size, "blocks": blocks}
+
+
+def run(n_events: int = 100_000, n_tickers: int = 1_000, n_steps: int = 100) -> dict:
+    prices = [100.0 + (i % 10) for i in range(n_events)]
+    results = {}
+    for name, cls in (("legacy_market", _LegacyMarketEvent), ("slotted_market", MarketEvent)):
+        stats = traced(lambda: [cls("AAPL", p) for p in prices])
+        results[name] = {k: v / n_events for k, v in stats.items()}
+    for name, cls in (("legacy_fill", _LegacyFillEvent), ("slotted_fill", FillEvent)):
+        stats = traced(lambda: [cls("AAPL", 100, "BUY", p, 5.0) for p in prices])
+        results[name] = {k: v / n_events for k, v in stats.items()}
+
+    # 同一份截面行情：每个 ticker 一个事件 vs 每个时间步一个批量事件
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    closes = np.random.default_rng(0).uniform(10, 500, size=(n_steps, n_tickers))
+    per_ticker = traced(lambda: [
+        [MarketEvent(t, p) for t, p in zip(tickers, row.tolist())] for row in closes
+    ])
+    batched = traced(lambda: [
+        MarketBatchEvent(step, {"ticker": tickers, "close": row}) for step, row in enumerate(closes)
+    ])
+    bars = n_tickers * n_steps
+    results["per_ticker_market"] = {k: v / bars for k, v in per_ticker.items()}
+    results["batched_market"] = {k: v / bars for k, v in batched.items()}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--tickers", type=int, default=1_000)
+    parser.add_argument("--steps", type=int, default=100)
+    args = parser.parse_args()
+
+    results = run(args.events, args.tickers, args.steps)
+    print(f"{'':>18}  {'bytes/item':>10}  {'allocs/item':>11}")
+    for name, stats in results.items():
+        print(f"{name:>18}  {stats['bytes']:>10.1f}  {stats['blocks']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+特征缓存基准。
+
+对 T 个 ticker 运行 MovingAverageCrossoverStrategy 的均线参数网格（VectorizedBacktest）：
+
+  * uncached — 每个参数组合重新计算两条均线；
+  * cold     — 使用 FeatureCache，每个 (ticker, 窗口) 的均线只计算一次；
+  * warm     — 新的 FeatureCache 实例读取上一轮写入的磁盘层（内存映射），不再计算。
+
+用法:
+    python -m auto_trader.benchmarks.bench_feature_cache [--tickers 20] [--bars 200000]
+"""
+import argparse
+import itertools
+import tempfile
+import time
+
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.benchmarks.synthetic import generate_universe
+from auto_trader.data_storage.feature_cache import FeatureCache
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+SHORT_WINDOWS = (5, 10, 20)
+LONG_WINDOWS = (30, 60, 120, 240)
+
+
+def measure(frames: dict, feature_cache=None) -> float:
+    started = time.perf_counter()
+    for short, long in itertools.product(SHORT_WINDOWS, LONG_WINDOWS):
+        backtest = VectorizedBacktest(MovingAverageCrossoverStrategy(None, short, long), feature_cache=feature_cache)
+        for ticker, df in frames.items():
+            backtest.run(df, ticker)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=200_000)
+    args = parser.parse_args()
+
+    frames = generate_universe(args.tickers, args.bars)
+    runs = len(SHORT_WINDOWS) * len(LONG_WINDOWS) * args.tickers
+    with tempfile.TemporaryDirectory() as directory:
+        cold = FeatureCache(directory)
+        warm = FeatureCache(directory)
+        for name, cache in (("uncached", None), ("cold", cold), ("warm", warm)):
+            seconds = measure(frames, cache)
+            stats = "" if cache is None else "  " + ", ".join(f"{k}={v}" for k, v in cache.stats().items()
+                                                              if k != "memory_bytes")
+            print(f"{name:>10}: {seconds * 1e3:10.1f} ms for {runs} backtests{stats}")
+
+
+if __name__ == "__main__":
+    main()
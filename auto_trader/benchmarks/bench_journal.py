@@ -0,0 +1,124 @@
+"""
+事件日志写入吞吐量与状态重建基准。
+
+  * append      — 直接调用 EventJournal.on_market_event / on_fill 的写入速率；
+  * bus         — 单线程 EventBus 上一个空处理器 vs 挂上 EventJournal 的分发速率，
+                  衡量日志对总线的拖累；
+  * rebuild     — 用合成数据跑一遍带 MovingAverageCrossoverStrategy 的回测并记录日志，
+                  对比重新回测与 rebuild_state()（默认快速模式和 full=True）的耗时。
+
+用法:
+    python -m auto_trader.benchmarks.bench_journal [--events 1000000] [--tickers 50] [--bars 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from auto_trader.benchmarks.synthetic import generate_universe
+from auto_trader.common.event import EventBus, EventType, FillEvent, MarketEvent
+from auto_trader.data_storage.event_journal import EventJournal, JournalReader
+from auto_trader.data_storage.journal_replay import rebuild_state
+
+
+def _noop(event):
+    pass
+
+
+def measure_append(directory: str, n_events: int) -> float:
+    events = [MarketEvent(f"T{i % 100:05d}", 100.0 + i % 10, i, 100.0, 101.0, 99.0, 1000.0)
+              for i in range(n_events)]
+    fills = [FillEvent(f"T{i % 100:05d}", 100, "BUY", 100.0, 1.0, i) for i in range(n_events // 10)]
+    with EventJournal(os.path.join(directory, "append")) as journal:
+        on_market, on_fill = journal.on_market_event, journal.on_fill
+        started = time.perf_counter()
+        for event in events:
+            on_market(event)
+        for event in fills:
+            on_fill(event)
+        journal.flush(sync=True)
+        elapsed = time.perf_counter() - started
+    return (len(events) + len(fills)) / elapsed
+
+
+def measure_bus(directory: str, n_events: int) -> dict:
+    events = [MarketEvent(f"T{i % 100:05d}", 100.0 + i % 10, i) for i in range(n_events)]
+    results = {}
+    for name in ("plain", "journaled"):
+        bus = EventBus(threaded=False)
+        bus.subscribe(EventType.MARKET, _noop)
+        journal = None
+        if name == "journaled":
+            journal = EventJournal(os.path.join(directory, "bus"))
+            journal.attach(bus)
+        publish, run_until_idle = bus.publish, bus.run_until_idle
+        started = time.perf_counter()
+        for event in events:
+            publish(event)
+            run_until_idle()
+        if journal is not None:
+            journal.close()
+        results[name] = n_events / (time.perf_counter() - started)
+    return results
+
+
+def _pipeline(frames: dict, journal_dir: str = None):
+    from auto_trader.backtest.backtest import Backtest
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+    from auto_trader.execution_handler.execution_handler import ExecutionHandler
+    from auto_trader.position_manager.position_manager import PositionManager
+    from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+    from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+    event_bus = EventBus(threaded=False)
+    handler = HistoricCSVDataHandler.from_dataframes(event_bus, frames)
+    strategies = [MovingAverageCrossoverStrategy(handler, 10, 30)]
+    StrategyEngine(strategies, event_bus)
+    execution_handler = ExecutionHandler(event_bus)
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    position_manager = PositionManager(event_bus, initial_cash=1e6)
+    journal = None
+    if journal_dir:
+        journal = EventJournal(journal_dir)
+        journal.attach(event_bus)
+    Backtest(event_bus, handler).run()
+    if journal is not None:
+        journal.close()
+    return position_manager
+
+
+def measure_rebuild(directory: str, n_tickers: int, n_bars: int) -> dict:
+    frames = generate_universe(n_tickers, n_bars)
+    journal_dir = os.path.join(directory, "pipeline")
+    started = time.perf_counter()
+    _pipeline(frames, journal_dir)
+    results = {"rerun_seconds": time.perf_counter() - started}
+    reader = JournalReader(journal_dir)
+    results["records"] = len(reader)
+    for name, full in (("rebuild_seconds", False), ("rebuild_full_seconds", True)):
+        started = time.perf_counter()
+        rebuild_state(reader, initial_cash=1e6, full=full)
+        results[name] = time.perf_counter() - started
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"append: {measure_append(tmp, args.events):12,.0f} events/s")
+        bus = measure_bus(tmp, args.events)
+        for name, rate in bus.items():
+            print(f"{'bus ' + name:>16}: {rate:12,.0f} events/s")
+        rebuild = measure_rebuild(tmp, args.tickers, args.bars)
+    print(f"journal records: {rebuild['records']:,}")
+    for name in ("rerun_seconds", "rebuild_seconds", "rebuild_full_seconds"):
+        print(f"{name:>20}: {rebuild[name]:8.3f} s  ({rebuild['rerun_seconds'] / rebuild[name]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+事前风控单笔检查延迟基准。
+
+构造一个 N 个 ticker、全部持仓且都有价格的组合，打开所有限额检查，
+逐笔计时 PreTradeRiskEngine.check()，报告平均值与分位数（微秒）。
+另报告 check_batch() 一次检查整个截面时的单笔均摊耗时。
+
+用法:
+    python -m auto_trader.benchmarks.bench_pre_trade [--tickers 5000] [--orders 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from auto_trader.common.event import EventBus, MarketBatchEvent, PositionEvent
+from auto_trader.risk_manager.pre_trade import PreTradeRiskEngine, RiskLimits
+
+
+def build_engine(n_tickers: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    event_bus = EventBus(threaded=False)
+    limits = RiskLimits(
+        max_order_quantity=1_000, max_ticker_notional=1e6, max_gross_exposure=1e12, max_net_exposure=1e12,
+        max_orders_per_second=1e12, order_burst=10**9, max_drawdown=0.5,
+    )
+    engine = PreTradeRiskEngine(event_bus, limits)
+    close = rng.uniform(10, 500, n_tickers)
+    engine.on_market_batch(MarketBatchEvent(0, {"ticker": np.array(tickers, dtype=object), "close": close}))
+    engine.on_position_event(PositionEvent(dict(zip(tickers, rng.integers(-500, 500, n_tickers).tolist()))))
+    return engine, tickers
+
+
+def run(n_tickers: int = 5_000, n_orders: int = 100_000) -> dict:
+    engine, tickers = build_engine(n_tickers)
+    rng = np.random.default_rng(1)
+    picks = [tickers[i] for i in rng.integers(0, n_tickers, n_orders)]
+    directions = rng.choice(["BUY", "SELL"], n_orders).tolist()
+    quantities = rng.integers(1, 2_000, n_orders).tolist()
+
+    check = engine.check
+    perf = time.perf_counter_ns
+    samples = np.empty(n_orders, dtype=np.int64)
+    for k in range(n_orders):
+        started = perf()
+        check(picks[k], directions[k], quantities[k])
+        samples[k] = perf() - started
+    micros = samples / 1_000
+
+    started = time.perf_counter()
+    engine.check_batch(tickers, rng.choice(["BUY", "SELL"], n_tickers), rng.integers(1, 2_000, n_tickers))
+    batch_seconds = time.perf_counter() - started
+    return {
+        "mean_us": float(micros.mean()),
+        "p50_us": float(np.percentile(micros, 50)),
+        "p99_us": float(np.percentile(micros, 99)),
+        "batch_per_order_us": batch_seconds * 1e6 / n_tickers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    args = parser.parse_args()
+    stats = run(args.tickers, args.orders)
+    print(f"check(): mean {stats['mean_us']:.2f} us  p50 {stats['p50_us']:.2f} us  p99 {stats['p99_us']:.2f} us")
+    print(f"check_batch(): {stats['batch_per_order_us']:.3f} us per order")
+
+
+if __name__ == "__main__":
+    main()
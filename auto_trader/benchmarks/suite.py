@@ -0,0 +1,289 @@
+"""
+交易流水线基准套件。
+
+对每个规模（ticker 数 × 每个 ticker 的 K 线数）生成合成 OHLCV 数据并写成 CSV，
+在独立子进程中测量：
+  * csv_load_seconds         — HistoricCSVDataHandler 读取并转换全部 CSV；
+  * replay_bars_per_sec      — 逐条 update_bars() 回放的吞吐量；
+  * event_bus_events_per_sec — EventBus（单线程 deque）发布 + 分发三个处理器；
+  * strategy_us_per_bar      — MovingAverageCrossoverStrategy.calculate_signals 单根 K 线耗时；
+  * pipeline_bars_per_sec / pipeline_events_per_sec
+                             — Backtest 驱动的完整流水线（策略 → 执行 → 头寸 → 风控）；
+  * peak_rss_mb              — 子进程的峰值常驻内存。
+
+结果写成 JSON。若存在基线文件（默认 benchmarks/baseline.json），逐项对比，
+变差超过容差的指标标记为回退，并以退出码 1 结束。基线与机器相关，
+换机器后请用 --save-baseline 重新生成。
+
+用法:
+    python -m auto_trader.benchmarks.suite [--scales tiny small] [--output results.json]
+                                            [--baseline PATH] [--tolerance 0.2] [--save-baseline]
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.benchmarks.synthetic import generate_universe, write_csvs
+
+# 规模名 -> (ticker 数, 每个 ticker 的 K 线数)
+SCALES = {
+    "tiny": (1, 1_000),
+    "small": (10, 10_000),
+    "medium": (100, 10_000),
+    "wide": (5_000, 200),
+    "large": (5_000, 2_000),
+}
+DEFAULT_SCALES = ("tiny", "small")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.2
+
+# 事件总线基准的事件数上限
+MAX_BUS_EVENTS = 1_000_000
+
+
+def higher_is_better(metric: str) -> bool:
+    """
+    吞吐量类指标（*_per_sec）越大越好，其余（耗时、内存）越小越好。
+    """
+    return metric.endswith("_per_sec")
+
+
+def _noop(event):
+    pass
+
+
+def measure_event_bus(n_events: int, handlers: int = 3) -> float:
+    """
+    返回单线程 EventBus 每秒发布并分发的事件数。
+    """
+    from auto_trader.common.event import EventBus, EventType, MarketEvent
+
+    bus = EventBus(threaded=False)
+    for _ in range(handlers):
+        bus.subscribe(EventType.MARKET, _noop)
+    events = [MarketEvent("T00000", 100.0 + i % 10) for i in range(n_events)]
+    publish, run_until_idle = bus.publish, bus.run_until_idle
+    started = time.perf_counter()
+    for event in events:
+        publish(event)
+        run_until_idle()
+    return n_events / (time.perf_counter() - started)
+
+
+def measure_replay(frames: dict) -> float:
+    """
+    返回 HistoricCSVDataHandler 逐步回放的 K 线吞吐量（根/秒）。
+    """
+    from auto_trader.common.event import EventBus
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+
+    handler = HistoricCSVDataHandler.from_dataframes(EventBus(threaded=False), frames)
+    bars = 0
+    started = time.perf_counter()
+    while handler.continue_backtest:
+        bars += len(handler.update_bars())
+    return bars / (time.perf_counter() - started)
+
+
+def measure_strategy(frames: dict, short_window: int = 10, long_window: int = 30) -> float:
+    """
+    返回 MovingAverageCrossoverStrategy 处理一根 K 线的平均耗时（微秒）。
+
+    每次产生信号后重置 bought 标记，保证每根 K 线都走完整的均线计算路径。
+    """
+    from auto_trader.common.event import EventBus
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+    from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+    handler = HistoricCSVDataHandler.from_dataframes(EventBus(threaded=False), frames)
+    strategy = MovingAverageCrossoverStrategy(handler, short_window, long_window)
+    handler.require_history(strategy.lookback)
+    calculate_signals = strategy.calculate_signals
+    clock = time.perf_counter_ns
+    elapsed = bars = 0
+    while handler.continue_backtest:
+        for event in handler.update_bars():
+            started = clock()
+            calculate_signals(event)
+            elapsed += clock() - started
+            strategy.bought.clear()
+            bars += 1
+    return elapsed / bars / 1e3
+
+
+def measure_pipeline(frames: dict) -> tuple:
+    """
+    返回完整流水线的 (K 线/秒, 事件/秒)。
+    """
+    from auto_trader.backtest.backtest import Backtest
+    from auto_trader.common.event import EventBus, EventType
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+    from auto_trader.execution_handler.execution_handler import ExecutionHandler
+    from auto_trader.position_manager.position_manager import PositionManager
+    from auto_trader.risk_manager.risk_manager import RiskManager
+    from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+    from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+    event_bus = EventBus(threaded=False)
+    handler = HistoricCSVDataHandler.from_dataframes(event_bus, frames)
+    StrategyEngine([MovingAverageCrossoverStrategy(handler, 10, 30)], event_bus)
+    execution_handler = ExecutionHandler(event_bus)
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    PositionManager(event_bus, initial_cash=1e6)
+    RiskManager(event_bus, equity_limit=math.inf)
+    backtest = Backtest(event_bus, handler)
+    started = time.perf_counter()
+    bars = backtest.run()
+    elapsed = time.perf_counter() - started
+    return bars / elapsed, backtest.events_dispatched / elapsed
+
+
+def run_scale(n_tickers: int, n_bars: int, seed: int = 0) -> dict:
+    """
+    在当前进程中测量一个规模的全部指标。
+    """
+    from auto_trader.common.event import EventBus
+    from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+
+    frames = generate_universe(n_tickers, n_bars, seed)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, tickers = write_csvs(tmp, frames)
+        started = time.perf_counter()
+        HistoricCSVDataHandler(EventBus(threaded=False), paths, tickers)
+        metrics["csv_load_seconds"] = time.perf_counter() - started
+    metrics["replay_bars_per_sec"] = measure_replay(frames)
+    metrics["event_bus_events_per_sec"] = measure_event_bus(min(n_tickers * n_bars, MAX_BUS_EVENTS))
+    metrics["strategy_us_per_bar"] = measure_strategy(frames)
+    metrics["pipeline_bars_per_sec"], metrics["pipeline_events_per_sec"] = measure_pipeline(frames)
+    return metrics
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _child(scale: str, seed: int):
+    n_tickers, n_bars = SCALES[scale]
+    metrics = run_scale(n_tickers, n_bars, seed)
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    print(json.dumps(metrics))
+
+
+def run(scales=DEFAULT_SCALES, seed: int = 0) -> dict:
+    """
+    依次在独立子进程中运行各规模，返回可写成 JSON 的结果。
+    """
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": seed,
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        n_tickers, n_bars = SCALES[scale]
+        output = subprocess.run(
+            [sys.executable, "-m", "auto_trader.benchmarks.suite", "--child", scale, "--seed", str(seed)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        metrics = json.loads(output.strip().splitlines()[-1])
+        results["scales"][scale] = {"tickers": n_tickers, "bars": n_tickers * n_bars, "metrics": metrics}
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    逐项对比结果与基线。
+
+    Args:
+        results (dict): run() 的结果。
+        baseline (dict): 之前保存的 run() 结果。
+        tolerance (float): 允许变差的相对幅度，0.2 表示 20%。
+
+    Returns:
+        list: 每个双方都有的指标一行 (规模, 指标, 基线值, 当前值, 相对变化, 是否回退)，
+            相对变化为正表示变好。
+    """
+    rows = []
+    for scale, current in results["scales"].items():
+        reference = baseline.get("scales", {}).get(scale)
+        if reference is None:
+            continue
+        for metric, value in current["metrics"].items():
+            base = reference["metrics"].get(metric)
+            if not base:
+                continue
+            change = (value - base) / base
+            if not higher_is_better(metric):
+                change = -change
+            rows.append((scale, metric, base, value, change, change < -tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=list(DEFAULT_SCALES), choices=list(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 的输出路径")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="对比用的基线 JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许变差的相对幅度")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.seed)
+        return
+
+    results = run(args.scales, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    for scale, entry in results["scales"].items():
+        print(f"[{scale}] {entry['tickers']} tickers, {entry['bars']:,} bars")
+        for metric, value in entry["metrics"].items():
+            print(f"  {metric:>26}: {value:14,.2f}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    regressions = [row for row in rows if row[5]]
+    print(f"\ncompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+    for scale, metric, base, value, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"  [{scale}] {metric:>26}: {base:14,.2f} -> {value:14,.2f}  {change:+7.1%}  {flag}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
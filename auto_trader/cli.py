@@ -0,0 +1,292 @@
+"""
+配置驱动的命令行入口。
+
+    python -m auto_trader run CONFIG [--mode backtest|live]
+    python -m auto_trader check CONFIG [--resolve]
+    python -m auto_trader list
+
+配置格式见 auto_trader.config。启动路径保持轻量：本模块和配置加载只依赖标准库，
+策略、数据处理器、成本模型等组件通过注册表（common.registry）在 build_components()
+中按需导入，check 和 list 不会导入 numpy 或 pandas。调度器批量启动短任务时，
+进程冷启动耗时主要取决于实际用到的组件，可用 benchmarks/bench_cold_start.py 测量。
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from auto_trader.common.registry import COMMISSION_MODELS, DATA_HANDLERS, SLIPPAGE_MODELS, STRATEGIES
+from auto_trader.config import MODE_BACKTEST, MODE_LIVE, ConfigError, RunConfig, load_config
+
+logger = logging.getLogger("auto_trader.cli")
+
+# 入口模块导入完成的时刻，用于报告组件导入和构建耗时
+_STARTED = time.perf_counter()
+
+_REGISTRIES = {
+    "strategies": STRATEGIES,
+    "data handlers": DATA_HANDLERS,
+    "slippage models": SLIPPAGE_MODELS,
+    "commission models": COMMISSION_MODELS,
+}
+
+
+def _handle_order_event(event):
+    logger.info("接收到订单事件: %s - %s %s shares at %s price", event.ticker, event.direction, event.quantity,
+                event.order_type)
+
+
+def _handle_fill_event(event):
+    logger.info("接收到成交事件: %s - %s %s shares at %s price, commission: %s",
+                event.ticker, event.direction, event.quantity, event.fill_price, event.commission)
+
+
+def _build_model(registry, spec: dict):
+    options = {key: value for key, value in spec.items() if key != "type"}
+    return registry.resolve(spec["type"])(**options)
+
+
+def _check_strategy_input(strategy_cls, spec: dict, config: RunConfig):
+    """
+    只接收 MarketBatchEvent 的策略（requires_batches）要求数据处理器配置 emit_batches = true。
+    """
+    if getattr(strategy_cls, "requires_batches", False) and not config.data.get("emit_batches"):
+        raise ConfigError(f"策略 {spec['type']} 只处理批量行情，需要在 [data] 中设置 emit_batches = true")
+
+
+def _build_strategy(spec: dict, config: RunConfig, data_handler, indicators):
+    """
+    实例化一个策略：按构造函数的签名传入数据处理器（bars）、共享的指标注册表
+    （indicators），以及必需但未配置的 tickers（默认整个 universe）。
+    """
+    import inspect
+    strategy_cls = STRATEGIES.resolve(spec["type"])
+    _check_strategy_input(strategy_cls, spec, config)
+    accepted = inspect.signature(strategy_cls).parameters
+    params = dict(spec["params"])
+    if "bars" in accepted:
+        params["bars"] = data_handler
+    if "indicators" in accepted:
+        params.setdefault("indicators", indicators)
+    if "tickers" in accepted:
+        if "tickers" in spec:
+            params["tickers"] = spec["tickers"]
+        elif accepted["tickers"].default is inspect.Parameter.empty:
+            params["tickers"] = list(config.tickers)
+    strategy = strategy_cls(**params)
+    if "tickers" in spec and "tickers" not in accepted:
+        strategy.tickers = frozenset(spec["tickers"])
+    return strategy
+
+
+def build_components(config: RunConfig) -> dict:
+    """
+    按配置导入并实例化各组件，接线方式与演示流水线（main.py）一致。
+
+    Args:
+        config: load_config() 返回的配置。
+
+    Returns:
+        dict: 组件名 -> 组件，键为 event_bus、data_handler、strategies、strategy_engine、
+        position_manager、broker、pre_trade、execution_handler、risk_manager、instrumentation
+        （未配置的 broker、pre_trade、instrumentation 为 None）。
+    """
+    from auto_trader.common.event import EventBus, EventType
+    from auto_trader.execution_handler.execution_handler import ExecutionHandler
+    from auto_trader.position_manager.position_manager import PositionManager
+    from auto_trader.risk_manager.risk_manager import RiskManager
+    from auto_trader.strategy_engine.indicators import IndicatorRegistry
+    from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+    instrumentation = None
+    if config.run["instrumentation"]:
+        from auto_trader.common.instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+    event_bus = EventBus(threaded=config.run["mode"] == MODE_LIVE, instrumentation=instrumentation)
+
+    handler_cls = DATA_HANDLERS.resolve(config.data["handler"])
+    data_handler = handler_cls(event_bus, config.data_files(), list(config.tickers), **config.handler_options())
+    indicators = IndicatorRegistry(data_handler)
+    strategies = [_build_strategy(spec, config, data_handler, indicators) for spec in config.strategies]
+    strategy_engine = StrategyEngine(strategies, event_bus)
+    # risk_manager 需要在 position_manager 之后创建，因为它依赖后者的工作流
+    position_manager = PositionManager(event_bus, config.portfolio["initial_cash"])
+
+    execution = config.execution
+    broker = None
+    if execution.get("broker") == "simulated":
+        from auto_trader.execution_handler.cost_models import VolumeParticipation
+        from auto_trader.execution_handler.simulated_broker import SimulatedBroker
+        broker = SimulatedBroker(
+            event_bus,
+            slippage=_build_model(SLIPPAGE_MODELS, execution["slippage"]) if "slippage" in execution else None,
+            commission=(_build_model(COMMISSION_MODELS, execution["commission_model"])
+                        if "commission_model" in execution else None),
+            participation=(VolumeParticipation(execution["participation"])
+                           if execution.get("participation") is not None else None),
+            latency_bars=execution.get("latency_bars", 0),
+        )
+
+    risk = config.risk
+    pre_trade = None
+    if risk.get("pre_trade"):
+        from auto_trader.risk_manager.pre_trade import PreTradeRiskEngine, RiskLimits
+        initial_equity = risk.get("initial_equity", config.portfolio["initial_cash"] or None)
+        pre_trade = PreTradeRiskEngine(event_bus, RiskLimits(**risk["pre_trade"]), initial_equity=initial_equity)
+
+    execution_handler = ExecutionHandler(event_bus, execution["quantity"], execution["commission"], broker=broker,
+                                         order_type=execution["order_type"], risk=pre_trade)
+    risk_manager = RiskManager(event_bus, **({"equity_limit": risk["equity_limit"]} if "equity_limit" in risk else {}))
+
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    event_bus.subscribe(EventType.ORDER, _handle_order_event)
+    event_bus.subscribe(EventType.FILL, _handle_fill_event)
+    return {
+        "event_bus": event_bus,
+        "data_handler": data_handler,
+        "strategies": strategies,
+        "strategy_engine": strategy_engine,
+        "position_manager": position_manager,
+        "broker": broker,
+        "pre_trade": pre_trade,
+        "execution_handler": execution_handler,
+        "risk_manager": risk_manager,
+        "instrumentation": instrumentation,
+    }
+
+
+def run_backtest(config: RunConfig, components: dict) -> dict:
+    """
+    用同步的 Backtest 驱动器回放全部数据；配置了 checkpoint_dir 时先从最新的
+    检查点恢复，并按 checkpoint_every 周期性保存。
+
+    Returns:
+        dict: 运行摘要（处理的 K 线数、成交数、最终权益等）。
+    """
+    from auto_trader.backtest.backtest import Backtest
+    from auto_trader.common.event import EventType
+
+    event_bus = components["event_bus"]
+    checkpointer = None
+    if config.run["checkpoint_dir"]:
+        if components["broker"] is not None:
+            raise ConfigError("检查点不包含 SimulatedBroker 的挂单，不能与 broker = \"simulated\" 同时使用")
+        from auto_trader.data_storage.checkpoint import Checkpointer
+        names = ("data_handler", "strategy_engine", "position_manager", "risk_manager", "pre_trade")
+        checkpointer = Checkpointer(config.resolve_path(config.run["checkpoint_dir"]),
+                                    {name: components[name] for name in names if components[name] is not None},
+                                    every=config.run["checkpoint_every"], keep=config.run["checkpoint_keep"])
+
+    fills = []
+    event_bus.subscribe(EventType.FILL, fills.append)
+    backtest = Backtest(event_bus, components["data_handler"], checkpointer)
+    resumed_at = backtest.bars_processed if checkpointer is not None and backtest.resume() else None
+    started = time.perf_counter()
+    bars = backtest.run()
+    if checkpointer is not None:
+        checkpointer.save(backtest.bars_processed)
+    elapsed = time.perf_counter() - started
+    portfolio = components["position_manager"].portfolio
+    if components["instrumentation"] is not None:
+        components["instrumentation"].dump()
+    return {
+        "bars": bars,
+        "events": backtest.events_dispatched,
+        "fills": len(fills),
+        "final_equity": portfolio.equity,
+        "positions": dict(portfolio.positions),
+        "resumed_at": resumed_at,
+        "run_seconds": elapsed,
+    }
+
+
+def run_live(components: dict):
+    """
+    在后台线程上运行事件总线和数据处理器，直到数据耗尽或收到 Ctrl-C。
+    """
+    event_bus, data_handler = components["event_bus"], components["data_handler"]
+    logger.info("系统启动...")
+    event_bus.start()
+    data_handler.start()
+    try:
+        while event_bus.is_running() and data_handler._thread.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("接收到退出信号，正在关闭系统...")
+    finally:
+        event_bus.stop()
+        data_handler.stop()
+        logger.info("系统已关闭。")
+
+
+def _command_run(args) -> int:
+    config = load_config(args.config)
+    if args.mode:
+        config.run["mode"] = args.mode
+    from auto_trader.common.log import setup_logging
+    setup_logging(config.run["log_level"])
+    components = build_components(config)
+    startup = time.perf_counter() - _STARTED
+    if config.run["mode"] == MODE_LIVE:
+        run_live(components)
+        return 0
+    summary = run_backtest(config, components)
+    summary["startup_seconds"] = startup
+    print(json.dumps(summary))
+    return 0
+
+
+def _command_check(args) -> int:
+    config = load_config(args.config)
+    plan = {
+        "mode": config.run["mode"],
+        "tickers": config.tickers,
+        "data": {"handler": DATA_HANDLERS.path(config.data["handler"]), "files": config.data_files()},
+        "strategies": [{"class": STRATEGIES.path(spec["type"]), "params": spec["params"]}
+                       for spec in config.strategies],
+    }
+    if args.resolve:
+        # 实际导入每个组件，确认模块和类都存在，且策略与数据处理器的输入方式相符
+        DATA_HANDLERS.resolve(config.data["handler"])
+        for spec in config.strategies:
+            _check_strategy_input(STRATEGIES.resolve(spec["type"]), spec, config)
+        for key, registry in (("slippage", SLIPPAGE_MODELS), ("commission_model", COMMISSION_MODELS)):
+            if key in config.execution:
+                registry.resolve(config.execution[key]["type"])
+    print(json.dumps(plan, indent=2, ensure_ascii=False))
+    return 0
+
+
+def _command_list(args) -> int:
+    for kind, registry in _REGISTRIES.items():
+        print(f"{kind}:")
+        for name in registry.names():
+            print(f"  {name:<28} {registry.path(name)}")
+    return 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="auto_trader", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="按配置运行回测或实时流水线，回测结束后输出 JSON 摘要")
+    run.add_argument("config")
+    run.add_argument("--mode", choices=(MODE_BACKTEST, MODE_LIVE), help="覆盖配置中的 [run] mode")
+    run.set_defaults(handler=_command_run)
+    check = commands.add_parser("check", help="校验配置并输出将要创建的组件，不运行")
+    check.add_argument("config")
+    check.add_argument("--resolve", action="store_true", help="同时导入每个组件，确认其存在并与数据配置相符")
+    check.set_defaults(handler=_command_check)
+    commands.add_parser("list", help="列出注册表中的组件名称").set_defaults(handler=_command_list)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ConfigError as exc:
+        print(f"配置错误: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import asyncio
+import inspect
+
+from auto_trader.common.event import Event, EventType
+
+
+class AsyncEventBus:
+    """
+    An EventBus for a single asyncio event loop.
+
+    Handlers can be plain functions or coroutine functions; coroutine
+    handlers are awaited in turn, so events are still handled one at a time
+    and in publish order. publish() is synchronous and never blocks, so the
+    existing components (StrategyEngine, ExecutionHandler, ...) work on this
+    bus unchanged; coroutines can use publish_async() to wait for room when
+    the queue is bounded by maxsize.
+
+    start() runs the dispatch loop as a task of the running loop. stop()
+    cancels it and returns as soon as the task has finished, with no polling
+    or timeout. Cancellation can only land on an await, so a synchronous
+    handler always runs to completion and the queue's bookkeeping stays
+    consistent even if a coroutine handler is interrupted.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self._queue = asyncio.Queue(maxsize)
+        self._handlers = {event_type: () for event_type in EventType}
+        self._task = None
+
+    def subscribe(self, event_type: EventType, handler, ordered: bool = False):
+        """
+        Subscribe a handler (function or coroutine function) to an event type.
+        ordered is accepted for compatibility with ShardedEventBus; this bus is always ordered.
+        """
+        entry = (handler, inspect.iscoroutinefunction(handler))
+        self._handlers[event_type] = self._handlers[event_type] + (entry,)
+
+    def unsubscribe(self, event_type: EventType, handler):
+        """
+        Remove a previously subscribed handler.
+        """
+        handlers = [entry for entry in self._handlers[event_type] if entry[0] != handler]
+        if len(handlers) == len(self._handlers[event_type]):
+            raise ValueError("handler is not subscribed")
+        self._handlers[event_type] = tuple(handlers)
+
+    def publish(self, event: Event):
+        """
+        Queues an event without blocking. Raises asyncio.QueueFull if a bounded queue is full.
+        """
+        self._queue.put_nowait(event)
+
+    async def publish_async(self, event: Event):
+        """
+        Queues an event, waiting for room if the queue is bounded.
+        """
+        await self._queue.put(event)
+
+    async def _dispatch(self, event: Event):
+        for handler, is_coroutine in self._handlers[event.event_type]:
+            if is_coroutine:
+                await handler(event)
+            else:
+                handler(event)
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            event = await queue.get()
+            try:
+                await self._dispatch(event)
+            finally:
+                queue.task_done()
+
+    def start(self):
+        """
+        Starts the dispatch loop on the running event loop.
+        """
+        if self.is_running():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Cancels the dispatch loop and waits for it to finish. Events still
+        queued stay queued and are handled by the next start() or
+        run_until_idle().
+        """
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def join(self):
+        """
+        Waits until every queued event, including those published by
+        handlers meanwhile, has been handled by the running dispatch loop.
+        """
+        await self._queue.join()
+
+    async def run_until_idle(self) -> int:
+        """
+        Dispatches queued events in the calling coroutine until the queue is
+        empty. Must not be used while the dispatch loop runs. Returns the
+        number of events dispatched.
+        """
+        if self.is_running():
+            raise RuntimeError("run_until_idle() cannot be used while the dispatch loop is running")
+        queue = self._queue
+        dispatched = 0
+        while not queue.empty():
+            event = queue.get_nowait()
+            try:
+                await self._dispatch(event)
+            finally:
+                queue.task_done()
+            dispatched += 1
+        return dispatched
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
@@ -1,10 +1,13 @@
+from collections import deque
 from enum import Enum
 from queue import Queue, Empty
-import time
 from threading import Thread
+from time import perf_counter_ns
 
 class EventType(Enum):
     MARKET = "MARKET"
+    MARKET_BATCH = "MARKET_BATCH"
+    BAR = "BAR"
     SIGNAL = "SIGNAL"
     ORDER = "ORDER"
     FILL = "FILL"
@@ -14,26 +17,87 @@ class Event:
     """
     Event is base class, providing an interface for all subsequent 
     (inherited) events, that will trigger further events in the trading infrastructure. 
+
+    Events are slotted: each subclass lists its fields in __slots__ and
+    declares its type as a class attribute, so instances carry no __dict__
+    and no per-instance event_type.
     """
-    def __init__(self, event_type: EventType):
-        self.event_type = event_type
+    __slots__ = ()
+    event_type: EventType = None
 
 class MarketEvent(Event):
     """
     Handles the event of receiving a new market update with corresponding bars.
+
+    price is the bar's close. timestamp (nanoseconds since the epoch) and the
+    rest of the OHLCV bar are filled in by data handlers that know them.
     """
-    def __init__(self, ticker: str, price: float):
-        super().__init__(EventType.MARKET)
+    __slots__ = ("ticker", "price", "timestamp", "open", "high", "low", "volume")
+    event_type = EventType.MARKET
+
+    def __init__(self, ticker: str, price: float, timestamp: int = None, open: float = None,
+                 high: float = None, low: float = None, volume: float = None):
         self.ticker = ticker
         self.price = price
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.volume = volume
+
+    @property
+    def close(self) -> float:
+        return self.price
+
+class BarEvent(MarketEvent):
+    """
+    A completed bar of a higher timeframe (e.g. "5m", "1h", "1d"), published
+    by a BarAggregator when the bar closes. timestamp is the bar's start.
+
+    It carries the same fields as MarketEvent, so strategies can handle it
+    with calculate_signals(), but has its own event type: components that
+    track the base feed (positions, risk, execution) do not see it twice.
+    """
+    __slots__ = ("timeframe",)
+    event_type = EventType.BAR
+
+    def __init__(self, ticker: str, price: float, timestamp: int, open: float, high: float, low: float,
+                 volume: float, timeframe: str):
+        super().__init__(ticker, price, timestamp, open, high, low, volume)
+        self.timeframe = timeframe
+
+class MarketBatchEvent(Event):
+    """
+    Carries one step's bars for many tickers at once, as a struct of arrays.
+
+    ``arrays`` maps "ticker" and each of "open", "high", "low", "close" and
+    "volume" to equally long sequences (NumPy arrays for the prices), so
+    consumers can process the whole cross-section in one call instead of
+    receiving one MarketEvent per ticker.
+    """
+    __slots__ = ("timestamp", "arrays")
+    event_type = EventType.MARKET_BATCH
+
+    def __init__(self, timestamp: int, arrays: dict):
+        self.timestamp = timestamp
+        self.arrays = arrays
+
+    @property
+    def tickers(self):
+        return self.arrays["ticker"]
+
+    def __len__(self):
+        return len(self.arrays["ticker"])
 
 class SignalEvent(Event):
     """
     Handles the event of sending a Signal from a Strategy object.
     This is received by a Portfolio object and acted upon.
     """
+    __slots__ = ("ticker", "action", "price")
+    event_type = EventType.SIGNAL
+
     def __init__(self, ticker: str, action: str, price: float):
-        super().__init__(EventType.SIGNAL)
         self.ticker = ticker
         self.action = action # 'BUY' or 'SELL'
         self.price = price
@@ -41,99 +105,244 @@ class SignalEvent(Event):
 class OrderEvent(Event):
     """
     Handles the event of sending an Order to an execution system.
-    The order contains a ticker (e.g. AAPL), a type (market or limit),
-    a quantity and a direction.
+    The order contains a ticker (e.g. AAPL), a type (market, limit or stop),
+    a quantity and a direction. Limit orders carry limit_price and stop
+    orders stop_price; order_id identifies the order in the fills it produces.
     """
-    def __init__(self, ticker: str, order_type: str, quantity: int, direction: str):
-        super().__init__(EventType.ORDER)
+    __slots__ = ("ticker", "order_type", "quantity", "direction", "limit_price", "stop_price", "order_id")
+    event_type = EventType.ORDER
+
+    def __init__(self, ticker: str, order_type: str, quantity: int, direction: str,
+                 limit_price: float = None, stop_price: float = None, order_id: int = None):
         self.ticker = ticker
-        self.order_type = order_type # 'MKT' or 'LMT'
+        self.order_type = order_type # 'MKT', 'LMT' or 'STP'
         self.quantity = quantity
         self.direction = direction # 'BUY' or 'SELL'
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.order_id = order_id
 
 class FillEvent(Event):
     """
     Encapsulates the notion of a Filled Order, as returned from a brokerage.
     Stores the quantity of an instrument actually filled and at what price.
     In addition, stores the commission of the trade from the brokerage.
+    An order can be filled in several parts; order_id links them to it.
     """
-    def __init__(self, ticker: str, quantity: int, direction: str, fill_price: float, commission: float = 0.0):
-        super().__init__(EventType.FILL)
+    __slots__ = ("ticker", "quantity", "direction", "fill_price", "commission", "order_id")
+    event_type = EventType.FILL
+
+    def __init__(self, ticker: str, quantity: int, direction: str, fill_price: float, commission: float = 0.0,
+                 order_id: int = None):
         self.ticker = ticker
         self.quantity = quantity
         self.direction = direction
         self.fill_price = fill_price
         self.commission = commission
+        self.order_id = order_id
 
 class PositionEvent(Event):
     """
     当头寸更新时触发该事件。
+
+    positions 是只读的 ticker -> 持仓数量映射，发布后不会再被修改；
+    ticker 是本次发生变化的 ticker，snapshot 是同一时刻的 PortfolioSnapshot。
     """
-    def __init__(self, positions: dict):
-        super().__init__(EventType.POSITION)
+    __slots__ = ("positions", "ticker", "snapshot")
+    event_type = EventType.POSITION
+
+    def __init__(self, positions, ticker: str = None, snapshot=None):
         self.positions = positions
+        self.ticker = ticker
+        self.snapshot = snapshot
+
+# Sentinel used to wake the bus thread on stop()
+_STOP = object()
+
 
 class EventBus:
-    _instance = None
-    _initialized = False
+    """
+    Routes published events to the handlers subscribed to their type.
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    Every EventBus is independent; components receive the bus they should use
+    explicitly. Handlers are kept as an immutable tuple per event type, so
+    dispatching an event is a single dict lookup and a loop.
 
-    def __init__(self):
-        if EventBus._initialized:
-            return
-        self._event_queue = Queue()
-        self._handlers = {event_type: [] for event_type in EventType}
+    In threaded mode (the default) events are queued on a thread-safe Queue
+    and dispatched by a background thread started with start(). With
+    threaded=False the bus is meant for a single thread: events go into a
+    lock-free collections.deque and are dispatched by run_until_idle().
+
+    With an Instrumentation (see common.instrumentation) events are queued
+    with their publish time and dispatched by timed copies of the loops;
+    without one the untimed loops below run unchanged.
+    """
+
+    def __init__(self, threaded: bool = True, instrumentation=None):
+        self._threaded = threaded
+        self._event_queue = Queue() if threaded else deque()
+        self._handlers = {event_type: () for event_type in EventType}
         self._running = False
-        self._thread = Thread(target=self._run, daemon=True)
-        EventBus._initialized = True
-    
+        self._thread = None
+        self.instrumentation = instrumentation
+        # event type -> (queue wait recorder, ((handler, recorder), ...)), rebuilt on (un)subscribe
+        self._timed = {}
+        # Bind the queue's put directly to skip a Python-level call per publish
+        self._put = self._event_queue.put if threaded else self._event_queue.append
+        self.publish = self._put if instrumentation is None else self._publish_instrumented
+
+    def _publish_instrumented(self, event: Event):
+        now = perf_counter_ns()
+        self.instrumentation.on_publish(event, now)
+        self._put((now, event))
+
+    def _timed_handlers(self, event_type: EventType) -> tuple:
+        instrumentation = self.instrumentation
+        timed = self._timed[event_type] = (
+            instrumentation.queue_wait[event_type].record,
+            instrumentation.timed_handlers(self._handlers[event_type]),
+        )
+        return timed
+
+    def _dispatch_instrumented(self, item) -> None:
+        published, event = item
+        started = perf_counter_ns()
+        timed = self._timed.get(event.event_type) or self._timed_handlers(event.event_type)
+        record_wait, handlers = timed
+        record_wait(started - published)
+        for handler, record in handlers:
+            handler(event)
+            finished = perf_counter_ns()
+            record(finished - started)
+            started = finished
+
     def _run(self):
         """
         Runs the event loop.
         """
+        if self.instrumentation is not None:
+            return self._run_instrumented()
+        queue = self._event_queue
+        handlers = self._handlers
         while self._running:
-            try:
-                event = self._event_queue.get(block=True, timeout=1)
-                if event and event.event_type in self._handlers:
-                    for handler in self._handlers[event.event_type]:
-                        handler(event)
-            except Empty:
+            event = queue.get()
+            if event is _STOP:
                 continue
-    
-    def subscribe(self, event_type: EventType, handler):
+            for handler in handlers[event.event_type]:
+                handler(event)
+
+    def _run_instrumented(self):
+        queue = self._event_queue
+        dispatch = self._dispatch_instrumented
+        while self._running:
+            item = queue.get()
+            if item is not _STOP:
+                dispatch(item)
+
+    def run_until_idle(self) -> int:
+        """
+        Dispatches queued events on the calling thread until the queue is empty.
+
+        Events published by handlers while draining are processed in the same
+        call, so on return the bus is quiescent. This is the synchronous
+        counterpart of start() and must not be used while the bus thread runs.
+
+        Returns the number of events dispatched.
+        """
+        if self._running:
+            raise RuntimeError("run_until_idle() cannot be used while the event bus thread is running")
+        if self.instrumentation is not None:
+            return self._run_until_idle_instrumented()
+        handlers = self._handlers
+        dispatched = 0
+        if self._threaded:
+            get = self._event_queue.get_nowait
+            while True:
+                try:
+                    event = get()
+                except Empty:
+                    return dispatched
+                if event is _STOP:
+                    continue
+                for handler in handlers[event.event_type]:
+                    handler(event)
+                dispatched += 1
+        queue = self._event_queue
+        popleft = queue.popleft
+        while queue:
+            event = popleft()
+            for handler in handlers[event.event_type]:
+                handler(event)
+            dispatched += 1
+        return dispatched
+
+    def _run_until_idle_instrumented(self) -> int:
+        queue = self._event_queue
+        dispatch = self._dispatch_instrumented
+        dispatched = 0
+        while True:
+            try:
+                item = queue.get_nowait() if self._threaded else queue.popleft()
+            except (Empty, IndexError):
+                return dispatched
+            if item is not _STOP:
+                dispatch(item)
+                dispatched += 1
+
+    def subscribe(self, event_type: EventType, handler, ordered: bool = False):
         """
         Subscribe a handler to a specific event type.
+
+        ordered=True marks a handler that must see the event in order with
+        ORDER/FILL/POSITION events. A single-threaded bus always dispatches in
+        order, so it only matters for ShardedEventBus.
         """
         if event_type in self._handlers:
-            self._handlers[event_type].append(handler)
+            self._handlers[event_type] = self._handlers[event_type] + (handler,)
+            self._timed.pop(event_type, None)
+
+    def unsubscribe(self, event_type: EventType, handler):
+        """
+        Remove a previously subscribed handler.
+        """
+        handlers = list(self._handlers[event_type])
+        handlers.remove(handler)
+        self._handlers[event_type] = tuple(handlers)
+        self._timed.pop(event_type, None)
 
     def publish(self, event: Event):
         """
         Publish an event to the event bus.
         """
-        self._event_queue.put(event)
+        # Replaced per instance in __init__ by the queue's put/append
+        self._put(event)
 
     def start(self):
         """
         Starts the event bus thread.
         """
+        if not self._threaded:
+            raise RuntimeError("A bus created with threaded=False is driven by run_until_idle()")
+        if self._running:
+            return
         self._running = True
+        self._thread = Thread(target=self._run, daemon=True)
         self._thread.start()
-    
+
     def stop(self):
         """
-        Stops the event bus thread.
+        Stops the event bus thread and dumps the instrumentation, if any.
         """
         self._running = False
-        if self._thread.is_alive():
+        if self._thread and self._thread.is_alive():
+            # Wake the thread up immediately instead of waiting for a timeout
+            self._event_queue.put(_STOP)
             self._thread.join()
+        if self.instrumentation is not None:
+            self.instrumentation.dump()
 
     def is_running(self):
         """
         Returns the running state of the event bus.
         """
-        return self._running
\ No newline at end of file
+        return self._running
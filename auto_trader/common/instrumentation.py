@@ -0,0 +1,242 @@
+import json
+import logging
+
+import numpy as np
+
+from auto_trader.common.event import EventType
+
+logger = logging.getLogger(__name__)
+
+# Each power-of-two range of values is split into 2**(SUB_BITS - 1) linear
+# buckets, so any recorded value is off by less than 1 / 64 (~1.6%)
+SUB_BITS = 7
+_HALF_BITS = SUB_BITS - 1
+# Values are nanoseconds; anything above 2**36 ns (~69 s) lands in the last bucket
+MAX_EXPONENT = 36 - SUB_BITS
+BUCKETS = (MAX_EXPONENT + 2) << _HALF_BITS
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    """
+    Returns the log-linear bucket of a non-negative integer value.
+    """
+    shift = value.bit_length() - SUB_BITS
+    if shift <= 0:
+        return value
+    index = (shift << _HALF_BITS) + (value >> shift)
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def bucket_bounds(index: int) -> tuple:
+    """
+    Returns the (lowest, highest) value that falls into bucket ``index``.
+    """
+    if index < 1 << SUB_BITS:
+        return index, index
+    shift = (index >> _HALF_BITS) - 1
+    lowest = (index - (shift << _HALF_BITS)) << shift
+    return lowest, lowest + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram of integer latencies in nanoseconds.
+
+    Buckets are log-linear: exact below 128 ns, then 64 equal buckets per
+    power of two, which keeps the relative error of every percentile under
+    2% across the whole range with a fixed array of BUCKETS counters.
+    Recording is a bit_length, two shifts and a list increment; the sum and
+    the maximum are kept exactly, the count and the minimum are derived from
+    the buckets when read. Values are expected to be non-negative.
+
+    A histogram is meant to be written by one thread. Concurrent writers do
+    not corrupt it but may lose the odd count.
+    """
+
+    __slots__ = ("name", "counts", "total", "max")
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * BUCKETS
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        shift = value.bit_length() - SUB_BITS
+        if shift > 0:
+            index = (shift << _HALF_BITS) + (value >> shift)
+            self.counts[index if index < BUCKETS else BUCKETS - 1] += 1
+        else:
+            self.counts[value] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def min(self):
+        """
+        The lowest value of the lowest non-empty bucket, or None if empty.
+        """
+        nonzero = np.flatnonzero(self.counts)
+        return bucket_bounds(int(nonzero[0]))[0] if len(nonzero) else None
+
+    def merge(self, other: "LatencyHistogram"):
+        """
+        Adds the counts of another histogram to this one.
+        """
+        self.counts = (np.asarray(self.counts) + np.asarray(other.counts)).tolist()
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, percentiles=PERCENTILES) -> list:
+        """
+        Returns the value at each percentile (0-100), in nanoseconds: the
+        highest value of the bucket holding that rank, capped at the
+        recorded maximum.
+        """
+        cumulative = np.cumsum(self.counts)
+        count = int(cumulative[-1])
+        if not count:
+            return [None] * len(percentiles)
+        ranks = np.ceil(np.asarray(percentiles, dtype=np.float64) / 100.0 * count).clip(1, count)
+        indices = np.searchsorted(cumulative, ranks)
+        return [min(bucket_bounds(int(i))[1], self.max) for i in indices]
+
+    def snapshot(self) -> dict:
+        """
+        Returns count and summary statistics in microseconds.
+        """
+        count = self.count
+        if not count:
+            return {"count": 0}
+        stats = {
+            "count": count,
+            "mean_us": self.total / count / 1e3,
+            "min_us": self.min / 1e3,
+        }
+        for percentile, value in zip(PERCENTILES, self.percentiles()):
+            stats[f"p{percentile:g}_us"] = value / 1e3
+        stats["max_us"] = self.max / 1e3
+        return stats
+
+
+def handler_name(handler) -> str:
+    """
+    A readable, stable name for a subscribed handler, e.g. "PositionManager.on_fill".
+    """
+    return getattr(handler, "__qualname__", None) or repr(handler)
+
+
+class Instrumentation:
+    """
+    Latency histograms for the event pipeline.
+
+    Pass an instance to EventBus(instrumentation=...) to record:
+
+      * queue_wait.<EVENT_TYPE>  time from publish() to dispatch,
+      * handler.<name>           execution time of every handler,
+      * latency.tick_to_signal   time from a ticker's latest MarketEvent (or
+                                 MarketBatchEvent) being published to a
+                                 SignalEvent for it being published,
+      * latency.signal_to_fill   time from a SignalEvent to the first
+                                 FillEvent of the same ticker.
+
+    A bus created without one runs its original, untimed dispatch loop, so
+    disabled instrumentation costs nothing. All values are
+    time.perf_counter_ns() differences. snapshot() returns the statistics
+    of every non-empty histogram; dump() logs them and, with ``dump_path``
+    set, writes them as JSON. EventBus.stop() calls dump().
+    """
+
+    def __init__(self, dump_path: str = None):
+        self.dump_path = dump_path
+        self.histograms = {}
+        self.queue_wait = {event_type: self.histogram(f"queue_wait.{event_type.name}") for event_type in EventType}
+        self.tick_to_signal = self.histogram("latency.tick_to_signal")
+        self.signal_to_fill = self.histogram("latency.signal_to_fill")
+        self._handler_histograms = {}
+        self._last_tick = {}
+        self._last_signal = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """
+        Returns the histogram called ``name``, creating it on first use.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram(name)
+        return histogram
+
+    def handler_histogram(self, handler) -> LatencyHistogram:
+        histogram = self._handler_histograms.get(handler)
+        if histogram is None:
+            histogram = self._handler_histograms[handler] = self.histogram(f"handler.{handler_name(handler)}")
+        return histogram
+
+    def timed_handlers(self, handlers: tuple) -> tuple:
+        """
+        Pairs every handler with its histogram's record method, for the bus to
+        cache per event type.
+        """
+        return tuple((handler, self.handler_histogram(handler).record) for handler in handlers)
+
+    def on_publish(self, event, now: int):
+        """
+        Tracks the tick -> signal -> fill chain of the ticker of ``event``.
+        """
+        event_type = event.event_type
+        if event_type is EventType.MARKET:
+            self._last_tick[event.ticker] = now
+        elif event_type is EventType.MARKET_BATCH:
+            self._last_tick.update(dict.fromkeys(event.arrays["ticker"], now))
+        elif event_type is EventType.SIGNAL:
+            tick = self._last_tick.get(event.ticker)
+            if tick is not None:
+                self.tick_to_signal.record(now - tick)
+            self._last_signal[event.ticker] = now
+        elif event_type is EventType.FILL:
+            signal = self._last_signal.pop(event.ticker, None)
+            if signal is not None:
+                self.signal_to_fill.record(now - signal)
+
+    def snapshot(self) -> dict:
+        """
+        Returns {histogram name: statistics} for every histogram with data.
+        """
+        snapshot = {}
+        for name, histogram in sorted(self.histograms.items()):
+            stats = histogram.snapshot()
+            if stats["count"]:
+                snapshot[name] = stats
+        return snapshot
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self._last_tick.clear()
+        self._last_signal.clear()
+
+    def dump(self, path: str = None) -> dict:
+        """
+        Logs the snapshot at INFO and writes it as JSON to ``path`` (or
+        ``dump_path``) if one is set. Returns the snapshot.
+        """
+        snapshot = self.snapshot()
+        if logger.isEnabledFor(logging.INFO):
+            for name, stats in snapshot.items():
+                logger.info("%-40s n=%-8d mean=%.1fus p50=%.1fus p99=%.1fus max=%.1fus", name, stats["count"],
+                            stats["mean_us"], stats["p50_us"], stats["p99_us"], stats["max_us"])
+        path = path or self.dump_path
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2)
+        return snapshot
@@ -0,0 +1,72 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER = "auto_trader"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_listener = None
+_queue_handler = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues the record untouched; the listener thread does the formatting.
+
+    The stock QueueHandler formats every record on the caller's thread so it
+    can be pickled. Records here never leave the process, so the caller
+    only pays for creating the record and one queue put.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level="INFO", handler: logging.Handler = None, fmt: str = DEFAULT_FORMAT) -> QueueListener:
+    """
+    Routes every auto_trader.* logger through a queue to a background thread.
+
+    Logging calls on the hot path then only build a LogRecord and put it on
+    an unbounded SimpleQueue; formatting and I/O happen on the listener
+    thread. Records below ``level`` are discarded by the logger's level
+    check before any of that. ``handler`` defaults to a StreamHandler on
+    stderr. Calling it again replaces the previous setup; shutdown_logging()
+    (also run at interpreter exit) flushes the queue.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+    if handler is None:
+        handler = logging.StreamHandler(sys.stderr)
+    if handler.formatter is None:
+        handler.setFormatter(logging.Formatter(fmt))
+    records = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(records)
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """
+    Writes out every queued record, stops the listener thread and restores
+    the default level and propagation to the root logger.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.removeHandler(_queue_handler)
+        logger.propagate = True
+        logger.setLevel(logging.NOTSET)
+        _queue_handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,80 @@
+import importlib
+
+
+class Registry:
+    """
+    Maps short component names to "module:attribute" paths and imports the
+    module only when a name is first resolved.
+
+    Listing or validating names is a dictionary lookup, so tools that only
+    read a configuration never import numpy, pandas or the component
+    modules. Besides registered names, any "package.module:Attribute" path
+    can be resolved directly, which is how a configuration refers to a
+    component that is not registered.
+    """
+
+    def __init__(self, kind: str, entries: dict = None):
+        self.kind = kind
+        self._paths = dict(entries or {})
+        self._resolved = {}
+
+    def register(self, name: str, target):
+        """
+        Registers ``target``, either a "module:attribute" path or the object itself.
+        """
+        if isinstance(target, str):
+            self._paths[name] = target
+            self._resolved.pop(name, None)
+        else:
+            self._paths[name] = f"{target.__module__}:{target.__qualname__}"
+            self._resolved[name] = target
+
+    def names(self) -> list:
+        return sorted(self._paths)
+
+    def path(self, name: str) -> str:
+        """
+        Returns the "module:attribute" path of ``name`` without importing anything.
+        """
+        path = self._paths.get(name)
+        if path is not None:
+            return path
+        if ":" in name:
+            return name
+        raise ValueError(f"Unknown {self.kind} {name!r}, expected one of {self.names()} or a 'module:attribute' path")
+
+    def resolve(self, name: str):
+        """
+        Returns the object registered as ``name``, importing its module on first use.
+        """
+        target = self._resolved.get(name)
+        if target is None:
+            module_name, _, attribute = self.path(name).partition(":")
+            target = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                target = getattr(target, part)
+            self._resolved[name] = target
+        return target
+
+
+STRATEGIES = Registry("strategy", {
+    "moving_average_crossover": "auto_trader.strategy_engine.buy_and_hold_strategy:MovingAverageCrossoverStrategy",
+    "cross_sectional_momentum": "auto_trader.strategy_engine.cross_sectional:CrossSectionalMomentumStrategy",
+})
+
+DATA_HANDLERS = Registry("data handler", {
+    "csv": "auto_trader.data_handler.historic_csv_data_handler:HistoricCSVDataHandler",
+    "streaming_csv": "auto_trader.data_handler.streaming_csv_data_handler:StreamingCSVDataHandler",
+})
+
+SLIPPAGE_MODELS = Registry("slippage model", {
+    "none": "auto_trader.execution_handler.cost_models:NoSlippage",
+    "fixed": "auto_trader.execution_handler.cost_models:FixedSlippage",
+    "volume_share": "auto_trader.execution_handler.cost_models:VolumeShareSlippage",
+})
+
+COMMISSION_MODELS = Registry("commission model", {
+    "fixed": "auto_trader.execution_handler.cost_models:FixedCommission",
+    "per_share": "auto_trader.execution_handler.cost_models:PerShareCommission",
+    "percent": "auto_trader.execution_handler.cost_models:PercentCommission",
+})
@@ -0,0 +1,356 @@
+import zlib
+from collections import deque
+from threading import Condition, Thread
+
+import numpy as np
+
+from auto_trader.common.event import Event, EventType, MarketBatchEvent
+
+BACKPRESSURE_BLOCK = "block"
+BACKPRESSURE_DROP = "drop"
+BACKPRESSURE_COALESCE = "coalesce"
+BACKPRESSURE_POLICIES = (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP, BACKPRESSURE_COALESCE)
+
+# Event types whose handlers run on the shard owning the event's ticker
+SHARDED_TYPES = (EventType.MARKET, EventType.MARKET_BATCH, EventType.BAR, EventType.SIGNAL)
+# Market data event types subject to a lane's backpressure policy
+BACKPRESSURE_TYPES = frozenset((EventType.MARKET, EventType.MARKET_BATCH, EventType.BAR))
+
+
+def _coalesce_key(event):
+    return event.event_type, getattr(event, "ticker", None), getattr(event, "timeframe", None)
+
+
+class _Lane:
+    """
+    A FIFO of events consumed by one dispatch thread.
+
+    Only market data (MARKET, MARKET_BATCH and BAR events) is subject to
+    backpressure; every other event is always accepted, so a handler
+    publishing into its own lane can never deadlock and orders, fills and
+    signals are never lost. While fewer than max_size events are queued
+    all market data is accepted; once the lane is full, it is handled by
+    the lane's policy:
+
+      * "block"    - the publisher waits for room.
+      * "drop"     - the new event is discarded.
+      * "coalesce" - a quote, or a bar of one timeframe, for a ticker that
+                     already has one queued replaces it (latest wins). A
+                     MarketBatchEvent replaces the batch already queued on
+                     the lane: batches are keyed by lane rather than by
+                     ticker, as each one is a snapshot of the lane's
+                     tickers. An event with nothing to replace is dropped.
+
+    A coalesced event does not take over the old event's place in the queue:
+    the old slot is invalidated and the new event appended, so it is never
+    dispatched ahead of events published before it. With coalesce, market
+    data is queued in one-element list slots so they can be invalidated in O(1);
+    dead slots are skipped when dequeued and compacted away once there are
+    more than max_size of them.
+    """
+
+    def __init__(self, max_size: int, policy: str):
+        self.max_size = max_size
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self._items = deque()
+        # live events queued (dead coalesce slots excluded)
+        self._size = 0
+        self._dead = 0
+        # (event type, ticker, timeframe) -> slot of the most recently queued
+        # market event with that key; batches have no ticker (coalesce only)
+        self._latest = {}
+        self._closed = False
+        self._ready = Condition()
+
+    def __len__(self):
+        return self._size
+
+    def put(self, event) -> bool:
+        """
+        Queues an event; returns False if it was dropped or replaced a queued event.
+        """
+        with self._ready:
+            is_market = event.event_type in BACKPRESSURE_TYPES
+            if is_market and self._size >= self.max_size:
+                policy = self.policy
+                if policy == BACKPRESSURE_COALESCE:
+                    slot = self._latest.get(_coalesce_key(event))
+                    if slot is None:
+                        self.dropped += 1
+                        return False
+                    slot[0] = None
+                    self._size -= 1
+                    self._dead += 1
+                    self.coalesced += 1
+                    self._append(event, is_market)
+                    return False
+                if policy == BACKPRESSURE_DROP:
+                    self.dropped += 1
+                    return False
+                while self._size >= self.max_size and not self._closed:
+                    self._ready.wait()
+            self._append(event, is_market)
+            return True
+
+    def _append(self, event, is_market: bool):
+        if is_market and self.policy == BACKPRESSURE_COALESCE:
+            slot = [event]
+            self._latest[_coalesce_key(event)] = slot
+            event = slot
+            if self._dead > self.max_size:
+                self._items = deque(item for item in self._items if type(item) is not list or item[0] is not None)
+                self._dead = 0
+        self._items.append(event)
+        self._size += 1
+        self._ready.notify_all()
+
+    def _pop(self):
+        while True:
+            item = self._items.popleft()
+            if type(item) is not list:
+                break
+            event = item[0]
+            if event is None:
+                self._dead -= 1
+                continue
+            key = _coalesce_key(event)
+            if self._latest.get(key) is item:
+                del self._latest[key]
+            item = event
+            break
+        self._size -= 1
+        if self.policy == BACKPRESSURE_BLOCK and self._size == self.max_size - 1:
+            # Wake publishers blocked on a full lane
+            self._ready.notify_all()
+        return item
+
+    def get(self):
+        """
+        Blocks until an event is available; returns None once the lane is closed.
+        """
+        with self._ready:
+            while not self._size:
+                if self._closed:
+                    return None
+                self._ready.wait()
+            return self._pop()
+
+    def get_nowait(self):
+        with self._ready:
+            return self._pop() if self._size else None
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+    def open(self):
+        with self._ready:
+            self._closed = False
+
+
+class ShardedEventBus:
+    """
+    An event bus that dispatches on several threads for live trading.
+
+    MARKET, MARKET_BATCH, BAR and SIGNAL events are partitioned by a stable hash
+    of their ticker across num_shards worker threads, so a slow strategy only
+    delays the tickers on its own shard, and events for one ticker are always
+    handled in publish order. ORDER, FILL and POSITION events go to a single
+    ordered lane with its own thread. A MarketBatchEvent is split into one
+    sub-batch per shard.
+
+    Handlers that keep state shared with the ordered lane (positions, risk,
+    the simulated broker) should see market data on that lane too: they
+    subscribe with ordered=True, and market events are then also delivered to
+    the ordered lane, in order with fills. The same holds for handlers that
+    act on SIGNAL events through such state, e.g. an ExecutionHandler with a
+    PreTradeRiskEngine or a SimulatedBroker: a handler whose owning object
+    has a true ``requires_ordered_lane`` attribute is always subscribed as
+    if ordered=True.
+
+    Every lane is bounded by max_queue for market data (quotes, bars and
+    batches), with the backpressure policy described in _Lane.
+
+    Shards are threads, not processes: handlers are bound methods sharing
+    in-process state, so the bus isolates slow handlers rather than adding
+    CPU parallelism. Handlers on different shards run concurrently and must
+    not share unsynchronised state.
+    """
+
+    def __init__(self, num_shards: int = 4, max_queue: int = 10_000, backpressure: str = BACKPRESSURE_BLOCK):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy {backpressure!r}, expected one of {BACKPRESSURE_POLICIES}")
+        self.num_shards = num_shards
+        self._shards = [_Lane(max_queue, backpressure) for _ in range(num_shards)]
+        self._ordered = _Lane(max_queue, backpressure)
+        self._sharded_handlers = {event_type: () for event_type in EventType}
+        self._ordered_handlers = {event_type: () for event_type in EventType}
+        self._shard_of = {}
+        # events queued or being handled on any lane, for stop() to wait on
+        self._pending = 0
+        self._idle = Condition()
+        self._running = False
+        self._threads = []
+
+    @property
+    def dropped(self) -> int:
+        return sum(lane.dropped for lane in self._lanes())
+
+    @property
+    def coalesced(self) -> int:
+        return sum(lane.coalesced for lane in self._lanes())
+
+    def _lanes(self):
+        return self._shards + [self._ordered]
+
+    def shard_for(self, ticker: str) -> int:
+        """
+        Returns the shard index of ticker (stable across processes and runs).
+        """
+        shard = self._shard_of.get(ticker)
+        if shard is None:
+            shard = self._shard_of[ticker] = zlib.crc32(ticker.encode("utf-8")) % self.num_shards
+        return shard
+
+    def subscribe(self, event_type: EventType, handler, ordered: bool = False):
+        """
+        Subscribe a handler to a specific event type.
+
+        Handlers for MARKET, MARKET_BATCH, BAR and SIGNAL run on the ticker's shard
+        unless ordered=True (or the handler's object requires the ordered lane);
+        all other event types run on the ordered lane.
+        """
+        ordered = ordered or getattr(getattr(handler, "__self__", None), "requires_ordered_lane", False)
+        table = self._sharded_handlers if event_type in SHARDED_TYPES and not ordered else self._ordered_handlers
+        table[event_type] = table[event_type] + (handler,)
+
+    def unsubscribe(self, event_type: EventType, handler):
+        """
+        Remove a previously subscribed handler.
+        """
+        for table in (self._sharded_handlers, self._ordered_handlers):
+            if handler in table[event_type]:
+                handlers = list(table[event_type])
+                handlers.remove(handler)
+                table[event_type] = tuple(handlers)
+                return
+        raise ValueError("handler is not subscribed")
+
+    def publish(self, event: Event):
+        """
+        Publish an event to the lane(s) that handle it.
+        """
+        event_type = event.event_type
+        if event_type not in SHARDED_TYPES:
+            self._put(self._ordered, event)
+            return
+        if self._sharded_handlers[event_type]:
+            if event_type is EventType.MARKET_BATCH:
+                self._publish_batch(event)
+            else:
+                self._put(self._shards[self.shard_for(event.ticker)], event)
+        if self._ordered_handlers[event_type]:
+            self._put(self._ordered, event)
+
+    def _track(self, delta: int):
+        with self._idle:
+            self._pending += delta
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _put(self, lane: _Lane, event: Event):
+        # Counted before it becomes visible to the lane's thread, so the count
+        # cannot reach zero while the event is queued
+        self._track(1)
+        if not lane.put(event):
+            self._track(-1)
+
+    def _publish_batch(self, event: MarketBatchEvent):
+        tickers = event.arrays["ticker"]
+        if self.num_shards == 1:
+            self._put(self._shards[0], event)
+            return
+        shard_ids = np.fromiter((self.shard_for(t) for t in tickers), dtype=np.int64, count=len(tickers))
+        tickers = np.asarray(tickers, dtype=object)
+        for shard in np.unique(shard_ids):
+            mask = shard_ids == shard
+            arrays = {name: (values[mask] if isinstance(values, np.ndarray) else tickers[mask])
+                      for name, values in event.arrays.items()}
+            self._put(self._shards[shard], MarketBatchEvent(event.timestamp, arrays))
+
+    def _dispatch(self, lane: _Lane, handlers: dict):
+        while True:
+            event = lane.get()
+            if event is None:
+                return
+            try:
+                for handler in handlers[event.event_type]:
+                    handler(event)
+            finally:
+                self._track(-1)
+
+    def start(self):
+        """
+        Starts one thread per shard plus the ordered lane's thread.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._threads = []
+        for lane, handlers in self._lane_handlers():
+            lane.open()
+            thread = Thread(target=self._dispatch, args=(lane, handlers), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _lane_handlers(self):
+        return [(lane, self._sharded_handlers) for lane in self._shards] + [(self._ordered, self._ordered_handlers)]
+
+    def stop(self):
+        """
+        Stops all dispatch threads once every lane is idle, including events
+        that handlers on one lane publish into another while draining.
+        """
+        with self._idle:
+            while self._pending and any(thread.is_alive() for thread in self._threads):
+                self._idle.wait(0.1)
+        self._running = False
+        for lane in self._lanes():
+            lane.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def is_running(self):
+        return self._running
+
+    def run_until_idle(self) -> int:
+        """
+        Dispatches every queued event on the calling thread until all lanes
+        are empty, visiting the lanes round-robin. Must not be used while the
+        dispatch threads run. Returns the number of events dispatched.
+        """
+        if self._running:
+            raise RuntimeError("run_until_idle() cannot be used while the dispatch threads are running")
+        dispatched = 0
+        lanes = self._lane_handlers()
+        busy = True
+        while busy:
+            busy = False
+            for lane, handlers in lanes:
+                event = lane.get_nowait()
+                while event is not None:
+                    try:
+                        for handler in handlers[event.event_type]:
+                            handler(event)
+                    finally:
+                        self._track(-1)
+                    dispatched += 1
+                    busy = True
+                    event = lane.get_nowait()
+        return dispatched
@@ -0,0 +1,223 @@
+"""
+声明式运行配置。
+
+配置文件为 TOML（标准库 tomllib）或 JSON，描述一次运行所需的全部组件：
+
+    [universe]
+    tickers = ["AAPL"]
+
+    [data]
+    handler = "csv"                   # DATA_HANDLERS 中的名称，或 "模块:类"
+    path = "data/{ticker}.csv"        # 或 files = [...]，与 tickers 一一对应
+    cache_dir = ".bar_cache"          # 其余键原样传给数据处理器
+
+    [[strategies]]
+    type = "moving_average_crossover" # STRATEGIES 中的名称，或 "模块:类"
+    params = { short_window = 5, long_window = 10 }
+
+    [execution]
+    quantity = 100
+    commission = 5.0
+    broker = "simulated"              # 可选，省略时按信号价格立即成交
+    slippage = { type = "fixed", bps = 5.0 }
+    commission_model = { type = "per_share", rate = 0.005 }
+
+    [risk]
+    equity_limit = 1000000.0
+    pre_trade = { max_order_quantity = 500 }
+
+    [portfolio]
+    initial_cash = 100000.0
+
+    [run]
+    mode = "backtest"                 # 或 "live"
+
+相对路径相对于配置文件所在目录。本模块只依赖标准库，加载和校验配置
+不会导入 numpy、pandas 或任何组件模块，组件名称只在注册表中查找（见 common.registry）。
+"""
+import json
+import os
+
+from auto_trader.common.registry import COMMISSION_MODELS, DATA_HANDLERS, SLIPPAGE_MODELS, STRATEGIES
+
+MODE_BACKTEST = "backtest"
+MODE_LIVE = "live"
+
+# 各节允许的键；data 节中其余的键传给数据处理器
+_EXECUTION_KEYS = {"quantity", "commission", "order_type", "broker", "slippage", "commission_model",
+                   "participation", "latency_bars"}
+_RISK_KEYS = {"equity_limit", "pre_trade", "initial_equity"}
+_PORTFOLIO_KEYS = {"initial_cash"}
+_RUN_KEYS = {"mode", "log_level", "instrumentation", "checkpoint_dir", "checkpoint_every", "checkpoint_keep"}
+_STRATEGY_KEYS = {"type", "params", "tickers"}
+_SECTIONS = {"universe", "data", "strategies", "execution", "risk", "portfolio", "run"}
+
+_RUN_DEFAULTS = {"mode": MODE_BACKTEST, "log_level": "WARNING", "instrumentation": False,
+                 "checkpoint_dir": None, "checkpoint_every": 0, "checkpoint_keep": 2}
+
+
+class ConfigError(ValueError):
+    """
+    配置文件格式或内容错误。
+    """
+
+
+def _section(raw: dict, name: str, allowed: set = None) -> dict:
+    section = raw.get(name, {})
+    if not isinstance(section, dict):
+        raise ConfigError(f"[{name}] 应为表（键值对）")
+    if allowed is not None:
+        unknown = set(section) - allowed
+        if unknown:
+            raise ConfigError(f"[{name}] 中有未知的键: {sorted(unknown)}，可选 {sorted(allowed)}")
+    return dict(section)
+
+
+def _component(registry, spec, where: str) -> dict:
+    """
+    校验 {"type": 名称, 其余参数} 形式的组件配置，字符串视为只给出了名称。
+    """
+    if isinstance(spec, str):
+        spec = {"type": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("type"), str):
+        raise ConfigError(f"{where} 应为组件名称或带 type 键的表")
+    try:
+        registry.path(spec["type"])
+    except ValueError as exc:
+        raise ConfigError(f"{where}: {exc}") from None
+    return dict(spec)
+
+
+class RunConfig:
+    """
+    校验过的运行配置，由 load_config() 或 RunConfig.from_dict() 创建。
+
+    各节以字典保存，缺省的键已填入默认值；组件此时还只是注册表中的名称，
+    由 cli.build_components() 按需导入并实例化。
+    """
+
+    def __init__(self, tickers: list, data: dict, strategies: list, execution: dict, risk: dict,
+                 portfolio: dict, run: dict, base_dir: str = "."):
+        self.tickers = tickers
+        self.data = data
+        self.strategies = strategies
+        self.execution = execution
+        self.risk = risk
+        self.portfolio = portfolio
+        self.run = run
+        self.base_dir = base_dir
+
+    @classmethod
+    def from_dict(cls, raw: dict, base_dir: str = ".") -> "RunConfig":
+        """
+        校验配置字典。
+
+        Args:
+            raw: 解析后的配置文件内容。
+            base_dir: 相对路径的基准目录。
+
+        Returns:
+            RunConfig 实例；内容有误时抛出 ConfigError。
+        """
+        if not isinstance(raw, dict):
+            raise ConfigError("配置的顶层应为表")
+        unknown = set(raw) - _SECTIONS
+        if unknown:
+            raise ConfigError(f"未知的配置节: {sorted(unknown)}，可选 {sorted(_SECTIONS)}")
+
+        tickers = _section(raw, "universe", {"tickers"}).get("tickers")
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) for t in tickers):
+            raise ConfigError("[universe] tickers 应为非空的字符串列表")
+
+        data = _section(raw, "data")
+        data.setdefault("handler", "csv")
+        _component(DATA_HANDLERS, {"type": data["handler"]}, "[data] handler")
+        if ("path" in data) == ("files" in data):
+            raise ConfigError("[data] 需要且只能指定 path（含 {ticker} 的路径模板）或 files 之一")
+        if "files" in data and (not isinstance(data["files"], list) or len(data["files"]) != len(tickers)):
+            raise ConfigError("[data] files 应为与 tickers 一一对应的路径列表")
+
+        strategies = raw.get("strategies")
+        if not isinstance(strategies, list) or not strategies:
+            raise ConfigError("至少需要一个 [[strategies]]")
+        checked = []
+        for i, spec in enumerate(strategies):
+            where = f"[[strategies]] #{i + 1}"
+            spec = _component(STRATEGIES, spec, where)
+            unknown = set(spec) - _STRATEGY_KEYS
+            if unknown:
+                raise ConfigError(f"{where} 中有未知的键: {sorted(unknown)}，参数请放在 params 中")
+            spec.setdefault("params", {})
+            if not isinstance(spec["params"], dict):
+                raise ConfigError(f"{where} params 应为表")
+            checked.append(spec)
+
+        execution = _section(raw, "execution", _EXECUTION_KEYS)
+        execution.setdefault("quantity", 100)
+        execution.setdefault("commission", 5.0)
+        execution.setdefault("order_type", "MKT")
+        broker = execution.get("broker")
+        if broker not in (None, "simulated"):
+            raise ConfigError(f"[execution] broker 只支持 \"simulated\"，得到 {broker!r}")
+        if "slippage" in execution:
+            execution["slippage"] = _component(SLIPPAGE_MODELS, execution["slippage"], "[execution] slippage")
+        if "commission_model" in execution:
+            execution["commission_model"] = _component(COMMISSION_MODELS, execution["commission_model"],
+                                                       "[execution] commission_model")
+        if broker is None and ({"slippage", "commission_model", "participation", "latency_bars"} & set(execution)):
+            raise ConfigError("[execution] 成本模型、成交量限制和延迟需要 broker = \"simulated\"")
+
+        risk = _section(raw, "risk", _RISK_KEYS)
+        if not isinstance(risk.get("pre_trade", {}), dict):
+            raise ConfigError("[risk] pre_trade 应为 RiskLimits 参数表")
+        portfolio = _section(raw, "portfolio", _PORTFOLIO_KEYS)
+        portfolio.setdefault("initial_cash", 0.0)
+
+        run = dict(_RUN_DEFAULTS)
+        run.update(_section(raw, "run", _RUN_KEYS))
+        if run["mode"] not in (MODE_BACKTEST, MODE_LIVE):
+            raise ConfigError(f"[run] mode 应为 \"{MODE_BACKTEST}\" 或 \"{MODE_LIVE}\"，得到 {run['mode']!r}")
+        return cls(tickers, data, checked, execution, risk, portfolio, run, base_dir)
+
+    def resolve_path(self, path: str) -> str:
+        """
+        把相对路径解释为相对于配置文件所在目录。
+        """
+        return path if os.path.isabs(path) else os.path.join(self.base_dir, path)
+
+    def data_files(self) -> list:
+        """
+        返回与 tickers 一一对应的数据文件路径。
+        """
+        if "files" in self.data:
+            return [self.resolve_path(path) for path in self.data["files"]]
+        return [self.resolve_path(self.data["path"].format(ticker=ticker)) for ticker in self.tickers]
+
+    def handler_options(self) -> dict:
+        """
+        返回传给数据处理器构造函数的其余参数，cache_dir 等路径已解析。
+        """
+        options = {key: value for key, value in self.data.items() if key not in ("handler", "path", "files")}
+        if options.get("cache_dir"):
+            options["cache_dir"] = self.resolve_path(options["cache_dir"])
+        return options
+
+
+def load_config(path: str) -> RunConfig:
+    """
+    读取并校验 TOML（.toml）或 JSON 配置文件。
+    """
+    if path.endswith(".toml"):
+        import tomllib
+        try:
+            with open(path, "rb") as f:
+                raw = tomllib.load(f)
+        except tomllib.TOMLDecodeError as exc:
+            raise ConfigError(f"{path}: {exc}") from None
+    else:
+        try:
+            with open(path) as f:
+                raw = json.load(f)
+        except json.JSONDecodeError as exc:
+            raise ConfigError(f"{path}: {exc}") from None
+    return RunConfig.from_dict(raw, os.path.dirname(os.path.abspath(path)))
@@ -0,0 +1,85 @@
+import numpy as np
+
+from auto_trader.data_handler.bar_buffer import BAR_FIELDS
+
+FILL_SKIP = "skip"
+FILL_FORWARD = "ffill"
+FILL_NAN = "nan"
+FILL_POLICIES = (FILL_SKIP, FILL_FORWARD, FILL_NAN)
+
+
+class AlignedBarFeed:
+    """
+    AlignedBarFeed lines several tickers' bar columns up on a common clock.
+
+    The union of all timestamps is computed once, together with a
+    (steps x tickers) matrix of row numbers into flat, concatenated OHLCV
+    columns, so producing the cross-section for a step is a single gather
+    with no searching.
+
+    fill_policy decides what a ticker contributes at a timestamp where it
+    has no bar:
+      * "skip"  - nothing; only tickers that traded appear in the step.
+      * "ffill" - a flat bar at the previous close (open = high = low = close,
+                  volume 0) once the ticker has traded at least once.
+      * "nan"   - every ticker appears in every step, with NaN for gaps.
+
+    Every ticker's timestamps must be sorted and unique.
+    """
+
+    def __init__(self, columns: dict, fill_policy: str = FILL_SKIP):
+        if fill_policy not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill policy {fill_policy!r}, expected one of {FILL_POLICIES}")
+        self.fill_policy = fill_policy
+        self.tickers = np.array(list(columns), dtype=object)
+
+        timestamps = [np.asarray(columns[ticker]["timestamp"], dtype=np.int64) for ticker in self.tickers]
+        lengths = np.array([len(ts) for ts in timestamps], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+        self.timestamps = np.unique(np.concatenate(timestamps)) if timestamps else np.empty(0, np.int64)
+        # Flat arrays have a trailing NaN row that missing entries gather from.
+        self._flat = {
+            field: np.concatenate([np.asarray(columns[t][field], dtype=np.float64) for t in self.tickers]
+                                  + [np.full(1, np.nan)])
+            for field in BAR_FIELDS
+        }
+        missing_row = int(lengths.sum())
+
+        rows = np.full((len(self.timestamps), len(self.tickers)), -1, dtype=np.int64)
+        for j, ts in enumerate(timestamps):
+            rows[np.searchsorted(self.timestamps, ts), j] = offsets[j] + np.arange(len(ts))
+        self.observed = rows >= 0
+        if fill_policy == FILL_FORWARD:
+            # Row numbers grow with time inside each ticker's block, so a running
+            # maximum down each column carries the last observed row forward.
+            rows = np.maximum.accumulate(rows, axis=0)
+        self.present = rows >= 0
+        rows[~self.present] = missing_row
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def step(self, i: int):
+        """
+        Returns (timestamp, arrays) for step i, where arrays maps "ticker" and
+        each OHLCV field to an array over the tickers included in the step.
+        """
+        rows = self._rows[i]
+        if self.fill_policy == FILL_NAN:
+            mask = None
+        else:
+            mask = self.present[i]
+            rows = rows[mask]
+        flat = self._flat
+        arrays = {"ticker": self.tickers if mask is None else self.tickers[mask]}
+        for field in BAR_FIELDS:
+            arrays[field] = flat[field][rows]
+        if self.fill_policy == FILL_FORWARD:
+            filled = ~self.observed[i][mask]
+            if filled.any():
+                close = arrays["close"]
+                for field in ("open", "high", "low"):
+                    arrays[field][filled] = close[filled]
+                arrays["volume"][filled] = 0.0
+        return int(self.timestamps[i]), arrays
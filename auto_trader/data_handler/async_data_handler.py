@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+from auto_trader.common.event import MarketEvent
+from auto_trader.data_handler.bar_buffer import BarBuffer
+from auto_trader.data_handler.data_handler import BarHistory, BufferedDataHandler
+
+
+async def replay(data_handler: BufferedDataHandler, interval: float = 0.0):
+    """
+    Async generator over a synchronous handler such as HistoricCSVDataHandler:
+    yields each step's market events, then sleeps ``interval`` seconds (0
+    just yields control to the event loop) before the next step.
+    """
+    while data_handler.continue_backtest:
+        for event in data_handler.update_bars():
+            yield event
+        await asyncio.sleep(interval)
+
+
+async def pump(events, event_bus, lockstep: bool = False) -> int:
+    """
+    Publishes every event of the async iterable ``events`` on ``event_bus``
+    and returns how many were published. With lockstep=True it waits for the
+    bus to go idle after each event, like the synchronous Backtest driver
+    does, so handlers never see a bar before the previous one is handled.
+    """
+    published = 0
+    async for event in events:
+        event_bus.publish(event)
+        published += 1
+        if lockstep:
+            await event_bus.join()
+    return published
+
+
+class AsyncFeedDataHandler(BarHistory):
+    """
+    AsyncFeedDataHandler consumes a live bar feed over TCP, such as
+    FakeExchange: newline-delimited JSON objects with "ticker", "timestamp",
+    OHLCV fields and the exchange's send time "sent_ns"
+    (time.perf_counter_ns on the same host).
+
+    It is driven by the async generator stream() rather than a thread, so
+    it is not a DataHandler (there is no update_bars() or start()); each
+    received bar is appended to the ticker's BarBuffer before its
+    MarketEvent is yielded, so the usual get_latest_bars_values() accessors
+    (BarHistory) work for strategies. As with HistoricCSVDataHandler, the
+    buffers keep every received bar by default (history_depth=None) until
+    require_history() bounds them; a long-running feed without a strategy
+    declaring its needs should pass history_depth. sent_ns and received_ns
+    keep the latest quote's timestamps per ticker for latency measurements.
+    stop() closes the connection, which ends a running stream().
+    """
+
+    def __init__(self, event_bus, host: str, port: int, tickers: list, history_depth: int = None):
+        self.event_bus = event_bus
+        self.host = host
+        self.port = port
+        self.tickers = tickers
+        self.history_depth = history_depth
+        self.latest_ticker_data = {ticker: BarBuffer(history_depth) for ticker in tickers}
+        self.sent_ns = {}
+        self.received_ns = {}
+        self.continue_backtest = True
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def stream(self):
+        """
+        Yields a MarketEvent for every bar received until the feed closes or
+        stop() is called.
+        """
+        if not self.continue_backtest:
+            return
+        if self._reader is None:
+            await self.connect()
+        try:
+            while self.continue_backtest:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                event = self._on_message(line)
+                if event is not None:
+                    yield event
+        finally:
+            self.continue_backtest = False
+            await self.close()
+
+    def _on_message(self, line: bytes):
+        received = time.perf_counter_ns()
+        bar = json.loads(line)
+        ticker = bar["ticker"]
+        buffer = self.latest_ticker_data.get(ticker)
+        if buffer is None:
+            return None
+        timestamp, close = bar["timestamp"], bar["close"]
+        buffer.append(timestamp, bar["open"], bar["high"], bar["low"], close, bar["volume"])
+        self.sent_ns[ticker] = bar["sent_ns"]
+        self.received_ns[ticker] = received
+        return MarketEvent(ticker, close, timestamp, bar["open"], bar["high"], bar["low"], bar["volume"])
+
+    def stop(self):
+        """
+        Stops the feed immediately: closes the connection, so a running
+        stream() ends as soon as its pending read returns instead of waiting
+        for the next quote. Must be called from the event loop's thread.
+        """
+        self.continue_backtest = False
+        if self._writer is not None:
+            self._writer.close()
@@ -0,0 +1,254 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.common.event import BarEvent, EventType, MarketBatchEvent, MarketEvent
+from auto_trader.data_handler.bar_buffer import BarBuffer, BAR_FIELDS
+
+_UNITS = {"s": 1_000_000_000, "m": 60_000_000_000, "h": 3_600_000_000_000, "d": 86_400_000_000_000}
+_TIMEFRAME = re.compile(r"^(\d+)([smhd])$")
+
+
+def parse_timeframe(timeframe: str) -> int:
+    """
+    Converts a timeframe such as "30s", "5m", "1h" or "1d" to nanoseconds.
+    """
+    match = _TIMEFRAME.match(timeframe)
+    if match is None or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid timeframe {timeframe!r}, expected e.g. '5m', '1h' or '1d'")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def _bar_columns(columns: dict, width: int) -> dict:
+    """
+    Aggregates time-sorted bar columns into bars of ``width`` nanoseconds.
+    """
+    timestamps = columns["timestamp"]
+    if not len(timestamps):
+        return {field: column[:0] for field, column in columns.items()}
+    buckets = timestamps - timestamps % width
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    return {
+        "timestamp": buckets[starts],
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+
+
+def resample_columns(columns: dict, timeframes) -> dict:
+    """
+    Aggregates one ticker's replay columns ("timestamp" in nanoseconds plus
+    OHLCV, as held by HistoricCSVDataHandler or BarCache) into every requested
+    timeframe, matching what BarAggregator emits for the same data.
+
+    Timeframes are processed from the finest to the coarsest and each one is
+    built from the previous result whenever its width is a multiple of it
+    (5m -> 15m -> 1h -> 1d), so the raw data is scanned only once and the
+    coarser timeframes only touch the already reduced bars. Buckets are
+    aligned to the epoch (days start at midnight UTC) and empty buckets are
+    left out.
+
+    Returns:
+        dict: timeframe -> columns, in the order the timeframes were given.
+    """
+    results = {}
+    source, source_width = columns, None
+    for width, timeframe in sorted((parse_timeframe(timeframe), timeframe) for timeframe in timeframes):
+        base = source if source_width is not None and width % source_width == 0 else columns
+        results[timeframe] = _bar_columns(base, width)
+        source, source_width = results[timeframe], width
+    return {timeframe: results[timeframe] for timeframe in timeframes}
+
+
+def resample_frame(df: pd.DataFrame, timeframes) -> dict:
+    """
+    DataFrame wrapper around resample_columns(): takes an OHLCV frame indexed
+    by datetime and returns timeframe -> frame.
+    """
+    columns = {field: df[field].to_numpy(dtype=np.float64) for field in BAR_FIELDS}
+    columns["timestamp"] = df.index.values.astype("datetime64[ns]").view(np.int64)
+    frames = {}
+    for timeframe, bars in resample_columns(columns, timeframes).items():
+        index = pd.DatetimeIndex(bars["timestamp"].view("datetime64[ns]"), name=df.index.name).as_unit(df.index.unit)
+        frames[timeframe] = pd.DataFrame({field: bars[field] for field in BAR_FIELDS}, index=index)
+    return frames
+
+
+class TimeframeBars:
+    """
+    The completed bars of one timeframe, with the history interface of a
+    BufferedDataHandler (get_latest_bars_values, get_bar_count,
+    require_history), so a strategy or an IndicatorRegistry can use it in
+    place of the data handler. Obtained from BarAggregator.bars().
+
+    Like the data handlers, it keeps every completed bar by default
+    (history_depth=None) until require_history() bounds the buffers.
+    """
+
+    def __init__(self, timeframe: str, history_depth: int = None):
+        self.timeframe = timeframe
+        self.history_depth = history_depth
+        self.latest_ticker_data = {}
+
+    def buffer(self, ticker: str) -> BarBuffer:
+        buffer = self.latest_ticker_data.get(ticker)
+        if buffer is None:
+            buffer = self.latest_ticker_data[ticker] = BarBuffer(self.history_depth)
+        return buffer
+
+    def require_history(self, depth: int):
+        """
+        Makes sure at least ``depth`` completed bars are retained for every ticker.
+        With history_depth=None the full history is kept until the first
+        call, which bounds it to ``depth``.
+        """
+        if self.history_depth is not None and depth <= self.history_depth:
+            return
+        self.history_depth = depth
+        for buffer in self.latest_ticker_data.values():
+            buffer.resize(depth)
+
+    def get_latest_bars_values(self, ticker, val_type, n=1):
+        """
+        Returns a read-only view of the latest ``n`` completed bars' ``val_type``
+        values, oldest first; empty if ``ticker`` has no completed bar yet.
+        """
+        if val_type == "datetime":
+            val_type = "timestamp"
+        return self.buffer(ticker).latest(val_type, n)
+
+    def get_bar_count(self, ticker) -> int:
+        """
+        Returns how many bars of ``ticker`` have completed so far.
+        """
+        buffer = self.latest_ticker_data.get(ticker)
+        return 0 if buffer is None else buffer.count
+
+
+class BarAggregator:
+    """
+    Rolls the base feed (ticks or bars, as MarketEvent or MarketBatchEvent)
+    into higher timeframes while it streams through the event bus, and
+    publishes a BarEvent whenever a higher-timeframe bar completes.
+
+    State is O(1) per ticker and timeframe: the open bar's start and running
+    OHLCV. Buckets are aligned to the epoch, so "1d" bars start at midnight
+    UTC and bars match resample_columns() and pandas' resample() on the same
+    data. Completed bars are kept in a TimeframeBars per timeframe (see
+    bars()), sized by require_history() like the data handler's buffers.
+
+    A bar is known to be complete once an update for a later bucket arrives.
+    When the feed consists of bars of a known length, pass it as
+    ``bar_interval`` and a bar is closed as soon as the update that ends it
+    arrives, with no extra delay. flush() closes the bars still open, e.g.
+    when a backtest ends.
+
+    Strategies subscribe to a timeframe by setting ``timeframe`` (see
+    Strategy); StrategyEngine then routes that timeframe's BarEvents to them.
+    """
+
+    def __init__(self, event_bus, timeframes=("5m", "15m", "1h", "1d"), bar_interval: str = None,
+                 history_depth: int = None):
+        self.event_bus = event_bus
+        self.timeframes = tuple(timeframes)
+        self._widths = [parse_timeframe(timeframe) for timeframe in self.timeframes]
+        self.bar_interval = None if bar_interval is None else parse_timeframe(bar_interval)
+        self._bars = {timeframe: TimeframeBars(timeframe, history_depth) for timeframe in self.timeframes}
+        # timeframe -> ticker -> [bucket start, open, high, low, close, volume] of the open bar
+        self._open = {timeframe: {} for timeframe in self.timeframes}
+        self.event_bus.subscribe(EventType.MARKET, self.on_market_event)
+        self.event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch)
+
+    def bars(self, timeframe: str) -> TimeframeBars:
+        """
+        Returns the completed-bar history of ``timeframe``.
+        """
+        return self._bars[timeframe]
+
+    def on_market_event(self, event: MarketEvent):
+        if event.timestamp is None:
+            return
+        price = event.price
+        open_ = price if event.open is None else event.open
+        high = price if event.high is None else event.high
+        low = price if event.low is None else event.low
+        volume = 0.0 if event.volume is None else event.volume
+        self.update(event.ticker, event.timestamp, open_, high, low, price, volume)
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        arrays = event.arrays
+        columns = [arrays[field].tolist() for field in BAR_FIELDS]
+        timestamp = event.timestamp
+        for ticker, open_, high, low, close, volume in zip(arrays["ticker"], *columns):
+            if close == close:  # gaps under the "nan" fill policy
+                self.update(ticker, timestamp, open_, high, low, close, volume)
+
+    def update(self, ticker: str, timestamp: int, open_: float, high: float, low: float, close: float,
+               volume: float):
+        """
+        Adds one tick or bar of ``ticker`` to every timeframe, publishing the
+        bars it completes.
+        """
+        interval = self.bar_interval
+        for timeframe, width in zip(self.timeframes, self._widths):
+            bucket = timestamp - timestamp % width
+            bars = self._open[timeframe]
+            bar = bars.get(ticker)
+            if bar is not None and bar[0] != bucket:
+                self._close(timeframe, ticker, bar)
+                bar = None
+            if bar is None:
+                bar = bars[ticker] = [bucket, open_, high, low, close, volume]
+            else:
+                if high > bar[2]:
+                    bar[2] = high
+                if low < bar[3]:
+                    bar[3] = low
+                bar[4] = close
+                bar[5] += volume
+            if interval is not None and timestamp + interval >= bucket + width:
+                self._close(timeframe, ticker, bar)
+
+    def _close(self, timeframe: str, ticker: str, bar: list):
+        del self._open[timeframe][ticker]
+        start, open_, high, low, close, volume = bar
+        self._bars[timeframe].buffer(ticker).append(start, open_, high, low, close, volume)
+        self.event_bus.publish(BarEvent(ticker, close, start, open_, high, low, volume, timeframe))
+
+    def flush(self):
+        """
+        Closes and publishes every bar that is still open.
+        """
+        for timeframe in self.timeframes:
+            for ticker, bar in list(self._open[timeframe].items()):
+                self._close(timeframe, ticker, bar)
+
+    def get_state(self) -> dict:
+        """
+        Returns the open bars and completed-bar history for checkpointing.
+        """
+        return {
+            "open": {timeframe: {ticker: list(bar) for ticker, bar in bars.items()}
+                     for timeframe, bars in self._open.items()},
+            "buffers": {timeframe: {ticker: buffer.get_state() for ticker, buffer in bars.latest_ticker_data.items()}
+                        for timeframe, bars in self._bars.items()},
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restores state saved by get_state() into an aggregator with the same timeframes.
+        """
+        if set(state["open"]) != set(self.timeframes):
+            raise ValueError(f"Checkpoint timeframes {sorted(state['open'])} do not match {sorted(self.timeframes)}")
+        self._open = {timeframe: {ticker: list(bar) for ticker, bar in bars.items()}
+                      for timeframe, bars in state["open"].items()}
+        for timeframe, buffers in state["buffers"].items():
+            bars = self._bars[timeframe]
+            bars.latest_ticker_data = {}
+            for ticker, buffer_state in buffers.items():
+                bars.buffer(ticker).set_state(buffer_state)
@@ -0,0 +1,129 @@
+import numpy as np
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class BarBuffer:
+    """
+    A bounded, columnar history of bars for a single ticker.
+
+    OHLCV values are kept in contiguous float64 arrays and timestamps
+    (nanoseconds since the epoch) in an int64 array. Every value is written
+    twice, at ``i`` and ``i + depth``, so the latest N values of any column
+    are always a contiguous slice: reading them is an O(1) zero-copy view,
+    and memory stays fixed at ``2 * depth`` slots per column.
+
+    With depth=None the buffer is unbounded: it keeps every bar, doubling its
+    capacity whenever it fills up, until resize() gives it a fixed depth.
+    """
+
+    # initial capacity of an unbounded buffer
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, depth: int = 1):
+        self.bounded = depth is not None
+        if not self.bounded:
+            depth = self.INITIAL_CAPACITY
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        # total number of bars ever appended, not just the ones retained
+        self.count = 0
+        # number of bars currently retained
+        self._size = 0
+        self._columns = {field: np.zeros(2 * depth, dtype=np.float64) for field in BAR_FIELDS}
+        self._columns["timestamp"] = np.zeros(2 * depth, dtype=np.int64)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float):
+        """
+        Appends one bar, overwriting the oldest one once the buffer is full
+        (or growing it, if it is unbounded).
+        """
+        if not self.bounded and self._size == self.depth:
+            self._reallocate(2 * self.depth)
+        i = self.count % self.depth
+        j = i + self.depth
+        columns = self._columns
+        for field, value in (("timestamp", timestamp), ("open", open_), ("high", high),
+                             ("low", low), ("close", close), ("volume", volume)):
+            column = columns[field]
+            column[i] = value
+            column[j] = value
+        self.count += 1
+        if self._size < self.depth:
+            self._size += 1
+
+    def latest(self, field: str, n: int = 1) -> np.ndarray:
+        """
+        Returns a read-only view of the latest ``n`` values of ``field``,
+        oldest first. Fewer values are returned if less history is available.
+        """
+        column = self._columns[field]
+        n = min(n, self._size)
+        if n <= 0:
+            return column[:0]
+        end = (self.count - 1) % self.depth + self.depth + 1
+        view = column[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def resize(self, depth: int):
+        """
+        Changes the history depth, keeping as many of the latest bars as fit.
+        An unbounded buffer becomes bounded.
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.bounded = True
+        if depth != self.depth:
+            self._reallocate(depth)
+
+    def _reallocate(self, depth: int):
+        kept = min(self._size, depth)
+        # slot of the k-th bar in the new layout, for the kept bars k
+        slots = np.arange(self.count - kept, self.count) % depth
+        columns = {}
+        for field, column in self._columns.items():
+            new_column = np.zeros(2 * depth, dtype=column.dtype)
+            if kept:
+                end = (self.count - 1) % self.depth + self.depth + 1
+                latest = column[end - kept:end]
+                new_column[slots] = latest
+                new_column[slots + depth] = latest
+            columns[field] = new_column
+        self._columns = columns
+        self.depth = depth
+        self._size = kept
+
+    def get_state(self) -> dict:
+        """
+        Returns the retained bars (oldest first, copied) together with the
+        total bar count, in a form that set_state() can restore.
+        """
+        return {
+            "count": self.count,
+            "columns": {field: self.latest(field, self._size).copy() for field in self._columns},
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restores bars saved by get_state(), keeping as many of the latest
+        ones as fit in the current depth (all of them, if unbounded).
+        """
+        count = state["count"]
+        saved = state["columns"]
+        if not self.bounded and len(saved["timestamp"]) > self.depth:
+            self._reallocate(len(saved["timestamp"]))
+        kept = min(len(saved["timestamp"]), self.depth)
+        slots = np.arange(count - kept, count) % self.depth
+        for field, column in self._columns.items():
+            column[:] = 0
+            if kept:
+                latest = saved[field][len(saved[field]) - kept:]
+                column[slots] = latest
+                column[slots + self.depth] = latest
+        self.count = count
+        self._size = kept
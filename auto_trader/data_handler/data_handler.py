@@ -1,8 +1,11 @@
-import time
-from threading import Thread
+import logging
+from threading import Event, Thread
+import numpy as np
 from auto_trader.common.event import MarketEvent
 from abc import ABC, abstractmethod
 
+logger = logging.getLogger(__name__)
+
 class DataHandler(ABC):
     """
     DataHandler is an abstract base class providing an interface for all subsequent
@@ -17,6 +20,21 @@ class DataHandler(ABC):
     backtesting and live trading.
     """
 
+    @abstractmethod
+    def update_bars(self):
+        """
+        Advances the feed by one step and returns the generated MarketEvents,
+        without publishing them. Used by synchronous (backtest) drivers.
+        """
+        raise NotImplementedError("Should implement update_bars()")
+
+    def require_history(self, depth: int):
+        """
+        Asks the handler to retain at least ``depth`` bars per ticker.
+        Handlers that keep unbounded history can ignore this.
+        """
+        pass
+
     @abstractmethod
     def start(self):
         """
@@ -29,4 +47,126 @@ class DataHandler(ABC):
         """
         Stops the data handler.
         """
-        raise NotImplementedError("Should implement stop()")
\ No newline at end of file
+        raise NotImplementedError("Should implement stop()")
+
+
+class BarHistory:
+    """
+    Mixin giving a handler the history accessors strategies and indicators
+    use, over a BarBuffer per ticker.
+
+    The class using it sets ``history_depth`` and ``latest_ticker_data``
+    (ticker -> BarBuffer) in its constructor.
+    """
+
+    def require_history(self, depth: int):
+        """
+        Makes sure at least ``depth`` bars are retained for every ticker.
+        A handler created with history_depth=None keeps its full history
+        until the first call, which bounds it to ``depth``.
+        """
+        if self.history_depth is not None and depth <= self.history_depth:
+            return
+        self.history_depth = depth
+        for buffer in self.latest_ticker_data.values():
+            buffer.resize(depth)
+
+    def get_latest_bars_values(self, ticker, val_type, n=1):
+        """
+        返回最新的 N 条数据
+
+        返回值是底层列式缓冲区的只读视图（旧 -> 新），不发生拷贝。
+        val_type 可以是 open/high/low/close/volume，或 datetime（纳秒时间戳）。
+        """
+        if ticker in self.latest_ticker_data:
+            if val_type == "datetime":
+                val_type = "timestamp"
+            return self.latest_ticker_data[ticker].latest(val_type, n)
+        else:
+            logger.warning("Ticker %s is not available in the data.", ticker)
+            return np.empty(0)
+
+    def get_bar_count(self, ticker) -> int:
+        """
+        Returns how many bars of ``ticker`` have been replayed so far.
+        """
+        return self.latest_ticker_data[ticker].count
+
+
+class BufferedDataHandler(BarHistory, DataHandler):
+    """
+    Base class for handlers that keep the replayed history of each ticker in
+    a BarBuffer (``self.latest_ticker_data``, see BarHistory) and replay on a
+    thread by repeatedly calling ``_get_new_bar()``.
+
+    Subclasses set ``event_bus``, ``history_depth``, ``latest_ticker_data``,
+    ``continue_backtest``, ``_running`` and ``_thread`` in their constructor.
+    The thread waits ``replay_interval`` seconds between steps.
+    """
+
+    replay_interval: float = 0.1
+
+    def get_state(self) -> dict:
+        """
+        Returns the replay state (history buffers and whether the feed is
+        exhausted) for checkpointing; see data_storage.checkpoint.
+        """
+        return {
+            "continue_backtest": self.continue_backtest,
+            "buffers": {ticker: buffer.get_state() for ticker, buffer in self.latest_ticker_data.items()},
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restores state saved by get_state() into a handler over the same tickers.
+        """
+        buffers = state["buffers"]
+        if set(buffers) != set(self.latest_ticker_data):
+            raise ValueError(f"Checkpoint tickers {sorted(buffers)} do not match "
+                             f"handler tickers {sorted(self.latest_ticker_data)}")
+        for ticker, buffer_state in buffers.items():
+            self.latest_ticker_data[ticker].set_state(buffer_state)
+        self.continue_backtest = state["continue_backtest"]
+
+    @abstractmethod
+    def _get_new_bar(self):
+        """
+        Advances the feed by one step, yielding the resulting market events.
+        """
+        raise NotImplementedError("Should implement _get_new_bar()")
+
+    def update_bars(self):
+        """
+        Pushes the next step's bars onto the latest data and returns the
+        corresponding market events. Once every feed is exhausted this
+        returns an empty list and sets continue_backtest to False.
+        """
+        return list(self._get_new_bar())
+
+    def start(self):
+        """
+        Starts the data handler thread.
+        """
+        self._running = True
+        self._wake = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the data handler thread.
+        """
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            # Interrupt the wait between steps instead of sleeping it out
+            self._wake.set()
+            self._thread.join()
+
+    def _run(self):
+        """
+        Main loop of the data handler.
+        """
+        while self._running:
+            for event in self._get_new_bar():
+                self.event_bus.publish(event)
+            self._wake.wait(self.replay_interval) # Simulate time passing
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+
+import pandas as pd
+
+from auto_trader.common.event import EventBus
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+
+
+class FakeExchange:
+    """
+    A local stand-in for a live market data feed.
+
+    An asyncio TCP server that replays CSV bars to every client that
+    connects, as newline-delimited JSON (the format AsyncFeedDataHandler
+    reads). Bars are replayed on the time-aligned clock of all tickers; every
+    bar sharing a timestamp is written together, then the server waits
+    ``interval`` seconds before the next timestamp. Each message carries the
+    time it was written as "sent_ns" (time.perf_counter_ns), so a client on
+    the same host can measure quote-to-order latency. The connection is
+    closed at the end of the data.
+    """
+
+    def __init__(self, csv_files: list, tickers: list, interval: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.tickers = tickers
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.frames = {
+            ticker: pd.read_csv(path, header=0, index_col=0, parse_dates=True)
+            for path, ticker in zip(csv_files, tickers)
+        }
+        self.clients = 0
+        self._server = None
+
+    async def start(self) -> tuple:
+        """
+        Starts listening and returns the (host, port) actually bound.
+        """
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _serve(self, reader, writer):
+        self.clients += 1
+        feed = HistoricCSVDataHandler.from_dataframes(EventBus(threaded=False), self.frames, align=True)
+        try:
+            while feed.continue_backtest:
+                events = feed.update_bars()
+                if events:
+                    sent = time.perf_counter_ns()
+                    writer.write(b"".join(
+                        json.dumps({
+                            "ticker": e.ticker, "timestamp": e.timestamp, "open": e.open, "high": e.high,
+                            "low": e.low, "close": e.price, "volume": e.volume, "sent_ns": sent,
+                        }).encode() + b"\n"
+                        for e in events
+                    ))
+                    await writer.drain()
+                await asyncio.sleep(self.interval)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,23 +1,84 @@
-import pandas as pd
-from threading import Thread
-import time
-from auto_trader.common.event import MarketEvent
-from auto_trader.data_handler.data_handler import DataHandler
+import numpy as np
+from auto_trader.common.event import MarketEvent, MarketBatchEvent
+from auto_trader.data_handler.aligned_feed import AlignedBarFeed, FILL_FORWARD, FILL_SKIP, FILL_POLICIES
+from auto_trader.data_handler.bar_buffer import BarBuffer, BAR_FIELDS
+from auto_trader.data_handler.data_handler import BufferedDataHandler
+from auto_trader.data_storage.bar_cache import BarCache
 
-class HistoricCSVDataHandler(DataHandler):
+
+class _LazyFrames(dict):
+    """
+    ticker -> DataFrame mapping that builds frames from the replay columns on
+    first access, so cache-backed handlers never materialize unused frames.
+    """
+
+    def __init__(self, columns: dict):
+        super().__init__()
+        self._source = columns
+
+    def __missing__(self, ticker):
+        import pandas as pd
+        columns = self._source[ticker]
+        index = pd.DatetimeIndex(columns["timestamp"].view("datetime64[ns]"), name="datetime")
+        df = pd.DataFrame({field: columns[field] for field in BAR_FIELDS}, index=index)
+        self[ticker] = df
+        return df
+
+class HistoricCSVDataHandler(BufferedDataHandler):
     """
     HistoricCSVDataHandler is designed to read CSV files for each requested
     symbol from disk and provide an interface to obtain the "latest" bar in a
     manner identical to a live trading interface.
+
+    Each file is converted once into contiguous NumPy columns; replay only
+    advances an integer cursor per ticker and copies the bar's values into a
+    BarBuffer. By default (history_depth=None) the buffers keep the full
+    replayed history; once the registered strategies declare how much they
+    need through require_history(), they are bounded to that depth.
+
+    By default every ticker advances one row per step regardless of dates.
+    With align=True steps follow the union of all tickers' timestamps
+    instead (see AlignedBarFeed): each step emits every bar sharing the next
+    timestamp, and fill_policy decides what tickers without a bar at that
+    time contribute. With emit_batches=True, which implies alignment, the
+    step is published as a single MarketBatchEvent carrying the
+    cross-section as arrays, instead of one MarketEvent per ticker. The
+    "nan" policy's gap rows only appear in batches; without batches a
+    ticker with no bar at a timestamp gets no MarketEvent.
+
+    If cache_dir is given, files are read through a BarCache: each CSV is
+    parsed once into a binary columnar cache and later runs memory-map it.
+    start and end restrict replay to a date range; with a cache only that
+    range is ever paged in.
+
+    If feature_cache (a FeatureCache) is given, indicators obtained through an
+    IndicatorRegistry over this handler read their full-history series from
+    the cache (see feature_series()) instead of being updated bar by bar.
     """
 
-    def __init__(self, event_bus, csv_files: list, tickers: list):
+    def __init__(self, event_bus, csv_files: list, tickers: list, history_depth: int = None,
+                 emit_batches: bool = False, cache_dir: str = None, start=None, end=None,
+                 align: bool = False, fill_policy: str = FILL_SKIP, feature_cache=None):
         self.event_bus = event_bus
         self.csv_files = csv_files
         self.tickers = tickers
-        self.ticker_data = {}
+        self.history_depth = history_depth
+        self.emit_batches = emit_batches
+        self.align = align or emit_batches
+        if fill_policy not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill policy {fill_policy!r}, expected one of {FILL_POLICIES}")
+        self.fill_policy = fill_policy
+        self.start_date = start
+        self.end_date = end
+        self.bar_cache = BarCache(cache_dir) if cache_dir else None
+        self.feature_cache = feature_cache
         self.latest_ticker_data = {}
-        self.iterators = {}
+        self._columns = {}
+        self.ticker_data = _LazyFrames(self._columns)
+        self._cursors = {}
+        self._feed = None
+        self._step = 0
+        self.continue_backtest = True
         self._running = False
         self._thread = None
 
@@ -26,66 +87,160 @@ class HistoricCSVDataHandler(DataHandler):
     def _open_convert_csv_files(self):
         """
         Opens the CSV files from the data directory, converting
-        them into pandas DataFrames stored in a dictionary.
+        them into pandas DataFrames stored in a dictionary, and
+        extracts their OHLCV columns as float64 arrays.
         """
         comb = zip(self.csv_files, self.tickers)
         for path, ticker in comb:
+            if self.bar_cache is not None:
+                self._add_ticker_columns(ticker, self.bar_cache.load(path, self.start_date, self.end_date))
+                continue
+            import pandas as pd
             df = pd.read_csv(
                 path, header=0, index_col=0, parse_dates=True
             )
-            self.ticker_data[ticker] = df
-            self.iterators[ticker] = self.ticker_data[ticker].iterrows()
-            self.latest_ticker_data[ticker] = []
+            # Same row order as the BarCache path
+            df = df.sort_index(kind="stable")
+            self._add_ticker_data(ticker, df)
+
+    def _add_ticker_data(self, ticker, df):
+        """
+        Registers an OHLCV DataFrame for ``ticker`` and prepares its columns for replay.
+        """
+        if self.start_date is not None or self.end_date is not None:
+            df = df.loc[self.start_date:self.end_date]
+        columns = {
+            field: df[field].to_numpy(dtype=np.float64) for field in BAR_FIELDS
+        }
+        columns["timestamp"] = df.index.values.astype("datetime64[ns]").view(np.int64)
+        self._add_ticker_columns(ticker, columns)
+        self.ticker_data[ticker] = df
 
-    def get_latest_bars_values(self, ticker, val_type, n=1):
+    def _add_ticker_columns(self, ticker, columns):
         """
-        返回最新的 N 条数据
+        Registers the replay columns ("timestamp" plus OHLCV arrays) for ``ticker``.
         """
-        if ticker in self.latest_ticker_data:
-            return [bar[val_type] for bar in self.latest_ticker_data[ticker][-n:]]
-        else:
-            print(f"Ticker {ticker} is not available in the data.")
-            return []
+        self._columns[ticker] = columns
+        self._cursors[ticker] = 0
+        self.latest_ticker_data[ticker] = BarBuffer(self.history_depth)
+
+    @classmethod
+    def from_dataframes(cls, event_bus, frames: dict, history_depth: int = None, emit_batches: bool = False,
+                        align: bool = False, fill_policy: str = FILL_SKIP, feature_cache=None):
+        """
+        Creates a handler over already loaded OHLCV DataFrames (ticker -> DataFrame)
+        instead of reading CSV files.
+        """
+        handler = cls(event_bus, [], [], history_depth=history_depth, emit_batches=emit_batches,
+                      align=align, fill_policy=fill_policy, feature_cache=feature_cache)
+        for ticker, df in frames.items():
+            handler.tickers.append(ticker)
+            handler._add_ticker_data(ticker, df)
+        return handler
+
+    def feature_series(self, ticker: str, name: str, **params):
+        """
+        Returns the full-history series of feature ``name`` over ``ticker``'s
+        data from the feature cache, aligned so that element ``get_bar_count(ticker) - 1``
+        belongs to the latest bar. Returns None without a cache, or when
+        forward filling makes the history buffers diverge from the source rows.
+        """
+        if self.feature_cache is None or (self.align and self.fill_policy == FILL_FORWARD):
+            return None
+        return self.feature_cache.feature(ticker, self.ticker_data[ticker], name, **params)
+
+    def get_state(self) -> dict:
+        """
+        Adds the per-ticker row cursors and the aligned step to the buffered
+        state, so a handler over the same files resumes where this one stopped.
+        """
+        state = super().get_state()
+        state["cursors"] = dict(self._cursors)
+        state["step"] = self._step
+        return state
+
+    def set_state(self, state: dict):
+        super().set_state(state)
+        for ticker, cursor in state["cursors"].items():
+            if cursor > len(self._columns[ticker]["close"]):
+                raise ValueError(f"Checkpoint cursor {cursor} is past the end of {ticker}'s data")
+        self._cursors.update(state["cursors"])
+        self._step = state["step"]
 
     def _get_new_bar(self):
         """
         Returns the latest bar from the data feed as a tuple of
         (sybmbol, datetime, open, high, low, close, volume).
         """
+        if self.emit_batches:
+            yield from self._get_new_batch()
+            return
+        if self.align:
+            yield from self._get_new_aligned_bars()
+            return
         all_stopped = True
         for ticker in self.tickers:
-            try:
-                row = next(self.iterators[ticker])
-                self.latest_ticker_data[ticker].append(row[1])
-                yield MarketEvent(ticker, row[1]['close'])
-                all_stopped = False
-            except StopIteration:
+            i = self._cursors[ticker]
+            columns = self._columns[ticker]
+            if i >= len(columns["close"]):
                 # End of the data feed for this symbol
                 continue
+            self._cursors[ticker] = i + 1
+            bar = (int(columns["timestamp"][i]), float(columns["open"][i]), float(columns["high"][i]),
+                   float(columns["low"][i]), float(columns["close"][i]), float(columns["volume"][i]))
+            self.latest_ticker_data[ticker].append(*bar)
+            timestamp, open_, high, low, close, volume = bar
+            yield MarketEvent(ticker, close, timestamp, open_, high, low, volume)
+            all_stopped = False
         if all_stopped:
+            self.continue_backtest = False
             self._running = False
 
-    def start(self):
+    def _aligned_step(self):
         """
-        Starts the data handler thread.
+        Advances the aligned feed by one timestamp, appends the step's bars to
+        the history buffers and returns (timestamp, arrays), or None once the
+        feed is exhausted.
         """
-        self._running = True
-        self._thread = Thread(target=self._run, daemon=True)
-        self._thread.start()
+        if self._feed is None:
+            self._feed = AlignedBarFeed(
+                {ticker: self._columns[ticker] for ticker in self.tickers}, self.fill_policy
+            )
+        if self._step >= len(self._feed):
+            self.continue_backtest = False
+            self._running = False
+            return None
+        timestamp, arrays = self._feed.step(self._step)
+        self._step += 1
+        buffers = self.latest_ticker_data
+        for ticker, open_, high, low, close, volume in zip(
+            arrays["ticker"], arrays["open"], arrays["high"], arrays["low"], arrays["close"], arrays["volume"]
+        ):
+            if close == close:  # gaps under the "nan" policy are not recorded
+                buffers[ticker].append(timestamp, open_, high, low, close, volume)
+        return timestamp, arrays
 
-    def stop(self):
+    def _get_new_aligned_bars(self):
         """
-        Stops the data handler thread.
+        Yields a MarketEvent for every ticker in the next aligned timestamp.
+        Gaps under the "nan" policy yield nothing: NaN rows only make sense
+        inside a MarketBatchEvent, whose consumers skip them, while a lone
+        NaN quote would poison every per-ticker price and equity consumer.
         """
-        self._running = False
-        if self._thread and self._thread.is_alive():
-            self._thread.join()
+        step = self._aligned_step()
+        if step is None:
+            return
+        timestamp, arrays = step
+        columns = [arrays[field].tolist() for field in BAR_FIELDS]
+        for ticker, open_, high, low, close, volume in zip(arrays["ticker"], *columns):
+            if close == close:
+                yield MarketEvent(ticker, close, timestamp, open_, high, low, volume)
 
-    def _run(self):
+    def _get_new_batch(self):
         """
-        Main loop of the data handler.
+        Yields a single MarketBatchEvent with every ticker's bar at the next
+        aligned timestamp.
         """
-        while self._running:
-            for event in self._get_new_bar():
-                self.event_bus.publish(event)
-            time.sleep(0.1) # Simulate time passing
\ No newline at end of file
+        step = self._aligned_step()
+        if step is not None:
+            yield MarketBatchEvent(*step)
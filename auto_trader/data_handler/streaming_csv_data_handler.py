@@ -0,0 +1,76 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.common.event import MarketEvent
+from auto_trader.data_handler.bar_buffer import BarBuffer, BAR_FIELDS
+from auto_trader.data_handler.data_handler import BufferedDataHandler
+
+
+class StreamingCSVDataHandler(BufferedDataHandler):
+    """
+    StreamingCSVDataHandler replays CSV files that are too large to load
+    whole. Each file is read lazily in chunks of ``chunk_size`` rows, and the
+    per-ticker streams are k-way merged by timestamp with a heap, so bars are
+    emitted in true chronological order across tickers.
+
+    Each step emits every bar that shares the next timestamp. Every file must
+    be sorted by time.
+
+    As with HistoricCSVDataHandler, the BarBuffers keep the full replayed
+    history by default (history_depth=None) until the registered strategies
+    declare how much they need through require_history(). Once bounded, peak
+    memory is chunk_size x number of tickers plus that history, regardless
+    of file size; pass history_depth to bound it from the start.
+    """
+
+    def __init__(self, event_bus, csv_files: list, tickers: list, chunk_size: int = 10_000,
+                 history_depth: int = None):
+        self.event_bus = event_bus
+        self.csv_files = csv_files
+        self.tickers = tickers
+        self.chunk_size = chunk_size
+        self.history_depth = history_depth
+        self.latest_ticker_data = {ticker: BarBuffer(history_depth) for ticker in tickers}
+        self.continue_backtest = True
+        self._running = False
+        self._thread = None
+
+        streams = [
+            self._read_bars(path, order, ticker)
+            for order, (path, ticker) in enumerate(zip(csv_files, tickers))
+        ]
+        # Entries are (timestamp, ticker order, ticker, open, high, low, close, volume),
+        # so ties on the timestamp keep the order the tickers were given in.
+        self._merged = heapq.merge(*streams)
+        self._pending = next(self._merged, None)
+
+    def _read_bars(self, path, order, ticker):
+        """
+        Generates one ticker's bars chunk by chunk.
+        """
+        with pd.read_csv(path, header=0, index_col=0, parse_dates=True, chunksize=self.chunk_size) as reader:
+            for chunk in reader:
+                timestamps = chunk.index.values.astype("datetime64[ns]").view(np.int64).tolist()
+                columns = [chunk[field].to_numpy(dtype=np.float64).tolist() for field in BAR_FIELDS]
+                for timestamp, open_, high, low, close, volume in zip(timestamps, *columns):
+                    yield timestamp, order, ticker, open_, high, low, close, volume
+
+    def _get_new_bar(self):
+        """
+        Yields a MarketEvent for every bar with the next timestamp in the merged feed.
+        """
+        bar = self._pending
+        if bar is None:
+            self.continue_backtest = False
+            self._running = False
+            return
+        timestamp = bar[0]
+        merged = self._merged
+        while bar is not None and bar[0] == timestamp:
+            _, _, ticker, open_, high, low, close, volume = bar
+            self.latest_ticker_data[ticker].append(timestamp, open_, high, low, close, volume)
+            yield MarketEvent(ticker, close, timestamp, open_, high, low, volume)
+            bar = next(merged, None)
+        self._pending = bar
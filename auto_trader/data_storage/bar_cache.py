@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from ..data_handler.bar_buffer import BAR_FIELDS
+
+_META_FILE = "meta.json"
+_HASH_CHUNK = 1 << 20
+
+
+def _file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BarCache:
+    """
+    CSV 行情的列式二进制缓存。
+
+    每个 CSV 第一次被请求时解析一次，写成两个 .npy 文件：int64 纳秒时间戳，
+    以及 (5, n) 的 float64 OHLCV 矩阵（每个字段在文件中连续）。之后的运行直接以
+    内存映射方式打开，不再解析 CSV，数据页也只在真正被读取时才进入内存。
+
+    缓存按文件绝对路径分目录存放，meta.json 记录源文件的 mtime、大小和 SHA-1：
+    mtime 与大小不变时直接命中；变化时重新计算内容哈希，内容未变则只刷新元数据，
+    内容变化才重新转换。
+
+    重新转换时新的 .npy 先写入临时文件再用 os.replace 原子替换，最后写 meta.json：
+    其他进程（例如参数扫描的工作进程）已经内存映射的旧文件保持完整，不会读到写了
+    一半的数据。行按时间戳排序（相同时间戳保持文件中的顺序），与直接读取 CSV 的
+    路径一致。
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, csv_path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, key)
+
+    def _read_meta(self, entry_dir: str):
+        try:
+            with open(os.path.join(entry_dir, _META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry_dir: str, meta: dict):
+        tmp_path = os.path.join(entry_dir, f"{_META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(entry_dir, _META_FILE))
+
+    def ensure(self, csv_path: str) -> str:
+        """
+        保证 csv_path 的缓存存在且与源文件一致，返回缓存目录。
+        """
+        entry_dir = self._entry_dir(csv_path)
+        stat = os.stat(csv_path)
+        meta = self._read_meta(entry_dir)
+        if meta is not None:
+            if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+                self.hits += 1
+                return entry_dir
+            sha1 = _file_sha1(csv_path)
+            if meta["sha1"] == sha1:
+                # 文件被 touch 过但内容没变
+                meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self._write_meta(entry_dir, meta)
+                self.hits += 1
+                return entry_dir
+        else:
+            sha1 = _file_sha1(csv_path)
+
+        self.misses += 1
+        self._convert(csv_path, entry_dir, {
+            "path": os.path.abspath(csv_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": sha1,
+        })
+        return entry_dir
+
+    def _convert(self, csv_path: str, entry_dir: str, meta: dict):
+        import pandas as pd
+        df = pd.read_csv(csv_path, header=0, index_col=0, parse_dates=True)
+        df = df.sort_index(kind="stable")
+        os.makedirs(entry_dir, exist_ok=True)
+        # 先让旧元数据失效，写到一半被中断时下次会重新转换
+        try:
+            os.remove(os.path.join(entry_dir, _META_FILE))
+        except FileNotFoundError:
+            pass
+        self._save(entry_dir, "timestamp.npy", df.index.values.astype("datetime64[ns]").view(np.int64))
+        self._save(entry_dir, "bars.npy", df[list(BAR_FIELDS)].to_numpy(dtype=np.float64).T.copy())
+        meta["rows"] = len(df)
+        self._write_meta(entry_dir, meta)
+
+    def _save(self, entry_dir: str, name: str, values: np.ndarray):
+        """
+        原子地写入一个 .npy 文件：先写到本进程独有的临时文件，再替换目标文件。
+        """
+        path = os.path.join(entry_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+
+    def load(self, csv_path: str, start=None, end=None) -> dict:
+        """
+        以内存映射方式返回 [start, end]（含两端）范围内的列，键为
+        "timestamp" 和 OHLCV 字段。返回的数组是只读视图，不会把整个文件读入内存。
+
+        范围的含义与 DataFrame.loc[start:end] 相同：只写到日期（或月份）的字符串
+        表示整个时间段，end="2021-01-04" 包含当天所有日内 K 线。
+        """
+        entry_dir = self.ensure(csv_path)
+        timestamps = np.load(os.path.join(entry_dir, "timestamp.npy"), mmap_mode="r").view(np.ndarray)
+        bars = np.load(os.path.join(entry_dir, "bars.npy"), mmap_mode="r").view(np.ndarray)
+        columns = {"timestamp": timestamps}
+        columns.update(zip(BAR_FIELDS, bars))
+        if start is None and end is None:
+            return columns
+        # 不复制数据，只借用 DatetimeIndex 的切片语义；不限定范围时不需要 pandas
+        import pandas as pd
+        index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), copy=False)
+        rows = index.slice_indexer(start, end)
+        return {column: values[rows] for column, values in columns.items()}
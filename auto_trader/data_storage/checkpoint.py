@@ -0,0 +1,171 @@
+import glob
+import os
+import pickle
+import struct
+import zlib
+from typing import Optional
+
+CHECKPOINT_SUFFIX = ".ckpt"
+
+_MAGIC = b"ATCKPT01"
+# magic, 检查点时已处理的 K 线数量, payload 长度, payload 的 CRC32
+_HEADER = struct.Struct("<8sQQI")
+
+
+class CheckpointError(Exception):
+    """
+    检查点文件损坏或格式不符。
+    """
+
+
+def write_checkpoint(path: str, bars: int, state: dict):
+    """
+    把 state 原子地写入 path：先写临时文件并 fsync，再用 os.replace 替换，
+    进程在写入途中退出也不会留下半个检查点。
+
+    Args:
+        path (str): 检查点文件路径。
+        bars (int): 检查点时已处理的 K 线数量。
+        state (dict): 组件名到 get_state() 结果的映射。
+    """
+    payload = pickle.dumps(state, protocol=5)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, bars, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path: str) -> tuple:
+    """
+    读取 write_checkpoint() 写入的文件。
+
+    Returns:
+        tuple: (bars, state)。
+
+    Raises:
+        CheckpointError: 文件头、长度或校验和不符。
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise CheckpointError(f"{path}: 文件头不完整")
+        magic, bars, length, crc = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            raise CheckpointError(f"{path}: 不是检查点文件")
+        payload = f.read(length)
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise CheckpointError(f"{path}: 数据不完整或校验失败")
+    return bars, pickle.loads(payload)
+
+
+class Checkpointer:
+    """
+    引擎状态的周期性检查点，用于快速热重启。
+
+    components 是名字到组件的映射，组件需要提供 get_state() / set_state()：
+    HistoricCSVDataHandler（各 ticker 的游标和历史缓冲区）、StrategyEngine
+    （策略状态和指标注册表）、PositionManager、RiskManager、PreTradeRiskEngine
+    都已实现。所有组件的状态合成一个字典，以 pickle（协议 5，NumPy 数组按原始
+    字节保存）写成一个带校验和的二进制文件，文件名中带有已处理的 K 线数量。
+
+    检查点只保存有界的状态：历史缓冲区只有 history_depth 根 K 线，权益曲线只有
+    最后一个点，因此文件大小和恢复耗时与已回放的历史长度无关。重启时按原样
+    构建流水线（数据处理器使用 cache_dir，内存映射打开数据而不必重新解析 CSV），
+    调用 restore()，再继续 Backtest.run() 即可只处理检查点之后的 K 线。
+
+    保存必须发生在事件总线静止时（Backtest 在两个时间步之间调用 maybe_save()），
+    否则队列中尚未处理的事件不会被记录。
+    """
+
+    def __init__(self, directory: str, components: dict, every: int = 0, keep: int = 2):
+        """
+        Args:
+            directory (str): 检查点目录，不存在时创建。
+            components (dict): 组件名 -> 提供 get_state()/set_state() 的组件。
+            every (int): maybe_save() 每处理这么多根 K 线保存一次，0 表示不自动保存。
+            keep (int): 保留最近的检查点文件数量。
+        """
+        if keep < 1:
+            raise ValueError("keep 必须至少为 1")
+        self.directory = directory
+        self.components = components
+        self.every = every
+        self.keep = keep
+        self.saved = 0
+        self._last_bars = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, bars: int) -> str:
+        return os.path.join(self.directory, f"checkpoint-{bars:016d}{CHECKPOINT_SUFFIX}")
+
+    def checkpoints(self) -> list:
+        """
+        返回目录中的检查点文件，按已处理的 K 线数量从旧到新排列。
+        """
+        return sorted(glob.glob(os.path.join(self.directory, "checkpoint-*" + CHECKPOINT_SUFFIX)))
+
+    def save(self, bars: int) -> str:
+        """
+        保存所有组件的当前状态，并删除超出 keep 数量的旧检查点。
+
+        Args:
+            bars (int): 已处理的 K 线数量。
+
+        Returns:
+            str: 检查点文件路径。
+        """
+        state = {name: component.get_state() for name, component in self.components.items()}
+        path = self._path(bars)
+        write_checkpoint(path, bars, state)
+        self.saved += 1
+        self._last_bars = bars
+        for old in self.checkpoints()[:-self.keep]:
+            os.remove(old)
+        return path
+
+    def maybe_save(self, bars: int) -> Optional[str]:
+        """
+        距离上一次保存已处理了至少 every 根 K 线时保存，否则什么都不做。
+        """
+        if self.every and bars - self._last_bars >= self.every:
+            return self.save(bars)
+        return None
+
+    def latest(self) -> Optional[tuple]:
+        """
+        读取最新的有效检查点，损坏的文件会被跳过。
+
+        Returns:
+            tuple: (path, bars, state)，没有可用的检查点时返回 None。
+        """
+        for path in reversed(self.checkpoints()):
+            try:
+                bars, state = read_checkpoint(path)
+            except (CheckpointError, OSError, pickle.UnpicklingError):
+                continue
+            return path, bars, state
+        return None
+
+    def restore(self) -> Optional[int]:
+        """
+        把最新的检查点恢复到各组件中。
+
+        Returns:
+            int: 检查点时已处理的 K 线数量，没有可用的检查点时返回 None。
+
+        Raises:
+            ValueError: 检查点中的组件与 components 不一致。
+        """
+        checkpoint = self.latest()
+        if checkpoint is None:
+            return None
+        path, bars, state = checkpoint
+        if set(state) != set(self.components):
+            raise ValueError(f"{path} 中的组件 {sorted(state)} 与当前组件 {sorted(self.components)} 不一致")
+        for name, component in self.components.items():
+            component.set_state(state[name])
+        self._last_bars = bars
+        return bars
@@ -0,0 +1,397 @@
+import math
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ..common.event import EventBus, EventType, FillEvent, MarketBatchEvent, MarketEvent, OrderEvent, SignalEvent
+
+EVENTS_FILE = "events.bin"
+TICKERS_FILE = "tickers.txt"
+
+_MAGIC = b"ATJRNL01"
+# magic, record size, committed record count
+_HEADER = struct.Struct("<8sQQ")
+HEADER_SIZE = 64
+
+# 定长记录：整数字段在前，5 个 float64 值的含义随事件类型而定（见 EventJournal）
+RECORD_DTYPE = np.dtype([
+    ("seq", "<i8"), ("timestamp", "<i8"), ("order_id", "<i8"),
+    ("ticker", "<i4"), ("kind", "u1"), ("flags", "u1"), ("pad", "<u2"),
+    ("v0", "<f8"), ("v1", "<f8"), ("v2", "<f8"), ("v3", "<f8"), ("v4", "<f8"),
+])
+VALUE_FIELDS = ("v0", "v1", "v2", "v3", "v4")
+
+_MARKET, _BATCH, _SIGNAL, _ORDER, _FILL = 1, 2, 3, 4, 5
+KIND_CODES = {
+    EventType.MARKET: _MARKET,
+    EventType.MARKET_BATCH: _BATCH,
+    EventType.SIGNAL: _SIGNAL,
+    EventType.ORDER: _ORDER,
+    EventType.FILL: _FILL,
+}
+JOURNALED_TYPES = tuple(KIND_CODES)
+
+SIDES = ("BUY", "SELL")
+ORDER_TYPES = ("MKT", "LMT", "STP")
+_SIDE_CODES = {side: code for code, side in enumerate(SIDES)}
+_ORDER_TYPE_CODES = {order_type: code << 1 for code, order_type in enumerate(ORDER_TYPES)}
+
+NO_TIMESTAMP = np.iinfo(np.int64).min
+NO_ORDER_ID = -1
+_NAN = math.nan
+
+
+def _float(value) -> float:
+    return _NAN if value is None else value
+
+
+def _optional(value: float):
+    return None if value != value else value
+
+
+def _quantity(value: float):
+    return int(value) if value.is_integer() else value
+
+
+class EventJournal:
+    """
+    只追加的二进制事件日志。
+
+    目录中有两个文件：events.bin 是 64 字节文件头加定长记录（RECORD_DTYPE，
+    72 字节），tickers.txt 每行一个 ticker，行号即记录中的 ticker 编号。
+    MARKET、MARKET_BATCH、SIGNAL、ORDER、FILL 事件各占一条记录（批量行情
+    每个 ticker 一条，共享同一个 seq）；POSITION 事件由头寸推导，不写入。
+    v0..v4 依次为：
+
+      * MARKET / MARKET_BATCH: close, open, high, low, volume；
+      * SIGNAL: price；
+      * ORDER: limit_price, stop_price, quantity；
+      * FILL: fill_price, quantity, commission。
+
+    flags 的第 0 位是方向（BUY/SELL），ORDER 的第 1-2 位是订单类型。
+    非行情事件的 timestamp 取最近一条行情的时间戳，与墙钟无关，
+    所以同样的输入总是产生逐字节相同的日志，便于回归比对。
+
+    写入路径只把记录元组追加到内存列表；每 flush_every 条记录才批量转换成
+    结构化数组，拷贝进内存映射的文件并更新文件头中的记录数，每 sync_every
+    次刷新才 msync 一次。文件按倍数预分配，close() 时截断到实际长度。
+    进程崩溃最多丢失尚未刷新的记录，文件头中的记录数之前的数据总是完整的。
+    """
+
+    def __init__(self, directory: str, flush_every: int = 4096, sync_every: int = 16,
+                 initial_capacity: int = 1 << 16):
+        """
+        打开（或新建）目录中的日志，在已有记录之后继续追加。
+
+        Args:
+            directory (str): 日志目录，不存在时创建。
+            flush_every (int): 每累积多少条记录写入一次内存映射。
+            sync_every (int): 每刷新多少次调用一次 msync。
+            initial_capacity (int): 新文件预分配的记录数。
+        """
+        if flush_every < 1 or sync_every < 1:
+            raise ValueError("flush_every 和 sync_every 必须至少为 1")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_every = flush_every
+        self.sync_every = sync_every
+        self.tickers = []
+        self._ticker_ids = {}
+        self._pending = []
+        self._chunks = []
+        self._chunk_rows = 0
+        self._flushes = 0
+        self._last_timestamp = NO_TIMESTAMP
+
+        self._tickers_file = open(os.path.join(directory, TICKERS_FILE), "a+", encoding="utf-8")
+        self._tickers_file.seek(0)
+        for line in self._tickers_file.read().splitlines():
+            self._ticker_ids[line] = len(self.tickers)
+            self.tickers.append(line)
+        self._tickers_written = len(self.tickers)
+
+        path = os.path.join(directory, EVENTS_FILE)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        size = os.fstat(self._fd).st_size
+        if size:
+            self.count = _read_header(os.pread(self._fd, HEADER_SIZE, 0))
+            self.capacity = max((size - HEADER_SIZE) // RECORD_DTYPE.itemsize, self.count)
+        else:
+            self.count = 0
+            self.capacity = initial_capacity
+        self._map(max(self.capacity, 1))
+        if self.count:
+            last = self._records[self.count - 1]
+            self._seq = int(last["seq"]) + 1
+            self._last_timestamp = int(last["timestamp"])
+        else:
+            self._seq = 0
+        self._write_header()
+
+    def _map(self, capacity: int):
+        self.capacity = capacity
+        os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._mmap = mmap.mmap(self._fd, HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=capacity, offset=HEADER_SIZE)
+
+    def _unmap(self):
+        # 先释放数组视图，mmap 才能关闭
+        self._records = None
+        self._mmap.close()
+
+    def _write_header(self):
+        self._mmap[:_HEADER.size] = _HEADER.pack(_MAGIC, RECORD_DTYPE.itemsize, self.count)
+
+    def attach(self, event_bus: EventBus):
+        """
+        订阅 event_bus 上所有需要记录的事件类型。
+        """
+        event_bus.subscribe(EventType.MARKET, self.on_market_event, ordered=True)
+        event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch, ordered=True)
+        event_bus.subscribe(EventType.SIGNAL, self.on_signal, ordered=True)
+        event_bus.subscribe(EventType.ORDER, self.on_order)
+        event_bus.subscribe(EventType.FILL, self.on_fill)
+
+    def ticker_id(self, ticker: str) -> int:
+        ticker_id = self._ticker_ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = self._ticker_ids[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return ticker_id
+
+    def _append(self, record: tuple):
+        pending = self._pending
+        pending.append(record)
+        if len(pending) + self._chunk_rows >= self.flush_every:
+            self.flush()
+
+    def _next_seq(self) -> int:
+        seq = self._seq
+        self._seq = seq + 1
+        return seq
+
+    def on_market_event(self, event: MarketEvent):
+        timestamp = NO_TIMESTAMP if event.timestamp is None else event.timestamp
+        self._last_timestamp = timestamp
+        self._append((
+            self._next_seq(), timestamp, NO_ORDER_ID, self.ticker_id(event.ticker), _MARKET, 0, 0,
+            event.price, _float(event.open), _float(event.high), _float(event.low), _float(event.volume),
+        ))
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        arrays = event.arrays
+        n = len(event)
+        chunk = np.zeros(n, dtype=RECORD_DTYPE)
+        chunk["seq"] = self._next_seq()
+        chunk["timestamp"] = self._last_timestamp = event.timestamp
+        chunk["order_id"] = NO_ORDER_ID
+        chunk["ticker"] = [self.ticker_id(ticker) for ticker in arrays["ticker"]]
+        chunk["kind"] = _BATCH
+        for field, column in zip(VALUE_FIELDS, ("close", "open", "high", "low", "volume")):
+            chunk[field] = arrays[column] if column in arrays else _NAN
+        self._seal()
+        self._chunks.append(chunk)
+        self._chunk_rows += n
+        if self._chunk_rows >= self.flush_every:
+            self.flush()
+
+    def on_signal(self, event: SignalEvent):
+        self._append((
+            self._next_seq(), self._last_timestamp, NO_ORDER_ID, self.ticker_id(event.ticker), _SIGNAL,
+            _SIDE_CODES[event.action], 0, event.price, _NAN, _NAN, _NAN, _NAN,
+        ))
+
+    def on_order(self, event: OrderEvent):
+        self._append((
+            self._next_seq(), self._last_timestamp,
+            NO_ORDER_ID if event.order_id is None else event.order_id, self.ticker_id(event.ticker), _ORDER,
+            _SIDE_CODES[event.direction] | _ORDER_TYPE_CODES[event.order_type], 0,
+            _float(event.limit_price), _float(event.stop_price), event.quantity, _NAN, _NAN,
+        ))
+
+    def on_fill(self, event: FillEvent):
+        self._append((
+            self._next_seq(), self._last_timestamp,
+            NO_ORDER_ID if event.order_id is None else event.order_id, self.ticker_id(event.ticker), _FILL,
+            _SIDE_CODES[event.direction], 0, event.fill_price, event.quantity, event.commission, _NAN, _NAN,
+        ))
+
+    def _seal(self):
+        """
+        把待写的记录元组转换成一个结构化数组块。
+        """
+        if self._pending:
+            chunk = np.array(self._pending, dtype=RECORD_DTYPE)
+            self._pending = []
+            self._chunks.append(chunk)
+            self._chunk_rows += len(chunk)
+
+    def flush(self, sync: bool = False):
+        """
+        把累积的记录写入内存映射的文件并更新文件头；每 sync_every 次
+        （或 sync=True 时）再调用 msync 把数据落盘。
+        """
+        self._seal()
+        if self._chunks:
+            # ticker 表先于文件头写入：文件头中的记录数一旦提交，记录里的
+            # ticker 编号就必须都能在 tickers.txt 中查到
+            if len(self.tickers) > self._tickers_written:
+                self._tickers_file.write("".join(t + "\n" for t in self.tickers[self._tickers_written:]))
+                self._tickers_file.flush()
+                self._tickers_written = len(self.tickers)
+            n = self._chunk_rows
+            if self.count + n > self.capacity:
+                capacity = self.capacity
+                while capacity < self.count + n:
+                    capacity *= 2
+                self._unmap()
+                self._map(capacity)
+            start = self.count
+            for chunk in self._chunks:
+                self._records[start:start + len(chunk)] = chunk
+                start += len(chunk)
+            self._chunks = []
+            self._chunk_rows = 0
+            self.count = start
+            self._write_header()
+            self._flushes += 1
+        if sync or self._flushes >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """
+        把已刷新的记录和 ticker 表落盘。
+        """
+        self._flushes = 0
+        os.fsync(self._tickers_file.fileno())
+        self._mmap.flush()
+
+    def close(self):
+        """
+        刷新并落盘全部记录，把文件截断到实际长度。
+        """
+        if self._mmap is None or self._mmap.closed:
+            return
+        self.flush(sync=True)
+        self._unmap()
+        os.ftruncate(self._fd, HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._tickers_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_header(data: bytes) -> int:
+    magic, record_size, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("不是事件日志文件")
+    if record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"记录长度 {record_size} 与当前格式 {RECORD_DTYPE.itemsize} 不一致")
+    return count
+
+
+class JournalReader:
+    """
+    以内存映射方式读取 EventJournal 写下的日志。
+
+    records 是文件头记录数范围内的只读结构化数组，可直接做向量化分析；
+    events() 把记录还原成事件对象，同一批量行情的记录还原成一个
+    MarketBatchEvent。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, TICKERS_FILE), encoding="utf-8") as f:
+            self.tickers = f.read().splitlines()
+        path = os.path.join(directory, EVENTS_FILE)
+        with open(path, "rb") as f:
+            count = _read_header(f.read(HEADER_SIZE))
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def ticker_names(self, records=None) -> np.ndarray:
+        """
+        返回每条记录的 ticker 名称（object 数组）。
+        """
+        records = self.records if records is None else records
+        return np.asarray(self.tickers, dtype=object)[records["ticker"]]
+
+    def events(self, types=None, start: int = 0, stop: int = None, chunk_size: int = 65536):
+        """
+        按写入顺序逐个产出事件。
+
+        Args:
+            types: 只产出这些 EventType（默认全部）。
+            start (int): 起始记录下标。
+            stop (int): 结束记录下标（不含）。
+            chunk_size (int): 每次从映射文件中解码的记录数。
+        """
+        kinds = None if types is None else [KIND_CODES[event_type] for event_type in types]
+        stop = len(self.records) if stop is None else min(stop, len(self.records))
+        tickers = self.tickers
+        i = start
+        while i < stop:
+            end = min(i + chunk_size, stop)
+            # 批量行情不能跨块拆开
+            if self.records[end - 1]["kind"] == _BATCH:
+                seq = self.records[end - 1]["seq"]
+                while end < stop and self.records[end]["seq"] == seq:
+                    end += 1
+            rows = self.records[i:end]
+            if kinds is not None:
+                rows = rows[np.isin(rows["kind"], kinds)]
+            values = rows.tolist()
+            j = 0
+            while j < len(values):
+                record = values[j]
+                if record[4] == _BATCH:
+                    k = j + 1
+                    while k < len(values) and values[k][0] == record[0]:
+                        k += 1
+                    yield self._batch(rows[j:k])
+                    j = k
+                else:
+                    yield _decode(record, tickers)
+                    j += 1
+            i = end
+
+    def _batch(self, rows) -> MarketBatchEvent:
+        return MarketBatchEvent(int(rows["timestamp"][0]), {
+            "ticker": self.ticker_names(rows),
+            "open": np.array(rows["v1"]), "high": np.array(rows["v2"]), "low": np.array(rows["v3"]),
+            "close": np.array(rows["v0"]), "volume": np.array(rows["v4"]),
+        })
+
+    def event(self, index: int):
+        """
+        还原第 index 条记录；批量行情的一行还原成 MarketEvent。
+        """
+        return _decode(self.records[index].tolist(), self.tickers)
+
+
+def _decode(record: tuple, tickers: list):
+    _, timestamp, order_id, ticker, kind, flags, _, v0, v1, v2, v3, v4 = record
+    ticker = tickers[ticker]
+    order_id = None if order_id == NO_ORDER_ID else order_id
+    if kind == _MARKET or kind == _BATCH:
+        return MarketEvent(ticker, v0, None if timestamp == NO_TIMESTAMP else timestamp,
+                           _optional(v1), _optional(v2), _optional(v3), _optional(v4))
+    side = SIDES[flags & 1]
+    if kind == _SIGNAL:
+        return SignalEvent(ticker, side, v0)
+    if kind == _ORDER:
+        return OrderEvent(ticker, ORDER_TYPES[flags >> 1], _quantity(v2), side, _optional(v0), _optional(v1),
+                          order_id)
+    return FillEvent(ticker, _quantity(v1), side, v0, v2, order_id)
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..data_handler.bar_buffer import BAR_FIELDS
+
+
+def _sma(close: pd.Series, window: int) -> np.ndarray:
+    return close.rolling(window).mean().to_numpy()
+
+
+def _ema(close: pd.Series, window: int) -> np.ndarray:
+    # 与流式 EMA 一致：以第一个值为初值，前 window - 1 根 K 线视为未就绪
+    values = close.ewm(span=window, adjust=False).mean().to_numpy(copy=True)
+    values[:window - 1] = np.nan
+    return values
+
+
+def _rolling_std(close: pd.Series, window: int, ddof: int = 1) -> np.ndarray:
+    return close.rolling(window).std(ddof=ddof).to_numpy()
+
+
+def _rolling_max(close: pd.Series, window: int) -> np.ndarray:
+    return close.rolling(window).max().to_numpy()
+
+
+def _rolling_min(close: pd.Series, window: int) -> np.ndarray:
+    return close.rolling(window).min().to_numpy()
+
+
+# 特征名 -> 基于收盘价序列的全历史计算函数，数值与 indicators 中同名的流式指标逐根 K 线一致
+FEATURES = {
+    "sma": _sma,
+    "ema": _ema,
+    "rolling_std": _rolling_std,
+    "rolling_max": _rolling_max,
+    "rolling_min": _rolling_min,
+}
+
+
+def compute_feature(df: pd.DataFrame, name: str, **params) -> np.ndarray:
+    """
+    不经过缓存，直接计算 df 上的特征序列。
+
+    Args:
+        df: 单个 ticker 的 OHLCV 数据。
+        name: FEATURES 中的特征名。
+        params: 特征参数，例如 window=20。
+
+    Returns:
+        与 df 的 K 线一一对应的 float64 数组，数据不足的位置为 NaN。
+    """
+    if name not in FEATURES:
+        raise ValueError(f"未知的特征: {name}，可选 {sorted(FEATURES)}")
+    close = df["close"].astype(np.float64)
+    return np.ascontiguousarray(FEATURES[name](close, **params), dtype=np.float64)
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    计算 OHLCV 数据内容的指纹：时间戳和 OHLCV 各列字节的 BLAKE2b 摘要。
+    同一份数据无论来自 CSV、BarCache 还是共享内存，指纹都相同。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.index.values.astype("datetime64[ns]").view(np.int64)))
+    for field in BAR_FIELDS:
+        digest.update(field.encode())
+        digest.update(np.ascontiguousarray(df[field].to_numpy(dtype=np.float64)))
+    return digest.hexdigest()
+
+
+class FrameFeatures:
+    """
+    绑定到单个 ticker 及其数据的特征访问器，由 FeatureCache.frame() 创建，
+    供策略的 vectorized_signals() 通过 Strategy.feature() 使用。
+    """
+
+    def __init__(self, cache: "FeatureCache", ticker: str, df: pd.DataFrame):
+        self.cache = cache
+        self.ticker = ticker
+        self.df = df
+
+    def get(self, name: str, **params) -> np.ndarray:
+        return self.cache.feature(self.ticker, self.df, name, **params)
+
+
+class FeatureCache:
+    """
+    指标/特征序列的持久化记忆化缓存，键为 (ticker, 数据指纹, 特征名, 参数)。
+
+    两级存储：
+      * 内存层：按字节数计预算的 LRU，超出预算时淘汰最久未使用的条目；
+      * 磁盘层（可选）：每个条目一个 .npy 文件，以内存映射方式打开，
+        原子写入（临时文件 + os.replace），多个进程可以共享同一个目录。
+
+    查找顺序为内存层 -> 磁盘层 -> 计算，计算结果同时写入两层。返回的数组只读。
+    数据指纹是键的一部分，行情内容变化后旧条目自然不再命中。
+
+    计数器 memory_hits / disk_hits / misses / evictions 记录缓存效果，
+    重复的参数研究中 misses 不再增加即说明没有重复计算。
+    """
+
+    def __init__(self, directory: str = None, memory_budget: int = 256 * 1024 * 1024):
+        """
+        Args:
+            directory (str): 可选，磁盘层目录；为 None 时只使用内存层。
+            memory_budget (int): 内存层的字节预算。
+        """
+        self.directory = directory
+        self.memory_budget = memory_budget
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self.memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # id(df) -> (弱引用, 指纹)，同一个 DataFrame 只计算一次指纹
+        self._fingerprints = {}
+
+    @staticmethod
+    def key(ticker: str, fingerprint: str, name: str, params: dict) -> str:
+        """
+        返回条目键（也是磁盘层的文件名）。
+        """
+        raw = json.dumps([ticker, fingerprint, name, sorted(params.items())])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """
+        返回 df 的数据指纹，按对象缓存。
+        """
+        entry = self._fingerprints.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        fingerprint = data_fingerprint(df)
+        key = id(df)
+        ref = weakref.ref(df, lambda _, key=key: self._fingerprints.pop(key, None))
+        self._fingerprints[key] = (ref, fingerprint)
+        return fingerprint
+
+    def frame(self, ticker: str, df: pd.DataFrame) -> FrameFeatures:
+        """
+        返回绑定到 (ticker, df) 的特征访问器。
+        """
+        return FrameFeatures(self, ticker, df)
+
+    def feature(self, ticker: str, df: pd.DataFrame, name: str, **params) -> np.ndarray:
+        """
+        返回 df 上特征 name 的完整序列，优先从缓存读取。
+        """
+        return self.get_or_compute(ticker, self.fingerprint(df), name, params,
+                                   lambda: compute_feature(df, name, **params))
+
+    def get_or_compute(self, ticker: str, fingerprint: str, name: str, params: dict, compute) -> np.ndarray:
+        """
+        按键查找条目，未命中时调用 compute() 计算并写入缓存。
+
+        Args:
+            ticker: ticker 名称。
+            fingerprint: 数据指纹，见 data_fingerprint()。
+            name: 特征名。
+            params: 特征参数。
+            compute: 无参可调用对象，返回特征数组。
+
+        Returns:
+            只读的特征数组。
+        """
+        key = self.key(ticker, fingerprint, name, params)
+        with self._lock:
+            values = self._memory.get(key)
+            if values is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return values
+        values = self._load(key)
+        if values is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(key, values)
+            return values
+        values = np.asarray(compute(), dtype=np.float64)
+        values.flags.writeable = False
+        self._store(key, values)
+        with self._lock:
+            self.misses += 1
+            self._remember(key, values)
+        return values
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npy")
+
+    def _load(self, key: str):
+        if self.directory is None:
+            return None
+        try:
+            return np.load(self._path(key), mmap_mode="r").view(np.ndarray)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, values: np.ndarray):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: str, values: np.ndarray):
+        """
+        把条目放入内存层，必要时淘汰最久未使用的条目；调用方持有锁。
+        """
+        if key in self._memory or values.nbytes > self.memory_budget:
+            return
+        while self._memory and self.memory_bytes + values.nbytes > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self.memory_bytes -= evicted.nbytes
+            self.evictions += 1
+        self._memory[key] = values
+        self.memory_bytes += values.nbytes
+
+    def clear_memory(self):
+        """
+        清空内存层（磁盘层保留）。
+        """
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        返回命中、未命中、淘汰计数以及内存层的当前占用。
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "memory_bytes": self.memory_bytes,
+            }
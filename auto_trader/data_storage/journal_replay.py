@@ -0,0 +1,219 @@
+"""
+事件日志回放工具。
+
+  * rebuild_state — 只把日志中的成交和各 ticker 最新行情交给 PositionManager /
+                    RiskManager，不经过策略和执行，重建重启前的头寸与风控状态；
+  * replay        — 把日志中的行情重新驱动一套新的流水线，配合 EventJournal
+                    记录新的输出，用于回归比对；
+  * diff          — 逐条比较两份日志，找出第一批不一致的记录。
+
+用法:
+    python -m auto_trader.data_storage.journal_replay state JOURNAL [--initial-cash 100000]
+    python -m auto_trader.data_storage.journal_replay diff EXPECTED ACTUAL [--rtol 0] [--limit 10]
+"""
+import argparse
+import math
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from ..common.event import EventBus, EventType, MarketBatchEvent
+from ..position_manager.position_manager import PositionManager
+from ..risk_manager.risk_manager import RiskManager
+from .event_journal import KIND_CODES, NO_TIMESTAMP, VALUE_FIELDS, JournalReader
+
+# 重建头寸与风控状态只需要的事件类型
+STATE_TYPES = (EventType.MARKET, EventType.MARKET_BATCH, EventType.FILL)
+MARKET_TYPES = (EventType.MARKET, EventType.MARKET_BATCH)
+
+
+def replay(reader: JournalReader, event_bus: EventBus, types=None, start: int = 0, stop: int = None) -> int:
+    """
+    按日志顺序把事件发布到 event_bus，每发布一个就把总线排空（与 Backtest 相同）。
+
+    Args:
+        reader (JournalReader): 日志。
+        event_bus (EventBus): 已订阅好各组件的事件总线，不能处于线程运行状态。
+        types: 只回放这些 EventType，默认全部。
+        start (int): 起始记录下标。
+        stop (int): 结束记录下标（不含）。
+
+    Returns:
+        int: 发布的事件数量。
+    """
+    if event_bus.is_running():
+        raise RuntimeError("回放需要在调用线程上分发事件，请勿先调用 event_bus.start()")
+    publish, run_until_idle = event_bus.publish, event_bus.run_until_idle
+    published = 0
+    for event in reader.events(types, start, stop):
+        publish(event)
+        run_until_idle()
+        published += 1
+    return published
+
+
+def latest_prices(reader: JournalReader) -> MarketBatchEvent:
+    """
+    返回日志中每个 ticker 最后一根 K 线组成的 MarketBatchEvent（向量化计算），
+    时间戳为其中最新的一根；日志中没有行情时返回 None。
+    """
+    records = reader.records
+    kinds = [KIND_CODES[event_type] for event_type in MARKET_TYPES]
+    # "nan" 填充策略记下的缺失 K 线不算
+    market = np.flatnonzero(np.isin(records["kind"], kinds) & ~np.isnan(records["v0"]))
+    if not len(market):
+        return None
+    tickers = np.asarray(records["ticker"])[market]
+    # 倒序后 np.unique 取到的首次出现即每个 ticker 的最后一条
+    _, last = np.unique(tickers[::-1], return_index=True)
+    rows = records[market[len(market) - 1 - last]]
+    timestamp = int(rows["timestamp"].max())
+    return MarketBatchEvent(None if timestamp == NO_TIMESTAMP else timestamp, {
+        "ticker": reader.ticker_names(rows),
+        "open": np.array(rows["v1"]), "high": np.array(rows["v2"]), "low": np.array(rows["v3"]),
+        "close": np.array(rows["v0"]), "volume": np.array(rows["v4"]),
+    })
+
+
+def rebuild_state(reader: JournalReader, initial_cash: float = 0.0, equity_limit: float = math.inf,
+                  event_bus: EventBus = None, full: bool = False) -> tuple:
+    """
+    从日志重建 PositionManager 和 RiskManager。
+
+    默认只回放成交，再用一个 MarketBatchEvent 送入每个 ticker 的最新价格：
+    持仓、成本、现金、已实现盈亏和风控市值都与原运行一致，而信号、订单和
+    绝大多数行情都不必处理，策略也不需要重新计算。full=True 时按顺序回放全部
+    行情和成交，额外重建完整的权益曲线。
+
+    Args:
+        reader (JournalReader): 日志。
+        initial_cash (float): 原运行的初始资金。
+        equity_limit (float): RiskManager 的市值限额。
+        event_bus (EventBus): 使用的事件总线，默认新建一个单线程总线。
+        full (bool): 是否回放全部行情以重建权益曲线。
+
+    Returns:
+        tuple: (PositionManager, RiskManager)。
+    """
+    event_bus = event_bus or EventBus(threaded=False)
+    position_manager = PositionManager(event_bus, initial_cash)
+    risk_manager = RiskManager(event_bus, equity_limit)
+    if full:
+        replay(reader, event_bus, STATE_TYPES)
+        return position_manager, risk_manager
+    replay(reader, event_bus, (EventType.FILL,))
+    prices = latest_prices(reader)
+    if prices is not None:
+        event_bus.publish(prices)
+        event_bus.run_until_idle()
+    return position_manager, risk_manager
+
+
+class JournalDifference(NamedTuple):
+    index: int
+    expected: object
+    actual: object
+
+
+def _comparable(reader: JournalReader) -> dict:
+    records = reader.records
+    columns = {
+        "kind": np.asarray(records["kind"]),
+        "ticker": reader.ticker_names(),
+        "flags": np.asarray(records["flags"]),
+        "order_id": np.asarray(records["order_id"]),
+        "timestamp": np.asarray(records["timestamp"]),
+    }
+    for field in VALUE_FIELDS:
+        columns[field] = np.asarray(records[field])
+    return columns
+
+
+def diff(expected: JournalReader, actual: JournalReader, types=None, rtol: float = 0.0,
+         limit: int = 10) -> list:
+    """
+    逐条比较两份日志（只看 types 中的事件类型，默认全部），忽略 seq 和 ticker 编号，
+    数值字段按相对误差 rtol 比较，NaN 与 NaN 视为相等。
+
+    Returns:
+        list: 前 limit 条差异，每条为 JournalDifference(下标, 期望事件, 实际事件)，
+            下标是过滤后的序号；一方较短时缺少的事件为 None。
+    """
+    a, b = _comparable(expected), _comparable(actual)
+    a_index = np.arange(len(expected))
+    b_index = np.arange(len(actual))
+    if types is not None:
+        kinds = [KIND_CODES[event_type] for event_type in types]
+        a_mask, b_mask = np.isin(a["kind"], kinds), np.isin(b["kind"], kinds)
+        a = {name: values[a_mask] for name, values in a.items()}
+        b = {name: values[b_mask] for name, values in b.items()}
+        a_index, b_index = a_index[a_mask], b_index[b_mask]
+
+    n = min(len(a_index), len(b_index))
+    same = np.ones(n, dtype=bool)
+    for name in a:
+        x, y = a[name][:n], b[name][:n]
+        if name in VALUE_FIELDS:
+            same &= np.isclose(x, y, rtol=rtol, atol=0.0, equal_nan=True)
+        else:
+            same &= x == y
+    positions = np.flatnonzero(~same).tolist()
+    positions += range(n, max(len(a_index), len(b_index)))
+
+    differences = []
+    for position in positions[:limit]:
+        differences.append(JournalDifference(
+            position,
+            expected.event(int(a_index[position])) if position < len(a_index) else None,
+            actual.event(int(b_index[position])) if position < len(b_index) else None,
+        ))
+    return differences
+
+
+def _describe(event) -> str:
+    if event is None:
+        return "<missing>"
+    fields = ", ".join(f"{name}={getattr(event, name)!r}" for name in type(event).__slots__)
+    return f"{type(event).__name__}({fields})"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    state = commands.add_parser("state", help="从日志重建头寸并输出")
+    state.add_argument("journal")
+    state.add_argument("--initial-cash", type=float, default=0.0)
+    compare = commands.add_parser("diff", help="比较两份日志")
+    compare.add_argument("expected")
+    compare.add_argument("actual")
+    compare.add_argument("--types", nargs="+", choices=[event_type.name for event_type in KIND_CODES])
+    compare.add_argument("--rtol", type=float, default=0.0)
+    compare.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "state":
+        reader = JournalReader(args.journal)
+        position_manager, _ = rebuild_state(reader, args.initial_cash)
+        snapshot = position_manager.portfolio.snapshot()
+        print(f"records: {len(reader):,}")
+        print(f"cash: {snapshot.cash:,.2f}  equity: {snapshot.equity:,.2f}  realized: {snapshot.realized_pnl:,.2f}")
+        for ticker, quantity in sorted(snapshot.positions.items()):
+            print(f"  {ticker:>10}: {quantity:g}")
+        return 0
+
+    types = None if args.types is None else [EventType[name] for name in args.types]
+    expected, actual = JournalReader(args.expected), JournalReader(args.actual)
+    differences = diff(expected, actual, types, args.rtol, args.limit)
+    if not differences:
+        print(f"identical ({len(expected):,} records)")
+        return 0
+    for difference in differences:
+        print(f"#{difference.index}")
+        print(f"  expected: {_describe(difference.expected)}")
+        print(f"  actual:   {_describe(difference.actual)}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import math
+from abc import ABC, abstractmethod
+
+
+class SlippageModel(ABC):
+    """
+    Adjusts the price a market (or triggered stop) order is filled at.
+    Limit orders are never filled through their limit, so slippage is not
+    applied to them.
+    """
+
+    @abstractmethod
+    def fill_price(self, direction: str, price: float, quantity: float, bar_volume: float) -> float:
+        raise NotImplementedError("Should implement fill_price()")
+
+
+class NoSlippage(SlippageModel):
+    """
+    Fills exactly at the reference price.
+    """
+
+    def fill_price(self, direction, price, quantity, bar_volume):
+        return price
+
+
+class FixedSlippage(SlippageModel):
+    """
+    Moves the price against the order by a fixed number of basis points.
+    """
+
+    def __init__(self, bps: float = 5.0):
+        self.bps = bps
+
+    def fill_price(self, direction, price, quantity, bar_volume):
+        shift = price * self.bps / 10_000.0
+        return price + shift if direction == "BUY" else price - shift
+
+
+class VolumeShareSlippage(SlippageModel):
+    """
+    Market impact that grows with the square of the order's share of the bar
+    volume: price * (1 +/- price_impact * (quantity / bar_volume) ** 2).
+    """
+
+    def __init__(self, price_impact: float = 0.1):
+        self.price_impact = price_impact
+
+    def fill_price(self, direction, price, quantity, bar_volume):
+        if not bar_volume or math.isinf(bar_volume):
+            return price
+        shift = price * self.price_impact * (quantity / bar_volume) ** 2
+        return price + shift if direction == "BUY" else price - shift
+
+
+class CommissionModel(ABC):
+    """
+    Computes the commission charged for a single fill.
+    """
+
+    @abstractmethod
+    def commission(self, quantity: float, price: float) -> float:
+        raise NotImplementedError("Should implement commission()")
+
+
+class FixedCommission(CommissionModel):
+    """
+    A flat fee per fill.
+    """
+
+    def __init__(self, fee: float = 5.0):
+        self.fee = fee
+
+    def commission(self, quantity, price):
+        return self.fee
+
+
+class PerShareCommission(CommissionModel):
+    """
+    A fee per share, with a minimum per fill.
+    """
+
+    def __init__(self, rate: float = 0.005, minimum: float = 1.0):
+        self.rate = rate
+        self.minimum = minimum
+
+    def commission(self, quantity, price):
+        return max(self.rate * abs(quantity), self.minimum)
+
+
+class PercentCommission(CommissionModel):
+    """
+    A fraction of the traded notional, with a minimum per fill.
+    """
+
+    def __init__(self, rate: float = 0.001, minimum: float = 0.0):
+        self.rate = rate
+        self.minimum = minimum
+
+    def commission(self, quantity, price):
+        return max(self.rate * abs(quantity) * price, self.minimum)
+
+
+class VolumeParticipation:
+    """
+    Caps how much of a bar's volume the broker may fill: at most
+    max_fraction of it, shared by all orders for the ticker on that bar.
+    Anything left over stays on the book for later bars.
+    """
+
+    def __init__(self, max_fraction: float = 0.1):
+        if not 0 < max_fraction <= 1:
+            raise ValueError("max_fraction must be in (0, 1]")
+        self.max_fraction = max_fraction
+
+    def capacity(self, bar_volume: float) -> float:
+        if bar_volume is None or math.isinf(bar_volume):
+            return math.inf
+        return math.floor(self.max_fraction * bar_volume)
@@ -6,11 +6,38 @@ class ExecutionHandler:
     It takes SignalEvents from a queue and places OrderEvents onto the event queue.
     """
 
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, quantity: int = 100, commission: float = 5.0,
+                 broker=None, order_type: str = 'MKT', risk=None):
         """
         Initialises the ExecutionHandler.
+
+        quantity is the number of shares ordered per signal and commission the
+        flat fee charged per fill.
+
+        Without a broker every order is filled immediately at the signal
+        price. With a SimulatedBroker the handler only places orders of
+        order_type ('MKT', or 'LMT'/'STP' priced at the signal price) and the
+        broker, which applies its own cost models, publishes the fills.
+
+        If a PreTradeRiskEngine is given as risk, every order is checked
+        before it is placed and may be resized or dropped.
         """
         self.event_bus = event_bus
+        self.quantity = quantity
+        self.commission = commission
+        self.broker = broker
+        self.order_type = order_type
+        self.risk = risk
+
+    @property
+    def requires_ordered_lane(self) -> bool:
+        """
+        True when on_signal() touches state that ordered-lane handlers also
+        update (the risk engine's counters and positions, the broker's order
+        ids). ShardedEventBus then dispatches signals to it on the ordered
+        lane instead of on the ticker's shard thread.
+        """
+        return self.risk is not None or self.broker is not None
 
     def on_signal(self, event: SignalEvent):
         """
@@ -18,16 +45,30 @@ class ExecutionHandler:
         It takes a SignalEvent, converts it into an OrderEvent, and then
         simulates the execution of this order by creating a FillEvent.
         """
-        order_event = OrderEvent(event.ticker, 'MKT', 100, event.action)
+        if self.broker is not None:
+            order_event = OrderEvent(
+                event.ticker, self.order_type, self.quantity, event.action,
+                limit_price=event.price if self.order_type == 'LMT' else None,
+                stop_price=event.price if self.order_type == 'STP' else None,
+            )
+            if self.risk is not None and self.risk.check_order(order_event, event.price) is None:
+                return
+            order_event.order_id = self.broker.next_order_id()
+            self.event_bus.publish(order_event)
+            return
+
+        order_event = OrderEvent(event.ticker, 'MKT', self.quantity, event.action)
+        if self.risk is not None and self.risk.check_order(order_event, event.price) is None:
+            return
         self.event_bus.publish(order_event)
 
         # Simulate execution and create a FillEvent
         # In a real system, this would come from a brokerage
         fill_event = FillEvent(
             ticker=event.ticker, 
-            quantity=100, 
+            quantity=order_event.quantity,
             direction=event.action, 
             fill_price=event.price, # Use the price from the signal for simplicity
-            commission=5.0 # Example commission
+            commission=self.commission
         )
         self.event_bus.publish(fill_event)
\ No newline at end of file
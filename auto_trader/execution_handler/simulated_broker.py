@@ -0,0 +1,249 @@
+import heapq
+import itertools
+import math
+from collections import deque
+
+from ..common.event import EventBus, EventType, FillEvent, MarketBatchEvent, MarketEvent, OrderEvent
+from .cost_models import CommissionModel, FixedCommission, NoSlippage, SlippageModel, VolumeParticipation
+
+ORDER_TYPES = ("MKT", "LMT", "STP")
+
+
+class _Order:
+    __slots__ = ("order_id", "ticker", "order_type", "direction", "remaining", "limit_price", "stop_price")
+
+    def __init__(self, order_id, ticker, order_type, direction, quantity, limit_price, stop_price):
+        self.order_id = order_id
+        self.ticker = ticker
+        self.order_type = order_type
+        self.direction = direction
+        self.remaining = quantity
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+
+
+class _Book:
+    """
+    Resting orders for one ticker. Every heap is keyed so that its top is
+    the order closest to executing: the highest buy limit, the lowest sell
+    limit, the lowest buy stop and the highest sell stop. A sequence number
+    breaks price ties in arrival order.
+    """
+    __slots__ = ("buy_limits", "sell_limits", "buy_stops", "sell_stops", "market", "pending",
+                 "bars", "last_close", "last_volume", "capacity")
+
+    def __init__(self):
+        self.buy_limits = []   # (-limit, seq, order)
+        self.sell_limits = []  # (limit, seq, order)
+        self.buy_stops = []    # (stop, seq, order)
+        self.sell_stops = []   # (-stop, seq, order)
+        self.market = deque()
+        self.pending = deque()  # (bar number the order becomes active at, order)
+        self.bars = 0
+        self.last_close = None
+        self.last_volume = math.inf
+        self.capacity = math.inf
+
+    def has_resting(self):
+        return bool(self.market or self.buy_limits or self.sell_limits or self.buy_stops or self.sell_stops)
+
+
+class SimulatedBroker:
+    """
+    SimulatedBroker fills OrderEvents against the bars seen on the event bus.
+
+    Market orders fill at the next available price: the last close when the
+    order arrives with no latency, otherwise the open of the bar on which it
+    becomes active. Limit and stop orders rest in a per-ticker book of heaps
+    and are matched against each bar's high and low; a limit fills at its
+    limit or better (the open if the bar gaps through it) and a triggered
+    stop becomes a market order filled at the stop or the gapped open.
+    Matching only looks at the top of each heap, so a bar costs O(log n) per
+    order that executes, however many orders rest on the book.
+
+    slippage and commission are pluggable (see cost_models); participation,
+    if given, limits fills to a share of each bar's volume and leaves the
+    remainder resting. latency_bars delays every order by that many bars of
+    its ticker before it can execute.
+    """
+
+    def __init__(self, event_bus: EventBus, slippage: SlippageModel = None, commission: CommissionModel = None,
+                 participation: VolumeParticipation = None, latency_bars: int = 0):
+        if latency_bars < 0:
+            raise ValueError("latency_bars must be non-negative")
+        self.event_bus = event_bus
+        self.slippage = slippage or NoSlippage()
+        self.commission = commission or FixedCommission(5.0)
+        self.participation = participation
+        self.latency_bars = latency_bars
+        self.open_orders = {}
+        self._books = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self.event_bus.subscribe(EventType.ORDER, self.on_order)
+        self.event_bus.subscribe(EventType.MARKET, self.on_market_event, ordered=True)
+        self.event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch, ordered=True)
+
+    def next_order_id(self) -> int:
+        """
+        Reserves an order id for an OrderEvent that is about to be published.
+        """
+        return next(self._ids)
+
+    def _book(self, ticker) -> _Book:
+        book = self._books.get(ticker)
+        if book is None:
+            book = self._books[ticker] = _Book()
+        return book
+
+    def on_order(self, event: OrderEvent):
+        self.submit(event)
+
+    def submit(self, event: OrderEvent) -> int:
+        """
+        Accepts an order and returns its id.
+        """
+        if event.order_type not in ORDER_TYPES:
+            raise ValueError(f"Unsupported order type {event.order_type!r}, expected one of {ORDER_TYPES}")
+        if event.order_type == "LMT" and event.limit_price is None:
+            raise ValueError("A limit order needs a limit_price")
+        if event.order_type == "STP" and event.stop_price is None:
+            raise ValueError("A stop order needs a stop_price")
+        order_id = event.order_id if event.order_id is not None else self.next_order_id()
+        order = _Order(order_id, event.ticker, event.order_type, event.direction, event.quantity,
+                       event.limit_price, event.stop_price)
+        self.open_orders[order_id] = order
+        book = self._book(event.ticker)
+        if self.latency_bars:
+            book.pending.append((book.bars + self.latency_bars, order))
+            return order_id
+        self._place(book, order)
+        if book.last_close is not None:
+            # Orders arriving between bars can only trade at the last close
+            close = book.last_close
+            self._match(book, close, close, close, book.last_volume)
+        return order_id
+
+    def cancel(self, order_id: int) -> bool:
+        """
+        Cancels a resting order. Returns False if it was already filled or cancelled.
+        """
+        order = self.open_orders.pop(order_id, None)
+        if order is None:
+            return False
+        # Cancelled entries stay in their heap and are discarded when they reach the top
+        order.remaining = 0
+        return True
+
+    def _place(self, book: _Book, order: _Order):
+        seq = next(self._seq)
+        if order.order_type == "MKT":
+            book.market.append(order)
+        elif order.order_type == "LMT":
+            if order.direction == "BUY":
+                heapq.heappush(book.buy_limits, (-order.limit_price, seq, order))
+            else:
+                heapq.heappush(book.sell_limits, (order.limit_price, seq, order))
+        elif order.direction == "BUY":
+            heapq.heappush(book.buy_stops, (order.stop_price, seq, order))
+        else:
+            heapq.heappush(book.sell_stops, (-order.stop_price, seq, order))
+
+    def on_market_event(self, event: MarketEvent):
+        close = event.price
+        open_ = close if event.open is None else event.open
+        high = close if event.high is None else event.high
+        low = close if event.low is None else event.low
+        volume = math.inf if event.volume is None else event.volume
+        self._on_bar(event.ticker, open_, high, low, close, volume)
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        arrays = event.arrays
+        columns = [arrays[field].tolist() for field in ("open", "high", "low", "close", "volume")]
+        for ticker, open_, high, low, close, volume in zip(arrays["ticker"], *columns):
+            if close == close:
+                self._on_bar(ticker, open_, high, low, close, volume)
+
+    def _on_bar(self, ticker, open_, high, low, close, volume):
+        book = self._book(ticker)
+        book.bars += 1
+        book.capacity = self.participation.capacity(volume) if self.participation else math.inf
+        pending = book.pending
+        while pending and pending[0][0] <= book.bars:
+            order = pending.popleft()[1]
+            if order.remaining:
+                self._place(book, order)
+        if book.has_resting():
+            self._match(book, open_, high, low, volume)
+        book.last_close = close
+        book.last_volume = volume
+
+    def _match(self, book: _Book, open_, high, low, volume):
+        """
+        Executes everything on the book that the bar reaches, in the order
+        market, stop, limit, until the bar's volume capacity runs out.
+        """
+        market = book.market
+        while market and book.capacity > 0:
+            order = market[0]
+            if order.remaining:
+                self._fill_market(book, order, open_, volume)
+            if not order.remaining:
+                market.popleft()
+
+        stops = book.buy_stops
+        while stops and (not stops[0][2].remaining or stops[0][0] <= high):
+            stop, _, order = heapq.heappop(stops)
+            if order.remaining:
+                self._trigger(book, order, max(stop, open_), volume)
+        stops = book.sell_stops
+        while stops and (not stops[0][2].remaining or -stops[0][0] >= low):
+            stop, _, order = heapq.heappop(stops)
+            if order.remaining:
+                self._trigger(book, order, min(-stop, open_), volume)
+
+        limits = book.buy_limits
+        while limits and book.capacity > 0:
+            limit, _, order = limits[0]
+            if order.remaining and -limit < low:
+                break
+            if order.remaining:
+                self._fill(book, order, min(-limit, open_))
+            if not order.remaining:
+                heapq.heappop(limits)
+        limits = book.sell_limits
+        while limits and book.capacity > 0:
+            limit, _, order = limits[0]
+            if order.remaining and limit > high:
+                break
+            if order.remaining:
+                self._fill(book, order, max(limit, open_))
+            if not order.remaining:
+                heapq.heappop(limits)
+
+    def _trigger(self, book: _Book, order: _Order, price, volume):
+        order.order_type = "MKT"
+        if book.capacity > 0:
+            self._fill_market(book, order, price, volume)
+        if order.remaining:
+            book.market.append(order)
+
+    def _fill_market(self, book: _Book, order: _Order, price, volume):
+        quantity = min(order.remaining, book.capacity)
+        self._fill(book, order, self.slippage.fill_price(order.direction, price, quantity, volume), quantity)
+
+    def _fill(self, book: _Book, order: _Order, price, quantity=None):
+        if quantity is None:
+            quantity = min(order.remaining, book.capacity)
+        book.capacity -= quantity
+        order.remaining -= quantity
+        if not order.remaining:
+            self.open_orders.pop(order.order_id, None)
+        self.event_bus.publish(FillEvent(
+            ticker=order.ticker,
+            quantity=quantity,
+            direction=order.direction,
+            fill_price=price,
+            commission=self.commission.commission(quantity, price),
+            order_id=order.order_id,
+        ))
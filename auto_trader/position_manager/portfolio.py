@@ -0,0 +1,279 @@
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Holding(NamedTuple):
+    """
+    单个 ticker 的持仓明细。
+    """
+    quantity: float
+    avg_cost: float
+    realized_pnl: float
+
+
+class PortfolioSnapshot(NamedTuple):
+    """
+    某一时刻投资组合的不可变快照。
+    """
+    timestamp: Optional[int]
+    cash: float
+    market_value: float
+    equity: float
+    gross_exposure: float
+    realized_pnl: float
+    commission: float
+    positions: Mapping
+    holdings: Mapping
+
+
+class EquityCurve:
+    """
+    按时间戳记录权益的数组缓冲区，容量不足时成倍扩容，追加为均摊 O(1)。
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._timestamps = np.empty(max(capacity, 1), dtype=np.int64)
+        self._values = np.empty(max(capacity, 1), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def mark(self, timestamp: int, equity: float):
+        """
+        记录 timestamp 时的权益；同一时间戳重复记录时覆盖最后一个点。
+        """
+        size = self._size
+        if size and self._timestamps[size - 1] == timestamp:
+            self._values[size - 1] = equity
+            return
+        if size == len(self._values):
+            self._timestamps = np.resize(self._timestamps, 2 * size)
+            self._values = np.resize(self._values, 2 * size)
+        self._timestamps[size] = timestamp
+        self._values[size] = equity
+        self._size = size + 1
+
+    def update_last(self, equity: float):
+        """
+        修正最后一个点的权益（该时间戳内又发生了成交）。
+        """
+        if self._size:
+            self._values[self._size - 1] = equity
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    def to_series(self) -> "pd.Series":
+        import pandas as pd
+        index = pd.DatetimeIndex(self.timestamps.view("datetime64[ns]"), name="datetime")
+        return pd.Series(self.values.copy(), index=index, name="equity")
+
+
+class Portfolio:
+    """
+    投资组合账本：现金、每个 ticker 的持仓数量、平均成本、已实现盈亏和佣金。
+
+    市值与总敞口按增量维护：价格更新只根据该 ticker 的持仓计算差额，成交只
+    调整该 ticker 的贡献，因此每次更新都是 O(1)，无需遍历全部持仓。
+
+    positions 和 holdings 以只读映射（MappingProxyType）对外提供，并采用写时复制：
+    映射交出去之后，下一次成交会先复制再修改，已交出的映射永远不会再变化，
+    其他线程持有它时也不会读到修改到一半的状态。
+    """
+
+    def __init__(self, initial_cash: float = 0.0, curve_capacity: int = 1024):
+        """
+        Args:
+            initial_cash (float): 初始现金。
+            curve_capacity (int): 权益曲线缓冲区的初始容量。
+        """
+        self.initial_cash = initial_cash
+        self.cash = initial_cash
+        self.market_value = 0.0
+        self.gross_exposure = 0.0
+        self.realized_pnl = 0.0
+        self.commission = 0.0
+        self.timestamp = None
+        self.equity_curve = EquityCurve(curve_capacity)
+        self._positions = {}
+        self._holdings = {}
+        self._prices = {}
+        self._shared = False
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.market_value
+
+    @property
+    def net_exposure(self) -> float:
+        return self.market_value
+
+    @property
+    def positions(self) -> Mapping:
+        """
+        ticker -> 持仓数量的只读映射。
+        """
+        self._shared = True
+        return MappingProxyType(self._positions)
+
+    @property
+    def holdings(self) -> Mapping:
+        """
+        ticker -> Holding 的只读映射。
+        """
+        self._shared = True
+        return MappingProxyType(self._holdings)
+
+    def price(self, ticker: str) -> Optional[float]:
+        return self._prices.get(ticker)
+
+    def exposure(self, ticker: str) -> float:
+        """
+        ticker 当前的市值（带方向）。
+        """
+        return self._positions.get(ticker, 0.0) * self._prices.get(ticker, 0.0)
+
+    def unrealized_pnl(self, ticker: str = None) -> float:
+        """
+        ticker 的浮动盈亏；不指定 ticker 时返回整个组合的浮动盈亏。
+        """
+        if ticker is not None:
+            holding = self._holdings.get(ticker)
+            if holding is None:
+                return 0.0
+            return holding.quantity * (self._prices.get(ticker, holding.avg_cost) - holding.avg_cost)
+        return sum(self.unrealized_pnl(t) for t in self._holdings)
+
+    def update_price(self, ticker: str, price: float):
+        """
+        更新 ticker 的最新价格，并按持仓增量调整市值和敞口。
+        """
+        old = self._prices.get(ticker, 0.0)
+        self._prices[ticker] = price
+        quantity = self._positions.get(ticker)
+        if quantity:
+            self.market_value += quantity * (price - old)
+            self.gross_exposure += abs(quantity) * (price - old)
+
+    def update_prices(self, tickers, prices):
+        """
+        批量更新一个截面的价格。
+        """
+        for ticker, price in zip(tickers, prices):
+            self.update_price(ticker, price)
+
+    def mark(self, timestamp: int):
+        """
+        在权益曲线上记录 timestamp 时的权益。
+        """
+        self.timestamp = timestamp
+        self.equity_curve.mark(timestamp, self.equity)
+
+    def on_fill(self, ticker: str, quantity: float, direction: str, price: float, commission: float = 0.0):
+        """
+        按成交更新现金、持仓、平均成本和已实现盈亏。
+
+        Args:
+            ticker (str): 成交的 ticker。
+            quantity (float): 成交数量（正数）。
+            direction (str): 'BUY' 或 'SELL'。
+            price (float): 成交价。
+            commission (float): 该笔成交的佣金。
+        """
+        signed = quantity if direction == 'BUY' else -quantity
+        if self._shared:
+            self._positions = dict(self._positions)
+            self._holdings = dict(self._holdings)
+            self._shared = False
+
+        holding = self._holdings.get(ticker)
+        old_quantity, avg_cost, realized = holding if holding is not None else (0.0, 0.0, 0.0)
+        new_quantity = old_quantity + signed
+        if old_quantity == 0 or (old_quantity > 0) == (signed > 0):
+            # 开仓或加仓
+            avg_cost = (old_quantity * avg_cost + signed * price) / new_quantity
+        else:
+            # 减仓、平仓或反手
+            closed = min(abs(signed), abs(old_quantity))
+            pnl = closed * (price - avg_cost) * (1 if old_quantity > 0 else -1)
+            realized += pnl
+            self.realized_pnl += pnl
+            if new_quantity == 0:
+                avg_cost = 0.0
+            elif (new_quantity > 0) != (old_quantity > 0):
+                avg_cost = price
+
+        self.cash -= signed * price + commission
+        self.commission += commission
+        if ticker not in self._prices:
+            self._prices[ticker] = price
+        mark_price = self._prices[ticker]
+        self.market_value += signed * mark_price
+        self.gross_exposure += (abs(new_quantity) - abs(old_quantity)) * mark_price
+        self._positions[ticker] = new_quantity
+        self._holdings[ticker] = Holding(new_quantity, avg_cost, realized)
+        self.equity_curve.update_last(self.equity)
+
+    def get_state(self) -> dict:
+        """
+        返回账本状态，用于检查点。
+
+        权益曲线只保存最后一个点，使检查点大小与历史长度无关；恢复后的曲线从该点
+        继续记录，完整曲线可以从事件日志重建（见 journal_replay.rebuild_state）。
+        """
+        curve = self.equity_curve
+        return {
+            "initial_cash": self.initial_cash,
+            "cash": self.cash,
+            "market_value": self.market_value,
+            "gross_exposure": self.gross_exposure,
+            "realized_pnl": self.realized_pnl,
+            "commission": self.commission,
+            "timestamp": self.timestamp,
+            "positions": dict(self._positions),
+            "holdings": {ticker: tuple(holding) for ticker, holding in self._holdings.items()},
+            "prices": dict(self._prices),
+            "last_mark": (int(curve.timestamps[-1]), float(curve.values[-1])) if len(curve) else None,
+        }
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态，清空当前的权益曲线。
+        """
+        for name in ("initial_cash", "cash", "market_value", "gross_exposure", "realized_pnl", "commission",
+                     "timestamp"):
+            setattr(self, name, state[name])
+        self._positions = dict(state["positions"])
+        self._holdings = {ticker: Holding(*holding) for ticker, holding in state["holdings"].items()}
+        self._prices = dict(state["prices"])
+        self._shared = False
+        self.equity_curve = EquityCurve(len(self.equity_curve._values))
+        if state["last_mark"] is not None:
+            self.equity_curve.mark(*state["last_mark"])
+
+    def snapshot(self) -> PortfolioSnapshot:
+        """
+        返回当前状态的不可变快照。
+        """
+        return PortfolioSnapshot(
+            timestamp=self.timestamp,
+            cash=self.cash,
+            market_value=self.market_value,
+            equity=self.equity,
+            gross_exposure=self.gross_exposure,
+            realized_pnl=self.realized_pnl,
+            commission=self.commission,
+            positions=self.positions,
+            holdings=self.holdings,
+        )
@@ -1,34 +1,79 @@
-from collections import defaultdict
+import logging
 
-from ..common.event import FillEvent, EventBus, PositionEvent, EventType
+from ..common.event import FillEvent, EventBus, MarketEvent, MarketBatchEvent, PositionEvent, EventType
+from .portfolio import Portfolio
+
+logger = logging.getLogger(__name__)
 
 
 class PositionManager:
     """
     头寸管理器负责跟踪和更新交易头寸。
+
+    账务由 Portfolio 负责：现金、平均成本、已实现盈亏和佣金随成交更新，
+    市值随行情按增量更新，并在每个行情时间戳记录一次权益。
     """
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, initial_cash: float = 0.0):
         """
         初始化 PositionManager。
 
         :param event_bus: 事件总线实例。
+        :param initial_cash: 初始现金。
         """
         self.event_bus = event_bus
-        self.positions = defaultdict(float)
+        self.portfolio = Portfolio(initial_cash)
         self.event_bus.subscribe(EventType.FILL, self.on_fill)
+        self.event_bus.subscribe(EventType.MARKET, self.on_market_event, ordered=True)
+        self.event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch, ordered=True)
+
+    @property
+    def positions(self):
+        """
+        ticker -> 持仓数量的只读快照。
+        """
+        return self.portfolio.positions
+
+    def get_state(self) -> dict:
+        """
+        返回组合账本的状态，用于检查点。
+        """
+        return self.portfolio.get_state()
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态。
+        """
+        self.portfolio.set_state(state)
+
+    def on_market_event(self, event: MarketEvent):
+        """
+        处理市场事件，按最新价格重估持仓。
+        """
+        self.portfolio.update_price(event.ticker, event.price)
+        if event.timestamp is not None:
+            self.portfolio.mark(event.timestamp)
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        """
+        处理批量市场事件，重估整个截面后记录一次权益。
+        """
+        close = event.arrays["close"]
+        valid = close == close
+        tickers = event.arrays["ticker"]
+        if not valid.all():
+            tickers, close = [t for t, ok in zip(tickers, valid) if ok], close[valid]
+        self.portfolio.update_prices(tickers, close.tolist())
+        self.portfolio.mark(event.timestamp)
 
     def on_fill(self, fill_event: FillEvent):
         """
         处理成交事件，更新头寸。
         """
         ticker = fill_event.ticker
-        quantity = fill_event.quantity
-        direction = fill_event.direction
-
-        if direction == 'BUY':
-            self.positions[ticker] += quantity
-        elif direction == 'SELL':
-            self.positions[ticker] -= quantity
+        self.portfolio.on_fill(
+            ticker, fill_event.quantity, fill_event.direction, fill_event.fill_price, fill_event.commission
+        )
+        snapshot = self.portfolio.snapshot()
 
-        print(f"[Position] Updated position for {ticker}: {self.positions[ticker]} shares")
-        self.event_bus.publish(PositionEvent(self.positions))
\ No newline at end of file
+        logger.debug("Updated position for %s: %s shares", ticker, snapshot.positions[ticker])
+        self.event_bus.publish(PositionEvent(snapshot.positions, ticker, snapshot))
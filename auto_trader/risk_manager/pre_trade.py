@@ -0,0 +1,371 @@
+import math
+import time
+from collections import Counter
+
+import numpy as np
+
+from auto_trader.common.event import EventBus, EventType, MarketEvent, MarketBatchEvent, OrderEvent, PositionEvent
+
+_INITIAL_CAPACITY = 64
+
+
+class RiskLimits:
+    """
+    事前风控的限额配置，取值为 None 的限额不检查。
+    """
+    def __init__(self, max_order_quantity: float = None, max_ticker_notional: float = None,
+                 max_gross_exposure: float = None, max_net_exposure: float = None,
+                 max_orders_per_second: float = None, order_burst: int = None, max_drawdown: float = None):
+        """
+        Args:
+            max_order_quantity (float): 单笔订单的最大数量。
+            max_ticker_notional (float): 单个 ticker 持仓市值（绝对值）的上限。
+            max_gross_exposure (float): 所有持仓市值绝对值之和的上限。
+            max_net_exposure (float): 持仓市值代数和（绝对值）的上限。
+            max_orders_per_second (float): 令牌桶的补充速率。
+            order_burst (int): 令牌桶容量，默认等于每秒订单数。
+            max_drawdown (float): 权益相对峰值的最大回撤比例，超过后触发熔断。
+        """
+        self.max_order_quantity = max_order_quantity
+        self.max_ticker_notional = max_ticker_notional
+        self.max_gross_exposure = max_gross_exposure
+        self.max_net_exposure = max_net_exposure
+        self.max_orders_per_second = max_orders_per_second
+        self.order_burst = order_burst
+        self.max_drawdown = max_drawdown
+
+
+class PreTradeRiskEngine:
+    """
+    事前风控：在订单进入执行环节之前拒绝或缩减订单。
+
+    检查项包括单笔数量、单 ticker 市值、总敞口（gross）、净敞口（net）、
+    令牌桶限速，以及权益回撤熔断。熔断触发后只允许减仓订单，直到调用
+    reset_kill_switch()。
+
+    状态保存在按 ticker 编号索引的 NumPy 数组中（持仓、最新价格、单 ticker
+    市值上限），总敞口和净敞口随行情和头寸事件按增量更新，因此单笔订单的
+    检查是常数次标量运算，与持仓数量无关；check_batch() 用向量运算一次检查
+    一组订单，批量行情的重估同样是几次数组运算。
+
+    持仓来自 PositionEvent，只反映已成交的数量，尚未成交的挂单不计入敞口。
+    """
+
+    def __init__(self, event_bus: EventBus, limits: RiskLimits, initial_equity: float = None,
+                 clock=time.monotonic):
+        """
+        Args:
+            event_bus (EventBus): 订阅行情和头寸事件所用的事件总线。
+            limits (RiskLimits): 限额配置。
+            initial_equity (float): 初始权益，作为回撤的起始峰值；默认取第一份组合快照的权益。
+            clock: 令牌桶使用的时钟（秒）。
+        """
+        self.event_bus = event_bus
+        self.limits = limits
+        self.clock = clock
+        self.ticker_ids = {}
+        self._positions = np.zeros(_INITIAL_CAPACITY)
+        self._prices = np.full(_INITIAL_CAPACITY, np.nan)
+        self._default_notional = math.inf if limits.max_ticker_notional is None else limits.max_ticker_notional
+        self._max_notional = np.full(_INITIAL_CAPACITY, self._default_notional)
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.cash = None
+        self.peak_equity = initial_equity
+        self.halted = False
+
+        rate = limits.max_orders_per_second
+        self._burst = (limits.order_burst or max(1, int(rate))) if rate is not None else None
+        self._tokens = self._burst
+        self._last_refill = clock()
+
+        self.approved = 0
+        self.resized = 0
+        self.rejections = Counter()
+
+        self.event_bus.subscribe(EventType.MARKET, self.on_market_event, ordered=True)
+        self.event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch, ordered=True)
+        self.event_bus.subscribe(EventType.POSITION, self.on_position_event)
+
+    def ticker_id(self, ticker: str) -> int:
+        """
+        返回 ticker 的数组下标，首次出现时分配，容量不足时按倍数扩容。
+        """
+        i = self.ticker_ids.get(ticker)
+        if i is None:
+            i = self.ticker_ids[ticker] = len(self.ticker_ids)
+            if i == len(self._positions):
+                size = 2 * i
+                self._positions = np.resize(self._positions, size)
+                self._positions[i:] = 0.0
+                self._prices = np.resize(self._prices, size)
+                self._prices[i:] = np.nan
+                self._max_notional = np.resize(self._max_notional, size)
+                self._max_notional[i:] = self._default_notional
+        return i
+
+    def set_ticker_limit(self, ticker: str, max_notional: float):
+        """
+        单独设置某个 ticker 的持仓市值上限。
+        """
+        self._max_notional[self.ticker_id(ticker)] = max_notional
+
+    @property
+    def equity(self):
+        return None if self.cash is None else self.cash + self.net_exposure
+
+    def _update_drawdown(self):
+        equity = self.equity
+        if equity is None:
+            return
+        if self.peak_equity is None or equity > self.peak_equity:
+            self.peak_equity = equity
+        max_drawdown = self.limits.max_drawdown
+        if max_drawdown is not None and self.peak_equity > 0 and \
+                equity < self.peak_equity * (1.0 - max_drawdown):
+            self.halted = True
+
+    def reset_kill_switch(self):
+        """
+        解除熔断，并以当前权益作为新的峰值。
+        """
+        self.halted = False
+        self.peak_equity = self.equity
+
+    def get_state(self) -> dict:
+        """
+        返回持仓、价格、单 ticker 限额、敞口、回撤峰值和熔断状态，用于检查点。
+
+        令牌桶与时钟相关，不保存；恢复后令牌桶是满的。
+        """
+        n = len(self.ticker_ids)
+        return {
+            "ticker_ids": dict(self.ticker_ids),
+            "positions": self._positions[:n].copy(),
+            "prices": self._prices[:n].copy(),
+            "max_notional": self._max_notional[:n].copy(),
+            "gross_exposure": self.gross_exposure,
+            "net_exposure": self.net_exposure,
+            "cash": self.cash,
+            "peak_equity": self.peak_equity,
+            "halted": self.halted,
+            "approved": self.approved,
+            "resized": self.resized,
+            "rejections": dict(self.rejections),
+        }
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态。
+        """
+        self.ticker_ids = {}
+        self._positions = np.zeros(_INITIAL_CAPACITY)
+        self._prices = np.full(_INITIAL_CAPACITY, np.nan)
+        self._max_notional = np.full(_INITIAL_CAPACITY, self._default_notional)
+        for ticker in state["ticker_ids"]:
+            self.ticker_id(ticker)
+        n = len(self.ticker_ids)
+        self._positions[:n] = state["positions"]
+        self._prices[:n] = state["prices"]
+        self._max_notional[:n] = state["max_notional"]
+        for name in ("gross_exposure", "net_exposure", "cash", "peak_equity", "halted", "approved", "resized"):
+            setattr(self, name, state[name])
+        self.rejections = Counter(state["rejections"])
+        self._tokens = self._burst
+        self._last_refill = self.clock()
+
+    # ---- 状态更新 ----
+
+    def on_market_event(self, event: MarketEvent):
+        i = self.ticker_id(event.ticker)
+        price = event.price
+        old = self._prices[i]
+        self._prices[i] = price
+        quantity = float(self._positions[i])
+        if quantity:
+            change = price - (0.0 if old != old else float(old))
+            self.net_exposure += quantity * change
+            self.gross_exposure += abs(quantity) * change
+            self._update_drawdown()
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        close = np.asarray(event.arrays["close"], dtype=np.float64)
+        idx = np.fromiter((self.ticker_id(t) for t in event.arrays["ticker"]), dtype=np.int64, count=len(close))
+        valid = close == close
+        if not valid.all():
+            idx, close = idx[valid], close[valid]
+        quantity = self._positions[idx]
+        change = close - np.nan_to_num(self._prices[idx])
+        self._prices[idx] = close
+        self.net_exposure += float(quantity @ change)
+        self.gross_exposure += float(np.abs(quantity) @ change)
+        self._update_drawdown()
+
+    def on_position_event(self, event: PositionEvent):
+        if event.ticker is not None:
+            i = self.ticker_id(event.ticker)
+            new = event.positions.get(event.ticker, 0.0)
+            old = float(self._positions[i])
+            self._positions[i] = new
+            price = float(self._prices[i])
+            if price == price:
+                self.net_exposure += (new - old) * price
+                self.gross_exposure += (abs(new) - abs(old)) * price
+        else:
+            self._positions[:] = 0.0
+            for ticker, quantity in event.positions.items():
+                self._positions[self.ticker_id(ticker)] = quantity
+            prices = np.nan_to_num(self._prices)
+            self.net_exposure = float(self._positions @ prices)
+            self.gross_exposure = float(np.abs(self._positions) @ prices)
+        if event.snapshot is not None:
+            self.cash = event.snapshot.cash
+        self._update_drawdown()
+
+    # ---- 检查 ----
+
+    def _take_token(self) -> bool:
+        if self._burst is None:
+            return True
+        now = self.clock()
+        self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self.limits.max_orders_per_second)
+        self._last_refill = now
+        return self._tokens >= 1
+
+    def _reject(self, reason: str) -> int:
+        self.rejections[reason] += 1
+        return 0
+
+    def check(self, ticker: str, direction: str, quantity: float, price: float = None) -> int:
+        """
+        检查一笔订单，返回允许的数量：与 quantity 相同表示通过，较小表示被缩减，0 表示拒绝。
+
+        Args:
+            ticker (str): 订单的 ticker。
+            direction (str): 'BUY' 或 'SELL'。
+            quantity (float): 申请的数量。
+            price (float): 用于计算市值的价格，默认使用该 ticker 的最新价格。
+        """
+        limits = self.limits
+        i = self.ticker_id(ticker)
+        if price is None:
+            price = float(self._prices[i])
+        position = float(self._positions[i])
+        buy = direction == 'BUY'
+        allowed = quantity
+
+        if self.halted:
+            # 熔断期间只允许减仓，且不能反手
+            if position == 0 or (position > 0) == buy:
+                return self._reject("kill_switch")
+            allowed = min(allowed, abs(position))
+        if limits.max_order_quantity is not None:
+            allowed = min(allowed, limits.max_order_quantity)
+
+        if price != price or price <= 0:
+            if limits.max_ticker_notional is not None or limits.max_gross_exposure is not None \
+                    or limits.max_net_exposure is not None:
+                return self._reject("no_price")
+        else:
+            reason = None
+            # 市值限额换算成持仓数量的上限 cap：买单最多买到 cap，卖单最多卖到 -cap
+            cap = float(self._max_notional[i]) / price
+            room = cap - position if buy else cap + position
+            if room < allowed:
+                allowed, reason = room, "ticker_notional"
+            if limits.max_gross_exposure is not None:
+                cap = (limits.max_gross_exposure - self.gross_exposure) / price + abs(position)
+                room = cap - position if buy else cap + position
+                if room < allowed:
+                    allowed, reason = room, "gross_exposure"
+            max_net = limits.max_net_exposure
+            if max_net is not None:
+                room = (max_net - self.net_exposure) / price if buy else (max_net + self.net_exposure) / price
+                if room < allowed:
+                    allowed, reason = room, "net_exposure"
+            allowed = math.floor(allowed + 1e-9)
+            if allowed <= 0:
+                return self._reject(reason)
+
+        if not self._take_token():
+            return self._reject("rate_limit")
+        if self._burst is not None:
+            self._tokens -= 1
+        self.approved += 1
+        if allowed < quantity:
+            self.resized += 1
+        return allowed
+
+    def check_order(self, order: OrderEvent, price: float = None):
+        """
+        检查 OrderEvent，返回（可能被缩减数量的）订单，被拒绝时返回 None。
+        """
+        if price is None:
+            price = order.limit_price if order.limit_price is not None else order.stop_price
+        quantity = self.check(order.ticker, order.direction, order.quantity, price)
+        if not quantity:
+            return None
+        if quantity != order.quantity:
+            order.quantity = quantity
+        return order
+
+    def check_batch(self, tickers, directions, quantities, prices=None) -> np.ndarray:
+        """
+        向量化地检查一组订单（例如一次截面调仓），返回每笔允许的数量。
+
+        单笔数量和单 ticker 市值逐笔独立检查；总敞口和净敞口的剩余额度不足时，
+        按比例缩减所有会增加该敞口的订单。同一 ticker 在一组中最多出现一次。
+        令牌不足时按顺序批准前面的订单。
+        """
+        limits = self.limits
+        idx = np.fromiter((self.ticker_id(t) for t in tickers), dtype=np.int64, count=len(tickers))
+        sign = np.where(np.asarray(directions) == 'BUY', 1.0, -1.0)
+        requested = np.asarray(quantities, dtype=np.float64)
+        price = self._prices[idx] if prices is None else np.asarray(prices, dtype=np.float64)
+        position = self._positions[idx]
+        allowed = requested.copy()
+
+        if self.halted:
+            reducing = (position != 0) & (np.sign(position) != sign)
+            allowed = np.where(reducing, np.minimum(allowed, np.abs(position)), 0.0)
+        if limits.max_order_quantity is not None:
+            allowed = np.minimum(allowed, limits.max_order_quantity)
+        priced = price > 0
+        if limits.max_ticker_notional is not None or limits.max_gross_exposure is not None \
+                or limits.max_net_exposure is not None:
+            allowed[~priced] = 0.0
+        safe_price = np.where(priced, price, 1.0)
+        cap = self._max_notional[idx] / safe_price
+        allowed = np.minimum(allowed, np.maximum(cap - sign * position, 0.0))
+
+        if limits.max_gross_exposure is not None:
+            # 反向订单先减仓，这部分不增加总敞口；剩余部分按比例分配剩余额度
+            reducing = np.where(sign * position < 0, np.minimum(allowed, np.abs(position)), 0.0)
+            increase = (allowed - reducing) * safe_price
+            headroom = max(limits.max_gross_exposure - self.gross_exposure, 0.0)
+            total = increase.sum()
+            if total > headroom:
+                allowed = reducing + (allowed - reducing) * (headroom / total)
+        if limits.max_net_exposure is not None:
+            delta = sign * allowed * safe_price
+            headroom = limits.max_net_exposure - self.net_exposure if delta.sum() > 0 else \
+                limits.max_net_exposure + self.net_exposure
+            total = abs(delta.sum())
+            if total > headroom:
+                moving = np.sign(delta) == np.sign(delta.sum())
+                moved = np.abs(delta[moving]).sum()
+                cut = total - max(headroom, 0.0)
+                allowed = np.where(moving, allowed * (1.0 - min(cut / moved, 1.0)), allowed)
+
+        allowed = np.floor(allowed + 1e-9)
+        if self._burst is not None:
+            self._take_token()
+            approved = np.cumsum(allowed > 0) <= math.floor(self._tokens)
+            allowed = np.where(approved, allowed, 0.0)
+            self._tokens -= int((allowed > 0).sum())
+        self.approved += int((allowed > 0).sum())
+        self.resized += int(((allowed > 0) & (allowed < requested)).sum())
+        rejected = int((allowed <= 0).sum())
+        if rejected:
+            self.rejections["batch"] += rejected
+        return allowed
@@ -1,4 +1,8 @@
-from auto_trader.common.event import EventBus, EventType, MarketEvent, PositionEvent
+import logging
+
+from auto_trader.common.event import EventBus, EventType, MarketEvent, MarketBatchEvent, PositionEvent
+
+logger = logging.getLogger(__name__)
 
 class RiskManager:
     """
@@ -8,32 +12,98 @@ class RiskManager:
         self.event_bus = event_bus
         self.equity_limit = equity_limit
         self.latest_prices = {}
+        # 最新价格所对应的行情时间（纳秒），批量行情保证同一截面的价格一致
+        self.price_timestamp = None
         self.positions = {}
-        self.event_bus.subscribe(EventType.MARKET, self.on_market_event)
+        # 持仓市值按增量维护，见 calculate_total_equity()
+        self._market_value = 0.0
+        self.event_bus.subscribe(EventType.MARKET, self.on_market_event, ordered=True)
+        self.event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch, ordered=True)
         self.event_bus.subscribe(EventType.POSITION, self.on_position_event)
 
+    def get_state(self) -> dict:
+        """
+        返回最新价格、持仓和市值，用于检查点。
+        """
+        return {
+            "latest_prices": dict(self.latest_prices),
+            "price_timestamp": self.price_timestamp,
+            "positions": dict(self.positions),
+            "market_value": self._market_value,
+        }
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态。
+        """
+        self.latest_prices = dict(state["latest_prices"])
+        self.price_timestamp = state["price_timestamp"]
+        self.positions = dict(state["positions"])
+        self._market_value = state["market_value"]
+
     def on_market_event(self, event: MarketEvent):
         """
         处理市场事件，更新最新价格。
         """
-        self.latest_prices[event.ticker] = event.price
+        ticker = event.ticker
+        quantity = self.positions.get(ticker)
+        if quantity:
+            self._market_value += quantity * (event.price - self.latest_prices.get(ticker, 0.0))
+        self.latest_prices[ticker] = event.price
+        if event.timestamp is not None:
+            self.price_timestamp = event.timestamp
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        """
+        处理批量市场事件，一次性更新整个截面的最新价格。
+        """
+        tickers, close = event.arrays["ticker"], event.arrays["close"]
+        valid = close == close
+        if not valid.all():
+            # "nan" 填充策略下缺失的 K 线不覆盖已有价格
+            tickers, close = [t for t, ok in zip(tickers, valid) if ok], close[valid]
+        prices = close.tolist()
+        positions, latest_prices = self.positions, self.latest_prices
+        delta = 0.0
+        for ticker, price in zip(tickers, prices):
+            quantity = positions.get(ticker)
+            if quantity:
+                delta += quantity * (price - latest_prices.get(ticker, 0.0))
+        self._market_value += delta
+        latest_prices.update(zip(tickers, prices))
+        self.price_timestamp = event.timestamp
 
     def on_position_event(self, event: PositionEvent):
         """
         处理头寸事件，在每次头寸更新后重新计算风险。
         """
+        old_positions = self.positions
         self.positions = event.positions
+        if event.ticker is None:
+            self._market_value = self._recalculate_market_value()
+        else:
+            ticker = event.ticker
+            change = self.positions.get(ticker, 0.0) - old_positions.get(ticker, 0.0)
+            self._market_value += change * self.latest_prices.get(ticker, 0.0)
         # 在成交后，需要确保最新价格可用，如果还没有市场数据，则不进行计算
         if not self.latest_prices:
             return
             
         total_equity = self.calculate_total_equity()
         if total_equity > self.equity_limit:
-            print(f"[RiskManager] 警告: 投资组合总市值 {total_equity:.2f} 已超过风险限额 {self.equity_limit:.2f}!")
+            logger.warning("投资组合总市值 %.2f 已超过风险限额 %.2f!", total_equity, self.equity_limit)
 
     def calculate_total_equity(self) -> float:
         """
-        计算投资组合的总市值。
+        返回投资组合的总市值。
+
+        市值在每次价格更新和头寸变化时按单个 ticker 的差额增量更新，这里是 O(1)。
+        """
+        return self._market_value
+
+    def _recalculate_market_value(self) -> float:
+        """
+        遍历全部持仓重新计算总市值，用于无法增量更新的头寸事件。
         """
         total_equity = 0.0
         for ticker, position in self.positions.items():
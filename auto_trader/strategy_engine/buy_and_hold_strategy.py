@@ -1,13 +1,22 @@
+import logging
+from typing import TYPE_CHECKING
+
 import numpy as np
 from ..common.event import SignalEvent, EventType
+from .indicators import IndicatorRegistry, SMA
 from .strategy import Strategy
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
 class MovingAverageCrossoverStrategy(Strategy):
     """
     一个简单的移动平均线交叉策略。
     当短期简单移动平均线（SMA）上穿长期简单移动平均线时，生成买入信号。
     """
-    def __init__(self, bars, short_window=10, long_window=30):
+    def __init__(self, bars, short_window=10, long_window=30, indicators=None, tickers=None, timeframe=None):
         """
         初始化移动平均线交叉策略。
 
@@ -15,29 +24,50 @@ class MovingAverageCrossoverStrategy(Strategy):
         bars (HistoricCSVDataHandler): 数据处理器，用于访问价格数据。
         short_window (int): 短期移动平均线的周期。
         long_window (int): 长期移动平均线的周期。
+        indicators (IndicatorRegistry): 共享的指标注册表，多个策略传入同一个实例时
+            相同参数的均线只计算一次。默认为该策略单独创建一个。
+        tickers (Iterable[str]): 只交易这些 ticker，默认全部。
+        timeframe (str): 在这个周期的 K 线上计算均线（例如 "15m"），此时 bars 应为
+            BarAggregator.bars(timeframe)。默认使用数据处理器的原始 K 线。
         """
         self.bars = bars
         self.short_window = short_window
         self.long_window = long_window
-        self.bought = False  # 跟踪是否已经买入
+        self.lookback = long_window
+        self.indicators = indicators if indicators is not None else IndicatorRegistry(bars)
+        self.tickers = frozenset(tickers) if tickers is not None else None
+        self.timeframe = timeframe
+        self.bought = set()  # 已经买入过的 ticker，每个 ticker 只买入一次
 
     def calculate_signals(self, event):
         """
         计算信号事件。
         """
-        if event.event_type == EventType.MARKET:
+        if event.event_type in (EventType.MARKET, EventType.BAR) and event.ticker not in self.bought:
             ticker = event.ticker
-            # 获取最新的 `long_window` 条数据
-            close_prices = self.bars.get_latest_bars_values(ticker, "close", self.long_window)
-
-            if len(close_prices) >= self.long_window and not self.bought:
-                short_sma = np.mean(close_prices[-self.short_window:])
-                long_sma = np.mean(close_prices)
+            # 增量更新的短期/长期均线，每根 K 线 O(1)
+            short_sma = self.indicators.get(SMA, ticker, window=self.short_window)
+            long_sma = self.indicators.get(SMA, ticker, window=self.long_window)
 
+            if long_sma.ready and short_sma.value >= long_sma.value:
                 # 检查金叉
-                if short_sma >= long_sma:
-                    print(f"交叉信号：短期SMA={short_sma:.2f}, 长期SMA={long_sma:.2f}")
-                    signal = SignalEvent(ticker, "BUY", 100)  # 创建买入信号
-                    self.bought = True # 标记为已买入，避免重复信号
-                    return signal
-        return None
\ No newline at end of file
+                logger.debug("交叉信号：短期SMA=%.2f, 长期SMA=%.2f", short_sma.value, long_sma.value)
+                signal = SignalEvent(ticker, "BUY", event.price)  # 以当前收盘价创建买入信号
+                self.bought.add(ticker)  # 标记为已买入，避免重复信号
+                return signal
+        return None
+
+    def vectorized_signals(self, df: "pd.DataFrame") -> "pd.Series":
+        """
+        向量化计算信号：在长期均线就绪后，第一次出现短期 SMA >= 长期 SMA 的 K 线上买入。
+        与事件驱动模式一样，每个 ticker 只买入一次。
+        """
+        import pandas as pd
+        short_sma = self.feature(df, "sma", window=self.short_window)
+        long_sma = self.feature(df, "sma", window=self.long_window)
+        # 均线未就绪时为 NaN，比较结果为 False
+        crossed = short_sma >= long_sma
+        signals = np.zeros(len(df), dtype=np.int8)
+        if crossed.any():
+            signals[np.argmax(crossed)] = 1
+        return pd.Series(signals, index=df.index)
\ No newline at end of file
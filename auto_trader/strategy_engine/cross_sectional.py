@@ -0,0 +1,75 @@
+import numpy as np
+
+from ..common.event import SignalEvent
+from .strategy import Strategy
+
+
+class CrossSectionalMomentumStrategy(Strategy):
+    """
+    截面动量策略：每个时间步按过去 lookback 步的收益率给 tickers 排名，买入排名
+    前 top_n 的 ticker，跌出前 top_n 时卖出。
+
+    整个截面在 calculate_signals_batch() 中一次向量化计算：收盘价保存在
+    (lookback + 1, ticker 数) 的环形矩阵中，ticker 通过 searchsorted 映射到列，
+    排名是一次 argsort，每个时间步的 Python 开销与 ticker 数量无关。
+    需要数据处理器以 emit_batches=True 发布 MarketBatchEvent（requires_batches）：
+    逐个 ticker 到达的 MarketEvent 无法确定一个时间步何时结束，一次调仓又会产生
+    多个信号，因此不支持 calculate_signals()。
+    """
+
+    requires_batches = True
+
+    def __init__(self, tickers, lookback: int = 20, top_n: int = 1):
+        """
+        Args:
+            tickers (Iterable[str]): 参与排名的 ticker。
+            lookback (int): 计算动量的步数。
+            top_n (int): 持有的 ticker 数量。
+        """
+        if lookback < 1 or top_n < 1:
+            raise ValueError("lookback 和 top_n 必须至少为 1")
+        self.tickers = frozenset(tickers)
+        self.lookback = lookback
+        self.top_n = top_n
+        self._names = np.array(sorted(self.tickers), dtype=object)
+        self._closes = np.full((lookback + 1, len(self._names)), np.nan)
+        self._count = 0
+        self.held = np.zeros(len(self._names), dtype=bool)
+
+    def calculate_signals(self, event):
+        raise TypeError(f"{type(self).__name__} 只能处理 MarketBatchEvent，"
+                        f"收到了 {event.ticker} 的单个 MarketEvent；请以 emit_batches=True 创建数据处理器")
+
+    def calculate_signals_batch(self, timestamp: int, arrays: dict) -> list[SignalEvent]:
+        closes = self._closes
+        rows = len(closes)
+        row = self._count % rows
+        # 本步没有 K 线的 ticker 沿用上一步的收盘价
+        closes[row] = closes[row - 1]
+        close = arrays["close"]
+        valid = close == close
+        closes[row, np.searchsorted(self._names, arrays["ticker"][valid])] = close[valid]
+        self._count += 1
+        if self._count < rows:
+            return []
+
+        momentum = closes[row] / closes[self._count % rows] - 1.0
+        ranked = np.argsort(-np.nan_to_num(momentum, nan=-np.inf), kind="stable")
+        target = np.zeros(len(self._names), dtype=bool)
+        top = ranked[:self.top_n]
+        target[top[momentum[top] == momentum[top]]] = True
+
+        signals = []
+        for direction, changed in (("SELL", self.held & ~target), ("BUY", target & ~self.held)):
+            for i in np.flatnonzero(changed):
+                signals.append(SignalEvent(self._names[i], direction, float(closes[row, i])))
+        self.held = target
+        return signals
+
+    def get_state(self) -> dict:
+        return {"closes": self._closes.copy(), "count": self._count, "held": self.held.copy()}
+
+    def set_state(self, state: dict):
+        self._closes = state["closes"].copy()
+        self._count = state["count"]
+        self.held = state["held"].copy()
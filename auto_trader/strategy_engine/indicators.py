@@ -0,0 +1,488 @@
+import copy
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+
+class Indicator(ABC):
+    """
+    流式指标的抽象基类。
+
+    每个指标每根 K 线只喂一次数据，`update()` 的开销是 O(1)（滚动最值为均摊 O(1)），
+    不会在每根 K 线上重新扫描整个窗口。`fields` 声明了 `update()` 需要的 K 线字段，
+    由 IndicatorRegistry 按顺序传入。`feature` 是数值相同的全历史特征名
+    （见 data_storage.feature_cache.FEATURES），数据处理器配置了特征缓存时
+    IndicatorRegistry 直接读取缓存中的序列，不再逐根 K 线计算。
+    """
+
+    fields = ("close",)
+    feature = None
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window 必须至少为 1")
+        self.window = window
+        self.count = 0
+
+    @abstractmethod
+    def update(self, *values: float):
+        """
+        用一根新 K 线更新指标状态。
+        """
+        raise NotImplementedError("应该在子类中实现 update() 方法")
+
+    @abstractmethod
+    def reset(self):
+        """
+        清空指标状态。
+        """
+        raise NotImplementedError("应该在子类中实现 reset() 方法")
+
+    def get_state(self) -> dict:
+        """
+        返回指标内部状态的副本，用于检查点；默认复制实例的全部属性。
+        """
+        return copy.deepcopy(vars(self))
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态。
+        """
+        vars(self).update(copy.deepcopy(state))
+
+    @property
+    def ready(self) -> bool:
+        """
+        是否已经积累了足够的数据。
+        """
+        return self.count >= self.window
+
+    @property
+    @abstractmethod
+    def value(self) -> float:
+        """
+        指标的当前值，数据不足时为 NaN。
+        """
+        raise NotImplementedError("应该在子类中实现 value 属性")
+
+
+class SMA(Indicator):
+    """
+    简单移动平均线，维护窗口内的滚动和。
+    """
+
+    feature = "sma"
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._values = deque(maxlen=self.window)
+        self._sum = 0.0
+
+    def update(self, value: float):
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(value)
+        self._sum += value
+        self.count += 1
+
+    @property
+    def value(self) -> float:
+        if not self.ready:
+            return math.nan
+        return self._sum / self.window
+
+
+class EMA(Indicator):
+    """
+    指数移动平均线，alpha = 2 / (window + 1)，以第一个值作为初值
+    （与 pandas `ewm(span=window, adjust=False)` 一致）。
+    """
+
+    feature = "ema"
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.alpha = 2.0 / (window + 1)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._ema = math.nan
+
+    def update(self, value: float):
+        if self.count == 0:
+            self._ema = value
+        else:
+            self._ema += self.alpha * (value - self._ema)
+        self.count += 1
+
+    @property
+    def value(self) -> float:
+        return self._ema if self.ready else math.nan
+
+
+class RollingStd(Indicator):
+    """
+    滚动方差/标准差，使用可删除旧值的 Welford 算法，数值上比维护平方和稳定。
+    """
+
+    def __init__(self, window: int, ddof: int = 1):
+        super().__init__(window)
+        if window <= ddof:
+            raise ValueError("window 必须大于 ddof")
+        self.ddof = ddof
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._values = deque(maxlen=self.window)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float):
+        values = self._values
+        if len(values) == self.window:
+            old = values[0]
+            old_mean = self._mean
+            self._mean = old_mean + (value - old) / self.window
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+            if self._m2 < 0.0:
+                self._m2 = 0.0
+        else:
+            n = len(values) + 1
+            delta = value - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (value - self._mean)
+        values.append(value)
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.ready else math.nan
+
+    @property
+    def variance(self) -> float:
+        if not self.ready:
+            return math.nan
+        return self._m2 / (self.window - self.ddof)
+
+    @property
+    def value(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class _RollingExtreme(Indicator):
+    """
+    基于单调双端队列的滚动最值，队列中保存 (序号, 值)。
+    """
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._deque = deque()
+
+    @staticmethod
+    @abstractmethod
+    def _dominates(new: float, old: float) -> bool:
+        raise NotImplementedError
+
+    def update(self, value: float):
+        dq = self._deque
+        while dq and self._dominates(value, dq[-1][1]):
+            dq.pop()
+        dq.append((self.count, value))
+        if dq[0][0] <= self.count - self.window:
+            dq.popleft()
+        self.count += 1
+
+    @property
+    def value(self) -> float:
+        return self._deque[0][1] if self.ready else math.nan
+
+
+class RollingMax(_RollingExtreme):
+    """
+    滚动最大值。
+    """
+
+    feature = "rolling_max"
+
+    @staticmethod
+    def _dominates(new, old):
+        return new >= old
+
+
+class RollingMin(_RollingExtreme):
+    """
+    滚动最小值。
+    """
+
+    feature = "rolling_min"
+
+    @staticmethod
+    def _dominates(new, old):
+        return new <= old
+
+
+class RSI(Indicator):
+    """
+    Wilder 相对强弱指标，涨跌幅用 alpha = 1 / window 的指数平均
+    （与 pandas `ewm(alpha=1/window, adjust=False)` 一致）。需要 window + 1 个收盘价。
+    """
+
+    def __init__(self, window: int = 14):
+        super().__init__(window)
+        self.alpha = 1.0 / window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._prev = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def update(self, value: float):
+        if self._prev is not None:
+            change = value - self._prev
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if self.count == 0:
+                self._avg_gain = gain
+                self._avg_loss = loss
+            else:
+                self._avg_gain += self.alpha * (gain - self._avg_gain)
+                self._avg_loss += self.alpha * (loss - self._avg_loss)
+            self.count += 1
+        self._prev = value
+
+    @property
+    def value(self) -> float:
+        if not self.ready:
+            return math.nan
+        if self._avg_loss == 0.0:
+            return 100.0 if self._avg_gain > 0.0 else math.nan
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+
+class ATR(Indicator):
+    """
+    Wilder 平均真实波幅。第一根 K 线的真实波幅取 high - low。
+    """
+
+    fields = ("high", "low", "close")
+
+    def __init__(self, window: int = 14):
+        super().__init__(window)
+        self.alpha = 1.0 / window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._prev_close = None
+        self._atr = math.nan
+
+    def update(self, high: float, low: float, close: float):
+        if self._prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        if self.count == 0:
+            self._atr = true_range
+        else:
+            self._atr += self.alpha * (true_range - self._atr)
+        self._prev_close = close
+        self.count += 1
+
+    @property
+    def value(self) -> float:
+        return self._atr if self.ready else math.nan
+
+
+class BollingerBands(Indicator):
+    """
+    布林带：中轨为 SMA，上下轨为中轨 ± num_std 倍总体标准差。`value` 返回中轨。
+    """
+
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        super().__init__(window)
+        self.num_std = num_std
+        self._std = RollingStd(window, ddof=0)
+
+    def reset(self):
+        self.count = 0
+        self._std.reset()
+
+    def update(self, value: float):
+        self._std.update(value)
+        self.count += 1
+
+    @property
+    def middle(self) -> float:
+        return self._std.mean
+
+    @property
+    def upper(self) -> float:
+        return self._std.mean + self.num_std * self._std.value
+
+    @property
+    def lower(self) -> float:
+        return self._std.mean - self.num_std * self._std.value
+
+    @property
+    def value(self) -> float:
+        return self.middle
+
+
+class SeriesIndicator(Indicator):
+    """
+    由预先算好的全历史序列支撑的只读指标，由 IndicatorRegistry 从特征缓存创建。
+
+    不需要逐根 K 线喂数据：`count` 是数据处理器已发布的该 ticker 的 K 线数量，
+    当前值直接取序列中对应的位置。
+    """
+
+    def __init__(self, series, window: int, bars, ticker: str):
+        self.window = window
+        self.series = series
+        self.bars = bars
+        self.ticker = ticker
+
+    @property
+    def count(self) -> int:
+        return self.bars.get_bar_count(self.ticker)
+
+    def update(self, *values: float):
+        pass
+
+    def reset(self):
+        pass
+
+    @property
+    def value(self) -> float:
+        count = self.count
+        return float(self.series[count - 1]) if count else math.nan
+
+
+class IndicatorRegistry:
+    """
+    指标注册表，按 (指标类型, ticker, 参数) 共享指标实例。
+
+    多个策略请求同一个指标时拿到的是同一个对象，每根新 K 线只喂一次：
+    每次 `get()` 都会先把数据处理器中该 ticker 新增的 K 线（通常只有一根）
+    喂给该 ticker 的所有指标。新建的指标用数据处理器中保留的历史预热，
+    因此数据处理器的历史深度应不小于指标窗口（见 Strategy.lookback）。
+
+    数据处理器提供 `feature_series()`（例如配置了特征缓存的 HistoricCSVDataHandler）时，
+    声明了 `feature` 的指标改为读取缓存中的全历史序列（SeriesIndicator），
+    同一份数据上的不同回测、不同参数组合共享计算结果。
+    """
+
+    def __init__(self, bars):
+        """
+        Args:
+            bars (HistoricCSVDataHandler): 提供 get_bar_count() 和
+                get_latest_bars_values() 的数据处理器。
+        """
+        self.bars = bars
+        self._indicators = {}
+        self._by_ticker = {}
+        self._synced = {}
+
+    def get(self, indicator_cls: type, ticker: str, **params) -> Indicator:
+        """
+        返回已同步到最新 K 线的共享指标实例，不存在时创建并预热。
+        """
+        self._sync(ticker)
+        key = (indicator_cls, ticker, tuple(sorted(params.items())))
+        indicator = self._indicators.get(key)
+        if indicator is None:
+            indicator = self._from_feature(indicator_cls, ticker, params)
+            if indicator is None:
+                indicator = indicator_cls(**params)
+                self._feed([indicator], ticker, self._synced[ticker])
+                self._by_ticker.setdefault(ticker, []).append(indicator)
+            self._indicators[key] = indicator
+        return indicator
+
+    def _from_feature(self, indicator_cls: type, ticker: str, params: dict):
+        """
+        从数据处理器的特征缓存创建 SeriesIndicator，不支持时返回 None。
+        """
+        feature_series = getattr(self.bars, "feature_series", None)
+        if indicator_cls.feature is None or feature_series is None:
+            return None
+        series = feature_series(ticker, indicator_cls.feature, **params)
+        if series is None:
+            return None
+        return SeriesIndicator(series, params["window"], self.bars, ticker)
+
+    def get_state(self) -> dict:
+        """
+        返回全部指标的状态以及每个 ticker 已同步的 K 线数量。
+        SeriesIndicator 没有自己的状态，不保存，恢复后由 get() 重新创建。
+        """
+        return {
+            "synced": dict(self._synced),
+            "indicators": [(cls, ticker, params, indicator.get_state())
+                           for (cls, ticker, params), indicator in self._indicators.items()
+                           if not isinstance(indicator, SeriesIndicator)],
+        }
+
+    def set_state(self, state: dict):
+        """
+        按 get_state() 的结果重建指标实例。恢复后数据处理器中的 K 线数量应与
+        保存时一致（同时恢复数据处理器的检查点），否则下一次 get() 会把差额当作新 K 线。
+        """
+        self._indicators = {}
+        self._by_ticker = {}
+        self._synced = dict(state["synced"])
+        for cls, ticker, params, indicator_state in state["indicators"]:
+            indicator = cls(**dict(params))
+            indicator.set_state(indicator_state)
+            self._indicators[(cls, ticker, params)] = indicator
+            self._by_ticker.setdefault(ticker, []).append(indicator)
+
+    def _sync(self, ticker: str):
+        """
+        把 ticker 自上次同步以来的新 K 线喂给它的所有指标。
+        """
+        count = self.bars.get_bar_count(ticker)
+        new_bars = count - self._synced.get(ticker, 0)
+        self._synced[ticker] = count
+        indicators = self._by_ticker.get(ticker)
+        if new_bars <= 0 or not indicators:
+            return
+        retained = len(self.bars.get_latest_bars_values(ticker, "close", new_bars))
+        if retained < new_bars:
+            # 错过的 K 线已不在历史缓冲区中，只能用保留的历史重新预热
+            for indicator in indicators:
+                indicator.reset()
+        self._feed(indicators, ticker, retained)
+
+    def _feed(self, indicators: list, ticker: str, n: int):
+        """
+        把最近 n 根 K 线依次喂给指定的指标。
+        """
+        if n <= 0:
+            return
+        columns = {}
+        for indicator in indicators:
+            inputs = []
+            for field in indicator.fields:
+                if field not in columns:
+                    columns[field] = self.bars.get_latest_bars_values(ticker, field, n).tolist()
+                inputs.append(columns[field])
+            update = indicator.update
+            if len(inputs) == 1:
+                for value in inputs[0]:
+                    update(value)
+            else:
+                for values in zip(*inputs):
+                    update(*values)
@@ -1,12 +1,44 @@
+import copy
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from ..common.event import SignalEvent, MarketEvent
 
+if TYPE_CHECKING:
+    # 只用于类型注解；pandas 在真正用到时才导入，不拖慢进程启动
+    import numpy as np
+    import pandas as pd
+
+# 默认检查点只保存这些类型的属性，数据处理器、指标注册表等组件由各自的检查点负责
+_STATE_TYPES = (bool, int, float, str, type(None), list, tuple, dict, set)
+
 class Strategy(ABC):
     """
     Strategy 是一个抽象基类，提供了所有后续策略类必须实现的接口。
+
+    策略如果通过 `self.bars` 读取历史数据，应当把所需的历史窗口长度声明在
+    `lookback` 上，StrategyEngine 会据此让数据处理器保留足够的 K 线。
+    只交易部分 ticker 的策略应在 `tickers` 上声明，StrategyEngine 按此路由行情，
+    不再把每根 K 线交给每个策略自己过滤。
     """
 
+    # 计算信号所需的最大历史 K 线数量
+    lookback: int = 1
+
+    # 策略关心的 ticker 集合，StrategyEngine 只把这些 ticker 的行情交给策略；
+    # None 表示接收全部 ticker
+    tickers: Optional[frozenset] = None
+
+    # 订阅的 K 线周期（例如 "5m"、"1h"），StrategyEngine 只把 BarAggregator 发布的
+    # 该周期 BarEvent 交给策略；None 表示接收数据处理器发布的原始行情
+    timeframe: Optional[str] = None
+
+    # 只实现了 calculate_signals_batch() 的截面策略设为 True：需要数据处理器以
+    # emit_batches=True 发布 MarketBatchEvent，不能处理逐个 ticker 的 MarketEvent
+    requires_batches: bool = False
+
+    # VectorizedBacktest 传入 FeatureCache 时绑定的特征访问器（FrameFeatures），见 feature()
+    features = None
+
     @abstractmethod
     def calculate_signals(self, event: MarketEvent) -> Optional[SignalEvent]:
         """
@@ -18,4 +50,87 @@ class Strategy(ABC):
         Returns:
             如果生成了交易信号，则返回 SignalEvent 对象，否则返回 None。
         """
-        raise NotImplementedError("应该在子类中实现 calculate_signals() 方法")
\ No newline at end of file
+        raise NotImplementedError("应该在子类中实现 calculate_signals() 方法")
+
+    def calculate_signals_batch(self, timestamp: int, arrays: dict) -> list[SignalEvent]:
+        """
+        根据一个时间步内多个 ticker 的 K 线（MarketBatchEvent.arrays）计算交易信号。
+
+        默认实现逐个 ticker 构造 MarketEvent 并调用 calculate_signals()；
+        截面策略可以重写此方法，一次向量化地处理所有 ticker。
+
+        Args:
+            timestamp: 该时间步的时间戳（纳秒）。
+            arrays: "ticker" 及 OHLCV 字段到等长数组的映射；声明了 `tickers` 的策略
+                只会收到其中的 ticker。
+
+        Returns:
+            生成的 SignalEvent 列表。
+        """
+        signals = []
+        columns = [arrays[field].tolist() for field in ("open", "high", "low", "close", "volume")]
+        for ticker, open_, high, low, close, volume in zip(arrays["ticker"], *columns):
+            if close != close:
+                # 对齐行情中没有 K 线的 ticker（"nan" 填充策略）
+                continue
+            signal = self.calculate_signals(MarketEvent(ticker, close, timestamp, open_, high, low, volume))
+            if signal:
+                signals.append(signal)
+        return signals
+
+    def get_state(self) -> dict:
+        """
+        返回策略需要跨重启保留的状态（例如 `bought` 标记），用于检查点。
+
+        默认保存实例上所有取值为标量或内置容器的属性；`bars`、`indicators`
+        等组件不在其中。状态保存在其他对象里的策略应重写此方法和 set_state()。
+
+        Returns:
+            属性名到取值副本的映射。
+        """
+        return {name: copy.deepcopy(value) for name, value in vars(self).items()
+                if isinstance(value, _STATE_TYPES)}
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态。
+
+        Args:
+            state: get_state() 的返回值。
+        """
+        for name, value in state.items():
+            setattr(self, name, copy.deepcopy(value))
+
+    def vectorized_signals(self, df: "pd.DataFrame") -> "pd.Series":
+        """
+        可选钩子：一次性基于完整历史计算单个 ticker 的交易信号，供向量化回测引擎使用。
+
+        Args:
+            df: 单个 ticker 的完整 OHLCV 数据（即 HistoricCSVDataHandler.ticker_data 中的 DataFrame）。
+
+        Returns:
+            与 df.index 对齐的信号序列：1 为买入，-1 为卖出，0 为无操作。
+            信号出现的位置应与事件驱动模式下 calculate_signals() 返回信号的 K 线一致。
+        """
+        raise NotImplementedError(f"{type(self).__name__} 没有实现 vectorized_signals()，无法使用向量化回测")
+
+    def feature(self, df: "pd.DataFrame", name: str, **params) -> "np.ndarray":
+        """
+        在 vectorized_signals() 中读取 df 上的特征序列（见 data_storage.feature_cache.FEATURES）。
+
+        向量化回测为当前数据绑定了特征缓存时从缓存读取，不同参数组合、不同回测之间
+        共享相同的序列；否则直接计算。
+
+        Args:
+            df: vectorized_signals() 收到的数据。
+            name: 特征名，例如 "sma"。
+            params: 特征参数，例如 window=20。
+
+        Returns:
+            与 df 的 K 线一一对应的 float64 数组（可能只读）。
+        """
+        features = self.features
+        if features is not None and features.df is df:
+            return features.get(name, **params)
+        from ..data_storage.feature_cache import compute_feature
+        return compute_feature(df, name, **params)
@@ -1,26 +1,144 @@
-from ..common.event import EventType, MarketEvent, SignalEvent, EventBus
+import time
+
+import numpy as np
+
+from ..common.event import BarEvent, EventType, MarketEvent, MarketBatchEvent, SignalEvent, EventBus
+from .indicators import IndicatorRegistry
 from .strategy import Strategy
 
 class StrategyEngine:
     """
     策略引擎，负责管理和执行所有策略。
+
+    策略通过 `tickers` 声明自己关心的 ticker，引擎在构造时建好 ticker -> 策略
+    的路由表：每个 MarketEvent 只交给关心该 ticker 的策略（加上 tickers 为 None、
+    接收全部行情的策略），每根 K 线的开销与策略总数无关。MarketBatchEvent 对每个
+    策略只调用一次 calculate_signals_batch()，传入的截面已按其 tickers 过滤。
+
+    设置了 `timeframe` 的策略不接收原始行情，而是接收 BarAggregator 在该周期的
+    K 线完成时发布的 BarEvent，路由方式相同。
+
+    提供 Instrumentation（或事件总线带有 Instrumentation）时，每个策略每次调用的
+    耗时记录在 "strategy.<策略名>" 直方图中，timings() 按总耗时从高到低汇总。
     """
-    def __init__(self, strategies: list[Strategy]):
+    def __init__(self, strategies: list[Strategy], event_bus: EventBus, instrumentation=None):
         """
         初始化策略引擎。
 
         Args:
             strategies (list[Strategy]): 要管理的策略列表。
+            event_bus (EventBus): 订阅市场数据并发布信号所用的事件总线。
+            instrumentation (Instrumentation): 记录各策略耗时的直方图集合，
+                默认使用 event_bus.instrumentation；两者都没有时不计时。
         """
         self._strategies = strategies
-        self._event_bus = EventBus()
+        self._event_bus = event_bus
+        if instrumentation is None:
+            instrumentation = getattr(event_bus, "instrumentation", None)
+        self.instrumentation = instrumentation
+        self._histograms = None
+        if instrumentation is not None:
+            self._histograms = [instrumentation.histogram(f"strategy.{name}") for name in self.strategy_names()]
+        self._build_routes()
+        self._register_lookbacks()
         self._subscribe_to_market_data()
 
+    def strategy_names(self) -> list[str]:
+        """
+        各策略的名字（类名），同一个类的多个实例依次加上 "#2"、"#3" 后缀。
+        """
+        names, seen = [], {}
+        for strategy in self._strategies:
+            name = type(strategy).__name__
+            seen[name] = seen.get(name, 0) + 1
+            names.append(name if seen[name] == 1 else f"{name}#{seen[name]}")
+        return names
+
+    def _build_routes(self):
+        """
+        按各策略的 timeframe 和 tickers 建立 timeframe -> ticker -> 策略下标的路由表，
+        timeframe 为 None 的策略接收数据处理器发布的原始行情。
+        """
+        strategies = self._strategies
+        self._routes, self._universal = {}, {}
+        for timeframe in {strategy.timeframe for strategy in strategies}:
+            members = [i for i, strategy in enumerate(strategies) if strategy.timeframe == timeframe]
+            universal = tuple(i for i in members if strategies[i].tickers is None)
+            routes = {}
+            for i in members:
+                for ticker in strategies[i].tickers or ():
+                    routes.setdefault(ticker, set()).add(i)
+            # 保持策略在列表中的顺序，信号的发布顺序与不路由时一致
+            self._routes[timeframe] = {ticker: tuple(sorted(indices.union(universal)))
+                                       for ticker, indices in routes.items()}
+            self._universal[timeframe] = universal
+        self._market_routes = self._routes.get(None, {})
+        self._market_universal = self._universal.get(None, ())
+        self._universes = [None if strategy.tickers is None else np.array(sorted(strategy.tickers), dtype=object)
+                           for strategy in strategies]
+        self._batch_tickers = None
+        self._batch_masks = None
+
+    def strategies_for(self, ticker: str, timeframe: str = None) -> list[Strategy]:
+        """
+        返回会收到 ticker 行情（timeframe 为 None）或 ticker 的 timeframe K 线的策略。
+        """
+        routes, universal = self._routes.get(timeframe, {}), self._universal.get(timeframe, ())
+        return [self._strategies[i] for i in routes.get(ticker, universal)]
+
+    def _register_lookbacks(self):
+        """
+        按各策略声明的 lookback 设置数据处理器需要保留的历史深度。
+        """
+        for strategy in self._strategies:
+            # 数据处理器，或 BarAggregator.bars() 提供的某个周期的 K 线
+            require_history = getattr(getattr(strategy, "bars", None), "require_history", None)
+            if callable(require_history):
+                require_history(strategy.lookback)
+
+    def _registries(self) -> list:
+        """
+        各策略使用的 IndicatorRegistry，多个策略共享的实例只出现一次。
+        """
+        registries = {}
+        for strategy in self._strategies:
+            registry = getattr(strategy, "indicators", None)
+            if isinstance(registry, IndicatorRegistry):
+                registries.setdefault(id(registry), registry)
+        return list(registries.values())
+
+    def get_state(self) -> dict:
+        """
+        返回所有策略及其指标注册表的状态，用于检查点。
+        """
+        return {
+            "strategies": [(type(strategy).__name__, strategy.get_state()) for strategy in self._strategies],
+            "indicators": [registry.get_state() for registry in self._registries()],
+        }
+
+    def set_state(self, state: dict):
+        """
+        恢复 get_state() 保存的状态，策略列表须与保存时相同（按顺序一一对应）。
+        """
+        names = [name for name, _ in state["strategies"]]
+        if names != [type(strategy).__name__ for strategy in self._strategies]:
+            raise ValueError(f"检查点中的策略 {names} 与当前策略不一致")
+        registries = self._registries()
+        if len(registries) != len(state["indicators"]):
+            raise ValueError("检查点中的指标注册表数量与当前策略不一致")
+        for strategy, (_, strategy_state) in zip(self._strategies, state["strategies"]):
+            strategy.set_state(strategy_state)
+        for registry, registry_state in zip(registries, state["indicators"]):
+            registry.set_state(registry_state)
+
     def _subscribe_to_market_data(self):
         """
         订阅市场数据事件。
         """
         self._event_bus.subscribe(EventType.MARKET, self.on_market_event)
+        self._event_bus.subscribe(EventType.MARKET_BATCH, self.on_market_batch)
+        if any(timeframe is not None for timeframe in self._routes):
+            self._event_bus.subscribe(EventType.BAR, self.on_bar)
 
     def on_market_event(self, event: MarketEvent):
         """
@@ -29,7 +147,89 @@ class StrategyEngine:
         Args:
             event (MarketEvent): 市场数据事件。
         """
-        for strategy in self._strategies:
-            signal_event = strategy.calculate_signals(event)
+        self._dispatch(self._market_routes.get(event.ticker, self._market_universal), event)
+
+    def on_bar(self, event: BarEvent):
+        """
+        处理 BarAggregator 发布的高周期 K 线，只交给订阅了该周期的策略。
+
+        Args:
+            event (BarEvent): 刚完成的一根高周期 K 线。
+        """
+        routes = self._routes.get(event.timeframe)
+        if routes is not None:
+            self._dispatch(routes.get(event.ticker, self._universal[event.timeframe]), event)
+
+    def _dispatch(self, indices: tuple, event: MarketEvent):
+        """
+        把 event 依次交给 indices 中的策略并发布它们返回的信号。
+        """
+        strategies = self._strategies
+        histograms = self._histograms
+        for i in indices:
+            if histograms is None:
+                signal_event = strategies[i].calculate_signals(event)
+            else:
+                started = time.perf_counter_ns()
+                signal_event = strategies[i].calculate_signals(event)
+                histograms[i].record(time.perf_counter_ns() - started)
             if signal_event:
-                self._event_bus.publish(signal_event)
\ No newline at end of file
+                self._event_bus.publish(signal_event)
+
+    def on_market_batch(self, event: MarketBatchEvent):
+        """
+        处理批量市场数据事件，每个策略对整个截面只调用一次。
+
+        Args:
+            event (MarketBatchEvent): 一个时间步内所有 ticker 的 K 线。
+        """
+        histograms = self._histograms
+        for i, (strategy, arrays) in enumerate(zip(self._strategies, self._select(event.arrays))):
+            if arrays is None:
+                continue
+            if histograms is None:
+                signals = strategy.calculate_signals_batch(event.timestamp, arrays)
+            else:
+                started = time.perf_counter_ns()
+                signals = strategy.calculate_signals_batch(event.timestamp, arrays)
+                histograms[i].record(time.perf_counter_ns() - started)
+            for signal_event in signals:
+                self._event_bus.publish(signal_event)
+
+    def _select(self, arrays: dict) -> list:
+        """
+        按各策略的 tickers 过滤截面，返回与策略一一对应的 arrays；不包含任何
+        相关 ticker 的策略和订阅了高周期 K 线的策略对应 None。同一个 ticker 数组（例如 "nan" 填充策略下
+        每个时间步共用的全部 ticker）的过滤掩码只计算一次。
+        """
+        tickers = arrays["ticker"]
+        if tickers is not self._batch_tickers:
+            self._batch_tickers = tickers
+            self._batch_masks = [
+                False if strategy.timeframe is not None else None if universe is None else np.isin(tickers, universe)
+                for strategy, universe in zip(self._strategies, self._universes)
+            ]
+        selected = []
+        for mask in self._batch_masks:
+            if mask is False:
+                # 订阅高周期 K 线的策略不接收原始行情
+                selected.append(None)
+            elif mask is None or mask.all():
+                selected.append(arrays)
+            elif mask.any():
+                selected.append({field: column[mask] for field, column in arrays.items()})
+            else:
+                selected.append(None)
+        return selected
+
+    def timings(self) -> dict:
+        """
+        各策略的耗时统计（LatencyHistogram.snapshot() 加上总耗时 total_ms），
+        按总耗时从高到低排列；没有 Instrumentation 时返回空字典。
+        """
+        if self._histograms is None:
+            return {}
+        stats = {}
+        for name, histogram in zip(self.strategy_names(), self._histograms):
+            stats[name] = dict(histogram.snapshot(), total_ms=histogram.total / 1e6)
+        return dict(sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True))
@@ -0,0 +1,129 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.common.event import EventBus, EventType, FillEvent
+from auto_trader.data_handler.aligned_feed import AlignedBarFeed
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.risk_manager import RiskManager
+
+
+def _frame(dates, closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "open": closes - 0.5, "high": closes + 1, "low": closes - 1, "close": closes, "volume": 100.0,
+    }, index=pd.DatetimeIndex(dates, name="datetime"))
+
+
+def _frames():
+    # BBB skips the 3rd, CCC only starts trading on the 3rd
+    return {
+        "AAA": _frame(["2023-01-02", "2023-01-03", "2023-01-04"], [10, 11, 12]),
+        "BBB": _frame(["2023-01-02", "2023-01-04"], [20, 22]),
+        "CCC": _frame(["2023-01-03", "2023-01-04"], [31, 32]),
+    }
+
+
+class TestAlignedBarFeed(unittest.TestCase):
+    def setUp(self):
+        self.frames = _frames()
+        self.columns = {
+            ticker: {
+                "timestamp": df.index.values.astype("datetime64[ns]").view(np.int64),
+                **{field: df[field].to_numpy() for field in df.columns},
+            }
+            for ticker, df in self.frames.items()
+        }
+
+    def test_skip_policy(self):
+        feed = AlignedBarFeed(self.columns)
+        self.assertEqual(len(feed), 3)
+        steps = [feed.step(i) for i in range(len(feed))]
+        self.assertEqual([list(arrays["ticker"]) for _, arrays in steps],
+                         [["AAA", "BBB"], ["AAA", "CCC"], ["AAA", "BBB", "CCC"]])
+        self.assertEqual(steps[1][1]["close"].tolist(), [11.0, 31.0])
+        self.assertEqual(steps[1][0], pd.Timestamp("2023-01-03").value)
+
+    def test_ffill_policy(self):
+        feed = AlignedBarFeed(self.columns, fill_policy="ffill")
+        _, arrays = feed.step(1)
+        self.assertEqual(list(arrays["ticker"]), ["AAA", "BBB", "CCC"])
+        self.assertEqual(arrays["close"].tolist(), [11.0, 20.0, 31.0])
+        # BBB's gap is a flat bar at the previous close with no volume
+        self.assertEqual([arrays[f][1] for f in ("open", "high", "low", "volume")], [20.0, 20.0, 20.0, 0.0])
+        self.assertEqual(arrays["open"][0], 10.5)
+        # CCC has not traded yet on the first step
+        self.assertEqual(list(feed.step(0)[1]["ticker"]), ["AAA", "BBB"])
+
+    def test_nan_policy(self):
+        feed = AlignedBarFeed(self.columns, fill_policy="nan")
+        _, arrays = feed.step(0)
+        self.assertEqual(list(arrays["ticker"]), ["AAA", "BBB", "CCC"])
+        self.assertTrue(np.isnan(arrays["close"][2]))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            AlignedBarFeed(self.columns, fill_policy="bfill")
+
+
+class TestAlignedHandler(unittest.TestCase):
+    def setUp(self):
+        self.frames = _frames()
+
+    def test_market_events_share_timestamp(self):
+        handler = HistoricCSVDataHandler.from_dataframes(EventBus(threaded=False), self.frames, align=True)
+        steps = []
+        while handler.continue_backtest:
+            events = handler.update_bars()
+            if events:
+                steps.append(events)
+        self.assertEqual([len(events) for events in steps], [2, 2, 3])
+        for events in steps:
+            self.assertEqual(len({e.timestamp for e in events}), 1)
+        first = steps[0][0]
+        self.assertEqual((first.ticker, first.open, first.high, first.low, first.close, first.volume),
+                         ("AAA", 9.5, 11.0, 9.0, 10.0, 100.0))
+        self.assertEqual(handler.get_bar_count("BBB"), 2)
+
+    def test_batches_give_consistent_risk_snapshots(self):
+        event_bus = EventBus(threaded=False)
+        handler = HistoricCSVDataHandler.from_dataframes(
+            event_bus, self.frames, emit_batches=True, fill_policy="ffill", history_depth=5
+        )
+        risk_manager = RiskManager(event_bus)
+        snapshots = []
+        event_bus.subscribe(EventType.MARKET_BATCH, lambda e: snapshots.append(dict(risk_manager.latest_prices)))
+        while handler.continue_backtest:
+            for event in handler.update_bars():
+                event_bus.publish(event)
+            event_bus.run_until_idle()
+        self.assertEqual(snapshots[1], {"AAA": 11.0, "BBB": 20.0, "CCC": 31.0})
+        self.assertEqual(risk_manager.price_timestamp, pd.Timestamp("2023-01-04").value)
+        # forward-filled bars are part of the history
+        self.assertEqual(handler.get_latest_bars_values("BBB", "close", 3).tolist(), [20.0, 20.0, 22.0])
+
+    def test_position_held_across_a_nan_gap(self):
+        event_bus = EventBus(threaded=False)
+        handler = HistoricCSVDataHandler.from_dataframes(event_bus, self.frames, align=True, fill_policy="nan")
+        position_manager = PositionManager(event_bus, initial_cash=1000.0)
+        risk_manager = RiskManager(event_bus)
+        event_bus.publish(FillEvent("BBB", 10, "BUY", 20.0))
+        event_bus.run_until_idle()
+        steps = []
+        while handler.continue_backtest:
+            events = handler.update_bars()
+            for event in events:
+                event_bus.publish(event)
+            event_bus.run_until_idle()
+            if events:
+                steps.append([e.ticker for e in events])
+        # BBB has no bar on the 3rd and CCC none on the 2nd, so they get no events there
+        self.assertEqual(steps, [["AAA", "BBB"], ["AAA", "CCC"], ["AAA", "BBB", "CCC"]])
+        self.assertEqual(position_manager.portfolio.equity, 1000.0 + 10 * (22.0 - 20.0))
+        self.assertTrue(np.isfinite(position_manager.portfolio.equity_curve.values).all())
+        self.assertEqual(risk_manager.latest_prices["BBB"], 22.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+import unittest
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.common.async_event_bus import AsyncEventBus
+from auto_trader.common.event import EventBus, EventType, FillEvent, MarketEvent, SignalEvent
+from auto_trader.data_handler.async_data_handler import AsyncFeedDataHandler, pump, replay
+from auto_trader.data_handler.fake_exchange import FakeExchange
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+AAPL_CSV = os.path.join(DATA_DIR, "AAPL.csv")
+
+
+class AlternatingStrategy(Strategy):
+    """Buys on every even bar and sells on every odd one."""
+    def __init__(self):
+        self.bars = 0
+
+    def calculate_signals(self, event):
+        self.bars += 1
+        return SignalEvent(event.ticker, "BUY" if self.bars % 2 else "SELL", event.price)
+
+
+def build_pipeline(event_bus):
+    StrategyEngine([AlternatingStrategy()], event_bus)
+    execution_handler = ExecutionHandler(event_bus)
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+    return PositionManager(event_bus, initial_cash=100_000.0)
+
+
+class TestAsyncEventBus(unittest.IsolatedAsyncioTestCase):
+    async def test_coroutine_and_plain_handlers_run_in_order(self):
+        bus = AsyncEventBus()
+        seen = []
+
+        async def slow(event):
+            await asyncio.sleep(0)
+            seen.append(("slow", event.price))
+            if event.price == 1.0:
+                bus.publish(FillEvent("AAPL", 1, "BUY", event.price))
+
+        bus.subscribe(EventType.MARKET, slow)
+        bus.subscribe(EventType.MARKET, lambda e: seen.append(("plain", e.price)))
+        bus.subscribe(EventType.FILL, lambda e: seen.append(("fill", e.fill_price)))
+        bus.start()
+        bus.publish(MarketEvent("AAPL", 1.0))
+        bus.publish(MarketEvent("AAPL", 2.0))
+        await bus.join()
+        await bus.stop()
+        self.assertEqual(seen, [("slow", 1.0), ("plain", 1.0), ("slow", 2.0), ("plain", 2.0), ("fill", 1.0)])
+
+    async def test_stop_is_immediate_and_keeps_queued_events(self):
+        bus = AsyncEventBus()
+        seen = []
+        release = asyncio.Event()
+
+        async def blocked(event):
+            seen.append(event.price)
+            await release.wait()
+
+        bus.subscribe(EventType.MARKET, blocked)
+        bus.start()
+        bus.publish(MarketEvent("AAPL", 1.0))
+        bus.publish(MarketEvent("AAPL", 2.0))
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        await bus.stop()
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertFalse(bus.is_running())
+        self.assertEqual(seen, [1.0])
+
+        release.set()
+        self.assertEqual(await bus.run_until_idle(), 1)
+        self.assertEqual(seen, [1.0, 2.0])
+
+    async def test_unsubscribe(self):
+        bus = AsyncEventBus()
+        seen = []
+        handler = seen.append
+        bus.subscribe(EventType.MARKET, handler)
+        bus.unsubscribe(EventType.MARKET, handler)
+        bus.publish(MarketEvent("AAPL", 1.0))
+        await bus.run_until_idle()
+        self.assertEqual(seen, [])
+        with self.assertRaises(ValueError):
+            bus.unsubscribe(EventType.MARKET, handler)
+
+    async def test_replay_matches_synchronous_backtest(self):
+        sync_bus = EventBus(threaded=False)
+        sync_positions = build_pipeline(sync_bus)
+        Backtest(sync_bus, HistoricCSVDataHandler(sync_bus, [AAPL_CSV], ["AAPL"])).run()
+
+        bus = AsyncEventBus()
+        positions = build_pipeline(bus)
+        data_handler = HistoricCSVDataHandler(EventBus(threaded=False), [AAPL_CSV], ["AAPL"])
+        bus.start()
+        published = await pump(replay(data_handler), bus, lockstep=True)
+        await bus.stop()
+
+        self.assertEqual(published, 30)
+        self.assertEqual(positions.positions, sync_positions.positions)
+        self.assertAlmostEqual(positions.portfolio.cash, sync_positions.portfolio.cash)
+
+
+class TestFakeExchange(unittest.IsolatedAsyncioTestCase):
+    async def test_feed_round_trip(self):
+        async with FakeExchange([AAPL_CSV], ["AAPL"]) as exchange:
+            bus = AsyncEventBus()
+            feed = AsyncFeedDataHandler(bus, exchange.host, exchange.port, ["AAPL"])
+            seen = []
+            bus.subscribe(EventType.MARKET, seen.append)
+            bus.start()
+            published = await pump(feed.stream(), bus)
+            await bus.join()
+            await bus.stop()
+
+        reference = HistoricCSVDataHandler(EventBus(threaded=False), [AAPL_CSV], ["AAPL"], history_depth=5)
+        expected = []
+        while reference.continue_backtest:
+            expected.extend(reference.update_bars())
+
+        self.assertEqual(published, 30)
+        self.assertFalse(feed.continue_backtest)
+        self.assertEqual([(e.timestamp, e.price, e.volume) for e in seen],
+                         [(e.timestamp, e.price, e.volume) for e in expected])
+        self.assertEqual(list(feed.get_latest_bars_values("AAPL", "close", 5)),
+                         list(reference.get_latest_bars_values("AAPL", "close", 5)))
+        # Without history_depth every received bar is kept
+        self.assertEqual(list(feed.get_latest_bars_values("AAPL", "close", 30)), [e.price for e in expected])
+        self.assertLessEqual(feed.sent_ns["AAPL"], feed.received_ns["AAPL"])
+        self.assertEqual(exchange.clients, 1)
+
+    async def test_stop_ends_the_stream_immediately(self):
+        # The exchange pauses between timestamps, so the stream is blocked on a read when stopped
+        async with FakeExchange([AAPL_CSV], ["AAPL"], interval=1.0) as exchange:
+            feed = AsyncFeedDataHandler(EventBus(threaded=False), exchange.host, exchange.port, ["AAPL"])
+            seen = []
+            first = asyncio.Event()
+
+            async def consume():
+                async for event in feed.stream():
+                    seen.append(event)
+                    first.set()
+
+            task = asyncio.create_task(consume())
+            await asyncio.wait_for(first.wait(), timeout=5)
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            feed.stop()
+            await asyncio.wait_for(task, timeout=5)
+            self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(len(seen), 1)
+        self.assertFalse(feed.continue_backtest)
+        self.assertIsNone(feed._writer)
+        self.assertEqual(feed.get_bar_count("AAPL"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.benchmarks.synthetic import generate_ohlcv, generate_universe
+from auto_trader.common.event import EventBus, EventType, MarketEvent
+from auto_trader.data_handler.bar_aggregator import BarAggregator, parse_timeframe, resample_frame
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+TIMEFRAMES = ("5m", "15m", "1h", "1d")
+PANDAS_RULES = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}
+
+
+def pandas_resample(df, timeframe):
+    aggregated = df.astype(float).resample(PANDAS_RULES[timeframe]).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    return aggregated.dropna()
+
+
+def collect(bus):
+    bars = {timeframe: [] for timeframe in TIMEFRAMES}
+    bus.subscribe(EventType.BAR, lambda event: bars[event.timeframe].append(event))
+    return bars
+
+
+def as_frame(events, unit):
+    index = pd.DatetimeIndex([pd.Timestamp(e.timestamp) for e in events], name="datetime").as_unit(unit)
+    return pd.DataFrame({"open": [e.open for e in events], "high": [e.high for e in events],
+                         "low": [e.low for e in events], "close": [e.price for e in events],
+                         "volume": [e.volume for e in events]}, index=index)
+
+
+class TestBarAggregator(unittest.TestCase):
+    def setUp(self):
+        # Two and a half days of minute bars starting mid-hour, with a gap
+        df = generate_ohlcv(3_600, seed=11, start="2021-03-01 09:37")
+        self.df = df.drop(df.index[100:190])
+
+    def test_parse_timeframe(self):
+        self.assertEqual(parse_timeframe("15m"), 15 * 60 * 10**9)
+        self.assertEqual(parse_timeframe("1d"), 86_400 * 10**9)
+        for bad in ("5", "0m", "1w", "m5"):
+            with self.assertRaises(ValueError):
+                parse_timeframe(bad)
+
+    def test_resample_frame_matches_pandas(self):
+        frames = resample_frame(self.df, TIMEFRAMES)
+        self.assertEqual(list(frames), list(TIMEFRAMES))
+        for timeframe in TIMEFRAMES:
+            pd.testing.assert_frame_equal(frames[timeframe], pandas_resample(self.df, timeframe), check_freq=False)
+
+    def test_streaming_bars_match_offline_resample(self):
+        expected = resample_frame(self.df, TIMEFRAMES)
+        for bar_interval in (None, "1m"):
+            with self.subTest(bar_interval=bar_interval):
+                bus = EventBus(threaded=False)
+                aggregator = BarAggregator(bus, TIMEFRAMES, bar_interval=bar_interval, history_depth=3)
+                bars = collect(bus)
+                handler = HistoricCSVDataHandler.from_dataframes(bus, {"X": self.df})
+                Backtest(bus, handler).run()
+                if bar_interval is None:
+                    # The last bar of every timeframe is only known to be complete at the end
+                    self.assertEqual(len(bars["1h"]), len(expected["1h"]) - 1)
+                aggregator.flush()
+                bus.run_until_idle()
+                for timeframe in TIMEFRAMES:
+                    pd.testing.assert_frame_equal(as_frame(bars[timeframe], self.df.index.unit), expected[timeframe],
+                                                  check_freq=False)
+                history = aggregator.bars("1h")
+                self.assertEqual(history.get_bar_count("X"), len(expected["1h"]))
+                np.testing.assert_array_equal(history.get_latest_bars_values("X", "close", 3),
+                                              expected["1h"]["close"].to_numpy()[-3:])
+
+    def test_bar_interval_closes_bars_without_waiting(self):
+        bus = EventBus(threaded=False)
+        BarAggregator(bus, ("5m",), bar_interval="1m")
+        bars = collect(bus)
+        start = pd.Timestamp("2021-01-04 10:00").value
+        for minute in range(5):
+            bus.publish(MarketEvent("X", 100.0 + minute, start + minute * 60 * 10**9, 100.0, 110.0 - minute, 90.0, 1.0))
+            bus.run_until_idle()
+            self.assertEqual(len(bars["5m"]), 0 if minute < 4 else 1)
+        bar = bars["5m"][0]
+        self.assertEqual((bar.timestamp, bar.open, bar.high, bar.low, bar.price, bar.volume),
+                         (start, 100.0, 110.0, 90.0, 104.0, 5.0))
+
+    def test_batches_and_state_round_trip(self):
+        frames = generate_universe(3, 300, seed=2)
+        bus = EventBus(threaded=False)
+        aggregator = BarAggregator(bus, ("15m", "1h"))
+        bars = collect(bus)
+        handler = HistoricCSVDataHandler.from_dataframes(bus, frames, emit_batches=True)
+        restored = None
+        while handler.continue_backtest:
+            for event in handler.update_bars():
+                bus.publish(event)
+                bus.run_until_idle()
+                if restored is not None:
+                    restored.on_market_batch(event)
+                    restored_bus.run_until_idle()
+            if handler.get_bar_count("T00000") == 100:
+                # Resume a second aggregator from a snapshot taken mid-bar
+                restored_bus = EventBus(threaded=False)
+                restored = BarAggregator(restored_bus, ("15m", "1h"))
+                restored.set_state(aggregator.get_state())
+                restored_bars = collect(restored_bus)
+        for instance in (aggregator, restored):
+            instance.flush()
+        bus.run_until_idle()
+        restored_bus.run_until_idle()
+
+        for ticker, df in frames.items():
+            expected = pandas_resample(df, "15m")
+            got = as_frame([e for e in bars["15m"] if e.ticker == ticker], df.index.unit)
+            pd.testing.assert_frame_equal(got, expected, check_freq=False)
+            # Without history_depth every completed bar is kept
+            np.testing.assert_array_equal(aggregator.bars("15m").get_latest_bars_values(ticker, "close", len(expected)),
+                                          expected["close"].to_numpy())
+        resumed = [e for e in bars["15m"] if e.timestamp >= restored_bars["15m"][0].timestamp]
+        self.assertEqual([(e.ticker, e.timestamp, e.open, e.price) for e in restored_bars["15m"]],
+                         [(e.ticker, e.timestamp, e.open, e.price) for e in resumed])
+        self.assertEqual(restored.bars("1h").get_bar_count("T00002"), aggregator.bars("1h").get_bar_count("T00002"))
+        history = aggregator.bars("15m")
+        history.require_history(3)
+        history.require_history(2)
+        self.assertEqual(history.history_depth, 3)
+        self.assertEqual(len(history.get_latest_bars_values("T00000", "close", 10)), 3)
+
+
+class TestTimeframeStrategies(unittest.TestCase):
+    def test_strategy_on_higher_timeframe(self):
+        df = generate_ohlcv(2_000, seed=4)
+        bus = EventBus(threaded=False)
+        handler = HistoricCSVDataHandler.from_dataframes(bus, {"X": df})
+        aggregator = BarAggregator(bus, ("15m",), bar_interval="1m")
+        minute = MovingAverageCrossoverStrategy(handler, 5, 20)
+        quarter = MovingAverageCrossoverStrategy(aggregator.bars("15m"), 5, 20, timeframe="15m")
+        engine = StrategyEngine([minute, quarter], bus)
+        self.assertEqual(engine.strategies_for("X"), [minute])
+        self.assertEqual(engine.strategies_for("X", "15m"), [quarter])
+        self.assertEqual(aggregator.bars("15m").history_depth, 20)
+        signals = []
+        bus.subscribe(EventType.SIGNAL, signals.append)
+        Backtest(bus, handler).run()
+
+        resampled = resample_frame(df, ["15m"])["15m"]
+        self.assertEqual([s.price for s in signals], [
+            df["close"].iloc[minute.vectorized_signals(df).to_numpy().argmax()],
+            resampled["close"].iloc[quarter.vectorized_signals(resampled).to_numpy().argmax()],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.common.event import EventBus
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.data_storage.bar_cache import BarCache
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class TestBarCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmp, "AAPL.csv")
+        shutil.copy(AAPL_CSV, self.csv)
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        self.expected = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_converts_once_then_memory_maps(self):
+        cache = BarCache(self.cache_dir)
+        columns = cache.load(self.csv)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        np.testing.assert_array_equal(columns["close"], self.expected["close"].to_numpy())
+        np.testing.assert_array_equal(
+            columns["timestamp"], self.expected.index.values.astype("datetime64[ns]").view(np.int64)
+        )
+        base = columns["close"]
+        while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+
+        BarCache(self.cache_dir).load(self.csv)
+        second = BarCache(self.cache_dir)
+        second.load(self.csv)
+        self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_touched_file_is_revalidated_by_hash(self):
+        cache = BarCache(self.cache_dir)
+        cache.load(self.csv)
+        stat = os.stat(self.csv)
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.load(self.csv)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        with open(self.csv, "a") as f:
+            f.write("\n2023-02-14,131.00,132.00,130.00,131.50,60000000,130.60,AAPL")
+        columns = cache.load(self.csv)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(columns["close"]), len(self.expected) + 1)
+        self.assertEqual(columns["close"][-1], 131.50)
+
+    def test_reconversion_leaves_mapped_files_intact(self):
+        cache = BarCache(self.cache_dir)
+        old = cache.load(self.csv)["close"]
+        with open(self.csv, "a") as f:
+            f.write("\n2023-02-14,131.00,132.00,130.00,131.50,60000000,130.60,AAPL")
+        new = cache.load(self.csv)["close"]
+        self.assertEqual(cache.misses, 2)
+        # The earlier mapping still sees the complete old file, not the rewritten one
+        np.testing.assert_array_equal(old, self.expected["close"].to_numpy())
+        self.assertEqual(len(new), len(old) + 1)
+        entry_dir = cache.ensure(self.csv)
+        self.assertEqual(sorted(os.listdir(entry_dir)), ["bars.npy", "meta.json", "timestamp.npy"])
+
+    def test_unsorted_csv_replays_the_same_with_and_without_cache(self):
+        shuffled = self.expected.sample(frac=1.0, random_state=0)
+        shuffled.to_csv(self.csv)
+        plain = HistoricCSVDataHandler(EventBus(threaded=False), [self.csv], ["AAPL"])
+        cached = HistoricCSVDataHandler(EventBus(threaded=False), [self.csv], ["AAPL"], cache_dir=self.cache_dir)
+        for handler in (plain, cached):
+            prices = []
+            while handler.continue_backtest:
+                prices += [e.price for e in handler.update_bars()]
+            self.assertEqual(prices, self.expected["close"].tolist())
+
+    def test_date_range(self):
+        columns = BarCache(self.cache_dir).load(self.csv, start="2023-01-10", end="2023-01-20")
+        expected = self.expected.loc["2023-01-10":"2023-01-20"]
+        np.testing.assert_array_equal(columns["open"], expected["open"].to_numpy())
+
+    def test_handler_replay_matches_csv(self):
+        plain = HistoricCSVDataHandler(EventBus(threaded=False), [self.csv], ["AAPL"], start="2023-01-05")
+        cached = HistoricCSVDataHandler(
+            EventBus(threaded=False), [self.csv], ["AAPL"], cache_dir=self.cache_dir, start="2023-01-05"
+        )
+        plain_prices, cached_prices = [], []
+        while plain.continue_backtest or cached.continue_backtest:
+            plain_prices += [e.price for e in plain.update_bars()]
+            cached_prices += [e.price for e in cached.update_bars()]
+        self.assertEqual(plain_prices, cached_prices)
+        self.assertEqual(len(cached_prices), len(self.expected.loc["2023-01-05":]))
+        cached_frame = cached.ticker_data["AAPL"]
+        plain_frame = plain.ticker_data["AAPL"]
+        np.testing.assert_array_equal(cached_frame.to_numpy(), plain_frame[list(cached_frame.columns)].to_numpy())
+        self.assertTrue((cached_frame.index == plain_frame.index).all())
+
+    def test_intraday_range_matches_csv(self):
+        index = pd.date_range("2021-01-04 09:30", periods=20, freq="h", name="date")
+        hourly = pd.DataFrame({field: np.arange(20.0) for field in ("open", "high", "low", "close", "volume")},
+                              index=index)
+        hourly.to_csv(self.csv)
+        for start, end in (("2021-01-04", "2021-01-04"), ("2021-01-04 12:00", "2021-01-05"),
+                           (None, "2021-01-04 15:30"), ("2021-01", None)):
+            plain = HistoricCSVDataHandler(EventBus(threaded=False), [self.csv], ["AAPL"], start=start, end=end)
+            cached = HistoricCSVDataHandler(EventBus(threaded=False), [self.csv], ["AAPL"],
+                                            cache_dir=self.cache_dir, start=start, end=end)
+            expected = hourly.loc[start:end]
+            self.assertGreater(len(expected), 0)
+            for handler in (plain, cached):
+                with self.subTest(start=start, end=end, cached=handler is cached):
+                    self.assertTrue((handler.ticker_data["AAPL"].index == expected.index).all())
+                    self.assertEqual(len(handler.ticker_data["AAPL"]), len(expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from auto_trader.benchmarks.suite import compare, run_scale
+from auto_trader.benchmarks.synthetic import generate_ohlcv, generate_universe, write_csvs
+from auto_trader.common.event import EventBus
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_bars_are_consistent_and_reproducible(self):
+        df = generate_ohlcv(5_000, seed=7)
+        self.assertEqual(len(df), 5_000)
+        self.assertTrue((df["high"] >= df[["open", "close"]].max(axis=1)).all())
+        self.assertTrue((df["low"] <= df[["open", "close"]].min(axis=1)).all())
+        self.assertTrue((df["volume"] > 0).all())
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertTrue(df.equals(generate_ohlcv(5_000, seed=7)))
+
+    def test_universe_round_trips_through_csv_handler(self):
+        frames = generate_universe(3, 50, seed=1)
+        self.assertEqual(list(frames), ["T00000", "T00001", "T00002"])
+        self.assertFalse(np.allclose(frames["T00000"]["close"], frames["T00001"]["close"]))
+        with tempfile.TemporaryDirectory() as tmp:
+            paths, tickers = write_csvs(tmp, frames)
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+            handler = HistoricCSVDataHandler(EventBus(threaded=False), paths, tickers)
+        bars = 0
+        while handler.continue_backtest:
+            bars += len(handler.update_bars())
+        self.assertEqual(bars, 150)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run_scale_reports_every_metric(self):
+        metrics = run_scale(2, 100)
+        self.assertEqual(set(metrics), {
+            "csv_load_seconds", "replay_bars_per_sec", "event_bus_events_per_sec", "strategy_us_per_bar",
+            "pipeline_bars_per_sec", "pipeline_events_per_sec",
+        })
+        self.assertTrue(all(value > 0 for value in metrics.values()))
+
+    def test_compare_flags_regressions_by_direction(self):
+        baseline = {"scales": {"tiny": {"metrics": {
+            "replay_bars_per_sec": 1000.0, "strategy_us_per_bar": 10.0, "peak_rss_mb": 100.0,
+        }}}}
+        results = {"scales": {
+            "tiny": {"metrics": {"replay_bars_per_sec": 700.0, "strategy_us_per_bar": 8.0, "peak_rss_mb": 130.0}},
+            "small": {"metrics": {"replay_bars_per_sec": 1.0}},
+        }}
+        rows = {row[1]: row for row in compare(results, baseline, tolerance=0.2)}
+        self.assertEqual(set(rows), {"replay_bars_per_sec", "strategy_us_per_bar", "peak_rss_mb"})
+        self.assertTrue(rows["replay_bars_per_sec"][5])
+        self.assertAlmostEqual(rows["strategy_us_per_bar"][4], 0.2)
+        self.assertFalse(rows["strategy_us_per_bar"][5])
+        self.assertTrue(rows["peak_rss_mb"][5])
+
+
+if __name__ == "__main__":
+    unittest.main()
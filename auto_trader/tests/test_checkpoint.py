@@ -0,0 +1,162 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.benchmarks.synthetic import generate_universe, write_csvs
+from auto_trader.common.event import EventBus, EventType, MarketEvent, PositionEvent, SignalEvent
+from auto_trader.data_handler.bar_buffer import BarBuffer
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.data_storage.checkpoint import Checkpointer, read_checkpoint
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.pre_trade import PreTradeRiskEngine, RiskLimits
+from auto_trader.risk_manager.risk_manager import RiskManager
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+from auto_trader.strategy_engine.indicators import SMA, IndicatorRegistry, RollingMax
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+
+class MeanReversion(Strategy):
+    """Buys below and sells above a rolling mean, holding at most one lot per ticker."""
+    lookback = 20
+
+    def __init__(self, bars, indicators):
+        self.bars = bars
+        self.indicators = indicators
+        self.holding = {}
+        self.signals = 0
+
+    def calculate_signals(self, event):
+        mean = self.indicators.get(SMA, event.ticker, window=20)
+        self.indicators.get(RollingMax, event.ticker, window=20)
+        if not mean.ready:
+            return None
+        held = self.holding.get(event.ticker, False)
+        if not held and event.price < 0.998 * mean.value:
+            self.holding[event.ticker] = True
+        elif held and event.price > 1.002 * mean.value:
+            self.holding[event.ticker] = False
+        else:
+            return None
+        self.signals += 1
+        return SignalEvent(event.ticker, "BUY" if self.holding[event.ticker] else "SELL", event.price)
+
+
+class Pipeline:
+    def __init__(self, paths, tickers, directory, cache_dir, every=0, emit_batches=False):
+        self.bus = EventBus(threaded=False)
+        self.handler = HistoricCSVDataHandler(self.bus, paths, tickers, cache_dir=cache_dir,
+                                              emit_batches=emit_batches)
+        registry = IndicatorRegistry(self.handler)
+        self.strategies = [MovingAverageCrossoverStrategy(self.handler, 5, 15, registry),
+                           MeanReversion(self.handler, registry)]
+        self.engine = StrategyEngine(self.strategies, self.bus)
+        execution_handler = ExecutionHandler(self.bus)
+        self.bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        self.positions = PositionManager(self.bus, initial_cash=1e6)
+        self.risk = RiskManager(self.bus, equity_limit=1e9)
+        self.pre_trade = PreTradeRiskEngine(self.bus, RiskLimits(max_drawdown=0.5))
+        self.checkpointer = Checkpointer(directory, {
+            "data": self.handler, "strategies": self.engine, "positions": self.positions,
+            "risk": self.risk, "pre_trade": self.pre_trade,
+        }, every=every, keep=1000)
+        self.backtest = Backtest(self.bus, self.handler, self.checkpointer)
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths, self.tickers = write_csvs(self.tmp.name, generate_universe(3, 300, seed=3))
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.directory = os.path.join(self.tmp.name, "checkpoints")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _assert_same_state(self, resumed, original):
+        a, b = resumed.positions.portfolio.snapshot(), original.positions.portfolio.snapshot()
+        self.assertEqual(dict(a.positions), dict(b.positions))
+        self.assertEqual(dict(a.holdings), dict(b.holdings))
+        self.assertAlmostEqual(a.cash, b.cash)
+        self.assertAlmostEqual(a.equity, b.equity)
+        self.assertEqual(a.timestamp, b.timestamp)
+        self.assertAlmostEqual(resumed.risk.calculate_total_equity(), original.risk.calculate_total_equity())
+        self.assertAlmostEqual(resumed.pre_trade.gross_exposure, original.pre_trade.gross_exposure)
+        self.assertEqual(resumed.pre_trade.peak_equity, original.pre_trade.peak_equity)
+        self.assertEqual([s.get_state() for s in resumed.strategies], [s.get_state() for s in original.strategies])
+        for ticker in self.tickers:
+            np.testing.assert_array_equal(resumed.handler.get_latest_bars_values(ticker, "close", 20),
+                                          original.handler.get_latest_bars_values(ticker, "close", 20))
+            self.assertEqual(resumed.handler.get_bar_count(ticker), original.handler.get_bar_count(ticker))
+            sma = resumed.strategies[1].indicators.get(SMA, ticker, window=20)
+            self.assertAlmostEqual(sma.value, original.strategies[1].indicators.get(SMA, ticker, window=20).value)
+
+    def test_resume_from_mid_run_checkpoint_matches_uninterrupted_run(self):
+        for emit_batches in (False, True):
+            with self.subTest(emit_batches=emit_batches):
+                directory = f"{self.directory}-{emit_batches}"
+                original = Pipeline(self.paths, self.tickers, directory, self.cache_dir, 90, emit_batches)
+                original.backtest.run()
+                self.assertGreater(original.strategies[1].signals, 2)
+                checkpoints = original.checkpointer.checkpoints()
+                self.assertEqual(len(checkpoints), 900 // 90)
+                # Simulate a crash right after the 4th checkpoint (bar 360)
+                for path in checkpoints[4:]:
+                    os.remove(path)
+
+                resumed = Pipeline(self.paths, self.tickers, directory, self.cache_dir, 0, emit_batches)
+                self.assertTrue(resumed.backtest.resume())
+                self.assertEqual(resumed.backtest.bars_processed, 360)
+                self.assertEqual(resumed.backtest.run(), 900 - 360)
+                self._assert_same_state(resumed, original)
+
+    def test_missing_or_corrupt_checkpoints(self):
+        pipeline = Pipeline(self.paths, self.tickers, self.directory, self.cache_dir)
+        self.assertFalse(pipeline.backtest.resume())
+        first = pipeline.checkpointer.save(0)
+        pipeline.backtest.run()
+        last = pipeline.checkpointer.save(900)
+        self.assertEqual(read_checkpoint(last)[0], 900)
+        with open(last, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\x00")
+        self.assertEqual(pipeline.checkpointer.latest()[0], first)
+
+        other = Checkpointer(self.directory, {"data": pipeline.handler})
+        with self.assertRaises(ValueError):
+            other.restore()
+
+    def test_bar_buffer_state_fits_current_depth(self):
+        buffer = BarBuffer(5)
+        for i in range(12):
+            buffer.append(i, i, i, i, float(i), i)
+        for depth in (3, 5, 8):
+            restored = BarBuffer(depth)
+            restored.set_state(buffer.get_state())
+            self.assertEqual(restored.count, 12)
+            self.assertEqual(list(restored.latest("close", 10)), list(range(12 - min(depth, 5), 12)))
+            restored.append(12, 12, 12, 12, 12.0, 12)
+            self.assertEqual(restored.latest("close", 2).tolist(), [11.0, 12.0])
+
+    def test_pre_trade_state_round_trip(self):
+        bus = EventBus(threaded=False)
+        engine = PreTradeRiskEngine(bus, RiskLimits(max_ticker_notional=1_000.0), initial_equity=10_000.0)
+        for i in range(100):
+            engine.on_market_event(MarketEvent(f"T{i}", 10.0 + i))
+        engine.on_position_event(PositionEvent({"T99": 5.0}, "T99"))
+        engine.set_ticker_limit("T3", 50.0)
+        engine.halted = True
+        restored = PreTradeRiskEngine(EventBus(threaded=False), RiskLimits(max_ticker_notional=1_000.0))
+        restored.set_state(engine.get_state())
+        self.assertTrue(restored.halted)
+        self.assertEqual(restored.gross_exposure, engine.gross_exposure)
+        self.assertEqual(restored.check("T3", "BUY", 10), engine.check("T3", "BUY", 10))
+        self.assertEqual(restored.check("T99", "SELL", 10), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.benchmarks.synthetic import generate_universe, write_csvs
+from auto_trader.cli import build_components, main, run_backtest
+from auto_trader.common.registry import STRATEGIES, Registry
+from auto_trader.config import ConfigError, RunConfig, load_config
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONFIG = """
+[universe]
+tickers = ["T00000", "T00001"]
+
+[data]
+path = "data/{ticker}.csv"
+%s
+
+# One instance per ticker, to exercise per-strategy ticker lists
+[[strategies]]
+type = "moving_average_crossover"
+params = { short_window = 5, long_window = 20 }
+tickers = ["T00000"]
+
+[[strategies]]
+type = "moving_average_crossover"
+params = { short_window = 5, long_window = 20 }
+tickers = ["T00001"]
+
+[portfolio]
+initial_cash = 100000.0
+%s
+"""
+
+
+def loaded_modules(*args):
+    """Runs the CLI in a fresh interpreter and returns which heavy modules it imported."""
+    script = ("import json, sys\n"
+              "from auto_trader.cli import main\n"
+              "with open('/dev/null', 'w') as sys.stdout:\n"
+              "    main(sys.argv[1:])\n"
+              "print(json.dumps([m for m in ('numpy', 'pandas') if m in sys.modules]), file=sys.stderr)\n")
+    result = subprocess.run([sys.executable, "-c", script, *args], capture_output=True, text=True, check=True,
+                            cwd=PACKAGE_ROOT)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+class TestRunConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frames = generate_universe(2, 400, seed=9)
+        os.makedirs(os.path.join(self.tmp.name, "data"))
+        write_csvs(os.path.join(self.tmp.name, "data"), self.frames)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data_extra="", tail="", name="run.toml"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(CONFIG % (data_extra, tail))
+        return path
+
+    def run_cli(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(list(args))
+        return code, out.getvalue()
+
+    def test_toml_and_json_configs(self):
+        config = load_config(self.write())
+        self.assertEqual(config.data_files(), [os.path.join(self.tmp.name, "data", f"{t}.csv") for t in self.frames])
+        self.assertEqual(config.run["mode"], "backtest")
+        self.assertEqual(config.execution["quantity"], 100)
+        json_path = os.path.join(self.tmp.name, "run.json")
+        with open(json_path, "w") as f:
+            json.dump({"universe": {"tickers": ["T00000"]}, "data": {"files": ["data/T00000.csv"]},
+                       "strategies": [{"type": "cross_sectional_momentum", "params": {"lookback": 3}}]}, f)
+        self.assertEqual(load_config(json_path).strategies[0]["params"], {"lookback": 3})
+
+    def test_invalid_configs(self):
+        base = {"universe": {"tickers": ["A"]}, "data": {"path": "{ticker}.csv"},
+                "strategies": [{"type": "moving_average_crossover"}]}
+        RunConfig.from_dict(base)
+        for change in ({"portfolio": {"cash": 1}}, {"universe": {"tickers": []}}, {"engine": {}},
+                       {"strategies": [{"type": "no_such_strategy"}]},
+                       {"strategies": [{"type": "moving_average_crossover", "short_window": 5}]},
+                       {"execution": {"slippage": {"type": "fixed", "bps": 1.0}}},
+                       {"data": {"path": "{ticker}.csv", "files": ["a.csv"]}},
+                       {"run": {"mode": "paper"}}):
+            with self.subTest(change=change), self.assertRaises(ConfigError):
+                RunConfig.from_dict({**base, **change})
+        code, _ = self.run_cli("check", self.write(tail="[run]\nmode = \"paper\""))
+        self.assertEqual(code, 2)
+
+    def test_registry_resolves_lazily(self):
+        registry = Registry("thing", {"decoder": "json.decoder:JSONDecoder"})
+        self.assertEqual(registry.path("decoder"), "json.decoder:JSONDecoder")
+        self.assertIs(registry.resolve("decoder"), json.JSONDecoder)
+        self.assertIs(registry.resolve("json:JSONEncoder"), json.JSONEncoder)
+        with self.assertRaises(ValueError):
+            registry.path("encoder")
+        self.assertIs(STRATEGIES.resolve("moving_average_crossover"), MovingAverageCrossoverStrategy)
+
+    def test_backtest_matches_vectorized_runs(self):
+        code, out = self.run_cli("run", self.write())
+        self.assertEqual(code, 0)
+        summary = json.loads(out)
+        self.assertEqual(summary["bars"], 800)
+        # Compare against the data as written to CSV (rounded to 4 decimals)
+        frames = {ticker: pd.read_csv(path, index_col=0, parse_dates=True)
+                  for ticker, path in zip(self.frames, load_config(self.write()).data_files())}
+        expected = [VectorizedBacktest(MovingAverageCrossoverStrategy(None, 5, 20)).run(df, ticker).fills
+                    for ticker, df in frames.items()]
+        self.assertEqual(summary["fills"], sum(len(fills) for fills in expected))
+        spent = sum((fills["fill_price"] * fills["quantity"] + fills["commission"]).sum() for fills in expected)
+        marked = sum(len(fills) * 100 * df["close"].iloc[-1] for fills, df in zip(expected, frames.values()))
+        self.assertAlmostEqual(summary["final_equity"], 100_000.0 - spent + marked, places=6)
+
+    def test_components_follow_the_config(self):
+        config = load_config(self.write(data_extra="emit_batches = true", tail="""
+[[strategies]]
+type = "cross_sectional_momentum"
+params = { lookback = 5 }
+
+[execution]
+broker = "simulated"
+slippage = { type = "fixed", bps = 2.0 }
+commission_model = "per_share"
+
+[risk]
+equity_limit = 50000.0
+pre_trade = { max_order_quantity = 50 }
+"""))
+        components = build_components(config)
+        momentum = components["strategies"][2]
+        self.assertEqual(momentum.tickers, frozenset(self.frames))
+        first, second = components["strategies"][:2]
+        self.assertEqual(second.tickers, frozenset(["T00001"]))
+        self.assertIs(first.indicators, second.indicators)
+        self.assertEqual(components["broker"].slippage.bps, 2.0)
+        self.assertEqual(type(components["broker"].commission).__name__, "PerShareCommission")
+        self.assertEqual(components["pre_trade"].limits.max_order_quantity, 50)
+        self.assertEqual(components["risk_manager"].equity_limit, 50000.0)
+        self.assertGreater(run_backtest(config, components)["bars"], 0)
+
+    def test_batch_strategy_requires_batched_data(self):
+        momentum = '[[strategies]]\ntype = "cross_sectional_momentum"\nparams = { lookback = 5 }'
+        path = self.write(tail=momentum)
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            self.assertEqual(self.run_cli("check", "--resolve", path)[0], 2)
+        self.assertIn("emit_batches", err.getvalue())
+        with self.assertRaises(ConfigError):
+            build_components(load_config(path))
+        self.assertEqual(self.run_cli("check", "--resolve", self.write(data_extra="emit_batches = true",
+                                                                      tail=momentum))[0], 0)
+
+    def test_checkpointed_rerun_resumes_at_the_end(self):
+        path = self.write(tail="[run]\ncheckpoint_dir = \"checkpoints\"\ncheckpoint_every = 100")
+        first = json.loads(self.run_cli("run", path)[1])
+        second = json.loads(self.run_cli("run", path)[1])
+        self.assertEqual((second["resumed_at"], second["bars"]), (800, 0))
+        self.assertEqual(second["final_equity"], first["final_equity"])
+        self.assertEqual(second["positions"], first["positions"])
+
+    def test_cold_start_skips_heavy_imports(self):
+        path = self.write(data_extra='cache_dir = "bar_cache"')
+        self.assertEqual(loaded_modules("check", path), [])
+        self.assertEqual(loaded_modules("list"), [])
+        # The first run converts the CSVs; later runs memory-map them without pandas
+        loaded_modules("run", path)
+        self.assertEqual(loaded_modules("run", path), ["numpy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,22 @@
+import os
 import unittest
 from unittest.mock import MagicMock
-import time
-from queue import Queue, Empty
-from auto_trader.data_handler.data_handler import DataHandler
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.data_handler.bar_buffer import BarBuffer
 from auto_trader.common.event import EventBus, MarketEvent, EventType
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+AAPL_CSV = os.path.join(DATA_DIR, "AAPL.csv")
+
 
 class TestDataHandler(unittest.TestCase):
     def setUp(self):
         self.event_bus = EventBus()
-        # Reset handlers for each test to ensure isolation
-        self.event_bus._handlers = {event_type: [] for event_type in EventType}
-        self.event_bus._event_queue = Queue()
-        self.data_handler = DataHandler(self.event_bus, ticker="AAPL")
+        self.data_handler = HistoricCSVDataHandler(self.event_bus, [AAPL_CSV], ["AAPL"])
 
     def tearDown(self):
-        if self.event_bus.is_running():
-            self.event_bus.stop()
         if self.data_handler._running:
             self.data_handler.stop()
 
@@ -32,18 +33,14 @@ class TestDataHandler(unittest.TestCase):
         # Use a mock handler to verify that the event is published correctly
         mock_handler = MagicMock()
         self.event_bus.subscribe(EventType.MARKET, mock_handler)
-        
-        self.event_bus.start()
-        self.data_handler.start()
-        
-        time.sleep(1.5)  # Wait for at least one event to be generated
-        
-        self.data_handler.stop()
-        self.event_bus.stop()
+
+        for event in self.data_handler.update_bars():
+            self.event_bus.publish(event)
+        self.event_bus.run_until_idle()
 
         # Verify that the handler was called
         self.assertTrue(mock_handler.called)
-        
+
         # Verify the content of the received event
         event_args = mock_handler.call_args[0]
         self.assertEqual(len(event_args), 1)
@@ -51,6 +48,79 @@ class TestDataHandler(unittest.TestCase):
         self.assertIsInstance(received_event, MarketEvent)
         self.assertEqual(received_event.event_type, EventType.MARKET)
         self.assertEqual(received_event.ticker, "AAPL")
+        self.assertEqual(received_event.price, 125.07)
+
+    def test_update_bars_until_exhausted(self):
+        bars = 0
+        while self.data_handler.continue_backtest:
+            bars += len(self.data_handler.update_bars())
+        self.assertEqual(bars, 30)
+        self.assertEqual(self.data_handler.update_bars(), [])
+        closes = self.data_handler.get_latest_bars_values("AAPL", "close", 2)
+        self.assertEqual(list(closes), [129.62, 130.15])
+
+    def test_unsized_handler_keeps_full_history(self):
+        for _ in range(25):
+            self.data_handler.update_bars()
+        expected = self.data_handler.ticker_data["AAPL"]["close"].to_numpy()[:25]
+        self.assertEqual(list(self.data_handler.get_latest_bars_values("AAPL", "close", 100)), list(expected))
+        self.data_handler.require_history(4)
+        self.assertEqual(list(self.data_handler.get_latest_bars_values("AAPL", "close", 100)), list(expected[-4:]))
+
+    def test_history_depth_follows_strategy_lookback(self):
+        strategy = MovingAverageCrossoverStrategy(self.data_handler, short_window=3, long_window=7)
+        StrategyEngine([strategy], self.event_bus)
+        self.assertEqual(self.data_handler.history_depth, 7)
+        for _ in range(10):
+            self.data_handler.update_bars()
+        closes = self.data_handler.get_latest_bars_values("AAPL", "close", 100)
+        expected = self.data_handler.ticker_data["AAPL"]["close"].to_numpy()[3:10]
+        self.assertEqual(list(closes), list(expected))
+        self.assertEqual(self.data_handler.get_bar_count("AAPL"), 10)
+
+
+class TestBarBuffer(unittest.TestCase):
+    def _fill(self, buffer, values):
+        for v in values:
+            buffer.append(int(v), v, v + 1, v - 1, v, 10 * v)
+
+    def test_latest_is_zero_copy_view(self):
+        buffer = BarBuffer(depth=4)
+        self._fill(buffer, range(1, 11))
+        latest = buffer.latest("close", 3)
+        self.assertEqual(list(latest), [8.0, 9.0, 10.0])
+        self.assertIsNotNone(latest.base)
+        self.assertFalse(latest.flags.writeable)
+        self.assertEqual(list(buffer.latest("timestamp", 10)), [7, 8, 9, 10])
+        self.assertEqual(len(buffer), 4)
+
+    def test_partial_history(self):
+        buffer = BarBuffer(depth=5)
+        self.assertEqual(len(buffer.latest("close", 3)), 0)
+        self._fill(buffer, [1, 2])
+        self.assertEqual(list(buffer.latest("high", 3)), [2.0, 3.0])
+
+    def test_resize_keeps_latest_bars(self):
+        buffer = BarBuffer(depth=3)
+        self._fill(buffer, range(1, 8))
+        buffer.resize(5)
+        self.assertEqual(list(buffer.latest("close", 5)), [5.0, 6.0, 7.0])
+        self._fill(buffer, [8, 9, 10])
+        self.assertEqual(list(buffer.latest("close", 5)), [6.0, 7.0, 8.0, 9.0, 10.0])
+        buffer.resize(2)
+        self.assertEqual(list(buffer.latest("close", 5)), [9.0, 10.0])
+        self.assertEqual(buffer.count, 10)
+
+    def test_unbounded_buffer_grows_until_resized(self):
+        buffer = BarBuffer(depth=None)
+        self._fill(buffer, range(1, 201))
+        self.assertEqual(list(buffer.latest("close", 1000)), [float(v) for v in range(1, 201)])
+        restored = BarBuffer(depth=None)
+        restored.set_state(buffer.get_state())
+        self.assertEqual(len(restored), 200)
+        buffer.resize(3)
+        self._fill(buffer, [201])
+        self.assertEqual(list(buffer.latest("close", 1000)), [199.0, 200.0, 201.0])
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
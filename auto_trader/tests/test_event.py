@@ -1,7 +1,10 @@
 import unittest
 import time
+import numpy as np
 from queue import Queue, Empty
-from ..common.event import Event, EventType, MarketEvent, EventBus
+from ..common.event import (
+    Event, EventType, MarketEvent, MarketBatchEvent, SignalEvent, OrderEvent, FillEvent, PositionEvent, EventBus,
+)
 
 class TestEventBus(unittest.TestCase):
 
@@ -19,17 +22,31 @@ class TestEventBus(unittest.TestCase):
         market_event = MarketEvent("AAPL", 150.0)
         self.event_bus.publish(market_event)
 
-        # The event bus runs in a separate thread, so we need to wait for the event to be processed
-        self.event_bus.start()
+        # Dispatch synchronously on this thread, no sleeps needed
+        self.assertEqual(self.event_bus.run_until_idle(), 1)
 
         try:
-            received_event = self.test_queue.get(timeout=2)
-            self.assertEqual(received_event.type, EventType.MARKET)
-            self.assertEqual(received_event.symbol, "AAPL")
+            received_event = self.test_queue.get_nowait()
+            self.assertEqual(received_event.event_type, EventType.MARKET)
+            self.assertEqual(received_event.ticker, "AAPL")
         except Empty:
-            self.fail("Handler did not receive the event within the timeout period.")
-        finally:
-            self.event_bus.stop()
+            self.fail("Handler did not receive the event.")
+
+    def test_run_until_idle_drains_chained_events(self):
+        """Events published by handlers are dispatched in the same drain."""
+        received = []
+
+        def market_handler(event):
+            received.append(event)
+            self.event_bus.publish(SignalEvent(event.ticker, "BUY", event.price))
+
+        self.event_bus.subscribe(EventType.MARKET, market_handler)
+        self.event_bus.subscribe(EventType.SIGNAL, received.append)
+        self.event_bus.publish(MarketEvent("AAPL", 150.0))
+
+        self.assertEqual(self.event_bus.run_until_idle(), 2)
+        self.assertEqual([e.event_type for e in received], [EventType.MARKET, EventType.SIGNAL])
+        self.assertEqual(self.event_bus.run_until_idle(), 0)
 
     def test_start_and_stop(self):
         """Test the start and stop methods of the event bus thread."""
@@ -44,5 +61,75 @@ class TestEventBus(unittest.TestCase):
         # After stopping, the thread might still be alive for a short moment before exiting
         # self.assertFalse(self.event_bus._thread.is_alive(), "Event bus thread should be stopped")
 
+    def test_stop_is_immediate_and_bus_restarts(self):
+        self.event_bus.start()
+        started = time.perf_counter()
+        self.event_bus.stop()
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertFalse(self.event_bus._thread.is_alive())
+
+        received = Queue()
+        self.event_bus.subscribe(EventType.MARKET, received.put)
+        self.event_bus.start()
+        self.event_bus.publish(MarketEvent("AAPL", 150.0))
+        self.assertEqual(received.get(timeout=2).ticker, "AAPL")
+        self.event_bus.stop()
+
+    def test_instances_are_independent(self):
+        other = EventBus()
+        self.assertIsNot(other, self.event_bus)
+        received = []
+        other.subscribe(EventType.MARKET, received.append)
+        self.event_bus.publish(MarketEvent("AAPL", 150.0))
+        self.event_bus.run_until_idle()
+        other.run_until_idle()
+        self.assertEqual(received, [])
+
+    def test_single_threaded_mode(self):
+        bus = EventBus(threaded=False)
+        received = []
+        bus.subscribe(EventType.MARKET, received.append)
+        bus.subscribe(EventType.MARKET, received.append)
+        bus.unsubscribe(EventType.MARKET, received.append)
+        bus.publish(MarketEvent("AAPL", 150.0))
+        bus.publish(MarketEvent("MSFT", 250.0))
+        self.assertEqual(bus.run_until_idle(), 2)
+        self.assertEqual([e.ticker for e in received], ["AAPL", "MSFT"])
+        with self.assertRaises(RuntimeError):
+            bus.start()
+
+
+class TestEvents(unittest.TestCase):
+    def test_events_are_slotted(self):
+        events = [
+            MarketEvent("AAPL", 150.0),
+            SignalEvent("AAPL", "BUY", 150.0),
+            OrderEvent("AAPL", "MKT", 100, "BUY"),
+            FillEvent("AAPL", 100, "BUY", 150.0, 5.0),
+            PositionEvent({"AAPL": 100}),
+            MarketBatchEvent(0, {"ticker": ["AAPL"]}),
+        ]
+        for event in events:
+            self.assertIsInstance(event, Event)
+            self.assertFalse(hasattr(event, "__dict__"), type(event).__name__)
+            with self.assertRaises(AttributeError):
+                event.unexpected = 1
+        self.assertEqual([e.event_type for e in events], [
+            EventType.MARKET, EventType.SIGNAL, EventType.ORDER, EventType.FILL,
+            EventType.POSITION, EventType.MARKET_BATCH,
+        ])
+
+    def test_market_event_carries_bar(self):
+        event = MarketEvent("AAPL", 150.0, 123, 149.0, 151.0, 148.0, 1000.0)
+        self.assertEqual((event.timestamp, event.open, event.high, event.low, event.close, event.volume),
+                         (123, 149.0, 151.0, 148.0, 150.0, 1000.0))
+        self.assertIsNone(MarketEvent("AAPL", 150.0).timestamp)
+
+    def test_market_batch_event(self):
+        event = MarketBatchEvent(123, {"ticker": ["AAPL", "MSFT"], "close": np.array([1.0, 2.0])})
+        self.assertEqual(len(event), 2)
+        self.assertEqual(event.tickers, ["AAPL", "MSFT"])
+        self.assertEqual(event.timestamp, 123)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
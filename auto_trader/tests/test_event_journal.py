@@ -0,0 +1,179 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.common.event import (EventBus, EventType, FillEvent, MarketBatchEvent, MarketEvent, OrderEvent,
+                                      SignalEvent)
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.data_storage.event_journal import EventJournal, JournalReader
+from auto_trader.data_storage.journal_replay import MARKET_TYPES, diff, main, rebuild_state, replay
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.risk_manager import RiskManager
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+def fields(event):
+    return type(event), tuple(getattr(event, name) for name in type(event).__slots__)
+
+
+class EveryNthBar(Strategy):
+    """Alternates BUY and SELL signals every ``n`` bars."""
+    def __init__(self, n=3):
+        self.n = n
+        self.bars = 0
+
+    def calculate_signals(self, event):
+        self.bars += 1
+        if self.bars % self.n == 0:
+            return SignalEvent(event.ticker, "BUY" if self.bars // self.n % 2 else "SELL", event.price)
+        return None
+
+
+def build_pipeline(event_bus, strategy):
+    StrategyEngine([strategy], event_bus)
+    execution_handler = ExecutionHandler(event_bus)
+    event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+
+
+class TestEventJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "journal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trips_every_event_type(self):
+        events = [
+            MarketEvent("AAPL", 150.0, 1_000, 149.0, 151.0, 148.5, 12_345.0),
+            MarketEvent("MSFT", 300.0),
+            SignalEvent("AAPL", "SELL", 150.0),
+            OrderEvent("AAPL", "MKT", 100, "SELL", order_id=7),
+            OrderEvent("MSFT", "LMT", 10, "BUY", limit_price=299.5),
+            OrderEvent("MSFT", "STP", 10, "SELL", stop_price=290.0, order_id=9),
+            FillEvent("AAPL", 100, "SELL", 149.9, 1.5, order_id=7),
+            FillEvent("MSFT", 2.5, "BUY", 300.0),
+        ]
+        bus = EventBus(threaded=False)
+        with EventJournal(self.directory, flush_every=3, initial_capacity=2) as journal:
+            journal.attach(bus)
+            for event in events:
+                bus.publish(event)
+                bus.run_until_idle()
+        reader = JournalReader(self.directory)
+        self.assertEqual(len(reader), len(events))
+        self.assertEqual([fields(e) for e in reader.events()], [fields(e) for e in events])
+        self.assertEqual(reader.tickers, ["AAPL", "MSFT"])
+        self.assertEqual([e.ticker for e in reader.events([EventType.FILL])], ["AAPL", "MSFT"])
+        # Non-market records are stamped with the latest bar's time, not the wall clock
+        self.assertEqual(reader.records["timestamp"][0], 1_000)
+
+    def test_batches_are_regrouped(self):
+        arrays = {
+            "ticker": np.array(["A", "B"], dtype=object),
+            "open": np.array([1.0, 2.0]), "high": np.array([1.5, 2.5]), "low": np.array([0.5, 1.5]),
+            "close": np.array([1.2, np.nan]), "volume": np.array([10.0, 20.0]),
+        }
+        with EventJournal(self.directory) as journal:
+            journal.on_market_batch(MarketBatchEvent(5, arrays))
+            journal.on_fill(FillEvent("B", 1, "BUY", 2.0))
+            journal.on_market_batch(MarketBatchEvent(6, arrays))
+        events = list(JournalReader(self.directory).events(chunk_size=1))
+        self.assertEqual([e.event_type for e in events],
+                         [EventType.MARKET_BATCH, EventType.FILL, EventType.MARKET_BATCH])
+        self.assertEqual(events[2].timestamp, 6)
+        self.assertEqual(list(events[0].tickers), ["A", "B"])
+        np.testing.assert_array_equal(events[0].arrays["close"], arrays["close"])
+
+    def test_reopen_appends_and_only_flushed_records_are_visible(self):
+        with EventJournal(self.directory) as journal:
+            journal.on_market_event(MarketEvent("A", 1.0, 10))
+        journal = EventJournal(self.directory, flush_every=2)
+        journal.on_market_event(MarketEvent("B", 2.0, 11))
+        journal.on_market_event(MarketEvent("A", 3.0, 12))
+        journal.on_market_event(MarketEvent("B", 4.0, 13))
+        # The third record is still buffered in memory
+        reader = JournalReader(self.directory)
+        self.assertEqual([e.price for e in reader.events()], [1.0, 2.0, 3.0])
+        journal.close()
+        reader = JournalReader(self.directory)
+        self.assertEqual(list(reader.records["seq"]), [0, 1, 2, 3])
+        self.assertEqual(reader.tickers, ["A", "B"])
+
+    def test_crash_after_header_commit_keeps_tickers_resolvable(self):
+        journal = EventJournal(self.directory, flush_every=1)
+        journal.on_market_event(MarketEvent("A", 1.0, 10))
+        commit = journal._write_header
+
+        def crash_after_commit():
+            commit()
+            raise SystemExit("crashed")
+
+        with mock.patch.object(journal, "_write_header", crash_after_commit), self.assertRaises(SystemExit):
+            journal.on_market_event(MarketEvent("NEW", 2.0, 11))
+        reader = JournalReader(self.directory)
+        self.assertEqual([(e.ticker, e.price) for e in reader.events()], [("A", 1.0), ("NEW", 2.0)])
+
+
+class TestJournalReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.expected_dir = os.path.join(self.tmp.name, "expected")
+        bus = EventBus(threaded=False)
+        build_pipeline(bus, EveryNthBar())
+        self.positions = PositionManager(bus, initial_cash=10_000.0)
+        self.risk = RiskManager(bus, equity_limit=1e9)
+        self.journal = EventJournal(self.expected_dir)
+        self.journal.attach(bus)
+        Backtest(bus, HistoricCSVDataHandler(bus, [AAPL_CSV], ["AAPL"])).run()
+        self.journal.close()
+        self.reader = JournalReader(self.expected_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rebuild_state_matches_original_run(self):
+        original = self.positions.portfolio.snapshot()
+        for full in (False, True):
+            position_manager, risk_manager = rebuild_state(self.reader, 10_000.0, 1e9, full=full)
+            snapshot = position_manager.portfolio.snapshot()
+            self.assertEqual(dict(snapshot.positions), dict(original.positions))
+            self.assertAlmostEqual(snapshot.cash, original.cash)
+            self.assertAlmostEqual(snapshot.equity, original.equity)
+            self.assertAlmostEqual(risk_manager.calculate_total_equity(), self.risk.calculate_total_equity())
+            self.assertEqual(risk_manager.latest_prices, self.risk.latest_prices)
+        self.assertEqual(len(position_manager.portfolio.equity_curve.values),
+                         len(self.positions.portfolio.equity_curve.values))
+
+    def _redrive(self, name, strategy):
+        directory = os.path.join(self.tmp.name, name)
+        bus = EventBus(threaded=False)
+        build_pipeline(bus, strategy)
+        with EventJournal(directory) as journal:
+            journal.attach(bus)
+            replay(self.reader, bus, MARKET_TYPES)
+        return JournalReader(directory), directory
+
+    def test_redrive_diff(self):
+        same, same_dir = self._redrive("same", EveryNthBar())
+        self.assertEqual(diff(self.reader, same), [])
+        self.assertEqual(main(["diff", self.expected_dir, same_dir]), 0)
+
+        changed, changed_dir = self._redrive("changed", EveryNthBar(4))
+        differences = diff(self.reader, changed, types=[EventType.SIGNAL], limit=3)
+        self.assertEqual(len(differences), 3)
+        self.assertEqual(differences[0].index, 0)
+        self.assertIsInstance(differences[0].expected, SignalEvent)
+        self.assertEqual(main(["diff", self.expected_dir, changed_dir, "--types", "FILL"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
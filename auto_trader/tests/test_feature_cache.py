@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.backtest.sweep import ParameterSweep
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.benchmarks.synthetic import generate_ohlcv
+from auto_trader.common.event import EventBus, EventType
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.data_storage.feature_cache import FeatureCache, compute_feature, data_fingerprint
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+from auto_trader.strategy_engine.indicators import (
+    EMA, SMA, IndicatorRegistry, RollingMax, RollingMin, SeriesIndicator,
+)
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+
+def fail():
+    raise AssertionError("feature should have been served from the cache")
+
+
+class TestFeatureCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = generate_ohlcv(1_000, seed=8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_tier_is_an_lru_with_a_byte_budget(self):
+        # Room for two 1,000-bar float64 series
+        cache = FeatureCache(memory_budget=16_000)
+        sma5 = cache.feature("X", self.df, "sma", window=5)
+        self.assertFalse(sma5.flags.writeable)
+        cache.feature("X", self.df, "sma", window=10)
+        cache.feature("X", self.df, "sma", window=5)
+        cache.feature("X", self.df, "sma", window=20)  # evicts window=10, the least recently used
+        self.assertEqual(cache.stats(), {"memory_hits": 1, "disk_hits": 0, "misses": 3, "evictions": 1,
+                                         "entries": 2, "memory_bytes": 16_000})
+        self.assertIs(cache.feature("X", self.df, "sma", window=5), sma5)
+        cache.feature("X", self.df, "sma", window=10)
+        self.assertEqual((cache.misses, cache.evictions), (4, 2))
+
+    def test_disk_tier_survives_a_new_process(self):
+        FeatureCache(self.tmp.name).feature("X", self.df, "ema", window=12)
+        cache = FeatureCache(self.tmp.name)
+        values = cache.get_or_compute("X", data_fingerprint(self.df), "ema", {"window": 12}, fail)
+        np.testing.assert_array_equal(values, compute_feature(self.df, "ema", window=12))
+        self.assertEqual((cache.disk_hits, cache.misses), (1, 0))
+        cache.feature("X", self.df, "ema", window=12)
+        self.assertEqual(cache.memory_hits, 1)
+
+    def test_key_covers_ticker_data_and_params(self):
+        cache = FeatureCache()
+        changed = self.df.copy()
+        changed.iloc[500, changed.columns.get_loc("close")] += 1.0
+        self.assertNotEqual(data_fingerprint(changed), data_fingerprint(self.df))
+        for ticker, df, window in (("X", self.df, 5), ("Y", self.df, 5), ("X", changed, 5), ("X", self.df, 6)):
+            cache.feature(ticker, df, "sma", window=window)
+        self.assertEqual(cache.misses, 4)
+
+    def test_features_match_streaming_indicators(self):
+        bus = EventBus(threaded=False)
+        cache = FeatureCache()
+        handler = HistoricCSVDataHandler.from_dataframes(bus, {"X": self.df}, feature_cache=cache)
+        streaming = IndicatorRegistry(HistoricCSVDataHandler.from_dataframes(EventBus(threaded=False),
+                                                                             {"X": self.df}, history_depth=30))
+        cached = IndicatorRegistry(handler)
+        indicators = (SMA, EMA, RollingMax, RollingMin)
+        while streaming.bars.continue_backtest:
+            streaming.bars.update_bars()
+            handler.update_bars()
+            for indicator_cls in indicators:
+                expected = streaming.get(indicator_cls, "X", window=30)
+                actual = cached.get(indicator_cls, "X", window=30)
+                self.assertIsInstance(actual, SeriesIndicator)
+                self.assertEqual(actual.ready, expected.ready)
+                np.testing.assert_allclose(actual.value, expected.value, rtol=1e-9, equal_nan=True)
+        self.assertEqual(cache.misses, len(indicators))
+
+
+class TestFeatureCacheInBacktests(unittest.TestCase):
+    def setUp(self):
+        self.df = generate_ohlcv(2_000, seed=6)
+
+    def run_event_driven(self, strategy, handler, bus):
+        StrategyEngine([strategy], bus)
+        signals = []
+        bus.subscribe(EventType.SIGNAL, signals.append)
+        Backtest(bus, handler).run()
+        return [signal.price for signal in signals]
+
+    def test_vectorized_and_event_driven_runs_share_entries(self):
+        cache = FeatureCache()
+        windows = [(5, 10), (5, 20), (10, 20)]
+        vectorized = [VectorizedBacktest(MovingAverageCrossoverStrategy(None, short, long), feature_cache=cache)
+                      .run(self.df, "X").fills["fill_price"].tolist() for short, long in windows]
+        # Only the 5, 10 and 20-bar SMAs are ever computed
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.memory_hits, 3)
+
+        for (short, long), expected in zip(windows, vectorized):
+            bus = EventBus(threaded=False)
+            handler = HistoricCSVDataHandler.from_dataframes(bus, {"X": self.df}, feature_cache=cache)
+            prices = self.run_event_driven(MovingAverageCrossoverStrategy(handler, short, long), handler, bus)
+            self.assertEqual(prices, expected)
+            uncached_bus = EventBus(threaded=False)
+            uncached = HistoricCSVDataHandler.from_dataframes(uncached_bus, {"X": self.df})
+            self.assertEqual(self.run_event_driven(MovingAverageCrossoverStrategy(uncached, short, long),
+                                                   uncached, uncached_bus), expected)
+        self.assertEqual(cache.misses, 3)
+
+    def test_repeated_sweep_skips_recomputation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_files = []
+            for i in range(2):
+                path = os.path.join(tmp, f"T{i}.csv")
+                generate_ohlcv(300, seed=i).to_csv(path)
+                csv_files.append(path)
+            feature_dir = os.path.join(tmp, "features")
+
+            def sweep(engine):
+                return ParameterSweep(MovingAverageCrossoverStrategy, {"short_window": [3, 5], "long_window": [10, 20]},
+                                      csv_files, ["T0", "T1"], engine=engine, max_workers=2, batch_size=1,
+                                      feature_cache_dir=feature_dir)
+
+            first = sweep("vectorized")
+            table = first.run()
+            self.assertGreaterEqual(first.feature_cache_stats["misses"], 8)
+            for engine in ("vectorized", "event"):
+                repeat = sweep(engine)
+                self.assertTrue(repeat.run().equals(table))
+                stats = repeat.feature_cache_stats
+                self.assertEqual(stats["misses"], 0)
+                self.assertEqual(stats["memory_hits"] + stats["disk_hits"], 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,6 @@
+import os
 import unittest
 from unittest.mock import MagicMock, patch
-from queue import Queue
-import time
 
 from auto_trader.common.event import Event, EventBus, EventType, MarketEvent, SignalEvent, OrderEvent, FillEvent, PositionEvent
 from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
@@ -10,6 +9,9 @@ from auto_trader.strategy_engine.strategy_engine import StrategyEngine
 from auto_trader.execution_handler.execution_handler import ExecutionHandler
 from auto_trader.position_manager.position_manager import PositionManager
 from auto_trader.risk_manager.risk_manager import RiskManager
+from auto_trader.backtest.backtest import Backtest
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
 
 
 class MockStrategy(Strategy):
@@ -21,10 +23,10 @@ class MockStrategy(Strategy):
 
 class TestFullTradingFlow(unittest.TestCase):
     def setUp(self):
-        self.event_bus = EventBus()
+        self.event_bus = EventBus(threaded=False)
         self.mock_data_handler = MagicMock()
         self.strategy = MockStrategy()
-        self.strategy_engine = StrategyEngine([self.strategy])
+        self.strategy_engine = StrategyEngine([self.strategy], self.event_bus)
         self.position_manager = PositionManager(self.event_bus)
         self.execution_handler = ExecutionHandler(self.event_bus)
         self.risk_manager = RiskManager(self.event_bus, equity_limit=100000.0)
@@ -35,18 +37,14 @@ class TestFullTradingFlow(unittest.TestCase):
 
     def test_complete_flow(self):
         """Test the complete flow from market data to risk management."""
-        # 1. Start the event bus
-        self.event_bus.start()
-
-        # 2. A market event occurs, which is published to the event bus
+        # 1. A market event occurs, which is published to the event bus
         market_event = MarketEvent(ticker="AAPL", price=150.0)
         self.event_bus.publish(market_event)
 
-        # 3. Process events
-        # Give the event bus a moment to process
-        time.sleep(0.1) # allow for all events to be processed
+        # 2. Process events synchronously until the bus is quiescent
+        self.event_bus.run_until_idle()
 
-        # 4. Check results
+        # 3. Check results
         # Check that the position manager has a position in AAPL
         self.assertIn("AAPL", self.position_manager.positions)
         self.assertEqual(self.position_manager.positions["AAPL"], 100) # Assuming quantity is 100
@@ -55,15 +53,56 @@ class TestFullTradingFlow(unittest.TestCase):
         with patch('builtins.print') as mocked_print:
             # The events should have been processed, let's check the final state
             # The PositionEvent is published by the PositionManager, so we don't need to publish it manually
-            time.sleep(0.1) # allow for all events to be processed
+            self.event_bus.run_until_idle()
 
             # Check that the risk manager has calculated the total equity
             total_equity = self.risk_manager.calculate_total_equity()
             self.assertGreater(total_equity, 0)
             self.assertEqual(total_equity, 100 * 150.0)
 
-        # 5. Stop the event bus
-        self.event_bus.stop()
+    def test_backtest_over_csv(self):
+        """Replay a CSV through the synchronous backtest driver."""
+        data_handler = HistoricCSVDataHandler(self.event_bus, [AAPL_CSV], ["AAPL"])
+        fills = []
+        self.event_bus.subscribe(EventType.FILL, fills.append)
+
+        backtest = Backtest(self.event_bus, data_handler)
+        self.assertEqual(backtest.run(), 30)
+
+        # MockStrategy buys 100 shares on every bar
+        self.assertEqual(len(fills), 30)
+        self.assertEqual(self.position_manager.positions["AAPL"], 30 * 100)
+        self.assertEqual(fills[-1].fill_price, 130.15)
+        # MARKET + SIGNAL + ORDER + FILL + POSITION per bar
+        self.assertEqual(backtest.events_dispatched, 30 * 5)
+
+    def test_backtest_with_market_batches(self):
+        """Batched replay gives the same result as one MarketEvent per ticker."""
+        data_handler = HistoricCSVDataHandler(
+            self.event_bus, [AAPL_CSV, AAPL_CSV], ["AAPL", "AAPL2"], emit_batches=True
+        )
+        batches = []
+        self.event_bus.subscribe(EventType.MARKET_BATCH, batches.append)
+
+        backtest = Backtest(self.event_bus, data_handler)
+        self.assertEqual(backtest.run(), 60)
+
+        self.assertEqual(len(batches), 30)
+        self.assertEqual(list(batches[-1].tickers), ["AAPL", "AAPL2"])
+        self.assertEqual(list(batches[-1].arrays["close"]), [130.15, 130.15])
+        # MockStrategy only trades AAPL, through the per-ticker fallback
+        self.assertEqual(self.position_manager.positions["AAPL"], 30 * 100)
+        self.assertNotIn("AAPL2", self.position_manager.positions)
+        self.assertEqual(self.risk_manager.latest_prices, {"AAPL": 130.15, "AAPL2": 130.15})
+
+    def test_backtest_rejects_running_bus(self):
+        data_handler = HistoricCSVDataHandler(self.event_bus, [AAPL_CSV], ["AAPL"])
+        self.event_bus._running = True
+        try:
+            with self.assertRaises(RuntimeError):
+                Backtest(self.event_bus, data_handler).run()
+        finally:
+            self.event_bus._running = False
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.common.event import EventBus
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+from auto_trader.strategy_engine.indicators import (
+    ATR, EMA, RSI, SMA, BollingerBands, IndicatorRegistry, RollingMax, RollingMin, RollingStd,
+)
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+def _stream(indicator, *columns):
+    values = []
+    for row in zip(*columns):
+        indicator.update(*row)
+        values.append(indicator.value)
+    return np.array(values)
+
+
+class TestIndicatorsMatchPandas(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        close = 100 + np.cumsum(rng.normal(0, 1, 500))
+        spread = np.abs(rng.normal(0, 0.5, 500))
+        self.close = pd.Series(close)
+        self.high = pd.Series(close + spread)
+        self.low = pd.Series(close - spread)
+
+    def assertSeriesClose(self, actual, expected):
+        np.testing.assert_allclose(actual, expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_sma(self):
+        self.assertSeriesClose(_stream(SMA(20), self.close), self.close.rolling(20).mean())
+
+    def test_ema(self):
+        expected = self.close.ewm(span=10, adjust=False, min_periods=10).mean()
+        self.assertSeriesClose(_stream(EMA(10), self.close), expected)
+
+    def test_rolling_std(self):
+        self.assertSeriesClose(_stream(RollingStd(15), self.close), self.close.rolling(15).std())
+        std = RollingStd(15, ddof=0)
+        _stream(std, self.close)
+        self.assertAlmostEqual(std.variance, self.close[-15:].var(ddof=0))
+
+    def test_rolling_min_max(self):
+        self.assertSeriesClose(_stream(RollingMax(7), self.close), self.close.rolling(7).max())
+        self.assertSeriesClose(_stream(RollingMin(7), self.close), self.close.rolling(7).min())
+
+    def test_rsi(self):
+        delta = self.close.diff()
+        avg_gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        expected = 100 - 100 / (1 + avg_gain / avg_loss)
+        self.assertSeriesClose(_stream(RSI(14), self.close), expected)
+
+    def test_atr(self):
+        prev_close = self.close.shift()
+        true_range = pd.concat(
+            [self.high - self.low, (self.high - prev_close).abs(), (self.low - prev_close).abs()], axis=1
+        ).max(axis=1)
+        expected = true_range.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        self.assertSeriesClose(_stream(ATR(14), self.high, self.low, self.close), expected)
+
+    def test_bollinger_bands(self):
+        bands = BollingerBands(20, num_std=2.0)
+        upper, lower = [], []
+        for value in self.close:
+            bands.update(value)
+            upper.append(bands.upper)
+            lower.append(bands.lower)
+        middle = self.close.rolling(20).mean()
+        std = self.close.rolling(20).std(ddof=0)
+        self.assertSeriesClose(np.array(upper), middle + 2 * std)
+        self.assertSeriesClose(np.array(lower), middle - 2 * std)
+
+
+class TestIndicatorRegistry(unittest.TestCase):
+    def setUp(self):
+        self.event_bus = EventBus(threaded=False)
+        self.data_handler = HistoricCSVDataHandler(self.event_bus, [AAPL_CSV], ["AAPL"], history_depth=10)
+        self.registry = IndicatorRegistry(self.data_handler)
+
+    def test_shared_instance_fed_once_per_bar(self):
+        closes = self.data_handler.ticker_data["AAPL"]["close"]
+        expected = closes.rolling(5).mean().to_numpy()
+        for i in range(len(closes)):
+            self.data_handler.update_bars()
+            first = self.registry.get(SMA, "AAPL", window=5)
+            second = self.registry.get(SMA, "AAPL", window=5)
+            self.assertIs(first, second)
+            self.assertEqual(first.count, i + 1)
+            np.testing.assert_allclose(first.value, expected[i], equal_nan=True)
+
+    def test_late_indicator_is_warmed_from_history(self):
+        for _ in range(12):
+            self.data_handler.update_bars()
+        sma = self.registry.get(SMA, "AAPL", window=10)
+        closes = self.data_handler.ticker_data["AAPL"]["close"].to_numpy()
+        self.assertAlmostEqual(sma.value, closes[2:12].mean())
+
+    def test_crossover_matches_full_window_mean(self):
+        strategy = MovingAverageCrossoverStrategy(self.data_handler, short_window=3, long_window=10)
+        closes = self.data_handler.ticker_data["AAPL"]["close"].to_numpy()
+        expected_bar = next(
+            i for i in range(9, len(closes)) if closes[i - 2:i + 1].mean() >= closes[i - 9:i + 1].mean()
+        )
+        signal_bar = None
+        for i in range(len(closes)):
+            event = self.data_handler.update_bars()[0]
+            if strategy.calculate_signals(event) is not None:
+                signal_bar = i
+                break
+        self.assertEqual(signal_bar, expected_bar)
+        self.assertEqual(event.price, closes[expected_bar])
+
+if __name__ == '__main__':
+    unittest.main()
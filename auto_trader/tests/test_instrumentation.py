@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from auto_trader.common.event import EventBus, EventType, FillEvent, MarketEvent, SignalEvent
+from auto_trader.common.instrumentation import Instrumentation, LatencyHistogram, bucket_bounds, bucket_index
+from auto_trader.common.log import setup_logging, shutdown_logging
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+
+class AlwaysBuy(Strategy):
+    def calculate_signals(self, event):
+        return SignalEvent(event.ticker, "BUY", event.price)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_cover_values_with_bounded_error(self):
+        values = np.unique(np.random.default_rng(0).integers(0, 2**35, 5_000)).tolist() + list(range(300))
+        for value in values:
+            lowest, highest = bucket_bounds(bucket_index(value))
+            self.assertLessEqual(lowest, value)
+            self.assertGreaterEqual(highest, value)
+            self.assertLessEqual(highest - lowest, max(lowest, 1) / 64)
+
+    def test_percentiles_match_numpy_within_resolution(self):
+        values = np.random.default_rng(1).lognormal(10, 1.5, 50_000).astype(np.int64)
+        histogram = LatencyHistogram()
+        for value in values.tolist():
+            histogram.record(value)
+        self.assertEqual(histogram.count, len(values))
+        self.assertEqual(histogram.max, values.max())
+        self.assertEqual(histogram.total, values.sum())
+        for percentile, value in zip((50, 99, 99.9), histogram.percentiles((50, 99, 99.9))):
+            expected = np.percentile(values, percentile, method="inverted_cdf")
+            self.assertAlmostEqual(value / expected, 1.0, delta=0.02)
+
+    def test_merge_and_empty_snapshot(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        self.assertEqual(a.snapshot(), {"count": 0})
+        a.record(1_000)
+        b.record(5_000)
+        a.merge(b)
+        self.assertEqual(a.count, 2)
+        self.assertEqual(a.max, 5_000)
+        self.assertAlmostEqual(a.snapshot()["mean_us"], 3.0)
+
+
+class TestInstrumentedEventBus(unittest.TestCase):
+    def test_disabled_bus_publishes_straight_to_queue(self):
+        bus = EventBus(threaded=False)
+        self.assertIsNone(bus.instrumentation)
+        self.assertEqual(bus.publish, bus._event_queue.append)
+
+    def test_records_every_hop_of_the_pipeline(self):
+        instrumentation = Instrumentation()
+        bus = EventBus(threaded=False, instrumentation=instrumentation)
+        StrategyEngine([AlwaysBuy()], bus)
+        execution_handler = ExecutionHandler(bus)
+        bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        PositionManager(bus)
+        for i in range(10):
+            bus.publish(MarketEvent("AAPL", 100.0 + i))
+            bus.run_until_idle()
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot["latency.tick_to_signal"]["count"], 10)
+        self.assertEqual(snapshot["latency.signal_to_fill"]["count"], 10)
+        self.assertEqual(snapshot["queue_wait.MARKET"]["count"], 10)
+        self.assertEqual(snapshot["queue_wait.POSITION"]["count"], 10)
+        self.assertEqual(snapshot["handler.StrategyEngine.on_market_event"]["count"], 10)
+        self.assertEqual(snapshot["handler.PositionManager.on_fill"]["count"], 10)
+        self.assertNotIn("queue_wait.MARKET_BATCH", snapshot)
+        stats = snapshot["latency.tick_to_signal"]
+        self.assertLessEqual(stats["p50_us"], stats["max_us"])
+
+    def test_subscribe_after_dispatch_is_timed(self):
+        instrumentation = Instrumentation()
+        bus = EventBus(threaded=False, instrumentation=instrumentation)
+        seen = []
+        bus.publish(FillEvent("AAPL", 1, "BUY", 1.0))
+        bus.run_until_idle()
+        bus.subscribe(EventType.FILL, seen.append)
+        bus.publish(FillEvent("AAPL", 1, "BUY", 1.0))
+        bus.run_until_idle()
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(instrumentation.histogram("handler.list.append").count, 1)
+
+    def test_threaded_stop_dumps_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latency.json")
+            bus = EventBus(instrumentation=Instrumentation(dump_path=path))
+            seen = []
+            bus.subscribe(EventType.MARKET, seen.append)
+            bus.start()
+            for i in range(5):
+                bus.publish(MarketEvent("AAPL", float(i)))
+            deadline = time.monotonic() + 5
+            while len(seen) < 5 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            bus.stop()
+            with open(path, encoding="utf-8") as f:
+                dumped = json.load(f)
+        self.assertEqual(dumped["queue_wait.MARKET"]["count"], 5)
+
+
+class TestLogging(unittest.TestCase):
+    def tearDown(self):
+        shutdown_logging()
+
+    def test_records_are_delivered_by_listener_thread(self):
+        handler = ListHandler()
+        setup_logging("DEBUG", handler=handler)
+        bus = EventBus(threaded=False)
+        PositionManager(bus)
+        bus.publish(FillEvent("AAPL", 10, "BUY", 100.0))
+        bus.run_until_idle()
+        shutdown_logging()
+        messages = [record.getMessage() for record in handler.records]
+        self.assertIn("Updated position for AAPL: 10.0 shares", messages)
+
+    def test_level_filters_debug_records(self):
+        handler = ListHandler()
+        setup_logging("INFO", handler=handler)
+        logging.getLogger("auto_trader.tests").debug("hidden")
+        logging.getLogger("auto_trader.tests").warning("shown")
+        shutdown_logging()
+        self.assertEqual([record.getMessage() for record in handler.records], ["shown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.analytics.metrics import (
+    attribution, batch_metrics, export_metrics, fills_frame, load_metrics, performance_metrics, trade_metrics,
+)
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.common.event import FillEvent
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class TestMetrics(unittest.TestCase):
+    def test_equity_metrics(self):
+        equity = np.array([100.0, 110.0, 99.0, 105.0, 120.0, 118.0])
+        metrics = performance_metrics(equity, periods_per_year=252)
+        returns = equity[1:] / equity[:-1] - 1
+        self.assertAlmostEqual(metrics["total_return"], 0.18)
+        self.assertAlmostEqual(metrics["cagr"], 1.18 ** (252 / 5) - 1)
+        self.assertAlmostEqual(metrics["sharpe"], returns.mean() / returns.std(ddof=1) * math.sqrt(252))
+        downside = math.sqrt((np.minimum(returns, 0) ** 2).mean())
+        self.assertAlmostEqual(metrics["sortino"], returns.mean() / downside * math.sqrt(252))
+        self.assertAlmostEqual(metrics["max_drawdown"], 0.1)
+        self.assertEqual(metrics["max_drawdown_duration"], 2)
+
+    def test_batch_matches_single_runs_with_ragged_lengths(self):
+        rng = np.random.default_rng(0)
+        curves = [100 * np.cumprod(1 + rng.normal(0, 0.01, n)) for n in (50, 80, 65)]
+        padded = np.full((3, 80), np.nan)
+        for k, curve in enumerate(curves):
+            padded[k, :len(curve)] = curve
+        batch = batch_metrics(padded)
+        for k, curve in enumerate(curves):
+            single = performance_metrics(curve)
+            for column in batch.columns:
+                self.assertAlmostEqual(batch[column][k], single[column], msg=column)
+
+    def test_trade_metrics_and_attribution(self):
+        fills = fills_frame([
+            FillEvent("AAA", 10, "BUY", 10.0, 1.0),
+            FillEvent("BBB", 5, "BUY", 20.0, 1.0),
+            FillEvent("AAA", 10, "SELL", 12.0, 1.0),
+            FillEvent("AAA", 10, "BUY", 12.0, 1.0),
+            FillEvent("AAA", 10, "SELL", 11.0, 1.0),
+        ])
+        metrics = trade_metrics(fills, average_equity=1_000.0, years=0.5)
+        self.assertEqual(metrics["round_trips"], 2)
+        self.assertEqual(metrics["hit_rate"], 0.5)
+        self.assertEqual(metrics["traded_notional"], 100 + 100 + 120 + 120 + 110)
+        self.assertAlmostEqual(metrics["turnover"], 550 / 1_000 / 0.5)
+
+        pnl = attribution(fills, {"AAA": 11.0, "BBB": 25.0})
+        self.assertEqual(pnl.loc["AAA", "pnl"], 20 - 10 - 4)
+        self.assertEqual(pnl.loc["BBB", "pnl"], 25 - 1)
+        self.assertEqual(pnl.loc["BBB", "position"], 5)
+        self.assertEqual(pnl.loc["AAA", "num_fills"], 4)
+
+    def test_backtest_result_and_export(self):
+        df = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True)
+        backtest = VectorizedBacktest(MovingAverageCrossoverStrategy(None, 3, 5), initial_cash=100_000.0)
+        result = backtest.run(df, "AAPL")
+        metrics = performance_metrics(result.equity_curve, result.fills, result.positions)
+        self.assertEqual(metrics["num_fills"], len(result.fills))
+        self.assertGreater(metrics["exposure"], 0)
+
+        frame = pd.DataFrame([dict(metrics, ticker="AAPL"), dict(metrics, ticker="MSFT")])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_metrics(frame, os.path.join(tmp, "metrics.parquet"))
+            loaded = load_metrics(path)
+        self.assertEqual(list(loaded.columns), list(frame.columns))
+        self.assertEqual(loaded["ticker"].tolist(), ["AAPL", "MSFT"])
+        np.testing.assert_allclose(loaded["sharpe"], frame["sharpe"])
+
+if __name__ == '__main__':
+    unittest.main()
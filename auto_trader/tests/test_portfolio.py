@@ -0,0 +1,119 @@
+import os
+import random
+import unittest
+
+import numpy as np
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.common.event import EventBus, EventType, FillEvent, MarketEvent, PositionEvent
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.position_manager.portfolio import EquityCurve, Holding, Portfolio
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.risk_manager import RiskManager
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_average_cost_and_realized_pnl(self):
+        portfolio = Portfolio(initial_cash=10_000.0)
+        portfolio.on_fill("AAPL", 10, "BUY", 100.0, 1.0)
+        portfolio.on_fill("AAPL", 10, "BUY", 110.0, 1.0)
+        self.assertEqual(portfolio.holdings["AAPL"], Holding(20, 105.0, 0.0))
+        portfolio.on_fill("AAPL", 5, "SELL", 120.0, 1.0)
+        self.assertEqual(portfolio.holdings["AAPL"], Holding(15, 105.0, 75.0))
+        # flipping short realizes the remaining long and opens at the fill price
+        portfolio.on_fill("AAPL", 20, "SELL", 100.0, 1.0)
+        self.assertEqual(portfolio.holdings["AAPL"], Holding(-5, 100.0, 0.0))
+        self.assertEqual(portfolio.realized_pnl, 0.0)
+        self.assertEqual(portfolio.commission, 4.0)
+        self.assertEqual(portfolio.cash, 10_000.0 - 1000 - 1100 + 600 + 2000 - 4.0)
+        portfolio.update_price("AAPL", 90.0)
+        self.assertEqual(portfolio.unrealized_pnl("AAPL"), 50.0)
+        self.assertEqual(portfolio.market_value, -450.0)
+        self.assertEqual(portfolio.gross_exposure, 450.0)
+        self.assertEqual(portfolio.equity, portfolio.cash - 450.0)
+
+    def test_incremental_equity_matches_full_recalculation(self):
+        rng = random.Random(0)
+        portfolio = Portfolio(initial_cash=1e6)
+        tickers = ["A", "B", "C", "D"]
+        for _ in range(2000):
+            ticker = rng.choice(tickers)
+            if rng.random() < 0.2:
+                portfolio.on_fill(ticker, rng.randint(1, 50), rng.choice(["BUY", "SELL"]), rng.uniform(50, 150), 1.0)
+            else:
+                portfolio.update_price(ticker, rng.uniform(50, 150))
+        expected = sum(q * portfolio.price(t) for t, q in portfolio.positions.items())
+        gross = sum(abs(q) * portfolio.price(t) for t, q in portfolio.positions.items())
+        self.assertAlmostEqual(portfolio.market_value, expected, places=6)
+        self.assertAlmostEqual(portfolio.gross_exposure, gross, places=6)
+
+    def test_snapshots_are_copy_on_write(self):
+        portfolio = Portfolio()
+        portfolio.on_fill("AAPL", 10, "BUY", 100.0)
+        snapshot = portfolio.snapshot()
+        with self.assertRaises(TypeError):
+            snapshot.positions["AAPL"] = 0
+        portfolio.on_fill("AAPL", 10, "BUY", 100.0)
+        portfolio.on_fill("MSFT", 1, "BUY", 10.0)
+        self.assertEqual(dict(snapshot.positions), {"AAPL": 10})
+        self.assertEqual(dict(portfolio.positions), {"AAPL": 20, "MSFT": 1})
+
+    def test_equity_curve_buffer(self):
+        curve = EquityCurve(capacity=2)
+        for i in range(5):
+            curve.mark(i, float(i))
+        curve.mark(4, 40.0)
+        self.assertEqual(curve.values.tolist(), [0.0, 1.0, 2.0, 3.0, 40.0])
+        self.assertEqual(len(curve.to_series()), 5)
+
+
+class TestPositionManagerLedger(unittest.TestCase):
+    def test_backtest_records_equity_curve(self):
+        event_bus = EventBus(threaded=False)
+        data_handler = HistoricCSVDataHandler(event_bus, [AAPL_CSV], ["AAPL"])
+        position_manager = PositionManager(event_bus, initial_cash=100_000.0)
+        risk_manager = RiskManager(event_bus)
+        bought = []
+
+        def buy_first_bar(event):
+            if not bought:
+                bought.append(event.price)
+                event_bus.publish(FillEvent("AAPL", 100, "BUY", event.price, 5.0))
+
+        event_bus.subscribe(EventType.MARKET, buy_first_bar)
+        Backtest(event_bus, data_handler).run()
+
+        close = data_handler.ticker_data["AAPL"]["close"].to_numpy()
+        curve = position_manager.portfolio.equity_curve
+        self.assertEqual(len(curve), 30)
+        expected = 100_000.0 - 100 * close[0] - 5.0 + 100 * close
+        np.testing.assert_allclose(curve.values, expected)
+        self.assertAlmostEqual(risk_manager.calculate_total_equity(), 100 * close[-1])
+
+    def test_position_event_carries_snapshot(self):
+        event_bus = EventBus(threaded=False)
+        position_manager = PositionManager(event_bus)
+        events = []
+        event_bus.subscribe(EventType.POSITION, events.append)
+        event_bus.publish(MarketEvent("AAPL", 10.0))
+        event_bus.publish(FillEvent("AAPL", 3, "BUY", 10.0, 0.0))
+        event_bus.publish(FillEvent("AAPL", 1, "SELL", 12.0, 0.0))
+        event_bus.run_until_idle()
+        self.assertEqual([dict(e.positions) for e in events], [{"AAPL": 3}, {"AAPL": 2}])
+        self.assertEqual(events[1].ticker, "AAPL")
+        self.assertEqual(events[1].snapshot.realized_pnl, 2.0)
+        self.assertEqual(dict(position_manager.positions), {"AAPL": 2})
+
+    def test_risk_manager_full_recalculation_for_plain_events(self):
+        event_bus = EventBus(threaded=False)
+        risk_manager = RiskManager(event_bus)
+        event_bus.publish(MarketEvent("AAPL", 10.0))
+        event_bus.publish(PositionEvent({"AAPL": 5, "MSFT": 2}))
+        event_bus.publish(MarketEvent("MSFT", 20.0))
+        event_bus.run_until_idle()
+        self.assertEqual(risk_manager.calculate_total_equity(), 90.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+
+from auto_trader.common.event import EventBus, EventType, MarketEvent, MarketBatchEvent, SignalEvent
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.pre_trade import PreTradeRiskEngine, RiskLimits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPreTradeRiskEngine(unittest.TestCase):
+    def setUp(self):
+        self.event_bus = EventBus(threaded=False)
+        self.position_manager = PositionManager(self.event_bus, initial_cash=100_000.0)
+        self.fills = []
+        self.event_bus.subscribe(EventType.FILL, self.fills.append)
+
+    def make(self, **limits):
+        self.clock = FakeClock()
+        self.engine = PreTradeRiskEngine(self.event_bus, RiskLimits(**limits), clock=self.clock)
+        self.execution_handler = ExecutionHandler(self.event_bus, quantity=100, commission=0.0, risk=self.engine)
+        self.event_bus.subscribe(EventType.SIGNAL, self.execution_handler.on_signal)
+        return self.engine
+
+    def tick(self, ticker, price):
+        self.event_bus.publish(MarketEvent(ticker, price))
+        self.event_bus.run_until_idle()
+
+    def signal(self, ticker, action, price):
+        self.event_bus.publish(SignalEvent(ticker, action, price))
+        self.event_bus.run_until_idle()
+
+    def test_order_size_and_ticker_notional(self):
+        engine = self.make(max_order_quantity=80, max_ticker_notional=12_000.0)
+        self.tick("AAPL", 100.0)
+        self.signal("AAPL", "BUY", 100.0)
+        self.signal("AAPL", "BUY", 100.0)
+        self.signal("AAPL", "BUY", 100.0)
+        self.assertEqual([f.quantity for f in self.fills], [80, 40])
+        self.assertEqual(engine.rejections["ticker_notional"], 1)
+        self.assertEqual(engine.resized, 2)
+        engine.set_ticker_limit("MSFT", 1_000.0)
+        self.assertEqual(engine.check("MSFT", "BUY", 100, price=50.0), 20)
+        # selling reduces the position, so it is not limited by the notional cap
+        self.assertEqual(engine.check("AAPL", "SELL", 80), 80)
+
+    def test_gross_and_net_exposure(self):
+        engine = self.make(max_gross_exposure=30_000.0, max_net_exposure=10_000.0)
+        self.tick("AAPL", 100.0)
+        self.tick("MSFT", 100.0)
+        self.signal("AAPL", "BUY", 100.0)
+        self.assertEqual(engine.check("MSFT", "BUY", 100), 0)
+        self.assertEqual(engine.rejections["net_exposure"], 1)
+        self.signal("MSFT", "SELL", 100.0)
+        self.assertEqual((engine.gross_exposure, engine.net_exposure), (20_000.0, 0.0))
+        self.assertEqual(engine.check("TSLA", "BUY", 500, price=100.0), 100)
+        self.tick("AAPL", 150.0)
+        self.assertEqual((engine.gross_exposure, engine.net_exposure), (25_000.0, 5_000.0))
+
+    def test_token_bucket(self):
+        engine = self.make(max_orders_per_second=2, order_burst=2)
+        self.assertEqual([engine.check("AAPL", "BUY", 1) for _ in range(3)], [1, 1, 0])
+        self.clock.now += 0.5
+        self.assertEqual(engine.check("AAPL", "BUY", 1), 1)
+        self.assertEqual(engine.rejections["rate_limit"], 1)
+
+    def test_drawdown_kill_switch(self):
+        engine = self.make(max_drawdown=0.1)
+        self.tick("AAPL", 1_000.0)
+        self.signal("AAPL", "BUY", 1_000.0)
+        self.assertFalse(engine.halted)
+        self.tick("AAPL", 850.0)
+        self.assertTrue(engine.halted)
+        self.assertEqual(engine.check("MSFT", "BUY", 10, price=1.0), 0)
+        self.assertEqual(engine.check("AAPL", "SELL", 500), 100)
+        engine.reset_kill_switch()
+        self.assertFalse(engine.halted)
+        self.assertEqual(engine.peak_equity, 100_000.0 - 15_000.0)
+
+    def test_batch_check(self):
+        engine = self.make(max_ticker_notional=5_000.0, max_gross_exposure=6_000.0)
+        tickers = np.array(["A", "B", "C"], dtype=object)
+        self.event_bus.publish(MarketBatchEvent(0, {"ticker": tickers, "close": np.array([10.0, 20.0, 50.0])}))
+        self.event_bus.run_until_idle()
+        allowed = engine.check_batch(tickers, ["BUY", "BUY", "SELL"], [1_000, 100, 20])
+        # A is capped at 500 shares by its notional limit; the 8000 of gross
+        # asked for is then scaled into the 6000 of headroom
+        np.testing.assert_array_equal(allowed, [375, 75, 15])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.analytics.metrics import batch_metrics
+from auto_trader.analytics.robustness import (
+    ReservoirSample, RobustnessAnalysis, StreamingMoments, block_bootstrap, path_metrics, perturb_prices,
+    shuffle_trades,
+)
+from auto_trader.backtest.vectorized import BacktestResult, VectorizedBacktest
+from auto_trader.benchmarks.synthetic import generate_ohlcv
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+
+class TestPathGenerators(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+        self.returns = self.rng.normal(0.0005, 0.01, 250)
+
+    def test_block_bootstrap_draws_contiguous_blocks(self):
+        paths = block_bootstrap(self.returns, 50, block_size=10, initial_equity=100.0, rng=self.rng)
+        self.assertEqual(paths.shape, (50, 251))
+        np.testing.assert_array_equal(paths[:, 0], 100.0)
+        drawn = paths[:, 1:] / paths[:, :-1] - 1
+        # Every block of ten returns is a (circular) slice of the original series
+        start = int(np.argmin(np.abs(self.returns - drawn[0, 0])))
+        np.testing.assert_allclose(drawn[0, :10], self.returns[(start + np.arange(10)) % 250])
+
+    def test_shuffle_keeps_terminal_equity(self):
+        pnls = self.rng.normal(10, 50, 40)
+        paths = shuffle_trades(pnls, 30, 1000.0, rng=self.rng)
+        np.testing.assert_allclose(paths[:, -1], 1000.0 + pnls.sum())
+        np.testing.assert_allclose(np.sort(np.diff(paths, axis=1), axis=1), np.tile(np.sort(pnls), (30, 1)))
+        resampled = shuffle_trades(pnls, 30, 1000.0, replace=True, rng=self.rng)
+        self.assertGreater(np.ptp(resampled[:, -1]), 0)
+
+    def test_perturbation_keeps_costs(self):
+        close = 100 * np.cumprod(1 + self.returns)
+        positions = np.repeat([0, 100, 100, 0, 50], 50)
+        equity = 10_000 + np.concatenate(([0.0], np.cumsum(positions[:-1] * np.diff(close)))) - 5.0 * np.arange(250)
+        unchanged = perturb_prices(equity, close, positions, 5, noise=0.0, rng=self.rng)
+        np.testing.assert_allclose(unchanged, np.tile(equity, (5, 1)))
+        paths = perturb_prices(equity, close, positions, 20, rng=self.rng)
+        self.assertEqual(paths.shape, (20, 250))
+        # Flat stretches keep only the cost drift
+        np.testing.assert_allclose(np.diff(paths[:, :50], axis=1), -5.0)
+
+    def test_path_metrics_match_batch_metrics(self):
+        paths = block_bootstrap(self.returns, 20, rng=self.rng)
+        metrics, batch = path_metrics(paths), batch_metrics(paths)
+        np.testing.assert_allclose(metrics["sharpe"], batch["sharpe"])
+        np.testing.assert_allclose(metrics["max_drawdown"], batch["max_drawdown"])
+        np.testing.assert_allclose(metrics["terminal_equity"], batch["final_equity"])
+
+
+class TestStreamingAggregates(unittest.TestCase):
+    def test_moments_match_numpy_across_merges(self):
+        values = np.random.default_rng(0).normal(3, 2, 10_001)
+        left, right = StreamingMoments(), StreamingMoments()
+        for chunk in np.array_split(values[:6000], 7):
+            left.update(chunk)
+        right.update(np.append(values[6000:], np.nan))
+        left.merge(right)
+        self.assertEqual(left.count, len(values))
+        self.assertAlmostEqual(left.mean, values.mean())
+        self.assertAlmostEqual(left.std, values.std(ddof=1))
+        self.assertEqual((left.min, left.max), (values.min(), values.max()))
+
+    def test_reservoir_is_exact_below_capacity_and_bounded_above(self):
+        rng = np.random.default_rng(1)
+        values = rng.normal(size=500)
+        sample = ReservoirSample(1000)
+        sample.update(values, rng)
+        self.assertEqual(sample.quantile(0.3), np.quantile(values, 0.3))
+        for _ in range(20):
+            sample.update(rng.normal(size=500), rng)
+        self.assertEqual(len(sample.values), 1000)
+        self.assertAlmostEqual(sample.quantile(0.5), 0.0, delta=0.15)
+        self.assertAlmostEqual(sample.fraction_below(0.0), 0.5, delta=0.06)
+
+
+class TestRobustnessAnalysis(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_ohlcv(600, seed=4)
+        cls.result = VectorizedBacktest(MovingAverageCrossoverStrategy(None, 5, 20),
+                                        initial_cash=100_000.0).run(cls.df, "SYN")
+
+    def test_report_is_independent_of_workers_and_chunking(self):
+        analysis = RobustnessAnalysis.from_result(self.result, "bootstrap", chunk_size=64, reservoir_size=500,
+                                                  max_workers=1, seed=7)
+        inline = analysis.run(1000)
+        analysis.max_workers = 3
+        pooled = analysis.run(1000)
+        for name in ("sharpe", "max_drawdown", "terminal_equity"):
+            np.testing.assert_allclose(np.sort(inline.distributions[name].sample.values),
+                                       np.sort(pooled.distributions[name].sample.values))
+            self.assertAlmostEqual(inline.distributions[name].moments.mean,
+                                   pooled.distributions[name].moments.mean)
+        self.assertEqual(inline.distributions["sharpe"].moments.count, 1000)
+
+        summary = inline.summary()
+        self.assertEqual(list(summary.index), ["sharpe", "max_drawdown", "terminal_equity"])
+        self.assertAlmostEqual(summary.loc["terminal_equity", "observed"], self.result.equity[-1])
+        self.assertTrue(0.0 <= summary.loc["sharpe", "observed_rank"] <= 1.0)
+
+    def test_methods_prepare_inputs_from_a_backtest(self):
+        # Alternate buys and sells so the shuffle has closed round trips to reorder
+        prices = self.df["close"].to_numpy()[::60][:10]
+        fills = pd.DataFrame({"ticker": "SYN", "direction": ["BUY", "SELL"] * 5, "quantity": 100,
+                              "fill_price": prices, "commission": 5.0})
+        traded = BacktestResult("SYN", self.df.index, fills, self.result.positions, self.result.cash,
+                                self.result.equity)
+        shuffled = RobustnessAnalysis.from_result(traded, "shuffle", max_workers=1).run(200)
+        expected = self.result.equity[0] + (100 * (prices[1::2] - prices[::2]) - 10.0).sum()
+        self.assertAlmostEqual(shuffled.distributions["terminal_equity"].moments.mean, expected)
+        self.assertAlmostEqual(shuffled.distributions["terminal_equity"].moments.std, 0.0, places=6)
+        self.assertGreater(shuffled.distributions["max_drawdown"].moments.std, 0.0)
+        perturbed = RobustnessAnalysis.from_result(self.result, "perturb", close=self.df["close"],
+                                                   max_workers=1).run(200)
+        self.assertAlmostEqual(perturbed.observed["terminal_equity"], self.result.equity[-1])
+        self.assertGreater(perturbed.distributions["terminal_equity"].moments.std, 0.0)
+        with self.assertRaises(ValueError):
+            RobustnessAnalysis.from_result(self.result, "perturb")
+        with self.assertRaises(ValueError):
+            RobustnessAnalysis("jackknife", {})
+
+    def test_default_backtest_needs_initial_cash(self):
+        # VectorizedBacktest starts from zero cash, so its equity hovers around zero
+        result = VectorizedBacktest(MovingAverageCrossoverStrategy(None, 5, 20)).run(self.df, "SYN")
+        for method in ("bootstrap", "shuffle"):
+            with self.assertRaises(ValueError):
+                RobustnessAnalysis.from_result(result, method)
+        report = RobustnessAnalysis.from_result(result, "bootstrap", initial_cash=100_000.0, max_workers=1).run(200)
+        expected = RobustnessAnalysis.from_result(self.result, "bootstrap", max_workers=1).run(200)
+        summary = report.summary()
+        self.assertTrue(np.isfinite(summary.to_numpy()).all())
+        pd.testing.assert_frame_equal(summary, expected.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
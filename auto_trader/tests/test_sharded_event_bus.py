@@ -0,0 +1,175 @@
+import threading
+import unittest
+from collections import defaultdict
+
+import numpy as np
+
+from auto_trader.common.event import BarEvent, EventType, FillEvent, MarketEvent, MarketBatchEvent, SignalEvent
+from auto_trader.common.sharded_event_bus import ShardedEventBus
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.position_manager.position_manager import PositionManager
+from auto_trader.risk_manager.pre_trade import PreTradeRiskEngine, RiskLimits
+from auto_trader.risk_manager.risk_manager import RiskManager
+
+
+class TestShardedEventBus(unittest.TestCase):
+    def test_per_ticker_order_is_preserved(self):
+        bus = ShardedEventBus(num_shards=4, max_queue=64)
+        seen = defaultdict(list)
+        bus.subscribe(EventType.MARKET, lambda e: seen[e.ticker].append(e.price))
+        bus.start()
+        tickers = [f"T{i}" for i in range(10)]
+        for i in range(500):
+            for ticker in tickers:
+                bus.publish(MarketEvent(ticker, float(i)))
+        bus.stop()
+        for ticker in tickers:
+            self.assertEqual(seen[ticker], [float(i) for i in range(500)])
+        self.assertGreater(len({bus.shard_for(t) for t in tickers}), 1)
+
+    def test_slow_shard_does_not_block_ordered_lane(self):
+        bus = ShardedEventBus(num_shards=2)
+        release = threading.Event()
+        filled = threading.Event()
+        bus.subscribe(EventType.MARKET, lambda e: release.wait(5))
+        bus.subscribe(EventType.FILL, lambda e: filled.set())
+        bus.start()
+        try:
+            bus.publish(MarketEvent("SLOW", 1.0))
+            bus.publish(FillEvent("SLOW", 1, "BUY", 1.0))
+            self.assertTrue(filled.wait(2))
+            self.assertFalse(release.is_set())
+        finally:
+            release.set()
+            bus.stop()
+
+    def test_coalesce_keeps_latest_quote(self):
+        bus = ShardedEventBus(num_shards=1, max_queue=2, backpressure="coalesce")
+        quotes, signals = [], []
+        bus.subscribe(EventType.MARKET, lambda e: quotes.append((e.ticker, e.price)))
+        bus.subscribe(EventType.SIGNAL, signals.append)
+        for i in range(100):
+            bus.publish(MarketEvent("AAPL", float(i)))
+            bus.publish(MarketEvent("MSFT", float(-i)))
+        bus.publish(MarketEvent("TSLA", 1.0))
+        for _ in range(5):
+            bus.publish(SignalEvent("TSLA", "BUY", 1.0))
+        self.assertEqual(bus.run_until_idle(), 7)
+        self.assertEqual(quotes, [("AAPL", 99.0), ("MSFT", -99.0)])
+        self.assertEqual(len(signals), 5)
+        self.assertEqual((bus.coalesced, bus.dropped), (198, 1))
+
+    def test_coalesced_quote_does_not_overtake_later_events(self):
+        bus = ShardedEventBus(num_shards=1, max_queue=1000, backpressure="coalesce")
+        seen = []
+        bus.subscribe(EventType.MARKET, lambda e: seen.append(("M", e.ticker, e.price)), ordered=True)
+        bus.subscribe(EventType.FILL, lambda e: seen.append(("F", e.ticker, e.fill_price)))
+        # Below max_queue nothing is coalesced
+        bus.publish(MarketEvent("AAPL", 1.0))
+        bus.publish(FillEvent("AAPL", 1, "BUY", 1.0))
+        bus.publish(MarketEvent("AAPL", 2.0))
+        bus.run_until_idle()
+        self.assertEqual(seen, [("M", "AAPL", 1.0), ("F", "AAPL", 1.0), ("M", "AAPL", 2.0)])
+        self.assertEqual(bus.coalesced, 0)
+
+        # A full lane replaces the old quote but queues the new one behind the fill
+        bus = ShardedEventBus(num_shards=1, max_queue=2, backpressure="coalesce")
+        seen.clear()
+        bus.subscribe(EventType.MARKET, lambda e: seen.append(("M", e.ticker, e.price)), ordered=True)
+        bus.subscribe(EventType.FILL, lambda e: seen.append(("F", e.ticker, e.fill_price)))
+        bus.publish(MarketEvent("AAPL", 1.0))
+        bus.publish(MarketEvent("MSFT", 1.0))
+        bus.publish(FillEvent("AAPL", 1, "BUY", 1.0))
+        bus.publish(MarketEvent("AAPL", 2.0))
+        bus.run_until_idle()
+        self.assertEqual(seen, [("M", "MSFT", 1.0), ("F", "AAPL", 1.0), ("M", "AAPL", 2.0)])
+        self.assertEqual(bus.coalesced, 1)
+
+    def test_stateful_execution_runs_on_the_ordered_lane(self):
+        bus = ShardedEventBus(num_shards=4)
+        risk = PreTradeRiskEngine(bus, RiskLimits(max_order_quantity=1000))
+        plain, checked = ExecutionHandler(bus), ExecutionHandler(bus, risk=risk)
+        self.assertFalse(plain.requires_ordered_lane)
+        self.assertTrue(checked.requires_ordered_lane)
+        bus.subscribe(EventType.SIGNAL, plain.on_signal)
+        bus.subscribe(EventType.SIGNAL, checked.on_signal)
+        self.assertEqual(bus._sharded_handlers[EventType.SIGNAL], (plain.on_signal,))
+        self.assertEqual(bus._ordered_handlers[EventType.SIGNAL], (checked.on_signal,))
+
+    def test_drop_policy(self):
+        bus = ShardedEventBus(num_shards=1, max_queue=3, backpressure="drop")
+        quotes = []
+        bus.subscribe(EventType.MARKET, quotes.append)
+        for i in range(10):
+            bus.publish(MarketEvent("AAPL", float(i)))
+        bus.run_until_idle()
+        self.assertEqual([q.price for q in quotes], [0.0, 1.0, 2.0])
+        self.assertEqual(bus.dropped, 7)
+
+    def test_batches_and_bars_are_bounded(self):
+        def batch(i):
+            return MarketBatchEvent(i, {"ticker": np.array(["AAPL", "MSFT"], dtype=object), "close": np.full(2, i)})
+
+        def bar(i, timeframe):
+            return BarEvent("AAPL", float(i), i, i, i, i, 0.0, timeframe)
+
+        dropping = ShardedEventBus(num_shards=1, max_queue=2, backpressure="drop")
+        dropping.subscribe(EventType.MARKET_BATCH, lambda e: None)
+        for i in range(100):
+            dropping.publish(batch(i))
+        self.assertEqual((len(dropping._shards[0]), dropping.dropped), (2, 98))
+
+        bus = ShardedEventBus(num_shards=1, max_queue=3, backpressure="coalesce")
+        seen = []
+        bus.subscribe(EventType.MARKET_BATCH, lambda e: seen.append(("batch", e.timestamp)))
+        bus.subscribe(EventType.BAR, lambda e: seen.append((e.timeframe, e.timestamp)))
+        bus.publish(batch(0))
+        bus.publish(bar(0, "5m"))
+        bus.publish(bar(0, "1h"))
+        for i in range(1, 50):
+            bus.publish(batch(i))
+            bus.publish(bar(i, "5m"))
+        bus.publish(bar(1, "1d"))
+        self.assertEqual(len(bus._shards[0]), 3)
+        bus.run_until_idle()
+        # The hourly bar is never replaced by a bar of another timeframe
+        self.assertEqual(seen, [("1h", 0), ("batch", 49), ("5m", 49)])
+        self.assertEqual((bus.coalesced, bus.dropped), (98, 1))
+
+    def test_batches_are_split_by_shard(self):
+        bus = ShardedEventBus(num_shards=3)
+        parts, whole = [], []
+        bus.subscribe(EventType.MARKET_BATCH, parts.append)
+        bus.subscribe(EventType.MARKET_BATCH, whole.append, ordered=True)
+        tickers = np.array([f"T{i}" for i in range(20)], dtype=object)
+        close = np.arange(20, dtype=float)
+        bus.publish(MarketBatchEvent(7, {"ticker": tickers, "close": close}))
+        bus.run_until_idle()
+        self.assertGreater(len(parts), 1)
+        for part in parts:
+            self.assertEqual(len({bus.shard_for(t) for t in part.tickers}), 1)
+            self.assertEqual(part.timestamp, 7)
+        merged = {t: c for part in parts for t, c in zip(part.tickers, part.arrays["close"])}
+        self.assertEqual(merged, dict(zip(tickers, close)))
+        self.assertEqual(len(whole), 1)
+
+    def test_trading_components(self):
+        bus = ShardedEventBus(num_shards=4)
+        position_manager = PositionManager(bus, initial_cash=10_000.0)
+        risk_manager = RiskManager(bus)
+        execution_handler = ExecutionHandler(bus, quantity=10, commission=0.0)
+        bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        bus.subscribe(EventType.MARKET, lambda e: bus.publish(SignalEvent(e.ticker, "BUY", e.price)))
+        bus.start()
+        for ticker, price in (("AAPL", 10.0), ("MSFT", 20.0), ("TSLA", 30.0)):
+            bus.publish(MarketEvent(ticker, price))
+        bus.stop()
+        # stop() waits for the signals and fills published while draining
+        self.assertEqual(bus.run_until_idle(), 0)
+        self.assertEqual(dict(position_manager.positions), {"AAPL": 10, "MSFT": 10, "TSLA": 10})
+        self.assertEqual(risk_manager.calculate_total_equity(), 600.0)
+        self.assertEqual(position_manager.portfolio.equity, 10_000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import unittest
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.common.event import EventBus, EventType, MarketEvent, OrderEvent, SignalEvent
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.execution_handler.cost_models import (
+    FixedSlippage, PercentCommission, PerShareCommission, VolumeParticipation, VolumeShareSlippage,
+)
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.execution_handler.simulated_broker import SimulatedBroker
+from auto_trader.position_manager.position_manager import PositionManager
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class TestSimulatedBroker(unittest.TestCase):
+    def setUp(self):
+        self.event_bus = EventBus(threaded=False)
+        self.fills = []
+        self.event_bus.subscribe(EventType.FILL, self.fills.append)
+
+    def bar(self, open_, high, low, close, volume=1_000_000.0, ticker="AAPL"):
+        self.event_bus.publish(MarketEvent(ticker, close, 0, open_, high, low, volume))
+        self.event_bus.run_until_idle()
+
+    def order(self, *args, **kwargs):
+        self.event_bus.publish(OrderEvent(*args, **kwargs))
+        self.event_bus.run_until_idle()
+
+    def test_market_order_latency(self):
+        SimulatedBroker(self.event_bus)
+        self.bar(100, 101, 99, 100.5)
+        self.order("AAPL", "MKT", 10, "BUY")
+        self.assertEqual([(f.quantity, f.fill_price, f.commission) for f in self.fills], [(10, 100.5, 5.0)])
+
+        delayed = EventBus(threaded=False)
+        fills = []
+        delayed.subscribe(EventType.FILL, fills.append)
+        SimulatedBroker(delayed, latency_bars=1)
+        delayed.publish(MarketEvent("AAPL", 100.5, 0, 100, 101, 99, 1e6))
+        delayed.publish(OrderEvent("AAPL", "MKT", 10, "BUY"))
+        delayed.run_until_idle()
+        self.assertEqual(fills, [])
+        delayed.publish(MarketEvent("AAPL", 103, 0, 102, 104, 101, 1e6))
+        delayed.run_until_idle()
+        self.assertEqual(fills[0].fill_price, 102)
+
+    def test_limit_orders_match_against_bar_range(self):
+        broker = SimulatedBroker(self.event_bus)
+        self.bar(100, 101, 99, 100)
+        self.order("AAPL", "LMT", 10, "BUY", limit_price=97.0, order_id=1)
+        self.order("AAPL", "LMT", 10, "SELL", limit_price=103.0, order_id=2)
+        self.assertEqual(self.fills, [])
+        self.bar(99, 99.5, 97.5, 98)
+        self.assertEqual(self.fills, [])
+        self.assertEqual(set(broker.open_orders), {1, 2})
+
+        self.bar(98, 99, 96, 97)
+        self.assertEqual([(f.order_id, f.fill_price) for f in self.fills], [(1, 97.0)])
+        # gaps through the limit fill at the open
+        self.bar(105, 106, 104, 105)
+        self.assertEqual([(f.order_id, f.fill_price) for f in self.fills[1:]], [(2, 105.0)])
+        self.assertEqual(broker.open_orders, {})
+
+    def test_marketable_limit_fills_at_last_close(self):
+        SimulatedBroker(self.event_bus)
+        self.bar(100, 101, 99, 100)
+        self.order("AAPL", "LMT", 10, "BUY", limit_price=100.5)
+        self.assertEqual(self.fills[0].fill_price, 100)
+
+    def test_stop_orders_trigger_with_slippage(self):
+        SimulatedBroker(self.event_bus, slippage=FixedSlippage(bps=10))
+        self.bar(100, 101, 99, 100)
+        self.order("AAPL", "STP", 10, "SELL", stop_price=95.0)
+        self.order("AAPL", "STP", 10, "BUY", stop_price=108.0)
+        self.bar(99, 100, 96, 97)
+        self.assertEqual(self.fills, [])
+        self.bar(94, 96, 93, 95)
+        self.assertEqual(self.fills[0].direction, "SELL")
+        self.assertAlmostEqual(self.fills[0].fill_price, 94 * (1 - 0.001))
+        self.bar(105, 110, 104, 109)
+        self.assertAlmostEqual(self.fills[1].fill_price, 108 * (1 + 0.001))
+
+    def test_volume_participation_and_priority(self):
+        broker = SimulatedBroker(self.event_bus, participation=VolumeParticipation(0.1))
+        self.bar(100, 101, 99, 100, volume=10_000)
+        self.order("AAPL", "LMT", 600, "BUY", limit_price=98.0, order_id=1)
+        self.order("AAPL", "LMT", 600, "BUY", limit_price=99.0, order_id=2)
+        self.order("AAPL", "LMT", 600, "BUY", limit_price=99.0, order_id=3)
+        self.assertTrue(broker.cancel(3))
+        self.assertFalse(broker.cancel(3))
+        self.bar(99, 99, 97, 98, volume=10_000)
+        # 1000 shares of capacity: the better priced order first, then the rest
+        self.assertEqual([(f.order_id, f.quantity, f.fill_price) for f in self.fills],
+                         [(2, 600, 99.0), (1, 400, 98.0)])
+        self.bar(98, 99, 97, 98, volume=1_000)
+        self.assertEqual([(f.order_id, f.quantity) for f in self.fills[2:]], [(1, 100)])
+        self.assertEqual(broker.open_orders[1].remaining, 100)
+
+    def test_invalid_orders(self):
+        broker = SimulatedBroker(self.event_bus)
+        with self.assertRaises(ValueError):
+            broker.submit(OrderEvent("AAPL", "LMT", 10, "BUY"))
+        with self.assertRaises(ValueError):
+            broker.submit(OrderEvent("AAPL", "IOC", 10, "BUY"))
+
+    def test_execution_handler_routes_through_broker(self):
+        data_handler = HistoricCSVDataHandler(self.event_bus, [AAPL_CSV], ["AAPL"])
+        broker = SimulatedBroker(self.event_bus, commission=PerShareCommission(0.01, 1.0), latency_bars=1)
+        execution_handler = ExecutionHandler(self.event_bus, quantity=50, broker=broker)
+        position_manager = PositionManager(self.event_bus)
+        signals = []
+
+        def on_market(event):
+            if not signals:
+                signals.append(event)
+                self.event_bus.publish(SignalEvent("AAPL", "BUY", event.price))
+
+        self.event_bus.subscribe(EventType.MARKET, on_market)
+        self.event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        Backtest(self.event_bus, data_handler).run()
+        self.assertEqual(len(self.fills), 1)
+        self.assertEqual(self.fills[0].fill_price, data_handler.ticker_data["AAPL"]["open"].iloc[1])
+        self.assertEqual(self.fills[0].commission, 1.0)
+        self.assertEqual(position_manager.positions["AAPL"], 50)
+
+
+class TestCostModels(unittest.TestCase):
+    def test_models(self):
+        self.assertEqual(PercentCommission(0.001, 1.0).commission(100, 50.0), 5.0)
+        self.assertEqual(PercentCommission(0.001, 10.0).commission(100, 50.0), 10.0)
+        self.assertAlmostEqual(VolumeShareSlippage(0.1).fill_price("BUY", 100.0, 100, 1000), 100.1)
+        self.assertAlmostEqual(VolumeShareSlippage(0.1).fill_price("SELL", 100.0, 100, 1000), 99.9)
+        self.assertEqual(VolumeParticipation(0.25).capacity(10), 2)
+
+if __name__ == '__main__':
+    unittest.main()
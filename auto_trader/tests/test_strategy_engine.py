@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from auto_trader.benchmarks.synthetic import generate_universe
+from auto_trader.common.event import EventBus, EventType, MarketBatchEvent, MarketEvent, SignalEvent
+from auto_trader.common.instrumentation import Instrumentation
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.strategy_engine.cross_sectional import CrossSectionalMomentumStrategy
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+
+class Recorder(Strategy):
+    """Records the tickers it is shown and signals on every bar."""
+    def __init__(self, tickers=None):
+        if tickers is not None:
+            self.tickers = frozenset(tickers)
+        self.seen = []
+
+    def calculate_signals(self, event):
+        self.seen.append(event.ticker)
+        return SignalEvent(event.ticker, "BUY", event.price)
+
+
+def batch(tickers, closes, timestamp=0):
+    closes = np.asarray(closes, dtype=np.float64)
+    arrays = {"ticker": np.array(tickers, dtype=object), "close": closes}
+    for field in ("open", "high", "low", "volume"):
+        arrays[field] = closes.copy()
+    return MarketBatchEvent(timestamp, arrays)
+
+
+class TestStrategyEngine(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus(threaded=False)
+        self.signals = []
+        self.bus.subscribe(EventType.SIGNAL, self.signals.append)
+        self.a, self.everything, self.ab = Recorder(["A"]), Recorder(), Recorder(["A", "B"])
+        self.engine = StrategyEngine([self.a, self.everything, self.ab], self.bus)
+
+    def test_market_events_are_routed_by_ticker(self):
+        self.assertEqual(self.engine.strategies_for("A"), [self.a, self.everything, self.ab])
+        self.assertEqual(self.engine.strategies_for("B"), [self.everything, self.ab])
+        self.assertEqual(self.engine.strategies_for("Z"), [self.everything])
+        for ticker in ("A", "B", "Z", "A"):
+            self.bus.publish(MarketEvent(ticker, 1.0))
+        self.bus.run_until_idle()
+        self.assertEqual(self.a.seen, ["A", "A"])
+        self.assertEqual(self.everything.seen, ["A", "B", "Z", "A"])
+        self.assertEqual(self.ab.seen, ["A", "B", "A"])
+        self.assertEqual(len(self.signals), 9)
+
+    def test_batches_are_filtered_per_strategy(self):
+        self.bus.publish(batch(["A", "B", "C"], [1.0, np.nan, 3.0]))
+        self.bus.publish(batch(["C"], [4.0]))
+        self.bus.run_until_idle()
+        # Bars missing under the "nan" fill policy are skipped by the default batch method
+        self.assertEqual(self.a.seen, ["A"])
+        self.assertEqual(self.everything.seen, ["A", "C", "C"])
+        self.assertEqual(self.ab.seen, ["A"])
+
+    def test_per_strategy_timings(self):
+        self.assertEqual(self.engine.timings(), {})
+        instrumentation = Instrumentation()
+        bus = EventBus(threaded=False, instrumentation=instrumentation)
+        engine = StrategyEngine([Recorder(["A"]), Recorder()], bus)
+        self.assertEqual(engine.strategy_names(), ["Recorder", "Recorder#2"])
+        for _ in range(3):
+            bus.publish(MarketEvent("B", 1.0))
+        bus.publish(batch(["A", "B"], [1.0, 2.0]))
+        bus.run_until_idle()
+        timings = engine.timings()
+        self.assertEqual(timings["Recorder#2"]["count"], 4)
+        self.assertEqual(timings["Recorder"]["count"], 1)
+        self.assertIn("strategy.Recorder#2", instrumentation.snapshot())
+
+
+class TestCrossSectionalMomentum(unittest.TestCase):
+    def test_holds_the_top_ranked_tickers(self):
+        strategy = CrossSectionalMomentumStrategy(["A", "B", "C"], lookback=2, top_n=1)
+        steps = [
+            ([100.0, 100.0, 100.0], []),
+            ([101.0, 100.0, 99.0], []),
+            ([102.0, 100.0, 98.0], [("A", "BUY")]),
+            ([102.0, 106.0, 98.0], [("A", "SELL"), ("B", "BUY")]),
+        ]
+        for timestamp, (closes, expected) in enumerate(steps):
+            signals = strategy.calculate_signals_batch(timestamp, batch(["A", "B", "C"], closes).arrays)
+            self.assertEqual([(s.ticker, s.action) for s in signals], expected)
+        self.assertEqual(signals[1].price, 106.0)
+
+    def test_rejects_per_ticker_events(self):
+        strategy = CrossSectionalMomentumStrategy(["A", "B"], lookback=2)
+        self.assertTrue(strategy.requires_batches)
+        self.assertFalse(Strategy.requires_batches)
+        with self.assertRaisesRegex(TypeError, "emit_batches=True"):
+            strategy.calculate_signals(MarketEvent("A", 100.0, 0))
+
+    def test_runs_on_aligned_batches(self):
+        frames = generate_universe(20, 200, seed=5)
+        bus = EventBus(threaded=False)
+        handler = HistoricCSVDataHandler.from_dataframes(bus, frames, emit_batches=True)
+        strategy = CrossSectionalMomentumStrategy(list(frames)[:10], lookback=10, top_n=3)
+        StrategyEngine([strategy], bus)
+        signals = []
+        bus.subscribe(EventType.SIGNAL, signals.append)
+        while handler.continue_backtest:
+            for event in handler.update_bars():
+                bus.publish(event)
+                bus.run_until_idle()
+        self.assertTrue(signals)
+        self.assertTrue({s.ticker for s in signals} <= strategy.tickers)
+        self.assertEqual(strategy.held.sum(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.common.event import EventBus, EventType
+from auto_trader.data_handler.streaming_csv_data_handler import StreamingCSVDataHandler
+
+
+class TestStreamingCSVDataHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frames = {}
+        self.paths = []
+        calendars = {
+            "AAA": pd.date_range("2023-01-02", periods=10, freq="D"),
+            "BBB": pd.date_range("2023-01-02", periods=7, freq="2D"),
+            "CCC": pd.date_range("2023-01-05", periods=4, freq="D"),
+        }
+        for i, (ticker, index) in enumerate(calendars.items()):
+            close = np.arange(len(index), dtype=float) + 100 * (i + 1)
+            df = pd.DataFrame({
+                "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000.0,
+            }, index=index.rename("datetime"))
+            path = os.path.join(self.tmp.name, f"{ticker}.csv")
+            df.to_csv(path)
+            self.frames[ticker] = df
+            self.paths.append(path)
+        self.tickers = list(calendars)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_bars_are_merged_chronologically(self):
+        handler = StreamingCSVDataHandler(EventBus(threaded=False), self.paths, self.tickers, chunk_size=3)
+        steps = []
+        while handler.continue_backtest:
+            events = handler.update_bars()
+            if events:
+                timestamps = {handler.get_latest_bars_values(e.ticker, "datetime")[-1] for e in events}
+                self.assertEqual(len(timestamps), 1)
+                steps.append((timestamps.pop(), [(e.ticker, e.price) for e in events]))
+
+        expected = (
+            pd.concat([df.assign(ticker=t) for t, df in self.frames.items()])
+            .reset_index()
+            .sort_values(["datetime", "ticker"], kind="stable")
+        )
+        flattened = [bar for _, bars in steps for bar in bars]
+        self.assertEqual(flattened, list(zip(expected["ticker"], expected["close"])))
+        step_times = [timestamp for timestamp, _ in steps]
+        self.assertEqual(step_times, sorted(set(step_times)))
+        self.assertEqual(len(steps), expected["datetime"].nunique())
+        # Without history_depth the handler keeps every bar, like HistoricCSVDataHandler
+        np.testing.assert_array_equal(handler.get_latest_bars_values("AAA", "close", 5),
+                                      self.frames["AAA"]["close"].to_numpy()[-5:])
+
+    def test_backtest_driver_and_history(self):
+        event_bus = EventBus(threaded=False)
+        handler = StreamingCSVDataHandler(event_bus, self.paths, self.tickers, chunk_size=2, history_depth=3)
+        received = []
+        event_bus.subscribe(EventType.MARKET, received.append)
+        self.assertEqual(Backtest(event_bus, handler).run(), sum(len(df) for df in self.frames.values()))
+        self.assertEqual(len(received), 21)
+        self.assertEqual(list(handler.get_latest_bars_values("AAA", "close", 5)), [107.0, 108.0, 109.0])
+        self.assertEqual(handler.get_bar_count("BBB"), 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.backtest.sweep import ParameterSweep, SharedBarData
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(3)
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+        df = pd.DataFrame({
+            "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": 1000.0,
+        }, index=pd.date_range("2021-01-01", periods=len(close), freq="D", name="datetime"))
+        self.syn_csv = os.path.join(self.tmp.name, "SYN.csv")
+        df.to_csv(self.syn_csv)
+        self.csv_files = [AAPL_CSV, self.syn_csv]
+        self.tickers = ["AAPL", "SYN"]
+        self.grid = {"short_window": [3, 5], "long_window": [5, 10, 15]}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sweep(self, **kwargs):
+        return ParameterSweep(
+            MovingAverageCrossoverStrategy, self.grid, self.csv_files, self.tickers,
+            max_workers=2, batch_size=1, constraint=lambda p: p["short_window"] < p["long_window"],
+            **kwargs
+        )
+
+    def test_matches_in_process_backtests(self):
+        table = self._sweep().run()
+        # (3, 5) (3, 10) (3, 15) (5, 10) (5, 15) for two tickers
+        self.assertEqual(len(table), 10)
+        for row in table.itertuples():
+            path = self.csv_files[self.tickers.index(row.ticker)]
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            strategy = MovingAverageCrossoverStrategy(None, row.short_window, row.long_window)
+            result = VectorizedBacktest(strategy, initial_cash=100_000.0).run(df, row.ticker)
+            self.assertEqual(row.num_fills, len(result.fills))
+            self.assertAlmostEqual(row.final_equity, result.equity[-1])
+
+    def test_event_driven_engine_matches_vectorized(self):
+        vectorized = self._sweep().run()
+        event_driven = self._sweep(engine="event").run()
+        pd.testing.assert_frame_equal(event_driven, vectorized)
+
+    def test_resume_skips_completed_tasks(self):
+        results_path = os.path.join(self.tmp.name, "results.jsonl")
+        full = self._sweep(results_path=results_path).run()
+
+        # keep only part of the results, as if the sweep had been interrupted
+        with open(results_path) as f:
+            lines = f.readlines()
+        with open(results_path, "w") as f:
+            f.writelines(lines[:4])
+
+        progress = []
+        resumed = self._sweep(results_path=results_path, progress=lambda done, total: progress.append((done, total))).run()
+        self.assertEqual(progress[0], (4, 10))
+        self.assertEqual(progress[-1], (10, 10))
+        pd.testing.assert_frame_equal(resumed, full)
+
+        progress.clear()
+        self._sweep(results_path=results_path, progress=lambda done, total: progress.append((done, total))).run()
+        self.assertEqual(progress, [(10, 10)])
+
+    def test_resume_after_interrupted_write_and_grid_change(self):
+        results_path = os.path.join(self.tmp.name, "results.jsonl")
+        # NumPy scalars in the grid are written as plain JSON numbers
+        self.grid = {"short_window": list(np.array([3, 5])), "long_window": list(np.array([5, 10, 15]))}
+        full = self._sweep(results_path=results_path).run()
+
+        # an interrupted run leaves half a row at the end of the file
+        with open(results_path) as f:
+            lines = f.readlines()
+        with open(results_path, "w") as f:
+            f.writelines(lines[:4] + [lines[4][:25]])
+        progress = []
+        resumed = self._sweep(results_path=results_path, progress=lambda done, total: progress.append((done, total))).run()
+        self.assertEqual(progress[0], (4, 10))
+        pd.testing.assert_frame_equal(resumed, full, check_dtype=False)
+        with open(results_path) as f:
+            self.assertEqual(len(f.readlines()), 10)
+
+        # rows outside the current grid are dropped, rows missing a new grid key are rerun
+        self.grid = {"short_window": [3, 5], "long_window": [5, 10]}
+        narrowed = self._sweep(results_path=results_path).run()
+        self.assertEqual(len(narrowed), 6)
+        self.assertEqual(set(narrowed["long_window"]), {5, 10})
+        self.grid["timeframe"] = [None]
+        progress.clear()
+        widened = self._sweep(results_path=results_path, progress=lambda done, total: progress.append((done, total))).run()
+        self.assertEqual(progress[0], (0, 6))
+        self.assertEqual(len(widened), 6)
+
+    def test_shared_frames_do_not_copy(self):
+        with SharedBarData.from_csv(self.csv_files, self.tickers) as data:
+            attached = SharedBarData.attach(data.descriptor)
+            df = attached.frame("AAPL")
+            expected = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True)
+            np.testing.assert_array_equal(df["close"].to_numpy(), expected["close"].to_numpy())
+            self.assertTrue((df.index == expected.index).all())
+            shared = np.ndarray((attached._shm.size,), dtype=np.uint8, buffer=attached._shm.buf)
+            self.assertTrue(np.shares_memory(df["close"].to_numpy(), shared))
+            del df, shared
+            attached.close()
+
+if __name__ == '__main__':
+    unittest.main()
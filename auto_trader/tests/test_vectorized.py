@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from auto_trader.backtest.backtest import Backtest
+from auto_trader.backtest.vectorized import VectorizedBacktest
+from auto_trader.common.event import EventBus, EventType
+from auto_trader.data_handler.historic_csv_data_handler import HistoricCSVDataHandler
+from auto_trader.execution_handler.execution_handler import ExecutionHandler
+from auto_trader.strategy_engine.buy_and_hold_strategy import MovingAverageCrossoverStrategy
+from auto_trader.strategy_engine.strategy import Strategy
+from auto_trader.strategy_engine.strategy_engine import StrategyEngine
+
+AAPL_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "AAPL.csv")
+
+
+class AlternatingStrategy(Strategy):
+    """Buys on even bars and sells on odd bars, vectorized only."""
+    def calculate_signals(self, event):
+        return None
+
+    def vectorized_signals(self, df):
+        signals = np.where(np.arange(len(df)) % 2 == 0, 1, -1)
+        return pd.Series(signals, index=df.index)
+
+
+class TestVectorizedBacktest(unittest.TestCase):
+    def setUp(self):
+        self.event_bus = EventBus(threaded=False)
+
+    def _event_driven_fills(self, csv_path, short_window, long_window):
+        data_handler = HistoricCSVDataHandler(self.event_bus, [csv_path], ["AAPL"])
+        strategy = MovingAverageCrossoverStrategy(data_handler, short_window, long_window)
+        StrategyEngine([strategy], self.event_bus)
+        execution_handler = ExecutionHandler(self.event_bus)
+        self.event_bus.subscribe(EventType.SIGNAL, execution_handler.on_signal)
+        fills = []
+        self.event_bus.subscribe(EventType.FILL, fills.append)
+        Backtest(self.event_bus, data_handler).run()
+        return data_handler, fills
+
+    def assertSameFills(self, event_fills, vectorized_fills):
+        self.assertEqual(len(event_fills), len(vectorized_fills))
+        for fill, row in zip(event_fills, vectorized_fills.itertuples()):
+            self.assertEqual(fill.ticker, row.ticker)
+            self.assertEqual(fill.direction, row.direction)
+            self.assertEqual(fill.quantity, row.quantity)
+            self.assertEqual(fill.fill_price, row.fill_price)
+            self.assertEqual(fill.commission, row.commission)
+
+    def test_parity_with_event_driven_on_csv(self):
+        data_handler, fills = self._event_driven_fills(AAPL_CSV, 3, 10)
+        self.assertEqual(len(fills), 1)
+        strategy = MovingAverageCrossoverStrategy(None, 3, 10)
+        result = VectorizedBacktest(strategy).run(data_handler.ticker_data["AAPL"], "AAPL")
+        self.assertSameFills(fills, result.fills)
+
+    def test_parity_on_synthetic_history(self):
+        rng = np.random.default_rng(7)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))
+        df = pd.DataFrame({
+            "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": 1_000_000.0,
+        }, index=pd.date_range("2020-01-01", periods=len(close), freq="D", name="datetime"))
+        # start in a downtrend so the crossover fires late in the series
+        df.loc[df.index[:300], "close"] = np.linspace(200, 100, 300)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "SYN.csv")
+            df.to_csv(path)
+            for short_window, long_window in [(5, 20), (10, 50)]:
+                self.setUp()
+                data_handler, fills = self._event_driven_fills(path, short_window, long_window)
+                strategy = MovingAverageCrossoverStrategy(None, short_window, long_window)
+                result = VectorizedBacktest(strategy).run(data_handler.ticker_data["AAPL"], "AAPL")
+                self.assertEqual(len(fills), 1)
+                self.assertGreater(result.fills.index[0], df.index[300])
+                self.assertSameFills(fills, result.fills)
+
+    def test_parity_with_several_tickers(self):
+        frames = {}
+        for k, ticker in enumerate(("AAA", "BBB")):
+            close = 100 * np.exp(np.cumsum(np.random.default_rng(k).normal(0, 0.01, 300)))
+            frames[ticker] = pd.DataFrame({
+                "open": close, "high": close, "low": close, "close": close, "volume": 1_000_000.0,
+            }, index=pd.date_range("2020-01-01", periods=len(close), freq="D", name="datetime"))
+        data_handler = HistoricCSVDataHandler.from_dataframes(self.event_bus, frames)
+        StrategyEngine([MovingAverageCrossoverStrategy(data_handler, 5, 20)], self.event_bus)
+        self.event_bus.subscribe(EventType.SIGNAL, ExecutionHandler(self.event_bus).on_signal)
+        fills = []
+        self.event_bus.subscribe(EventType.FILL, fills.append)
+        Backtest(self.event_bus, data_handler).run()
+
+        strategy = MovingAverageCrossoverStrategy(None, 5, 20)
+        expected = [VectorizedBacktest(strategy).run(df, ticker).fills for ticker, df in frames.items()]
+        self.assertEqual(len(fills), 2)
+        for ticker, vectorized_fills in zip(frames, expected):
+            self.assertSameFills([fill for fill in fills if fill.ticker == ticker], vectorized_fills)
+
+    def test_positions_cash_and_equity(self):
+        df = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True).iloc[:4]
+        result = VectorizedBacktest(AlternatingStrategy(), quantity=10, commission=1.0).run(df, "AAPL")
+        close = df["close"].to_numpy()
+        np.testing.assert_array_equal(result.positions, [10, 0, 10, 0])
+        expected_cash = np.cumsum([-10 * close[0] - 1, 10 * close[1] - 1, -10 * close[2] - 1, 10 * close[3] - 1])
+        np.testing.assert_allclose(result.cash, expected_cash)
+        np.testing.assert_allclose(result.equity, expected_cash + result.positions * close)
+
+    def test_fill_at_next_open(self):
+        df = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True).iloc[:3]
+        result = VectorizedBacktest(AlternatingStrategy(), fill_at="next_open").run(df, "AAPL")
+        self.assertEqual(list(result.fills["direction"]), ["BUY", "SELL"])
+        self.assertEqual(list(result.fills["fill_price"]), list(df["open"].iloc[1:]))
+        self.assertEqual(list(result.fills.index), list(df.index[1:]))
+
+    def test_strategy_without_hook(self):
+        class EventOnly(Strategy):
+            def calculate_signals(self, event):
+                return None
+        df = pd.read_csv(AAPL_CSV, index_col=0, parse_dates=True)
+        with self.assertRaises(NotImplementedError):
+            VectorizedBacktest(EventOnly()).run(df, "AAPL")
+
+if __name__ == '__main__':
+    unittest.main()